@@ -11,4 +11,23 @@ CREATE TABLE LinearRegressionPredictions (
     predictedresult  DECIMAL(8, 2) NOT NULL, -- 8394, 10.12, 1:52.12
     seasonType      VARCHAR(8) NOT NULL CHECK (seasonType IN ('Outdoor', 'Indoor')),
     seasonYear      INT NOT NULL
-);
\ No newline at end of file
+);
+
+-- Predictions of every registered model in prediction_analysis/models.py, one row per entrant per model
+DROP TABLE IF EXISTS ModelPredictions CASCADE;
+CREATE TABLE ModelPredictions (
+    Model           VARCHAR(30) NOT NULL, -- linear, season_best, time_weighted
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101 (TFRRS Event ID)
+    EventName       VARCHAR(20) NOT NULL, -- 100m, 4x100m, Discus
+    EventType       VARCHAR(8) NOT NULL CHECK (EventType IN ('sprints', 'distance', 'jumps', 'throws', 'combined')), -- sprints, distance, jumps, throws, combined
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F', 'X')), -- M, F, X
+    SchoolID        VARCHAR(20) NOT NULL REFERENCES School(SchoolID), -- Johns_Hopkins
+    AthleteID       INT NOT NULL, -- 1, 101
+    AthleteFirstName VARCHAR(100) NOT NULL, -- John
+    AthleteLastName  VARCHAR(100) NOT NULL, -- Doe
+    predictedresult  DECIMAL(8, 2) NOT NULL, -- 8394, 10.12, 1:52.12
+    seasonType      VARCHAR(8) NOT NULL CHECK (seasonType IN ('Outdoor', 'Indoor')),
+    seasonYear      INT NOT NULL
+);
+
+CREATE INDEX ModelPredictions_Season ON ModelPredictions (Model, seasonYear, seasonType, Gender);
@@ -0,0 +1,211 @@
+-- Per athlete-season / event and per relay school / gender / event running features, the
+-- conference top-K leaderboard per event / season / gender and athletes' PB / SB progressions.
+-- Maintained incrementally by the ingest path (backends.Backend.upsert_*_features, leaderboard.py,
+-- progression.py) every time a performance is written, so models and routes read precomputed rows
+-- instead of rescanning Performance. Athlete ratings and mark percentiles are refreshed after ingest
+-- (python ratings.py update, python percentiles.py refresh). Full meet fields come from meet results
+-- pages (python meet_results.py fetch). Every ingest run appends the keys it wrote to the change feed
+-- (python change_feed.py since <RunID>).
+-- Rebuild from scratch with: python backends.py --rebuild-features
+--
+-- Written to run unchanged on Postgres and SQLite (backends.SQLiteBackend applies it on connect).
+-- Marks are stored as Min/Max; the views pick Best/Worst by event direction.
+-- Days are counted from 1970-01-01, so the Day* moments give a least-squares trend per day:
+--   slope = (n * DayMarkSum - DaySum * MarkSum) / (n * DaySumSq - DaySum^2)
+
+
+CREATE TABLE IF NOT EXISTS AthleteEventFeatures (
+    AthleteSeasonID INT NOT NULL REFERENCES AthleteSeason(AthleteSeasonID), -- 1, 101
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    MinMark         DOUBLE PRECISION NOT NULL, -- 10.52
+    MaxMark         DOUBLE PRECISION NOT NULL, -- 11.03
+    MarkCount       INT NOT NULL, -- 6
+    MarkSum         DOUBLE PRECISION NOT NULL, -- sum of marks
+    MarkSumSq       DOUBLE PRECISION NOT NULL, -- sum of squared marks
+    DaySum          DOUBLE PRECISION NOT NULL, -- sum of meet days
+    DaySumSq        DOUBLE PRECISION NOT NULL, -- sum of squared meet days
+    DayMarkSum      DOUBLE PRECISION NOT NULL, -- sum of day * mark
+    FirstDate       DATE NOT NULL, -- 2025-12-07
+    LastDate        DATE NOT NULL, -- 2026-02-28
+    LastMark        DOUBLE PRECISION NOT NULL, -- mark at LastDate
+    PRIMARY KEY (AthleteSeasonID, EventID)
+);
+
+CREATE TABLE IF NOT EXISTS RelayEventFeatures (
+    SchoolID        VARCHAR(20) NOT NULL REFERENCES School(SchoolID), -- Johns_Hopkins
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')), -- M, F
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    MinMark         DOUBLE PRECISION NOT NULL,
+    MaxMark         DOUBLE PRECISION NOT NULL,
+    MarkCount       INT NOT NULL,
+    MarkSum         DOUBLE PRECISION NOT NULL,
+    MarkSumSq       DOUBLE PRECISION NOT NULL,
+    DaySum          DOUBLE PRECISION NOT NULL,
+    DaySumSq        DOUBLE PRECISION NOT NULL,
+    DayMarkSum      DOUBLE PRECISION NOT NULL,
+    FirstDate       DATE NOT NULL,
+    LastDate        DATE NOT NULL,
+    LastMark        DOUBLE PRECISION NOT NULL,
+    PRIMARY KEY (SchoolID, Gender, EventID, SeasonType, SeasonYear)
+);
+
+-- Best mark of each of the top athletes (or relay schools) per event and season; AthleteID is NULL for relays
+CREATE TABLE IF NOT EXISTS EventLeaderboard (
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')), -- M, F
+    Place           INT NOT NULL, -- 1, 2, ... K
+    SchoolID        VARCHAR(20) NOT NULL REFERENCES School(SchoolID), -- Johns_Hopkins
+    AthleteID       INT REFERENCES Athlete(AthleteID), -- 1, 101
+    BestMark        DOUBLE PRECISION NOT NULL, -- 10.52
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID), -- meet of the best mark
+    PRIMARY KEY (EventID, SeasonType, SeasonYear, Gender, Place)
+);
+
+-- Every mark that improved an athlete's best in an individual event: Kind 'PB' over all seasons of a
+-- season type, 'SB' within one season. One row per date; Improvement is NULL for the first mark.
+CREATE TABLE IF NOT EXISTS BestProgression (
+    AthleteID       INT NOT NULL REFERENCES Athlete(AthleteID), -- 1, 101
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    Kind            VARCHAR(2) NOT NULL CHECK (Kind IN ('PB', 'SB')), -- PB, SB
+    SeasonYear      INT NOT NULL, -- season the mark was set in
+    MarkDate        DATE NOT NULL, -- 2025-02-01
+    Mark            DOUBLE PRECISION NOT NULL, -- 7.01
+    Improvement     DOUBLE PRECISION, -- 0.04 better than the previous best
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID),
+    PRIMARY KEY (AthleteID, EventID, SeasonType, Kind, SeasonYear, MarkDate)
+);
+
+-- Glicko-style strength of each athlete per event group, from every meet's individual results in date
+-- order (ratings.py). RatedMeet holds the meets already applied and how many marks they had then.
+CREATE TABLE IF NOT EXISTS AthleteRating (
+    AthleteID       INT NOT NULL REFERENCES Athlete(AthleteID), -- 1, 101
+    EventGroup      VARCHAR(8) NOT NULL CHECK (EventGroup IN ('sprints', 'distance', 'jumps', 'throws', 'combined')), -- TrackEvent.EventType
+    Rating          DOUBLE PRECISION NOT NULL, -- 1500 for a new athlete
+    Deviation       DOUBLE PRECISION NOT NULL, -- uncertainty of Rating, 350 for a new athlete
+    MeetCount       INT NOT NULL, -- 12
+    LastDate        DATE NOT NULL, -- date of the last rated meet
+    PRIMARY KEY (AthleteID, EventGroup)
+);
+
+CREATE TABLE IF NOT EXISTS RatedMeet (
+    MeetID          INT PRIMARY KEY REFERENCES TrackMeet(MeetID), -- 1, 101
+    StartDate       DATE NOT NULL, -- 2025-02-01
+    Performances    INT NOT NULL -- individual marks when rated; a different count means the meet changed
+);
+
+-- Sorted quantiles of athletes' season-best marks per event, gender, season type and year range, for
+-- mark -> percentile lookups (percentiles.py). FirstYear = LastYear = 0 covers every season.
+CREATE TABLE IF NOT EXISTS MarkPercentiles (
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')), -- M, F
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    FirstYear       INT NOT NULL, -- 2022, 0 for every season
+    LastYear        INT NOT NULL, -- 2025, 0 for every season
+    HigherIsBetter  BOOLEAN NOT NULL, -- field events and combined
+    MarkCount       INT NOT NULL, -- season bests the quantiles summarize
+    Quantiles       BYTEA NOT NULL, -- ascending float64 array, at most percentiles.QUANTILE_POINTS values
+    PRIMARY KEY (EventID, Gender, SeasonType, FirstYear, LastYear)
+);
+
+-- Event seasons with marks ingested since the last percentile refresh
+CREATE TABLE IF NOT EXISTS PercentileDirty (
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')), -- M, F
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025
+    PRIMARY KEY (EventID, Gender, SeasonType, SeasonYear)
+);
+
+-- Every entrant of every event on a meet's results page (meet_results.py), from any school. Marks of
+-- School athletes are also in Performance; the rest of the field is only kept here.
+CREATE TABLE IF NOT EXISTS MeetEntry (
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID), -- 1, 101
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')), -- M, F
+    Section         VARCHAR(20) NOT NULL, -- Final, Prelims, Heat 2
+    EntryKey        VARCHAR(120) NOT NULL, -- athlete id, or the team and result for relays
+    AthleteID       INT, -- NULL for relays
+    EntrantName     VARCHAR(200) NOT NULL, -- Spencer Ye, Johns Hopkins
+    TeamName        VARCHAR(100) NOT NULL, -- Johns Hopkins, Salisbury
+    TeamSlug        VARCHAR(100), -- Johns_Hopkins, Salisbury (TFRRS team slug), NULL if not linked
+    Place           INT, -- 1, 12, NULL when unplaced
+    ResultValue     DECIMAL(8, 2), -- 10.12, NULL for DNF, DQ...
+    WindGauge       DECIMAL(3, 1), -- 0.0, 2.1
+    PRIMARY KEY (MeetID, EventID, Gender, Section, EntryKey)
+);
+
+-- Meets whose results page has been ingested, so each page is fetched and parsed once
+CREATE TABLE IF NOT EXISTS FetchedMeet (
+    MeetID          INT PRIMARY KEY REFERENCES TrackMeet(MeetID), -- 1, 101
+    FetchedOn       DATE NOT NULL, -- 2025-02-23
+    Entries         INT NOT NULL, -- MeetEntry rows from the page
+    Added           INT NOT NULL -- School athletes' marks the school lists were missing
+);
+
+-- Lookup of an exact mark before it is inserted (backends.Backend.performance_exists), so ingesting a
+-- page twice stores nothing twice
+CREATE INDEX IF NOT EXISTS Performance_Entry ON Performance (MeetID, EventID, AthleteSeasonID);
+
+-- Append-only change feed (change_feed.py): one IngestRun per scraped page or meet fetch, and one
+-- IngestChange per athlete, meet, event, season or school the run wrote. Consumers keep the last RunID
+-- they processed and recompute only the keys of later runs.
+CREATE TABLE IF NOT EXISTS IngestRun (
+    RunID           INT PRIMARY KEY, -- 1, 2
+    Source          VARCHAR(200) NOT NULL, -- scrape 2025 Indoor m Johns_Hopkins
+    FinishedAt      TIMESTAMP NOT NULL, -- 2025-02-23 18:04:11
+    Changes         INT NOT NULL -- IngestChange rows of the run
+);
+
+CREATE TABLE IF NOT EXISTS IngestChange (
+    RunID           INT NOT NULL REFERENCES IngestRun(RunID), -- 1, 2
+    Kind            VARCHAR(10) NOT NULL CHECK (Kind IN ('athlete', 'meet', 'event', 'season', 'school')),
+    ChangeKey       VARCHAR(100) NOT NULL, -- 8001, 86242, 46, 2025-Indoor, Johns_Hopkins
+    PRIMARY KEY (RunID, Kind, ChangeKey)
+);
+
+
+DROP VIEW IF EXISTS AthleteEventFeatureView;
+CREATE VIEW AthleteEventFeatureView AS
+SELECT
+    F.AthleteSeasonID,
+    F.EventID,
+    E.EventType,
+    CASE WHEN E.EventType IN ('throws', 'jumps', 'combined') THEN F.MaxMark ELSE F.MinMark END AS BestMark,
+    CASE WHEN E.EventType IN ('throws', 'jumps', 'combined') THEN F.MinMark ELSE F.MaxMark END AS WorstMark,
+    F.MarkCount,
+    F.MarkSum / F.MarkCount AS MeanMark,
+    CASE WHEN F.MarkCount > 1 THEN (F.MarkSumSq - F.MarkSum * F.MarkSum / F.MarkCount) / (F.MarkCount - 1) END AS MarkVariance,
+    F.DaySum / F.MarkCount AS MeanDay,
+    (F.MarkCount * F.DayMarkSum - F.DaySum * F.MarkSum) / NULLIF(F.MarkCount * F.DaySumSq - F.DaySum * F.DaySum, 0) AS TrendPerDay,
+    F.FirstDate,
+    F.LastDate,
+    F.LastMark
+FROM AthleteEventFeatures AS F
+JOIN TrackEvent AS E ON E.EventID = F.EventID;
+
+DROP VIEW IF EXISTS RelayEventFeatureView;
+CREATE VIEW RelayEventFeatureView AS
+SELECT
+    F.SchoolID,
+    F.Gender,
+    F.EventID,
+    F.SeasonType,
+    F.SeasonYear,
+    E.EventType,
+    F.MinMark AS BestMark,
+    F.MaxMark AS WorstMark,
+    F.MarkCount,
+    F.MarkSum / F.MarkCount AS MeanMark,
+    CASE WHEN F.MarkCount > 1 THEN (F.MarkSumSq - F.MarkSum * F.MarkSum / F.MarkCount) / (F.MarkCount - 1) END AS MarkVariance,
+    F.DaySum / F.MarkCount AS MeanDay,
+    (F.MarkCount * F.DayMarkSum - F.DaySum * F.MarkSum) / NULLIF(F.MarkCount * F.DaySumSq - F.DaySum * F.DaySum, 0) AS TrendPerDay,
+    F.FirstDate,
+    F.LastDate,
+    F.LastMark
+FROM RelayEventFeatures AS F
+JOIN TrackEvent AS E ON E.EventID = F.EventID;
@@ -0,0 +1,66 @@
+-- Migrates an existing (unpartitioned) Performance table to the season-partitioned layout
+-- in table_generation.sql. Run once on Neon; new databases get the partitioned table directly.
+
+
+BEGIN;
+
+ALTER TABLE Performance RENAME TO Performance_Unpartitioned;
+ALTER SEQUENCE performance_performanceid_seq OWNED BY NONE;
+ALTER TABLE Performance_Unpartitioned ALTER COLUMN PerformanceID DROP DEFAULT;
+
+CREATE TABLE Performance (
+    PerformanceID    INT NOT NULL DEFAULT nextval('performance_performanceid_seq'), -- 1, 101
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID), -- 1, 101
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    AthleteSeasonID  INT REFERENCES AthleteSeason(AthleteSeasonID), -- 1, 101
+    RelayTeamID      INT REFERENCES RelayTeam(RelayTeamID), -- 1, 101
+    ResultValue      DECIMAL(8, 2) NOT NULL, -- 8394, 10.12, 1:52.12
+    WindGauge        DECIMAL(3, 1), -- 0.0, 2.1
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    PRIMARY KEY (PerformanceID, SeasonYear, SeasonType),
+    CHECK ((RelayTeamID IS NULL AND AthleteSeasonID IS NOT NULL) OR (AthleteSeasonID IS NULL AND RelayTeamID IS NOT NULL))
+) PARTITION BY RANGE (SeasonYear);
+
+ALTER SEQUENCE performance_performanceid_seq OWNED BY Performance.PerformanceID;
+
+DO $$
+BEGIN
+    FOR year IN 2010..2026 LOOP
+        EXECUTE format('CREATE TABLE Performance_%s PARTITION OF Performance FOR VALUES FROM (%s) TO (%s) PARTITION BY LIST (SeasonType)', year, year, year + 1);
+        EXECUTE format('CREATE TABLE Performance_%s_Indoor PARTITION OF Performance_%s FOR VALUES IN (''Indoor'')', year, year);
+        EXECUTE format('CREATE TABLE Performance_%s_Outdoor PARTITION OF Performance_%s FOR VALUES IN (''Outdoor'')', year, year);
+    END LOOP;
+END $$;
+
+-- Individual performances take their season from AthleteSeason, relays from any of their
+-- members. Relays with no known members fall back to the meet date
+-- (Nov-Mar is Indoor, and December meets count toward the next year's Indoor season).
+INSERT INTO Performance (PerformanceID, MeetID, EventID, AthleteSeasonID, RelayTeamID, ResultValue, WindGauge, SeasonType, SeasonYear)
+SELECT
+    p.PerformanceID,
+    p.MeetID,
+    p.EventID,
+    p.AthleteSeasonID,
+    p.RelayTeamID,
+    p.ResultValue,
+    p.WindGauge,
+    COALESCE(ats.SeasonType, rs.SeasonType,
+        CASE WHEN EXTRACT(MONTH FROM tm.StartDate) IN (11, 12, 1, 2, 3) THEN 'Indoor' ELSE 'Outdoor' END),
+    COALESCE(ats.SeasonYear, rs.SeasonYear,
+        CASE WHEN EXTRACT(MONTH FROM tm.StartDate) IN (11, 12) THEN EXTRACT(YEAR FROM tm.StartDate)::INT + 1
+             ELSE EXTRACT(YEAR FROM tm.StartDate)::INT END)
+FROM Performance_Unpartitioned p
+JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+LEFT JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+LEFT JOIN LATERAL (
+    SELECT mats.SeasonType, mats.SeasonYear
+    FROM RelayTeamMembers rtm
+    JOIN AthleteSeason mats ON rtm.AthleteSeasonID = mats.AthleteSeasonID
+    WHERE rtm.RelayTeamID = p.RelayTeamID
+    LIMIT 1
+) rs ON TRUE;
+
+DROP TABLE Performance_Unpartitioned;
+
+COMMIT;
@@ -2,6 +2,12 @@
 -- Centennial Conference Track & Field Database
 -- SQL Queries (Phase 1 Requirements)
 -- Authors: Mirra Klimov & Spencer Ye
+--
+-- Season filters on Performance use p.SeasonYear / p.SeasonType (not the
+-- AthleteSeason copy) so Postgres can prune to a single season partition.
+--
+-- scrape_tffrs/queries.py runs these as parameterized, cached Python functions;
+-- keep the two in step.
 -- ============================================================
 
 
@@ -83,7 +89,7 @@ JOIN TrackEvent e ON p.EventID = e.EventID
 JOIN TrackMeet tm ON p.MeetID = tm.MeetID
 WHERE a.AthleteLastName = 'Ye'
   AND a.AthleteFirstName = 'Spencer'
-  AND ats.SeasonYear = 2025
+  AND p.SeasonYear = 2025
 ORDER BY tm.StartDate, e.EventName;
 
 
@@ -181,8 +187,8 @@ WITH RankedAthletes AS (
     JOIN Athlete a ON ats.AthleteID = a.AthleteID
     JOIN School s ON ats.SchoolID = s.SchoolID
     JOIN TrackEvent e ON p.EventID = e.EventID
-    WHERE ats.SeasonYear = 2025
-      AND ats.SeasonType = 'Indoor'
+    WHERE p.SeasonYear = 2025
+      AND p.SeasonType = 'Indoor'
       AND e.IsRelay = FALSE
       AND e.MeasureUnit = 'seconds'  -- Only time events for this example
     GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName, e.EventID, e.EventName
@@ -192,6 +198,18 @@ FROM RankedAthletes
 WHERE ConferenceRank <= 5
 ORDER BY EventName, ConferenceRank;
 
+-- Same answer, per gender, from the leaderboard that ingest keeps up to date (feature_tables.sql)
+SELECT e.EventName, l.Gender, a.AthleteFirstName, a.AthleteLastName, s.SchoolName, l.BestMark, l.Place AS ConferenceRank
+FROM EventLeaderboard l
+JOIN TrackEvent e ON l.EventID = e.EventID
+JOIN Athlete a ON l.AthleteID = a.AthleteID
+JOIN School s ON l.SchoolID = s.SchoolID
+WHERE l.SeasonYear = 2025
+  AND l.SeasonType = 'Indoor'
+  AND l.Place <= 5
+  AND e.MeasureUnit = 'seconds'
+ORDER BY EventName, l.Gender, ConferenceRank;
+
 
 -- ============================================================
 -- QUERY 8: Athletes Who Competed in Multiple Events at Same Meet
@@ -315,6 +333,18 @@ WHERE a.AthleteLastName = 'Colletti'
 GROUP BY ats.SeasonYear, ats.SeasonType, ats.ClassYear
 ORDER BY ats.SeasonYear, ats.SeasonType;
 
+-- Every PB along the way (date, mark, improvement), kept up to date by ingest (feature_tables.sql)
+SELECT bp.SeasonType, bp.SeasonYear, bp.MarkDate, bp.Mark, bp.Improvement, tm.MeetName
+FROM BestProgression bp
+JOIN Athlete a ON bp.AthleteID = a.AthleteID
+JOIN TrackEvent e ON bp.EventID = e.EventID
+JOIN TrackMeet tm ON bp.MeetID = tm.MeetID
+WHERE a.AthleteLastName = 'Colletti'
+  AND a.AthleteFirstName = 'Alex'
+  AND e.EventName LIKE '%60 Meters%'
+  AND bp.Kind = 'PB'
+ORDER BY bp.SeasonType, bp.MarkDate;
+
 
 -- ============================================================
 -- QUERY 14: Event Records by School
@@ -349,7 +379,7 @@ FROM TrackMeet tm
 JOIN Performance p ON tm.MeetID = p.MeetID
 JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
 WHERE ats.SchoolID = 'Johns_Hopkins'
-  AND ats.SeasonYear = 2025
+  AND p.SeasonYear = 2025
 GROUP BY tm.MeetID, tm.MeetName, tm.StartDate, tm.EndDate
 ORDER BY tm.StartDate;
 
@@ -373,6 +403,14 @@ WHERE (a.AthleteLastName = 'Colletti' OR a.AthleteLastName = 'Ye')
   AND e.IsRelay = FALSE
 ORDER BY tm.StartDate, p.ResultValue;
 
+-- Both athletes' strength in the event's group from every meet they ran, kept by ratings.py (feature_tables.sql)
+SELECT a.AthleteFirstName || ' ' || a.AthleteLastName AS Athlete, r.Rating, r.Deviation, r.MeetCount
+FROM AthleteRating r
+JOIN Athlete a ON r.AthleteID = a.AthleteID
+WHERE (a.AthleteLastName = 'Colletti' OR a.AthleteLastName = 'Ye')
+  AND r.EventGroup = 'sprints'
+ORDER BY r.Rating DESC;
+
 
 -- ============================================================
 -- QUERY 17: Best Relay Teams
@@ -406,8 +444,8 @@ FROM Performance p
 JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
 JOIN Athlete a ON ats.AthleteID = a.AthleteID
 JOIN School s ON ats.SchoolID = s.SchoolID
-WHERE ats.SeasonYear = 2025
-  AND ats.SeasonType = 'Indoor'
+WHERE p.SeasonYear = 2025
+  AND p.SeasonType = 'Indoor'
 GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName
 ORDER BY PerformanceCount DESC
 LIMIT 20;
@@ -428,7 +466,7 @@ JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
 JOIN Athlete a ON ats.AthleteID = a.AthleteID
 JOIN School s ON ats.SchoolID = s.SchoolID
 JOIN TrackEvent e ON p.EventID = e.EventID
-WHERE ats.SeasonYear = 2025
+WHERE p.SeasonYear = 2025
   AND e.IsRelay = FALSE
 GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName
 HAVING COUNT(DISTINCT e.EventID) >= 3
@@ -448,7 +486,7 @@ FROM Performance p
 JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
 JOIN School s ON ats.SchoolID = s.SchoolID
 JOIN TrackEvent e ON p.EventID = e.EventID
-WHERE ats.SeasonYear = 2025
+WHERE p.SeasonYear = 2025
 GROUP BY s.SchoolID, s.SchoolName, e.EventType
 ORDER BY s.SchoolName, e.EventType;
 
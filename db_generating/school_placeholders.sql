@@ -0,0 +1,10 @@
+-- Lets discovery.py add placeholder School rows (SchoolID and SchoolName only) for the teams it finds,
+-- so their pages can be ingested before anyone fills in the location, address, enrollment and facility.
+-- Run once on Neon; new databases get the nullable columns from table_generation.sql directly.
+-- backends.SQLiteBackend rebuilds older local School tables itself.
+
+
+ALTER TABLE School ALTER COLUMN LocationID DROP NOT NULL;
+ALTER TABLE School ALTER COLUMN StreetAddress DROP NOT NULL;
+ALTER TABLE School ALTER COLUMN EnrollmentSize DROP NOT NULL;
+ALTER TABLE School ALTER COLUMN HasIndoorFacility DROP NOT NULL;
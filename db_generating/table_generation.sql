@@ -13,10 +13,11 @@ DROP TABLE IF EXISTS School CASCADE;
 CREATE TABLE School (
     SchoolID        VARCHAR(20) PRIMARY KEY, -- Johns_Hopkins, Ursinus
     SchoolName      VARCHAR(100) NOT NULL, -- Johns Hopkins University, Ursinus College
-    LocationID      INT NOT NULL REFERENCES GeographicLocation(LocationID), -- 1, 101
-    StreetAddress   VARCHAR(100) NOT NULL, -- 3400 North Charles Street, 101 West End Avenue
-    EnrollmentSize  INT NOT NULL, -- 10000, 1000
-    HasIndoorFacility BOOLEAN NOT NULL -- True, False
+    -- The rest are NULL for schools discovery.py added until someone fills them in
+    LocationID      INT REFERENCES GeographicLocation(LocationID), -- 1, 101
+    StreetAddress   VARCHAR(100), -- 3400 North Charles Street, 101 West End Avenue
+    EnrollmentSize  INT, -- 10000, 1000
+    HasIndoorFacility BOOLEAN -- True, False
 );
 
 DROP TABLE IF EXISTS TrackMeet CASCADE;
@@ -72,21 +73,40 @@ CREATE TABLE RelayTeamMembers (
     PRIMARY KEY (RelayTeamID, AthleteSeasonID)
 );
 
+-- NOTE: Performance is partitioned by season (SeasonYear, then SeasonType) so per-season
+-- reads and reloads only touch one partition. SeasonType/SeasonYear are copied from the
+-- AthleteSeason (or relay members' AthleteSeason) so Postgres can prune without a join.
 DROP TABLE IF EXISTS Performance CASCADE;
 CREATE TABLE Performance (
-    PerformanceID    SERIAL PRIMARY KEY, -- 1, 101
+    PerformanceID    SERIAL, -- 1, 101
     MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID), -- 1, 101
     EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
     AthleteSeasonID  INT REFERENCES AthleteSeason(AthleteSeasonID), -- 1, 101
     RelayTeamID      INT REFERENCES RelayTeam(RelayTeamID), -- 1, 101
     ResultValue      DECIMAL(8, 2) NOT NULL, -- 8394, 10.12, 1:52.12
     WindGauge        DECIMAL(3, 1), -- 0.0, 2.1
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    PRIMARY KEY (PerformanceID, SeasonYear, SeasonType),
     CHECK ((RelayTeamID IS NULL AND AthleteSeasonID IS NOT NULL) OR (AthleteSeasonID IS NULL AND RelayTeamID IS NOT NULL))
-);
+) PARTITION BY RANGE (SeasonYear);
+
+-- One partition per year (Performance_2025), split into one leaf per season (Performance_2025_Indoor)
+-- Later seasons are created on demand by repository.ensure_performance_partition
+DO $$
+BEGIN
+    FOR year IN 2010..2026 LOOP
+        EXECUTE format('CREATE TABLE Performance_%s PARTITION OF Performance FOR VALUES FROM (%s) TO (%s) PARTITION BY LIST (SeasonType)', year, year, year + 1);
+        EXECUTE format('CREATE TABLE Performance_%s_Indoor PARTITION OF Performance_%s FOR VALUES IN (''Indoor'')', year, year);
+        EXECUTE format('CREATE TABLE Performance_%s_Outdoor PARTITION OF Performance_%s FOR VALUES IN (''Outdoor'')', year, year);
+    END LOOP;
+END $$;
 
 DROP TABLE IF EXISTS CentennialConferenceEvents CASCADE;
 CREATE TABLE CentennialConferenceEvents (
     EventID         INT PRIMARY KEY, -- 1, 101 (TFRRS Event ID)
     Indoor          BOOLEAN NOT NULL, -- True, False
     Outdoor         BOOLEAN NOT NULL -- True, False
-);
\ No newline at end of file
+);
+
+-- Per athlete-season / event feature tables maintained by the ingest path: see feature_tables.sql
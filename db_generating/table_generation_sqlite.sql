@@ -0,0 +1,90 @@
+-- SQLite version of table_generation.sql for the embedded local backend (scrape_tffrs/backends.py)
+-- Same tables, keys and CHECK constraints. SERIAL becomes INTEGER PRIMARY KEY and Performance is a
+-- single table with a season index instead of season partitions.
+
+PRAGMA foreign_keys = ON;
+
+CREATE TABLE IF NOT EXISTS GeographicLocation (
+    LocationID      INTEGER PRIMARY KEY, -- 1, 10,
+    CityName        VARCHAR(100) NOT NULL, -- Baltimore, New York
+    StateCode       VARCHAR(2) NOT NULL, -- MD, NY
+    CountryCode     VARCHAR(2) NOT NULL -- US
+);
+
+CREATE TABLE IF NOT EXISTS School (
+    SchoolID        VARCHAR(20) PRIMARY KEY, -- Johns_Hopkins, Ursinus
+    SchoolName      VARCHAR(100) NOT NULL, -- Johns Hopkins University, Ursinus College
+    -- The rest are NULL for schools discovery.py added until someone fills them in
+    LocationID      INT REFERENCES GeographicLocation(LocationID), -- 1, 101
+    StreetAddress   VARCHAR(100), -- 3400 North Charles Street, 101 West End Avenue
+    EnrollmentSize  INT, -- 10000, 1000
+    HasIndoorFacility BOOLEAN -- True, False
+);
+
+CREATE TABLE IF NOT EXISTS TrackMeet (
+    MeetID          INT PRIMARY KEY, -- 1, 101 (TFRRS Meet ID)
+    MeetName        VARCHAR(200) NOT NULL, -- Navy Indoor Invitational, Black and Blue Invitational
+    StartDate       DATE NOT NULL, -- 2025-12-07, 2025-12-08
+    EndDate         DATE NOT NULL -- 2025-12-07, 2025-2026
+);
+
+CREATE TABLE IF NOT EXISTS Athlete (
+    AthleteID       INT PRIMARY KEY, -- 1, 101 (TFRRS Athlete ID)
+    AthleteLastName VARCHAR(100) NOT NULL, -- Ye, Klimov
+    AthleteFirstName VARCHAR(100) NOT NULL, -- Spencer, Mirra
+    Gender          VARCHAR(1) NOT NULL CHECK (Gender IN ('M', 'F')) -- M, F
+);
+
+CREATE TABLE IF NOT EXISTS AthleteSeason (
+    AthleteSeasonID INTEGER PRIMARY KEY, -- 1, 101
+    AthleteID       INT NOT NULL REFERENCES Athlete(AthleteID), -- 1, 101
+    SchoolID        VARCHAR(20) NOT NULL REFERENCES School(SchoolID), -- Johns_Hopkins
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    ClassYear       VARCHAR(2) NOT NULL CHECK (ClassYear IN ('FR', 'SO', 'JR', 'SR')), -- FR, SO, JR, SR
+    UNIQUE (AthleteID, SeasonType, SeasonYear)
+);
+
+CREATE TABLE IF NOT EXISTS TrackEvent (
+    EventID         INT PRIMARY KEY, -- 1, 101 (TFRRS Event ID)
+    EventName       VARCHAR(20) NOT NULL, -- 100m, 4x100m, Discus
+    EventType       VARCHAR(8) NOT NULL CHECK (EventType IN ('sprints', 'distance', 'jumps', 'throws', 'combined')), -- sprints, distance, jumps, throws, combined
+    MeasureUnit     VARCHAR(7) NOT NULL CHECK (MeasureUnit IN ('seconds', 'meters', 'points')), -- seconds, meters, points
+    IsRelay         BOOLEAN NOT NULL -- True, False
+);
+
+-- NOTE: Not all relay teams have known team members
+CREATE TABLE IF NOT EXISTS RelayTeam (
+    RelayTeamID     INTEGER PRIMARY KEY, -- 1, 101
+    SchoolID        VARCHAR(20) NOT NULL REFERENCES School(SchoolID), -- Johns_Hopkins, Ursinus
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID) -- 1, 101
+);
+
+CREATE TABLE IF NOT EXISTS RelayTeamMembers (
+    RelayTeamID       INT NOT NULL REFERENCES RelayTeam(RelayTeamID), -- 1, 101
+    AthleteSeasonID   INT NOT NULL REFERENCES AthleteSeason(AthleteSeasonID), -- 1, 101
+    LegNum            INT NOT NULL CHECK (LegNum IN (1, 2, 3, 4)), -- 1, 2, 3, 4
+    PRIMARY KEY (RelayTeamID, AthleteSeasonID)
+);
+
+CREATE TABLE IF NOT EXISTS Performance (
+    PerformanceID    INTEGER PRIMARY KEY, -- 1, 101
+    MeetID          INT NOT NULL REFERENCES TrackMeet(MeetID), -- 1, 101
+    EventID         INT NOT NULL REFERENCES TrackEvent(EventID), -- 1, 101
+    AthleteSeasonID  INT REFERENCES AthleteSeason(AthleteSeasonID), -- 1, 101
+    RelayTeamID      INT REFERENCES RelayTeam(RelayTeamID), -- 1, 101
+    ResultValue      DECIMAL(8, 2) NOT NULL, -- 8394, 10.12, 1:52.12
+    WindGauge        DECIMAL(3, 1), -- 0.0, 2.1
+    SeasonType      VARCHAR(10) NOT NULL CHECK (SeasonType IN ('Indoor', 'Outdoor')), -- Indoor, Outdoor
+    SeasonYear      INT NOT NULL, -- 2025, 2024
+    CHECK ((RelayTeamID IS NULL AND AthleteSeasonID IS NOT NULL) OR (AthleteSeasonID IS NULL AND RelayTeamID IS NOT NULL))
+);
+
+CREATE INDEX IF NOT EXISTS Performance_Season ON Performance (SeasonYear, SeasonType);
+
+CREATE TABLE IF NOT EXISTS CentennialConferenceEvents (
+    EventID         INT PRIMARY KEY, -- 1, 101 (TFRRS Event ID)
+    Indoor          BOOLEAN NOT NULL, -- True, False
+    Outdoor         BOOLEAN NOT NULL -- True, False
+);
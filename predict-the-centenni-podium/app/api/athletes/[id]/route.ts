@@ -39,47 +39,55 @@ export async function GET(
       ORDER BY ats.SeasonYear DESC, ats.SeasonType
     `, [id]);
 
-    // Get personal bests (all-time best per event, separated by Indoor/Outdoor)
-    // Use DISTINCT ON to get only one row per event per season type (the best one)
-    // For throws/jumps/combined: higher is better (DESC), for sprints/distance: lower is better (ASC)
+    // Personal bests and season bests come from the progressions kept up to date by ingest
+    // (BestProgression, see db_generating/feature_tables.sql): the latest row of each progression is the best
     const personalBests = await query(`
-      SELECT DISTINCT ON (e.EventID, ats.SeasonType)
+      SELECT DISTINCT ON (e.EventID, bp.SeasonType)
         e.EventID,
         e.EventName,
         e.EventType,
         e.MeasureUnit,
-        ats.SeasonType,
-        p.ResultValue AS PersonalBest,
+        bp.SeasonType,
+        bp.Mark AS PersonalBest,
         tm.MeetName AS PBMeet,
-        tm.StartDate AS PBDate
-      FROM Performance p
-      JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
-      JOIN TrackEvent e ON p.EventID = e.EventID
-      JOIN TrackMeet tm ON p.MeetID = tm.MeetID
-      WHERE ats.AthleteID = $1
-        AND e.IsRelay = FALSE
-        AND p.ResultValue IS NOT NULL
-      ORDER BY e.EventID, ats.SeasonType, 
-        CASE WHEN e.EventType IN ('throws', 'jumps', 'combined') THEN -p.ResultValue ELSE p.ResultValue END ASC, 
-        tm.StartDate DESC
+        bp.MarkDate AS PBDate
+      FROM BestProgression bp
+      JOIN TrackEvent e ON bp.EventID = e.EventID
+      JOIN TrackMeet tm ON bp.MeetID = tm.MeetID
+      WHERE bp.AthleteID = $1
+        AND bp.Kind = 'PB'
+      ORDER BY e.EventID, bp.SeasonType, bp.MarkDate DESC
     `, [id]);
 
-    // Get season bests (best per event per season)
-    // For throws/jumps/combined: higher is better (DESC), for sprints/distance: lower is better (ASC)
     const seasonBests = await query(`
-      SELECT DISTINCT ON (ats.SeasonYear, ats.SeasonType, e.EventID)
-        ats.SeasonYear,
-        ats.SeasonType,
+      SELECT DISTINCT ON (bp.SeasonYear, bp.SeasonType, e.EventID)
+        bp.SeasonYear,
+        bp.SeasonType,
         e.EventName,
-        p.ResultValue AS SeasonBest
-      FROM Performance p
-      JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
-      JOIN TrackEvent e ON p.EventID = e.EventID
-      WHERE ats.AthleteID = $1
-        AND e.IsRelay = FALSE
-        AND p.ResultValue IS NOT NULL
-      ORDER BY ats.SeasonYear DESC, ats.SeasonType, e.EventID, 
-        CASE WHEN e.EventType IN ('throws', 'jumps', 'combined') THEN -p.ResultValue ELSE p.ResultValue END ASC
+        bp.Mark AS SeasonBest
+      FROM BestProgression bp
+      JOIN TrackEvent e ON bp.EventID = e.EventID
+      WHERE bp.AthleteID = $1
+        AND bp.Kind = 'SB'
+      ORDER BY bp.SeasonYear DESC, bp.SeasonType, e.EventID, bp.MarkDate DESC
+    `, [id]);
+
+    // PB progression per event and season type: every mark that improved the athlete's best
+    const pbProgression = await query(`
+      SELECT
+        e.EventName,
+        bp.SeasonType,
+        bp.SeasonYear,
+        bp.MarkDate,
+        bp.Mark,
+        bp.Improvement,
+        tm.MeetName
+      FROM BestProgression bp
+      JOIN TrackEvent e ON bp.EventID = e.EventID
+      JOIN TrackMeet tm ON bp.MeetID = tm.MeetID
+      WHERE bp.AthleteID = $1
+        AND bp.Kind = 'PB'
+      ORDER BY e.EventName, bp.SeasonType, bp.MarkDate
     `, [id]);
 
     // Get full performance history
@@ -246,6 +254,7 @@ export async function GET(
       seasons,
       personalBests,
       seasonBests,
+      pbProgression,
       performanceHistory,
       trendData,
       relayPersonalBests,
@@ -160,89 +160,59 @@ function convertIndividualToPredictions(individualPredictions: IndividualEventPr
     return predictions
 }
 
-async function getSeasonBestPredictions(gender: string, seasonType: string, seasonYear: string): Promise<IndividualEventPrediction[]> {
+// Season best and season average come straight from the feature rows the ingest path keeps up to date
+// (db_generating/feature_tables.sql), instead of aggregating every Performance row on each request
+async function getFeaturePredictions(mark: 'BestMark' | 'MeanMark', gender: string, seasonType: string, seasonYear: string): Promise<IndividualEventPrediction[]> {
+    const [individualRecords, relayRecords] = await Promise.all([
+        query<IndividualEventPrediction>(
+            `
+            SELECT 
+                F.EventID,
+                TE.EventName,
+                TE.Eventtype,
+                Ath.gender,
+                F.AthleteSeasonID,
+                A.schoolid,
+                Ath.athletefirstname,
+                Ath.athletelastname,
+                Ath.athleteid,
+                F.${mark} AS predictedresult
+            FROM AthleteEventFeatureView AS F
+            JOIN CentennialConferenceEvents AS CCE ON F.EventID = CCE.EventID
+            JOIN AthleteSeason AS A ON F.AthleteSeasonID = A.AthleteSeasonID
+            JOIN Athlete AS Ath ON A.AthleteID = Ath.AthleteID
+            JOIN TrackEvent AS TE ON F.EventID = TE.EventID
+            WHERE Ath.Gender = $1
+                AND A.SeasonYear = $2
+                AND A.SeasonType = $3
+            `, [gender, seasonYear, seasonType]),
+        query<IndividualEventPrediction>(
+            `
+            SELECT 
+                F.EventID,
+                TE.EventName,
+                TE.Eventtype,
+                F.Gender AS gender,
+                F.SchoolID AS schoolid,
+                F.SchoolID AS athletefirstname,
+                ' ' AS athletelastname,
+                'Unavailable' AS athleteid,
+                F.${mark} AS predictedresult
+            FROM RelayEventFeatureView AS F
+            JOIN CentennialConferenceEvents AS CCE ON F.EventID = CCE.EventID
+            JOIN TrackEvent AS TE ON F.EventID = TE.EventID
+            WHERE F.Gender = $1
+                AND F.SeasonYear = $2
+                AND F.SeasonType = $3
+            `, [gender, seasonYear, seasonType]),
+    ]);
+
+    return [...individualRecords, ...relayRecords];
+}
 
+async function getSeasonBestPredictions(gender: string, seasonType: string, seasonYear: string): Promise<IndividualEventPrediction[]> {
     try {
-        const [
-            trackSeasonRecords,
-            fieldSeasonRecords,
-            relaySeasonRecords
-        ] = await Promise.all([
-            query<IndividualEventPrediction>(
-                `
-                SELECT 
-                    P.EventID,
-                    TE.EventName,
-                    TE.Eventtype,
-                    Ath.gender,
-                    P.AthleteSeasonID,
-                    A.schoolid,
-                    Ath.athletefirstname,
-                    Ath.athletelastname,
-                    Ath.athleteid,
-                    MIN(P.Resultvalue) AS predictedresult
-                FROM Performance AS P
-                JOIN CentennialConferenceEvents AS CCE ON P.EventID = CCE.EventID
-                JOIN AthleteSeason AS A ON P.AthleteSeasonID = A.AthleteSeasonID
-                JOIN Athlete AS Ath ON A.AthleteID = Ath.AthleteID
-                JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-                WHERE Ath.Gender = '${gender}'
-                    AND A.SeasonYear = '${seasonYear}'
-                    AND A.SeasonType = '${seasonType}'
-                    AND (TE.Eventtype = 'sprints' OR TE.Eventtype = 'distance')
-                GROUP BY P.EventID, TE.EventName, TE.Eventtype, Ath.gender, P.AthleteSeasonID, A.schoolid, Ath.athletefirstname, Ath.athletelastname, Ath.athleteid
-                `),
-            query<IndividualEventPrediction>(
-                `
-                SELECT 
-                    P.EventID,
-                    TE.EventName,
-                    TE.Eventtype,
-                    Ath.gender,
-                    P.AthleteSeasonID,
-                    A.schoolid,
-                    Ath.athletefirstname,
-                    Ath.athletelastname,
-                    Ath.athleteid,
-                    MAX(P.Resultvalue) AS predictedresult
-                FROM Performance AS P
-                JOIN CentennialConferenceEvents AS CCE ON P.EventID = CCE.EventID
-                JOIN AthleteSeason AS A ON P.AthleteSeasonID = A.AthleteSeasonID
-                JOIN Athlete AS Ath ON A.AthleteID = Ath.AthleteID
-                JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-                WHERE Ath.Gender = '${gender}'
-                    AND A.SeasonYear = '${seasonYear}'
-                    AND A.SeasonType = '${seasonType}'
-                    AND (TE.Eventtype = 'throws' OR TE.Eventtype = 'jumps' OR TE.Eventtype = 'combined')
-                GROUP BY P.EventID, TE.EventName, TE.Eventtype, Ath.gender, P.AthleteSeasonID, A.schoolid, Ath.athletefirstname, Ath.athletelastname, Ath.athleteid
-                `),
-            query<IndividualEventPrediction>(
-                `
-                SELECT 
-                    P.EventID,
-                    TE.EventName,
-                    TE.Eventtype,
-                    '${gender}' AS gender,
-                    AthS.schoolid,
-                    AthS.schoolid AS athletefirstname,
-                    ' ' AS athletelastname,
-                    'Unavailable' AS athleteid,
-                    MIN(P.Resultvalue) AS predictedresult
-                FROM Performance AS P
-                JOIN CentennialConferenceEvents AS CCE ON P.EventID = CCE.EventID
-                JOIN RelayTeamMembers AS RTM ON P.RelayTeamID = RTM.RelayTeamID
-                JOIN AthleteSeason AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
-                JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
-                JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-                WHERE Ath.Gender = '${gender}'
-                    AND AthS.SeasonYear = '${seasonYear}'
-                    AND AthS.SeasonType = '${seasonType}'
-                GROUP BY P.EventID, TE.EventName, TE.Eventtype, AthS.schoolid;
-                `),
-        ]);
-
-        return [...trackSeasonRecords, ...fieldSeasonRecords, ...relaySeasonRecords];
-
+        return await getFeaturePredictions('BestMark', gender, seasonType, seasonYear);
     } catch (error) {
         console.error('Error fetching season best predictions:', error);
         return [];
@@ -251,62 +221,9 @@ async function getSeasonBestPredictions(gender: string, seasonType: string, seas
 
 async function getAverageSeasonPerformance(gender: string, seasonType: string, seasonYear: string): Promise<IndividualEventPrediction[]> {
     try {
-        const [
-            averagePerformance,
-            averageRelayPerformance
-        ] = await Promise.all([
-            query<IndividualEventPrediction>(
-                `
-                SELECT 
-                    P.EventID,
-                    TE.EventName,
-                    TE.Eventtype,
-                    Ath.gender,
-                    P.AthleteSeasonID,
-                    A.schoolid,
-                    Ath.athletefirstname,
-                    Ath.athletelastname,
-                    Ath.athleteid,
-                    AVG(P.Resultvalue) AS predictedresult
-                FROM Performance AS P
-                JOIN CentennialConferenceEvents AS CCE ON P.EventID = CCE.EventID
-                JOIN AthleteSeason AS A ON P.AthleteSeasonID = A.AthleteSeasonID
-                JOIN Athlete AS Ath ON A.AthleteID = Ath.AthleteID
-                JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-                WHERE Ath.Gender = '${gender}'
-                    AND A.SeasonYear = '${seasonYear}'
-                    AND A.SeasonType = '${seasonType}'
-                GROUP BY P.EventID, TE.EventName, TE.Eventtype, Ath.gender, P.AthleteSeasonID, A.schoolid, Ath.athletefirstname, Ath.athletelastname, Ath.athleteid
-                `),
-            query<IndividualEventPrediction>(
-                `
-                SELECT 
-                    P.EventID,
-                    TE.EventName,
-                    TE.Eventtype,
-                    '${gender}' AS gender,
-                    AthS.schoolid,
-                    AthS.schoolid AS athletefirstname,
-                    ' ' AS athletelastname,
-                    'Unavailable' AS athleteid,
-                    AVG(P.Resultvalue) AS predictedresult
-                FROM Performance AS P
-                JOIN CentennialConferenceEvents AS CCE ON P.EventID = CCE.EventID
-                JOIN RelayTeamMembers AS RTM ON P.RelayTeamID = RTM.RelayTeamID
-                JOIN AthleteSeason AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
-                JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
-                JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-                WHERE Ath.Gender = '${gender}'
-                    AND AthS.SeasonYear = '${seasonYear}'
-                    AND AthS.SeasonType = '${seasonType}'
-                GROUP BY P.EventID, TE.EventName, TE.Eventtype, AthS.schoolid;
-                `),
-        ]);
-
-        return [...averagePerformance, ...averageRelayPerformance];
-
+        return await getFeaturePredictions('MeanMark', gender, seasonType, seasonYear);
     } catch (error) {
-        console.error('Error fetching season best predictions:', error);
+        console.error('Error fetching average season performance predictions:', error);
         return [];
     }
 }
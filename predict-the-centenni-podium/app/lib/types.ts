@@ -5,7 +5,7 @@ export interface EventPrediction {
     gender: string;
     predictions: Array<{
         place: number;
-        athleteid: number;
+        athleteid: number | null; // null for relay teams
         athletefirstname: string;
         athletelastname: string;
         schoolname: string;
@@ -43,8 +43,31 @@ function formatDistance(meters: number | string | null | undefined): string {
     return num.toFixed(2);
 }
 
+// Static files written by prediction_analysis/publish.py, keyed "model/season/gender"
+let publishedManifest: Promise<Record<string, { path: string }>> | null = null;
+
+function loadPublishedManifest(): Promise<Record<string, { path: string }>> {
+    if (!publishedManifest) {
+        publishedManifest = fetch('/predictions/manifest.json')
+            .then(response => response.ok ? response.json() : {})
+            .then(manifest => manifest.artifacts ?? {})
+            .catch(() => ({}));
+    }
+    return publishedManifest;
+}
+
 async function queryPredictions(selectedModel: string, selectedSeason: string, gender: string): Promise<[EventPrediction[], TeamScore[]]> {
     try {
+        // A published artifact is a static file; fall back to the API when there is none
+        const artifact = (await loadPublishedManifest())[`${selectedModel}/${selectedSeason}/${gender}`];
+        if (artifact) {
+            const published = await fetch(`/predictions/${artifact.path}`);
+            if (published.ok) {
+                const data = await published.json();
+                return [data.eventPredictions, data.teamScores];
+            }
+        }
+
         const predictions = await fetch(`/api/predictions?model=${selectedModel}&season=${selectedSeason}&gender=${gender}`);
         const data = await predictions.json();
         return [data.eventPredictions, data.teamScores];
@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import scoring
+import snapshot
+import models
+
+# Backtest of the prediction models against real Centennial Conference championships
+#
+# Every past season in the snapshot (snapshot.py) is replayed as if it were the week of the
+# championship: only marks from meets before the championship date are visible. Each model predicts
+# a championship mark for every entrant, and the predictions are scored against what actually
+# happened at the meet: mark error, event placings and 10-8-6-5-4-3-2-1 team totals.
+#
+# Every model registered in models.py is evaluated. Seasons run in parallel, one process per season.
+# Each season's pre-championship feature matrix (best mark per entrant per meet) is built once,
+# shared by every model and cached next to the season's snapshot files.
+
+FIRST_YEAR = 2010
+
+FEATURE_CACHE_VERSION = 2
+
+
+def is_championship(meet_name : str) -> bool:
+    name = meet_name.lower()
+    return "centennial" in name and "champ" in name
+
+
+# ============================================================
+# FEATURE MATRIX
+# ============================================================
+
+def build_features(season_year : int, season_type : str, gender : str, snapshot_dir : str = snapshot.SNAPSHOT_DIR):
+    """
+    (dataset, actual) for one season and gender, or None if it had no championship.
+    dataset holds pre-championship marks in championship events (models.SeasonDataset), actual maps
+    each championship entrant (event_id, school_id, athlete_id) to their best mark at the meet.
+    """
+    columns = snapshot.to_numpy(snapshot.load_season(season_year, season_type, snapshot_dir), ["MeetID", "MeetName", "Gender"])
+    gender_rows = columns["Gender"] == gender
+    championship_meets = {int(meet_id) for meet_id, name in zip(columns["MeetID"][gender_rows], columns["MeetName"][gender_rows])
+                          if is_championship(name)}
+    if not championship_meets:
+        return None
+
+    rows = models.snapshot_meet_rows(season_year, season_type, gender, snapshot_dir)
+    championship_rows = rows.select(lambda row: row.meet_id in championship_meets)
+    championship_day = min(championship_rows.column("day"))
+    championship_events = set(championship_rows.column("event_id"))
+
+    actual = {}
+    for row in championship_rows:
+        key = row.entrant
+        if key not in actual or (row.mark > actual[key] if scoring.higher_is_better(row.event_type) else row.mark < actual[key]):
+            actual[key] = row.mark
+
+    before = rows.select(lambda row: row.day < championship_day and row.event_id in championship_events)
+    return models.SeasonDataset.from_meet_marks(gender, models.best_per_meet(before)), actual
+
+
+def feature_cache_path(season_year : int, season_type : str, gender : str, snapshot_dir : str) -> str:
+    return os.path.join(snapshot.season_dir(season_year, season_type, snapshot_dir), f"backtest_features_{gender}.npz")
+
+
+def load_features(season_year : int, season_type : str, gender : str, snapshot_dir : str = snapshot.SNAPSHOT_DIR):
+    """build_features, cached on disk until the season is re-exported"""
+    path = feature_cache_path(season_year, season_type, gender, snapshot_dir)
+    entry = snapshot.load_manifest(snapshot_dir)["seasons"].get(str(season_year) + "_" + season_type, {})
+    stamp = np.array([FEATURE_CACHE_VERSION, entry.get("max_performance_id", -1), entry.get("performances", -1)])
+
+    if os.path.exists(path):
+        with np.load(path, allow_pickle=True) as cached:
+            if np.array_equal(cached["stamp"], stamp):
+                if cached["empty"]:
+                    return None
+                dataset = models.SeasonDataset()
+                for name in models.SeasonDataset.__slots__:
+                    value = cached[name]
+                    setattr(dataset, name, value.item() if value.ndim == 0 else value)
+                return dataset, cached["actual"].item()
+
+    features = build_features(season_year, season_type, gender, snapshot_dir)
+    if features is None:
+        np.savez(path, stamp=stamp, empty=True)
+    else:
+        dataset, actual = features
+        np.savez(path, stamp=stamp, empty=False, actual=np.array(actual, dtype=object),
+                 **{name: getattr(dataset, name) for name in models.SeasonDataset.__slots__})
+    return features
+
+
+# ============================================================
+# SCORING
+# ============================================================
+
+def _placings(entrants : list, marks : dict, higher : bool) -> dict:
+    """1-based place of every entrant with a mark"""
+    ranked = sorted((entrant for entrant in entrants if entrant in marks), key=lambda entrant: marks[entrant], reverse=higher)
+    return {entrant: place for place, entrant in enumerate(ranked, start=1)}
+
+
+def _team_totals(placings_by_event : dict) -> dict:
+    totals = {}
+    for placings in placings_by_event.values():
+        for (event_id, school_id, athlete_id), place in placings.items():
+            totals[school_id] = totals.get(school_id, 0) + scoring.points_for_place(place)
+    return totals
+
+
+def _spearman(a : list, b : list) -> float:
+    if len(a) < 2:
+        return float("nan")
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    if rank_a.std() == 0 or rank_b.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def score_model(dataset : models.SeasonDataset, actual : dict, predictions : np.ndarray) -> dict:
+    """Compare one model's predicted marks with the actual championship"""
+    predicted = {}
+    events = {}
+    for i in range(len(dataset)):
+        if np.isnan(predictions[i]):
+            continue
+        key = dataset.entrant_key(i)
+        predicted[key] = float(predictions[i])
+        events.setdefault(key[0], (bool(dataset.higher[i]), []))[1].append(key)
+
+    errors = [abs(predicted[key] - actual[key]) / actual[key] for key in predicted if key in actual and actual[key] > 0]
+
+    predicted_places = {}
+    actual_places = {}
+    rank_correlations = []
+    podium_hits = []
+    scorer_hits = []
+    for event_id, (higher, entrants) in events.items():
+        competed = [entrant for entrant in entrants if entrant in actual]
+        predicted_places[event_id] = _placings(competed, predicted, higher)
+        # Actual places include entrants with no pre-championship marks, they still take places
+        actual_places[event_id] = _placings([key for key in actual if key[0] == event_id], actual, higher)
+
+        if len(competed) >= 2:
+            rank_correlations.append(_spearman([predicted_places[event_id][e] for e in competed],
+                                               [actual_places[event_id][e] for e in competed]))
+        for hits, places in ((podium_hits, 3), (scorer_hits, scoring.SCORING_PLACES)):
+            actual_top = {e for e, place in actual_places[event_id].items() if place <= places}
+            predicted_top = {e for e, place in predicted_places[event_id].items() if place <= places}
+            if actual_top:
+                hits.append(len(actual_top & predicted_top) / len(actual_top))
+
+    predicted_totals = _team_totals(predicted_places)
+    actual_totals = _team_totals(actual_places)
+    schools = sorted(set(predicted_totals) | set(actual_totals))
+    predicted_points = [predicted_totals.get(school, 0) for school in schools]
+    actual_points = [actual_totals.get(school, 0) for school in schools]
+
+    return {
+        "entrants": len(errors),
+        "mark_mape": float(np.mean(errors)) if errors else float("nan"),
+        "place_spearman": float(np.nanmean(rank_correlations)) if rank_correlations else float("nan"),
+        "podium_hit_rate": float(np.mean(podium_hits)) if podium_hits else float("nan"),
+        "scorer_hit_rate": float(np.mean(scorer_hits)) if scorer_hits else float("nan"),
+        "team_points_mae": float(np.mean(np.abs(np.subtract(predicted_points, actual_points)))) if schools else float("nan"),
+        "team_spearman": _spearman(predicted_points, actual_points),
+        "winner_correct": bool(schools) and schools[int(np.argmax(predicted_points))] == schools[int(np.argmax(actual_points))],
+    }
+
+
+def backtest_season(season : tuple, snapshot_dir : str = snapshot.SNAPSHOT_DIR) -> list:
+    """All models, both genders, one season. Returns [(season_year, season_type, gender, model, metrics)]"""
+    season_year, season_type = season
+    results = []
+    for gender in ("M", "F"):
+        features = load_features(season_year, season_type, gender, snapshot_dir)
+        if features is None:
+            continue
+        dataset, actual = features
+        # Every registered model runs over the same loaded season
+        for name, predictions in models.run_models(dataset).items():
+            results.append((season_year, season_type, gender, name, score_model(dataset, actual, predictions)))
+    return results
+
+
+def run_backtest(first_year : int = FIRST_YEAR, last_year : int = None, workers : int = None,
+                 snapshot_dir : str = snapshot.SNAPSHOT_DIR) -> list:
+    seasons = [(year, season_type) for year, season_type in snapshot.available_seasons(snapshot_dir)
+               if year >= first_year and (last_year is None or year <= last_year)]
+    if not seasons:
+        raise Exception("No snapshot seasons to backtest, run snapshot.py first!")
+
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for season_results in pool.map(backtest_season, seasons, [snapshot_dir] * len(seasons)):
+            results.extend(season_results)
+    return results
+
+
+def print_report(results : list):
+    metrics = ("mark_mape", "place_spearman", "podium_hit_rate", "scorer_hit_rate", "team_points_mae", "team_spearman", "winner_correct")
+
+    print(f"{'Season':<14} {'G':<2} {'Model':<15} {'MAPE':>6} {'Place ρ':>8} {'Podium':>7} {'Top 8':>6} {'Team MAE':>9} {'Team ρ':>7} {'Winner':>7}")
+    for season_year, season_type, gender, name, result in results:
+        print(f"{season_year} {season_type:<9} {gender:<2} {name:<15} {result['mark_mape'] * 100:>5.2f}% {result['place_spearman']:>8.3f} "
+              f"{result['podium_hit_rate'] * 100:>6.1f}% {result['scorer_hit_rate'] * 100:>5.1f}% {result['team_points_mae']:>9.1f} "
+              f"{result['team_spearman']:>7.3f} {'yes' if result['winner_correct'] else 'no':>7}")
+
+    print("\nAverage over all seasons")
+    for name in models.MODELS:
+        rows = [result for _, _, _, model, result in results if model == name]
+        averages = {metric: np.nanmean([float(row[metric]) for row in rows]) for metric in metrics}
+        print(f"  {name:<15} MAPE {averages['mark_mape'] * 100:.2f}%, place ρ {averages['place_spearman']:.3f}, "
+              f"podium {averages['podium_hit_rate'] * 100:.1f}%, top 8 {averages['scorer_hit_rate'] * 100:.1f}%, "
+              f"team MAE {averages['team_points_mae']:.1f}, team ρ {averages['team_spearman']:.3f}, "
+              f"winner {averages['winner_correct'] * 100:.0f}% ({len(rows)} meets)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Backtest the prediction models against past Centennial Conference championships")
+    parser.add_argument("--first-year", type=int, default=FIRST_YEAR)
+    parser.add_argument("--last-year", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per core)")
+    parser.add_argument("--snapshot", default=snapshot.SNAPSHOT_DIR)
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    results = run_backtest(args.first_year, args.last_year, args.workers, args.snapshot)
+    elapsed = time.perf_counter() - start
+
+    print_report(results)
+    print(f"\nBacktested {len(results)} season/gender/model combinations in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
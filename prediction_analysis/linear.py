@@ -1,10 +1,14 @@
 import os
+import argparse
 import psycopg2
 from dotenv import load_dotenv
-import datetime
-from sklearn.linear_model import LinearRegression
+import models
+import scrape_path  # noqa: F401
+import profiling
 
+@profiling.profiled("linear.predict_season")
 def predict_season(gender : str, seasonType : str, seasonYear : str):
+    """Predict a season's championship marks and store them in LinearRegressionPredictions. profile= see profiling.py"""
 
     # Connect to the database
     load_dotenv()
@@ -18,134 +22,10 @@ def predict_season(gender : str, seasonType : str, seasonYear : str):
 
     cursor = _connection.cursor()
 
-    # Collect all data for the current season, get best performance per meet
-    cursor.execute("""
-        SELECT 
-            E.EventID,
-            E.EventName,
-            E.EventType,
-            A.Gender,
-            AtS.SchoolID,
-            A.AthleteID,
-            A.AthleteFirstName,
-            A.AthleteLastName,
-            MIN(P.resultvalue) AS resultvalue,
-            M.startdate
-        FROM Performance AS P
-        JOIN CentennialConferenceEvents AS C ON P.eventid = C.eventid
-        JOIN AthleteSeason AS AtS ON P.AthleteSeasonID = AtS.AthleteSeasonID
-        JOIN Athlete AS A ON AtS.AthleteID = A.AthleteID
-        JOIN TrackEvent AS E ON P.EventID = E.EventID
-        JOIN TrackMeet AS M ON P.MeetID = M.MeetID
-        WHERE AtS.SeasonType = %s
-            AND AtS.SeasonYear = %s
-            AND A.Gender = %s
-            AND (E.EventType = 'sprints' OR E.EventType = 'distance')
-            AND C.""" + seasonType + """
-        GROUP BY E.EventID, E.EventName, E.EventType, A.Gender, AtS.SchoolID, A.AthleteID, A.AthleteFirstName, A.AthleteLastName, M.startdate
-    """, (seasonType, seasonYear, gender))
-    all_track_performances = cursor.fetchall()
-
-    cursor.execute("""
-    SELECT 
-        E.EventID,
-        E.EventName,
-        E.EventType,
-        A.Gender,
-        AtS.SchoolID,
-        A.AthleteID,
-        A.AthleteFirstName,
-        A.AthleteLastName,
-        MAX(P.resultvalue) AS resultvalue,
-        M.startdate
-    FROM Performance AS P
-    JOIN CentennialConferenceEvents AS C ON P.eventid = C.eventid
-    JOIN AthleteSeason AS AtS ON P.AthleteSeasonID = AtS.AthleteSeasonID
-    JOIN Athlete AS A ON AtS.AthleteID = A.AthleteID
-    JOIN TrackEvent AS E ON P.EventID = E.EventID
-    JOIN TrackMeet AS M ON P.MeetID = M.MeetID
-    WHERE AtS.SeasonType = %s
-        AND AtS.SeasonYear = %s
-        AND A.Gender = %s
-        AND (E.EventType = 'throws' OR E.EventType = 'jumps' OR E.EventType = 'combined')
-        AND C.""" + seasonType + """
-    GROUP BY E.EventID, E.EventName, E.EventType, A.Gender, AtS.SchoolID, A.AthleteID, A.AthleteFirstName, A.AthleteLastName, M.startdate
-""", (seasonType, seasonYear, gender))
-    all_field_performances = cursor.fetchall()
-
-    cursor.execute("""
-        SELECT 
-            P.EventID,
-            TE.EventName,
-            TE.Eventtype,
-            Ath.Gender AS gender,
-            AthS.schoolid,
-            AthS.schoolid AS athleteid,
-            AthS.schoolid AS athletefirstname,
-            ' ' AS athletelastname,
-            MIN(P.Resultvalue) AS resultvalue,
-            TM.startdate
-        FROM Performance AS P
-        JOIN CentennialConferenceEvents AS C ON P.eventid = C.eventid
-        JOIN RelayTeamMembers AS RTM ON P.RelayTeamID = RTM.RelayTeamID
-        JOIN AthleteSeason AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
-        JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
-        JOIN TrackEvent AS TE ON P.EventID = TE.EventID
-        JOIN RelayTeam AS RT ON RTM.RelayTeamID = RT.RelayTeamID
-        JOIN TrackMeet AS TM ON RT.MeetID = TM.MeetID
-        WHERE Ath.Gender = %s
-            AND AthS.SeasonYear = %s
-            AND AthS.SeasonType = %s
-            AND C.""" + seasonType + """
-        GROUP BY Ath.gender, P.EventID, TE.EventName, TE.Eventtype, AthS.schoolid, TM.startdate;
-    """, (gender, seasonYear, seasonType))
-    all_relay_performances = cursor.fetchall()
-
-    all_performances = all_track_performances + all_field_performances + all_relay_performances
-
-    # Group Performances by EventID, AthleteID
-    performances_by_event_athlete = {}
-    for performance in all_performances:
-        event_id = performance[0]
-        athlete_id = performance[5]
-        if (event_id, athlete_id) not in performances_by_event_athlete:
-            performances_by_event_athlete[(event_id, athlete_id)] = []
-        performances_by_event_athlete[(event_id, athlete_id)].append(performance)
-
-    
-    predictions = []
-
-    # For each event and athlete season: create a linear regression, predict final
-    for event_athlete, performances in performances_by_event_athlete.items():
-        event_id, athlete_id = event_athlete
-
-        if len(performances) >= 2:
-            # Create linear regression
-            x = [[float((i[9] - datetime.date(2000, 1, 1)).days)] for i in performances]
-            y = [float(i[8]) for i in performances]
-
-            # Create linear regression model
-            model = LinearRegression()
-            model.fit(x, y)
-
-            # Predict final
-            final = model.predict([[sorted(x)[-1][0] + 3]])[0] # Predict result in 3 days
-
-        else:
-            final = performances[0][8]
-
-        if final < 0:
-            print("Negative final")
-            print(event_athlete)
-            print(performances)
-            print(final)
-            continue
-
-
-        if isinstance(performances[0][5], int):
-            predictions.append((event_id, performances[0][1], performances[0][2], performances[0][3], performances[0][4], performances[0][5], performances[0][6], performances[0][7], float(final)))
-        else: # For relays
-            predictions.append((event_id, performances[0][1], performances[0][2], performances[0][3], performances[0][4], -1, performances[0][6], performances[0][7], float(final)))
+    # Collect all data for the current season (best performance per meet) once, then run the
+    # linear regression plugin: one trend per event and athlete season, predicting the final 3 days out
+    dataset = models.load_dataset_from_database(cursor, gender, seasonType, seasonYear)
+    predictions = models.prediction_rows(dataset, models.run_models(dataset, ["linear"])["linear"])
 
     # Upload predictions to new table
     for prediction in predictions:
@@ -159,15 +39,12 @@ def predict_season(gender : str, seasonType : str, seasonYear : str):
     cursor.close()
     _connection.close()
 
-if __name__ == "__main__":
-    predict_season("M", "Indoor", "2026")
-    predict_season("F", "Indoor", "2026")
-    predict_season("M", "Outdoor", "2025")
-    predict_season("F", "Outdoor", "2025")
-    predict_season("M", "Indoor", "2025")
-    predict_season("F", "Indoor", "2025")
-    predict_season("M", "Outdoor", "2024")
-    predict_season("F", "Outdoor", "2024")
-    predict_season("M", "Indoor", "2024")
-    predict_season("F", "Indoor", "2024")
+SEASONS = [("Indoor", "2026"), ("Outdoor", "2025"), ("Indoor", "2025"), ("Outdoor", "2024"), ("Indoor", "2024")]
 
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store linear regression predictions for every season")
+    parser.add_argument("--profile", choices=profiling.MODES, default=os.environ.get("PROFILE"), help="Profile each season (see profiling.py)")
+    args = parser.parse_args()
+    for seasonType, seasonYear in SEASONS:
+        predict_season("M", seasonType, seasonYear, profile=args.profile)
+        predict_season("F", seasonType, seasonYear, profile=args.profile)
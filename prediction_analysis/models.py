@@ -0,0 +1,357 @@
+import os
+import sys
+import argparse
+import datetime
+import numpy as np
+import psycopg2
+from dotenv import load_dotenv
+import scoring
+import snapshot
+
+import scrape_path  # noqa: F401
+from records import PerformanceBatch, PerformanceRow
+
+# Prediction model plugins
+#
+# A season is loaded once into a SeasonDataset: every championship-event entrant (athlete, or a
+# school's relay team) with their best mark at each meet, in columnar arrays. Every registered model
+# receives the same dataset and returns one predicted championship mark per entrant (NaN = no
+# prediction), so adding a model adds compute but no database load.
+#
+#   @register_model("my_model")
+#   def predict_my_model(dataset : SeasonDataset) -> np.ndarray:
+#       ...
+#
+# run_models() evaluates every registered model over one dataset; linear.py and backtest.py use it.
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# Predict the championship this many days after an entrant's last meet, as in linear.py
+DAYS_AHEAD = 3
+
+# Half-life, in days, of a mark's weight in the time-weighted model
+HALF_LIFE_DAYS = 14.0
+
+MODELS = {}
+
+
+def register_model(name : str):
+    """Decorator adding a model to the registry under name"""
+    def decorator(model):
+        if name in MODELS:
+            raise Exception(f"Model '{name}' is already registered")
+        MODELS[name] = model
+        return model
+    return decorator
+
+
+# ============================================================
+# DATASET
+# ============================================================
+
+class SeasonDataset:
+    """
+    One season and gender. Entrant i is event_ids[i] / schools[i] / athlete_ids[i] (-1 for relays) and its
+    best mark per meet is marks[offsets[i]:offsets[i + 1]] on days[...] (days since 1970, oldest first).
+    """
+
+    __slots__ = ("gender", "event_ids", "event_names", "event_types", "schools", "athlete_ids",
+                 "first_names", "last_names", "higher", "offsets", "marks", "days")
+
+    def __len__(self) -> int:
+        return len(self.event_ids)
+
+    @property
+    def counts(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self.offsets[:-1]
+
+    @property
+    def last_days(self) -> np.ndarray:
+        return self.days[self.offsets[1:] - 1]
+
+    def entrant_marks(self, i : int) -> tuple:
+        return self.marks[self.offsets[i]:self.offsets[i + 1]], self.days[self.offsets[i]:self.offsets[i + 1]]
+
+    def entrant_key(self, i : int) -> tuple:
+        return (int(self.event_ids[i]), self.schools[i], int(self.athlete_ids[i]))
+
+    @classmethod
+    def from_meet_marks(cls, gender : str, rows) -> "SeasonDataset":
+        """Build from PerformanceRows (or a PerformanceBatch), at most one per entrant per meet"""
+        grouped = {}
+        info = {}
+        for row in rows:
+            key = row.entrant
+            grouped.setdefault(key, []).append((row.day, row.mark))
+            info.setdefault(key, (row.event_name, row.event_type, row.first_name, row.last_name))
+
+        keys = sorted(grouped)
+        for key in keys:
+            grouped[key].sort()
+
+        dataset = cls()
+        dataset.gender = gender
+        dataset.event_ids = np.array([key[0] for key in keys], dtype=np.int64)
+        dataset.schools = np.array([key[1] for key in keys], dtype=object)
+        dataset.athlete_ids = np.array([key[2] for key in keys], dtype=np.int64)
+        dataset.event_names = np.array([info[key][0] for key in keys], dtype=object)
+        dataset.event_types = np.array([info[key][1] for key in keys], dtype=object)
+        dataset.first_names = np.array([info[key][2] for key in keys], dtype=object)
+        dataset.last_names = np.array([info[key][3] for key in keys], dtype=object)
+        dataset.higher = np.array([scoring.higher_is_better(info[key][1]) for key in keys], dtype=bool)
+        dataset.offsets = np.cumsum([0] + [len(grouped[key]) for key in keys]).astype(np.int64)
+        dataset.days = np.array([day for key in keys for day, _ in grouped[key]], dtype=np.float64)
+        dataset.marks = np.array([mark for key in keys for _, mark in grouped[key]], dtype=np.float64)
+        return dataset
+
+
+def best_per_meet(rows) -> list:
+    """Reduce PerformanceRows to the best mark per entrant per meet"""
+    best = {}
+    for row in rows:
+        key = (row.entrant, row.meet_id)
+        current = best.get(key)
+        higher = scoring.higher_is_better(row.event_type)
+        if current is None or (row.mark > current.mark if higher else row.mark < current.mark):
+            best[key] = row
+    return list(best.values())
+
+
+def load_dataset_from_database(cursor, gender : str, seasonType : str, seasonYear : int) -> SeasonDataset:
+    """Load one season's championship-event entrants with two queries (individuals, relays)"""
+    if seasonType not in ("Indoor", "Outdoor"):
+        raise Exception(f"Unknown season type '{seasonType}'")
+
+    cursor.execute("""
+        SELECT
+            E.EventID,
+            E.EventName,
+            E.EventType,
+            AtS.SchoolID,
+            A.AthleteID,
+            A.AthleteFirstName,
+            A.AthleteLastName,
+            M.StartDate - DATE '1970-01-01',
+            CASE WHEN E.EventType IN ('throws', 'jumps', 'combined') THEN MAX(P.ResultValue) ELSE MIN(P.ResultValue) END
+        FROM Performance AS P
+        JOIN CentennialConferenceEvents AS C ON P.EventID = C.EventID
+        JOIN AthleteSeason AS AtS ON P.AthleteSeasonID = AtS.AthleteSeasonID
+        JOIN Athlete AS A ON AtS.AthleteID = A.AthleteID
+        JOIN TrackEvent AS E ON P.EventID = E.EventID
+        JOIN TrackMeet AS M ON P.MeetID = M.MeetID
+        WHERE P.SeasonType = %s
+            AND P.SeasonYear = %s
+            AND A.Gender = %s
+            AND C.""" + seasonType + """
+        GROUP BY E.EventID, E.EventName, E.EventType, AtS.SchoolID, A.AthleteID, A.AthleteFirstName, A.AthleteLastName, M.StartDate
+    """, (seasonType, seasonYear, gender))
+    individual_rows = cursor.fetchall()
+
+    # Relays: one team per school, named after the school as in linear.py
+    cursor.execute("""
+        SELECT
+            E.EventID,
+            E.EventName,
+            E.EventType,
+            RT.SchoolID,
+            -1,
+            RT.SchoolID,
+            ' ',
+            M.StartDate - DATE '1970-01-01',
+            MIN(P.ResultValue)
+        FROM Performance AS P
+        JOIN CentennialConferenceEvents AS C ON P.EventID = C.EventID
+        JOIN RelayTeam AS RT ON P.RelayTeamID = RT.RelayTeamID
+        JOIN TrackEvent AS E ON P.EventID = E.EventID
+        JOIN TrackMeet AS M ON P.MeetID = M.MeetID
+        WHERE P.SeasonType = %s
+            AND P.SeasonYear = %s
+            AND EXISTS (
+                SELECT 1 FROM RelayTeamMembers AS RTM
+                JOIN AthleteSeason AS AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
+                JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
+                WHERE RTM.RelayTeamID = P.RelayTeamID AND Ath.Gender = %s
+            )
+            AND C.""" + seasonType + """
+        GROUP BY E.EventID, E.EventName, E.EventType, RT.SchoolID, M.StartDate
+    """, (seasonType, seasonYear, gender))
+    relay_rows = cursor.fetchall()
+
+    # Dates and Decimals are converted once, into a column batch
+    return SeasonDataset.from_meet_marks(gender, PerformanceBatch.from_rows(individual_rows + relay_rows))
+
+
+def snapshot_meet_rows(season_year : int, season_type : str, gender : str, snapshot_dir : str = snapshot.SNAPSHOT_DIR) -> PerformanceBatch:
+    """A snapshot season's performances for one gender (with meet ids), relays named after their school"""
+    columns = snapshot.to_numpy(snapshot.load_season(season_year, season_type, snapshot_dir),
+                                ["MeetID", "MeetDate", "EventID", "EventName", "EventType", "AthleteID",
+                                 "AthleteFirstName", "AthleteLastName", "Gender", "SchoolID", "ResultValue"])
+    rows = np.flatnonzero(columns["Gender"] == gender)
+    days = columns["MeetDate"].astype(np.int64)
+    relay = columns["AthleteID"] == -1
+    batch = PerformanceBatch()
+    batch.extend(
+        PerformanceRow(int(columns["EventID"][i]), columns["EventName"][i], columns["EventType"][i], columns["SchoolID"][i],
+                       int(columns["AthleteID"][i]),
+                       columns["SchoolID"][i] if relay[i] else columns["AthleteFirstName"][i],
+                       " " if relay[i] else columns["AthleteLastName"][i],
+                       int(days[i]), float(columns["ResultValue"][i]), int(columns["MeetID"][i]))
+        for i in rows
+    )
+    return batch
+
+
+def load_dataset_from_snapshot(season_year : int, season_type : str, gender : str, before_day : int = None,
+                               events : set = None, snapshot_dir : str = snapshot.SNAPSHOT_DIR) -> SeasonDataset:
+    """One season from the local snapshot, optionally only meets before a day (days since 1970) and some events"""
+    rows = snapshot_meet_rows(season_year, season_type, gender, snapshot_dir)
+    rows = rows.select(lambda row: (before_day is None or row.day < before_day) and (events is None or row.event_id in events))
+    return SeasonDataset.from_meet_marks(gender, best_per_meet(rows))
+
+
+# ============================================================
+# MODELS
+# ============================================================
+
+@register_model("season_best")
+def predict_season_best(dataset : SeasonDataset) -> np.ndarray:
+    lowest = np.minimum.reduceat(dataset.marks, dataset.starts) if len(dataset) else np.empty(0)
+    highest = np.maximum.reduceat(dataset.marks, dataset.starts) if len(dataset) else np.empty(0)
+    return np.where(dataset.higher, highest, lowest)
+
+
+@register_model("season_average")
+def predict_season_average(dataset : SeasonDataset) -> np.ndarray:
+    if not len(dataset):
+        return np.empty(0)
+    return np.add.reduceat(dataset.marks, dataset.starts) / dataset.counts
+
+
+@register_model("linear")
+def predict_linear(dataset : SeasonDataset) -> np.ndarray:
+    """Least-squares trend over the season's meets, DAYS_AHEAD after the last one (as linear.py did per entrant)"""
+    if not len(dataset):
+        return np.empty(0)
+    counts = dataset.counts.astype(np.float64)
+
+    # Days relative to each entrant's first meet keep the sums small
+    x = dataset.days - np.repeat(dataset.days[dataset.starts], dataset.counts)
+    y = dataset.marks
+    sum_x = np.add.reduceat(x, dataset.starts)
+    sum_y = np.add.reduceat(y, dataset.starts)
+    sum_xx = np.add.reduceat(x * x, dataset.starts)
+    sum_xy = np.add.reduceat(x * y, dataset.starts)
+
+    denominator = counts * sum_xx - sum_x * sum_x
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = np.where(denominator > 0, (counts * sum_xy - sum_x * sum_y) / denominator, 0.0)
+
+    target = dataset.last_days - dataset.days[dataset.starts] + DAYS_AHEAD
+    predictions = sum_y / counts + slope * (target - sum_x / counts)
+
+    # A single mark is its own prediction; a trend running below zero is dropped as in linear.py
+    predictions = np.where(dataset.counts == 1, y[dataset.starts], predictions)
+    return np.where(predictions < 0, np.nan, predictions)
+
+
+@register_model("time_weighted")
+def predict_time_weighted(dataset : SeasonDataset) -> np.ndarray:
+    """Average with each mark's weight halving every HALF_LIFE_DAYS before the entrant's last meet"""
+    if not len(dataset):
+        return np.empty(0)
+    age = np.repeat(dataset.last_days, dataset.counts) - dataset.days
+    weights = 0.5 ** (age / HALF_LIFE_DAYS)
+    return np.add.reduceat(weights * dataset.marks, dataset.starts) / np.add.reduceat(weights, dataset.starts)
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+def run_models(dataset : SeasonDataset, names : list = None) -> dict:
+    """Evaluate the registered models (or just names) over one dataset: {name: predicted mark per entrant}"""
+    results = {}
+    for name in names or MODELS:
+        if name not in MODELS:
+            raise Exception(f"Unknown model '{name}', registered: {', '.join(MODELS)}")
+        predictions = np.asarray(MODELS[name](dataset), dtype=np.float64)
+        if predictions.shape != (len(dataset),):
+            raise Exception(f"Model '{name}' returned {predictions.shape} predictions for {len(dataset)} entrants")
+        results[name] = predictions
+    return results
+
+
+def prediction_rows(dataset : SeasonDataset, predictions : np.ndarray) -> list:
+    """
+    Predictions in the LinearRegressionPredictions shape:
+    (EventID, EventName, EventType, Gender, SchoolID, AthleteID, AthleteFirstName, AthleteLastName, predictedresult)
+    """
+    return [
+        (int(dataset.event_ids[i]), dataset.event_names[i], dataset.event_types[i], dataset.gender, dataset.schools[i],
+         int(dataset.athlete_ids[i]), dataset.first_names[i], dataset.last_names[i], float(predictions[i]))
+        for i in range(len(dataset)) if not np.isnan(predictions[i])
+    ]
+
+
+def connect():
+    load_dotenv()
+    database_url = os.environ.get("DATABASE_URL")
+
+    if not database_url:
+        raise Exception("DATABASE_URL environment variable not set!")
+
+    connection = psycopg2.connect(database_url)
+    connection.autocommit = True
+    return connection
+
+
+def store_predictions(cursor, model : str, rows : list, seasonType : str, seasonYear : int):
+    """Replace a model's predictions for a season and gender in ModelPredictions (analysis_tables.sql)"""
+    genders = {row[3] for row in rows}
+    for gender in genders:
+        cursor.execute("""
+            DELETE FROM ModelPredictions WHERE Model = %s AND Gender = %s AND seasonType = %s AND seasonYear = %s
+        """, (model, gender, seasonType, seasonYear))
+    for row in rows:
+        cursor.execute("""
+            INSERT INTO ModelPredictions (Model, EventID, EventName, EventType, Gender, SchoolID, AthleteID, AthleteFirstName, AthleteLastName, predictedresult, seasonType, seasonYear)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (model,) + row + (seasonType, seasonYear))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run every registered prediction model over one season")
+    parser.add_argument("gender", choices=["M", "F"])
+    parser.add_argument("season_type", choices=["Indoor", "Outdoor"])
+    parser.add_argument("season_year", type=int)
+    parser.add_argument("--model", action="append", help="Only run this model (repeatable)")
+    parser.add_argument("--snapshot", action="store_true", help="Read the local snapshot instead of the database")
+    parser.add_argument("--store", action="store_true", help="Save predictions to ModelPredictions")
+    args = parser.parse_args(argv)
+
+    connection = None
+    if args.snapshot:
+        dataset = load_dataset_from_snapshot(args.season_year, args.season_type, args.gender)
+    else:
+        connection = connect()
+        dataset = load_dataset_from_database(connection.cursor(), args.gender, args.season_type, args.season_year)
+
+    results = run_models(dataset, args.model)
+    for name, predictions in results.items():
+        rows = prediction_rows(dataset, predictions)
+        print(f"{name}: {len(rows)} predictions for {len(dataset)} entrants")
+        if args.store:
+            if connection is None:
+                connection = connect()
+            store_predictions(connection.cursor(), name, rows, args.season_type, args.season_year)
+
+    if connection is not None:
+        connection.close()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,377 @@
+import sys
+import time
+import bisect
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+import scoring
+import models
+
+try:
+    import pulp
+except ImportError:
+    pulp = None
+
+# Championship entry optimizer
+#
+# Picks one school's entries (which athletes in which events, and who runs each relay) to maximize
+# the team points they are predicted to score against every rival's predicted field. Predictions
+# come from one model run over the season (linear, falling back to season best where linear has no
+# prediction), made once and shared by every school's solve.
+#
+# With PuLP installed (it is in requirements.txt) each school is solved exactly as an integer program;
+# without it, or when the solve doesn't finish optimal, a greedy pick of the best marginal entry followed
+# by a local search over swaps. Schools are solved in parallel, one process per school.
+
+# Conference entry rules
+MAX_INDIVIDUAL_EVENTS = 3    # individual events per athlete
+MAX_EVENTS = 4               # events per athlete, relays included
+MAX_ENTRIES_PER_EVENT = 4    # entries per school per individual event
+RELAY_LEGS = 4
+
+SOLVER_TIME_LIMIT = 20       # seconds per school for the integer program
+
+
+# ============================================================
+# PROBLEM
+# ============================================================
+
+class Problem:
+    """The predicted championship, from one school's point of view"""
+
+    def __init__(self, rows : list, school_id : str):
+        self.school_id = school_id
+        self.events = {}       # event_id -> (event_name, event_type, higher)
+        self.entries = {}      # event_id -> [(athlete_id, name, mark)] of this school's athletes, best first
+        self.relays = {}       # event_id -> this school's predicted relay mark
+        self.rivals = {}       # event_id -> sorted sort keys of every rival entry that can be entered
+        self.athletes = {}     # athlete_id -> name
+        self.athlete_types = {}  # athlete_id -> event types they have individual predictions in
+
+        rival_marks = {}
+        for event_id, event_name, event_type, _, school_id, athlete_id, first_name, last_name, mark in rows:
+            higher = scoring.higher_is_better(event_type)
+            self.events[event_id] = (event_name, event_type, higher)
+            if school_id == self.school_id:
+                if athlete_id == -1:
+                    self.relays[event_id] = float(mark)
+                else:
+                    name = first_name + " " + last_name
+                    self.entries.setdefault(event_id, []).append((athlete_id, name, float(mark)))
+                    self.athletes[athlete_id] = name
+                    self.athlete_types.setdefault(athlete_id, set()).add(event_type)
+            else:
+                rival_marks.setdefault((event_id, school_id), []).append(self.sort_key(event_id, float(mark)))
+
+        for event_id, entries in self.entries.items():
+            entries.sort(key=lambda entry: self.sort_key(event_id, entry[2]))
+        self.marks = {(event_id, athlete_id): mark for event_id, entries in self.entries.items() for athlete_id, _, mark in entries}
+
+        # A rival enters at most MAX_ENTRIES_PER_EVENT athletes (its best) and one relay team
+        for (event_id, _), keys in rival_marks.items():
+            keys.sort()
+            self.rivals.setdefault(event_id, []).extend(keys[:MAX_ENTRIES_PER_EVENT])
+        for keys in self.rivals.values():
+            keys.sort()
+
+    def sort_key(self, event_id : int, mark : float) -> float:
+        """Smaller is better in every event"""
+        return -mark if self.events[event_id][2] else mark
+
+    def rivals_ahead(self, event_id : int, mark : float) -> int:
+        """Rival entries predicted ahead of a mark (ties go to the rival)"""
+        return bisect.bisect_right(self.rivals.get(event_id, []), self.sort_key(event_id, mark))
+
+    def relay_legs(self, event_id : int) -> list:
+        """Athletes who can run a relay: those with predictions in individual events of its type"""
+        event_type = self.events[event_id][1]
+        return sorted(athlete_id for athlete_id, types in self.athlete_types.items() if event_type in types)
+
+    def event_points(self, event_id : int, marks : list) -> int:
+        """Points this school scores with these marks entered in an event"""
+        points = 0
+        for own_ahead, mark in enumerate(sorted(marks, key=lambda mark: self.sort_key(event_id, mark))):
+            points += scoring.points_for_place(self.rivals_ahead(event_id, mark) + own_ahead + 1)
+        return points
+
+
+class Lineup:
+    """Entries chosen for one school"""
+
+    def __init__(self):
+        self.individual = {}   # event_id -> set of athlete_ids
+        self.relays = {}       # event_id -> tuple of leg athlete_ids
+
+    def copy(self) -> "Lineup":
+        lineup = Lineup()
+        lineup.individual = {event_id: set(athletes) for event_id, athletes in self.individual.items()}
+        lineup.relays = dict(self.relays)
+        return lineup
+
+    def events_of(self, athlete_id : int) -> tuple:
+        """(individual events, all events) entered by an athlete"""
+        individual = sum(athlete_id in athletes for athletes in self.individual.values())
+        return individual, individual + sum(athlete_id in legs for legs in self.relays.values())
+
+    def can_add(self, athlete_id : int, relay : bool) -> bool:
+        individual, total = self.events_of(athlete_id)
+        return total < MAX_EVENTS and (relay or individual < MAX_INDIVIDUAL_EVENTS)
+
+
+def individual_points(problem : Problem, event_id : int, athletes) -> int:
+    return problem.event_points(event_id, [problem.marks[(event_id, athlete_id)] for athlete_id in athletes])
+
+
+def lineup_points(problem : Problem, lineup : Lineup) -> int:
+    points = sum(individual_points(problem, event_id, athletes) for event_id, athletes in lineup.individual.items())
+    points += sum(problem.event_points(event_id, [problem.relays[event_id]]) for event_id in lineup.relays)
+    return points
+
+
+# ============================================================
+# GREEDY + LOCAL SEARCH
+# ============================================================
+
+def _choose_legs(problem : Problem, lineup : Lineup, event_id : int):
+    """Four eligible legs with room left, those with the fewest events first; None if there aren't four"""
+    available = [athlete_id for athlete_id in problem.relay_legs(event_id) if lineup.can_add(athlete_id, relay=True)]
+    if len(available) < RELAY_LEGS:
+        return None
+    available.sort(key=lambda athlete_id: (lineup.events_of(athlete_id)[1], athlete_id))
+    return tuple(available[:RELAY_LEGS])
+
+
+def _moves(problem : Problem, lineup : Lineup):
+    """Every entry that could be added to a lineup: ("individual", event_id, athlete_id) or ("relay", event_id, legs)"""
+    for event_id, entries in problem.entries.items():
+        chosen = lineup.individual.get(event_id, set())
+        if len(chosen) >= MAX_ENTRIES_PER_EVENT:
+            continue
+        for athlete_id, _, _ in entries:
+            if athlete_id not in chosen and lineup.can_add(athlete_id, relay=False):
+                yield ("individual", event_id, athlete_id)
+    for event_id in problem.relays:
+        if event_id not in lineup.relays:
+            legs = _choose_legs(problem, lineup, event_id)
+            if legs is not None:
+                yield ("relay", event_id, legs)
+
+
+def _gain(problem : Problem, lineup : Lineup, move : tuple) -> int:
+    """Points a move adds; only its event is re-scored"""
+    kind, event_id, value = move
+    if kind == "relay":
+        return problem.event_points(event_id, [problem.relays[event_id]])
+    athletes = lineup.individual.get(event_id, set())
+    return individual_points(problem, event_id, athletes | {value}) - individual_points(problem, event_id, athletes)
+
+
+def _apply(lineup : Lineup, move : tuple) -> Lineup:
+    kind, event_id, value = move
+    lineup = lineup.copy()
+    if kind == "individual":
+        lineup.individual.setdefault(event_id, set()).add(value)
+    else:
+        lineup.relays[event_id] = value
+    return lineup
+
+
+def solve_greedy(problem : Problem, max_rounds : int = 50) -> Lineup:
+    """Add the entry worth the most points until none adds any, then improve by swapping single entries"""
+    lineup = Lineup()
+    points = 0
+    while True:
+        best = None
+        for move in _moves(problem, lineup):
+            gain = _gain(problem, lineup, move)
+            if gain > 0 and (best is None or gain > best[0]):
+                best = (gain, move)
+        if best is None:
+            break
+        points += best[0]
+        lineup = _apply(lineup, best[1])
+
+    # Local search: drop one entry and add the best replacement, while that gains points
+    for _ in range(max_rounds):
+        improved = False
+        removals = [("individual", event_id, athlete_id) for event_id, athletes in lineup.individual.items() for athlete_id in athletes]
+        removals += [("relay", event_id, legs) for event_id, legs in lineup.relays.items()]
+        for kind, event_id, value in removals:
+            reduced = lineup.copy()
+            if kind == "individual":
+                reduced.individual[event_id].discard(value)
+            else:
+                del reduced.relays[event_id]
+            reduced_points = lineup_points(problem, reduced)
+            for move in _moves(problem, reduced):
+                if move == (kind, event_id, value):
+                    continue
+                gain = _gain(problem, reduced, move)
+                if reduced_points + gain > points:
+                    lineup, points, improved = _apply(reduced, move), reduced_points + gain, True
+                    break
+            if improved:
+                break
+        if not improved:
+            break
+    return lineup
+
+
+# ============================================================
+# INTEGER PROGRAM
+# ============================================================
+
+def solve_ilp(problem : Problem) -> Lineup:
+    """
+    Exact solve with PuLP. An event's own entries fill slots 1..MAX_ENTRIES_PER_EVENT best first, so
+    the athlete in slot s with r rivals ahead places r + s; x[a, e] enters athlete a in event e,
+    z[a, e, s] puts them in slot s, y[e] enters the relay and l[a, e] runs a leg of it.
+    """
+    model = pulp.LpProblem("lineup_" + problem.school_id, pulp.LpMaximize)
+    objective = []
+    x = {}
+    athlete_events = {}
+
+    for event_id, entries in problem.entries.items():
+        slots = range(1, MAX_ENTRIES_PER_EVENT + 1)
+        z = {}
+        for athlete_id, _, mark in entries:
+            x[(athlete_id, event_id)] = pulp.LpVariable(f"x_{athlete_id}_{event_id}", cat="Binary")
+            athlete_events.setdefault(athlete_id, []).append(x[(athlete_id, event_id)])
+            ahead = problem.rivals_ahead(event_id, mark)
+            for s in slots:
+                z[(athlete_id, s)] = pulp.LpVariable(f"z_{athlete_id}_{event_id}_{s}", cat="Binary")
+                objective.append(scoring.points_for_place(ahead + s) * z[(athlete_id, s)])
+            model += pulp.lpSum(z[(athlete_id, s)] for s in slots) == x[(athlete_id, event_id)]
+
+        for s in slots:
+            model += pulp.lpSum(z[(athlete_id, s)] for athlete_id, _, _ in entries) <= 1
+            if s > 1:
+                model += (pulp.lpSum(z[(athlete_id, s)] for athlete_id, _, _ in entries)
+                          <= pulp.lpSum(z[(athlete_id, s - 1)] for athlete_id, _, _ in entries))
+        # Slots follow predicted order: a slower teammate in slot s keeps faster ones out of later slots
+        for i, (better, _, _) in enumerate(entries):
+            for worse, _, _ in entries[i + 1:]:
+                for s in slots:
+                    model += z[(worse, s)] + pulp.lpSum(z[(better, later)] for later in slots if later > s) <= 1
+
+    relay_legs = {}
+    for event_id, mark in problem.relays.items():
+        y = pulp.LpVariable(f"y_{event_id}", cat="Binary")
+        objective.append(scoring.points_for_place(problem.rivals_ahead(event_id, mark) + 1) * y)
+        legs = {athlete_id: pulp.LpVariable(f"l_{athlete_id}_{event_id}", cat="Binary") for athlete_id in problem.relay_legs(event_id)}
+        model += pulp.lpSum(legs.values()) == RELAY_LEGS * y
+        relay_legs[event_id] = (y, legs)
+
+    for athlete_id in problem.athletes:
+        individual = athlete_events.get(athlete_id, [])
+        legs = [legs[athlete_id] for _, legs in relay_legs.values() if athlete_id in legs]
+        model += pulp.lpSum(individual) <= MAX_INDIVIDUAL_EVENTS
+        model += pulp.lpSum(individual + legs) <= MAX_EVENTS
+
+    model += pulp.lpSum(objective)
+    model.solve(pulp.PULP_CBC_CMD(msg=False, timeLimit=SOLVER_TIME_LIMIT))
+    if pulp.LpStatus[model.status] != "Optimal":
+        raise Exception(f"Lineup solve for {problem.school_id} failed: {pulp.LpStatus[model.status]}")
+
+    lineup = Lineup()
+    for (athlete_id, event_id), variable in x.items():
+        if variable.value() is not None and variable.value() > 0.5:
+            lineup.individual.setdefault(event_id, set()).add(athlete_id)
+    for event_id, (y, legs) in relay_legs.items():
+        if y.value() is not None and y.value() > 0.5:
+            lineup.relays[event_id] = tuple(sorted(athlete_id for athlete_id, leg in legs.items() if leg.value() > 0.5))
+    return lineup
+
+
+# ============================================================
+# RUNNER
+# ============================================================
+
+# Prediction rows shared by every solve in a worker process, set once by the pool initializer
+_rows = None
+
+
+def _init_worker(rows : list):
+    global _rows
+    _rows = rows
+
+
+def optimize_school(school_id : str, solver : str = "auto") -> dict:
+    """Best lineup for one school against the shared predictions; falls back to greedy if the ILP solve fails"""
+    start = time.perf_counter()
+    problem = Problem(_rows, school_id)
+    if solver == "ilp" or (solver == "auto" and pulp is not None):
+        if pulp is None:
+            raise Exception("The ILP solver needs PuLP: pip install pulp")
+        try:
+            lineup, used = solve_ilp(problem), "ilp"
+        except Exception as e:
+            # CBC gave up (time limit, infeasible or a solver error): a greedy lineup beats no lineup
+            print(f"{e}, using the greedy lineup")
+            lineup, used = solve_greedy(problem), "greedy"
+    else:
+        lineup, used = solve_greedy(problem), "greedy"
+    return {"school_id": school_id, "lineup": lineup, "points": lineup_points(problem, lineup), "solver": used,
+            "seconds": time.perf_counter() - start, "problem": problem}
+
+
+def optimize_all(rows : list, schools : list = None, workers : int = None, solver : str = "auto") -> list:
+    """Solve every school (or schools) in parallel; each worker gets the prediction rows once"""
+    schools = schools or sorted({row[4] for row in rows})
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(rows,)) as pool:
+        return list(pool.map(optimize_school, schools, [solver] * len(schools)))
+
+
+def predictions(dataset : models.SeasonDataset, model : str = "linear", fallback : str = "season_best") -> list:
+    """Prediction rows from model, with fallback filling entrants model has no prediction for"""
+    results = models.run_models(dataset, [model, fallback])
+    predicted = np.where(np.isnan(results[model]), results[fallback], results[model])
+    return models.prediction_rows(dataset, predicted)
+
+
+def print_lineup(result : dict):
+    problem = result["problem"]
+    lineup = result["lineup"]
+    marks = problem.marks
+    print(f"\n{result['school_id']}: {result['points']} predicted points ({result['solver']}, {result['seconds']:.2f}s)")
+    for event_id in sorted(set(lineup.individual) | set(lineup.relays), key=lambda event_id: problem.events[event_id][0]):
+        event_name = problem.events[event_id][0]
+        if event_id in lineup.relays:
+            legs = ", ".join(problem.athletes[athlete_id] for athlete_id in lineup.relays[event_id])
+            print(f"  {event_name:<20} relay {problem.relays[event_id]:.2f} ({legs})")
+        for athlete_id in sorted(lineup.individual.get(event_id, ()), key=lambda a: problem.sort_key(event_id, marks[(event_id, a)])):
+            print(f"  {event_name:<20} {problem.athletes[athlete_id]:<30} {marks[(event_id, athlete_id)]:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Choose each school's championship entries to maximize predicted team points")
+    parser.add_argument("gender", choices=["M", "F"])
+    parser.add_argument("season_type", choices=["Indoor", "Outdoor"])
+    parser.add_argument("season_year", type=int)
+    parser.add_argument("--school", action="append", help="Only optimize this school (repeatable)")
+    parser.add_argument("--model", default="linear")
+    parser.add_argument("--fallback-model", default="season_best")
+    parser.add_argument("--solver", choices=["auto", "ilp", "greedy"], default="auto")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per core)")
+    parser.add_argument("--snapshot", default=None, help="Read this snapshot directory instead of the database")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        dataset = models.load_dataset_from_snapshot(args.season_year, args.season_type, args.gender, snapshot_dir=args.snapshot)
+    else:
+        connection = models.connect()
+        dataset = models.load_dataset_from_database(connection.cursor(), args.gender, args.season_type, args.season_year)
+        connection.close()
+
+    start = time.perf_counter()
+    results = optimize_all(predictions(dataset, args.model, args.fallback_model), args.school, args.workers, args.solver)
+    elapsed = time.perf_counter() - start
+
+    for result in sorted(results, key=lambda result: -result["points"]):
+        print_lineup(result)
+    print(f"\nOptimized {len(results)} schools in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,223 @@
+import os
+import sys
+import json
+import inspect
+import hashlib
+import argparse
+import datetime
+import numpy as np
+import scoring
+import snapshot
+import models
+import scrape_path  # noqa: F401
+import profiling
+from linear import SEASONS
+
+# Static prediction artifacts for the website
+#
+# For every model, season and gender, publish() renders what /api/predictions would answer (the
+# per-event finishing order and the team scores) into one compact JSON file under the web app's
+# public/ directory, so the predictions page is served as a static file instead of a query per visit:
+#
+#   public/predictions/
+#       manifest.json                                   {"<model>/<season>/<gender>": {"path", "fingerprint", ...}}
+#       season-best/2026-Indoor-M.<fingerprint>.json    {"eventPredictions": [...], "teamScores": [...], ...}
+#
+# An artifact's fingerprint hashes its inputs: the season dataset, the schools scored, the model's
+# source, the source of models.py and scoring.py and ARTIFACT_VERSION. A season whose marks didn't change keeps its file and is not re-rendered.
+# The fingerprint is part of the file name, so files can be cached forever; the manifest is replaced last.
+#
+# Usage:
+#   python publish.py [--season 2026-Indoor] [--model season_best] [--snapshot] [--force]
+
+PUBLISH_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "predict-the-centenni-podium", "public", "predictions")
+
+# Bump when the artifact layout or the placing/scoring below changes
+ARTIFACT_VERSION = 1
+
+# Registry names -> the model ids the website uses
+WEB_MODEL_IDS = {"season_best": "season-best", "linear": "linear-regression", "season_average": "average-season-performance"}
+
+GENDERS = ("M", "F")
+
+
+def web_model_id(name : str) -> str:
+    return WEB_MODEL_IDS.get(name, name.replace("_", "-"))
+
+
+def artifact_key(name : str, seasonType : str, seasonYear, gender : str) -> str:
+    return f"{web_model_id(name)}/{seasonYear}-{seasonType}/{gender}"
+
+
+def fingerprint(dataset : models.SeasonDataset, name : str, schools : list) -> str:
+    """Hash of everything an artifact is rendered from"""
+    digest = hashlib.sha256(f"{ARTIFACT_VERSION}|{dataset.gender}|{name}".encode())
+    # The model, and the dataset loading (best_per_meet), DAYS_AHEAD, HALF_LIFE_DAYS and placing/scoring it relies on
+    for source in (models.MODELS[name], models, scoring):
+        digest.update(inspect.getsource(source).encode())
+    for column in (dataset.event_ids, dataset.athlete_ids, dataset.offsets, dataset.marks, dataset.days):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    for column in (dataset.schools, dataset.event_names, dataset.event_types, dataset.first_names, dataset.last_names, schools):
+        digest.update("\x1f".join(map(str, column)).encode())
+    return digest.hexdigest()[:16]
+
+
+def render(dataset : models.SeasonDataset, predictions : np.ndarray, schools : list) -> dict:
+    """The /api/predictions response for one model: entrants placed per event, and every school's score"""
+    entrants = {}
+    for i in range(len(dataset)):
+        if not np.isnan(predictions[i]):
+            entrants.setdefault(int(dataset.event_ids[i]), []).append(i)
+
+    teams = {school: {"schoolid": school, "schoolname": school, "totalscore": 0, "eventbreakdown": {}} for school in schools}
+    events = []
+    for event_id in sorted(entrants):
+        first = entrants[event_id][0]
+        higher = bool(dataset.higher[first])
+        order = sorted(entrants[event_id], key=lambda i: -predictions[i] if higher else predictions[i])
+        event_name = dataset.event_names[first]
+
+        rows = []
+        for place, i in enumerate(order, 1):
+            school = dataset.schools[i]
+            relay = dataset.athlete_ids[i] == -1
+            rows.append({
+                "place": place,
+                "athleteid": None if relay else int(dataset.athlete_ids[i]),
+                "athletefirstname": dataset.first_names[i],
+                "athletelastname": dataset.last_names[i],
+                "schoolid": school,
+                "schoolname": school,
+                "predictedresult": round(float(predictions[i]), 2),
+            })
+            team = teams.setdefault(school, {"schoolid": school, "schoolname": school, "totalscore": 0, "eventbreakdown": {}})
+            points = scoring.points_for_place(place)
+            team["totalscore"] += points
+            team["eventbreakdown"][event_name] = team["eventbreakdown"].get(event_name, 0) + points
+
+        events.append({"eventid": event_id, "eventname": event_name, "eventtype": dataset.event_types[first],
+                       "gender": dataset.gender, "predictions": rows})
+
+    team_scores = sorted(teams.values(), key=lambda team: (-team["totalscore"], team["schoolid"]))
+    return {"eventPredictions": events, "teamScores": team_scores}
+
+
+# ============================================================
+# MANIFEST
+# ============================================================
+
+def load_manifest(publish_dir : str = PUBLISH_DIR) -> dict:
+    path = os.path.join(publish_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {"version": ARTIFACT_VERSION, "artifacts": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _write_json(path : str, data : dict):
+    # Written beside the target then renamed, so the web server never serves half a file
+    temporary = path + ".tmp"
+    with open(temporary, "w") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(temporary, path)
+
+
+# ============================================================
+# PUBLISH
+# ============================================================
+
+def school_ids(connection) -> list:
+    cursor = connection.cursor()
+    cursor.execute("SELECT SchoolID FROM School ORDER BY SchoolID")
+    schools = [row[0] for row in cursor.fetchall()]
+    cursor.close()
+    return schools
+
+
+@profiling.profiled("publish.publish")
+def publish(seasons : list = SEASONS, names : list = None, use_snapshot : bool = False, force : bool = False,
+            publish_dir : str = PUBLISH_DIR) -> tuple:
+    """Render every stale artifact for seasons [(seasonType, seasonYear)] and models. Returns (written, unchanged)"""
+    for name in names or ():
+        if name not in models.MODELS:
+            raise Exception(f"Unknown model '{name}', registered: {', '.join(models.MODELS)}")
+    os.makedirs(publish_dir, exist_ok=True)
+    manifest = load_manifest(publish_dir)
+    artifacts = manifest["artifacts"]
+
+    connection = None
+    if use_snapshot:
+        available = set(snapshot.available_seasons())
+    else:
+        connection = models.connect()
+        schools = school_ids(connection)
+
+    written = unchanged = 0
+    for seasonType, seasonYear in seasons:
+        if use_snapshot and (int(seasonYear), seasonType) not in available:
+            print(f"PUBLISH: {seasonYear} {seasonType} is not in the snapshot, skipping")
+            continue
+        for gender in GENDERS:
+            if use_snapshot:
+                dataset = models.load_dataset_from_snapshot(int(seasonYear), seasonType, gender)
+                schools = sorted(set(dataset.schools))
+            else:
+                dataset = models.load_dataset_from_database(connection.cursor(), gender, seasonType, seasonYear)
+
+            # Fingerprint first, so only the models whose inputs changed are run
+            stale = {}
+            for name in names or models.MODELS:
+                key = artifact_key(name, seasonType, seasonYear, gender)
+                inputs = fingerprint(dataset, name, schools)
+                current = artifacts.get(key)
+                if not force and current is not None and current["fingerprint"] == inputs \
+                        and os.path.exists(os.path.join(publish_dir, current["path"])):
+                    unchanged += 1
+                    continue
+                stale[name] = inputs
+
+            results = models.run_models(dataset, list(stale)) if stale else {}
+            for name, inputs in stale.items():
+                key = artifact_key(name, seasonType, seasonYear, gender)
+                current = artifacts.get(key)
+                path = f"{web_model_id(name)}/{seasonYear}-{seasonType}-{gender}.{inputs}.json"
+                os.makedirs(os.path.dirname(os.path.join(publish_dir, path)), exist_ok=True)
+                artifact = render(dataset, results[name], schools)
+                artifact.update({"version": ARTIFACT_VERSION, "model": web_model_id(name), "season": f"{seasonYear}-{seasonType}",
+                                 "gender": gender, "fingerprint": inputs})
+                _write_json(os.path.join(publish_dir, path), artifact)
+                artifacts[key] = {"path": path, "fingerprint": inputs, "entrants": len(dataset),
+                                  "published": datetime.datetime.now().isoformat(timespec="seconds")}
+                if current is not None and current["path"] != path and os.path.exists(os.path.join(publish_dir, current["path"])):
+                    os.remove(os.path.join(publish_dir, current["path"]))
+                written += 1
+                print(f"PUBLISH: {key} -> {path}")
+
+            # Each season's manifest goes out as soon as its files exist
+            manifest["version"] = ARTIFACT_VERSION
+            _write_json(os.path.join(publish_dir, "manifest.json"), manifest)
+
+    if connection is not None:
+        connection.close()
+    print(f"PUBLISH: {written} artifacts written, {unchanged} unchanged")
+    return written, unchanged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Render static prediction and team score files for the website")
+    parser.add_argument("--season", action="append", help="YEAR-TYPE, e.g. 2026-Indoor (repeatable, default: every season on the site)")
+    parser.add_argument("--model", action="append", help="Only publish this model (repeatable)")
+    parser.add_argument("--snapshot", action="store_true", help="Read the local snapshot instead of the database")
+    parser.add_argument("--force", action="store_true", help="Re-render artifacts whose inputs didn't change")
+    parser.add_argument("--out", default=PUBLISH_DIR, help="Directory the website serves as /predictions")
+    parser.add_argument("--profile", choices=profiling.MODES, default=os.environ.get("PROFILE"), help="Profile the run (see profiling.py)")
+    args = parser.parse_args(argv)
+
+    seasons = SEASONS
+    if args.season:
+        seasons = [(season.split("-")[1], season.split("-")[0]) for season in args.season]
+    publish(seasons, args.model, args.snapshot, args.force, args.out, profile=args.profile)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
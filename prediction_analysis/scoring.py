@@ -0,0 +1,19 @@
+# Championship scoring shared by the simulation and scoring scripts
+# Centennial Conference championships score the top 8 places 10-8-6-5-4-3-2-1
+
+PLACE_POINTS = (10, 8, 6, 5, 4, 3, 2, 1)
+SCORING_PLACES = len(PLACE_POINTS)
+
+# For throws/jumps/combined: higher is better, for sprints/distance: lower is better
+HIGHER_IS_BETTER_TYPES = ("throws", "jumps", "combined")
+
+
+def higher_is_better(event_type : str) -> bool:
+    return event_type in HIGHER_IS_BETTER_TYPES
+
+
+def points_for_place(place : int) -> int:
+    """Points for a 1-based place, 0 outside the scoring places"""
+    if 1 <= place <= SCORING_PLACES:
+        return PLACE_POINTS[place - 1]
+    return 0
@@ -0,0 +1,15 @@
+import os
+import sys
+
+# Path setup for the scrape_tffrs modules used here (records.py, profiling.py)
+#
+# Modules that import from scrape_tffrs import this module right before, so none of them depends on
+# another module having changed sys.path first:
+#
+#   import scrape_path  # noqa: F401
+#   import profiling
+
+SCRAPE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scrape_tffrs"))
+
+if SCRAPE_DIR not in sys.path:
+    sys.path.append(SCRAPE_DIR)
@@ -0,0 +1,188 @@
+import sys
+import time
+import argparse
+import numpy as np
+import scoring
+import models
+
+# Monte Carlo championship simulator
+# Each entrant's championship mark is sampled from a normal distribution fitted to their season
+# history, every event is ranked, and team totals are scored 10-8-6-5-4-3-2-1 for each simulated meet.
+
+# Spread used for entrants with little history: a coefficient of variation of 2% of the mark,
+# weighted as if it were PRIOR_WEIGHT extra observations
+PRIOR_CV = 0.02
+PRIOR_WEIGHT = 2.0
+
+# Simulations are run in chunks so memory stays bounded for large entry lists
+CHUNK_SIZE = 25000
+
+# Entrants more than this many standard deviations out of the scoring places are not simulated
+PRUNE_SIGMAS = 5.0
+
+
+class Entrant:
+    """One entry in an event: an athlete, or a school's relay team (athlete_id -1)"""
+    __slots__ = ("event_id", "event_name", "event_type", "school_id", "athlete_id", "name", "marks")
+
+    def __init__(self, event_id : int, event_name : str, event_type : str, school_id : str, athlete_id : int, name : str):
+        self.event_id = event_id
+        self.event_name = event_name
+        self.event_type = event_type
+        self.school_id = school_id
+        self.athlete_id = athlete_id
+        self.name = name
+        self.marks = []
+
+
+def fit_distribution(marks) -> tuple:
+    """Fit (mean, standard deviation) to a season's marks, shrinking the spread toward PRIOR_CV of the mark"""
+    marks = np.asarray(marks, dtype=np.float64)
+    mean = float(marks.mean())
+    prior_variance = (PRIOR_CV * mean) ** 2
+    if len(marks) < 2:
+        return mean, float(np.sqrt(prior_variance))
+    sample_variance = float(marks.var(ddof=1))
+    variance = ((len(marks) - 1) * sample_variance + PRIOR_WEIGHT * prior_variance) / (len(marks) - 1 + PRIOR_WEIGHT)
+    return mean, float(np.sqrt(variance))
+
+
+def entrants_from_dataset(dataset : models.SeasonDataset) -> list:
+    """One Entrant per dataset entrant, with its best mark at each meet; relays are named after their school"""
+    entrants = []
+    for i in range(len(dataset)):
+        athlete_id = int(dataset.athlete_ids[i])
+        name = dataset.schools[i] if athlete_id == -1 else dataset.first_names[i] + " " + dataset.last_names[i]
+        entrant = Entrant(int(dataset.event_ids[i]), dataset.event_names[i], dataset.event_types[i], dataset.schools[i],
+                          athlete_id, name)
+        entrant.marks = [float(mark) for mark in dataset.entrant_marks(i)[0]]
+        entrants.append(entrant)
+    return entrants
+
+
+def load_entrants(gender : str, seasonType : str, seasonYear : int) -> list:
+    """Load every championship-event entrant for a season with their marks, from the same dataset the models use"""
+    connection = models.connect()
+    try:
+        dataset = models.load_dataset_from_database(connection.cursor(), gender, seasonType, seasonYear)
+    finally:
+        connection.close()
+    return entrants_from_dataset(dataset)
+
+
+def simulate_meet(entrants : list, n_sims : int = 100000, seed : int = None) -> dict:
+    """
+    Simulate n_sims championship meets.
+    Returns {school_id: {"win_probability", "expected_points", "p05", "median", "p95"}}
+    """
+    rng = np.random.default_rng(seed)
+
+    schools = sorted({entrant.school_id for entrant in entrants})
+    school_index = {school: i for i, school in enumerate(schools)}
+    n_schools = len(schools)
+
+    # Group entrants into events as arrays: mean, spread and school index per entrant
+    events = {}
+    for entrant in entrants:
+        events.setdefault(entrant.event_id, []).append(entrant)
+
+    event_arrays = []
+    for event_id, event_entrants in events.items():
+        fitted = np.array([fit_distribution(entrant.marks) for entrant in event_entrants])
+        # Sort ascending everywhere by flipping the sign of higher-is-better events
+        sign = -1.0 if scoring.higher_is_better(event_entrants[0].event_type) else 1.0
+        means = sign * fitted[:, 0]
+        spreads = fitted[:, 1]
+        entrant_schools = np.array([school_index[entrant.school_id] for entrant in event_entrants], dtype=np.int64)
+
+        # Drop entrants who can't realistically score: even PRUNE_SIGMAS better than expected they would
+        # still be behind the slowest of the best SCORING_PLACES entrants at PRUNE_SIGMAS worse than expected
+        if len(means) > scoring.SCORING_PLACES:
+            cutoff = np.sort(means + PRUNE_SIGMAS * spreads)[scoring.SCORING_PLACES - 1]
+            keep = means - PRUNE_SIGMAS * spreads <= cutoff
+            means, spreads, entrant_schools = means[keep], spreads[keep], entrant_schools[keep]
+
+        event_arrays.append((means.astype(np.float32), spreads.astype(np.float32), entrant_schools))
+
+    totals = np.zeros((n_sims, n_schools), dtype=np.float64)
+    place_points = np.array(scoring.PLACE_POINTS, dtype=np.float64)
+
+    for start in range(0, n_sims, CHUNK_SIZE):
+        size = min(CHUNK_SIZE, n_sims - start)
+        chunk_totals = np.zeros(size * n_schools, dtype=np.float64)
+        row_offsets = (np.arange(size, dtype=np.int64) * n_schools)[:, None]
+
+        for means, spreads, entrant_schools in event_arrays:
+            n_entrants = len(means)
+            scored = min(scoring.SCORING_PLACES, n_entrants)
+
+            samples = rng.standard_normal((size, n_entrants), dtype=np.float32)
+            samples *= spreads
+            samples += means
+
+            # Only the scoring places need a full ordering
+            if n_entrants > scored:
+                top = np.argpartition(samples, scored - 1, axis=1)[:, :scored]
+                top_samples = np.take_along_axis(samples, top, axis=1)
+                order = np.take_along_axis(top, np.argsort(top_samples, axis=1), axis=1)
+            else:
+                order = np.argsort(samples, axis=1)
+
+            flat_index = (row_offsets + entrant_schools[order]).ravel()
+            weights = np.broadcast_to(place_points[:scored], (size, scored)).ravel()
+            chunk_totals += np.bincount(flat_index, weights=weights, minlength=size * n_schools)
+
+        totals[start:start + size] = chunk_totals.reshape(size, n_schools)
+
+    # Win probability, splitting ties evenly between the tied schools
+    best = totals.max(axis=1, keepdims=True)
+    winners = totals == best
+    win_share = winners / winners.sum(axis=1, keepdims=True)
+
+    win_probability = win_share.mean(axis=0)
+    expected_points = totals.mean(axis=0)
+    p05, median, p95 = np.percentile(totals, [5, 50, 95], axis=0)
+
+    return {
+        school: {
+            "win_probability": float(win_probability[i]),
+            "expected_points": float(expected_points[i]),
+            "p05": float(p05[i]),
+            "median": float(median[i]),
+            "p95": float(p95[i])
+        }
+        for school, i in school_index.items()
+    }
+
+
+def print_results(results : dict):
+    print(f"{'School':<20} {'Win %':>7} {'Exp Pts':>8} {'5%':>6} {'Median':>7} {'95%':>6}")
+    for school, stats in sorted(results.items(), key=lambda item: -item[1]["expected_points"]):
+        print(f"{school:<20} {stats['win_probability'] * 100:>6.1f}% {stats['expected_points']:>8.1f} "
+              f"{stats['p05']:>6.0f} {stats['median']:>7.0f} {stats['p95']:>6.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo simulation of a Centennial Conference championship")
+    parser.add_argument("gender", choices=["M", "F"])
+    parser.add_argument("season_type", choices=["Indoor", "Outdoor"])
+    parser.add_argument("season_year", type=int)
+    parser.add_argument("--sims", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    entrants = load_entrants(args.gender, args.season_type, args.season_year)
+    if not entrants:
+        print("No entrants found for " + str(args.season_year) + " " + args.season_type + " " + args.gender)
+        return
+
+    start = time.perf_counter()
+    results = simulate_meet(entrants, args.sims, args.seed)
+    elapsed = time.perf_counter() - start
+
+    print(f"Simulated {args.sims} meets ({len(entrants)} entrants) in {elapsed:.2f}s")
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
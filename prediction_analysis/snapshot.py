@@ -0,0 +1,261 @@
+import os
+import sys
+import json
+import datetime
+import psycopg2
+import pyarrow as pa
+import pyarrow.ipc as ipc
+from dotenv import load_dotenv
+
+# Columnar local snapshot of the warehouse
+#
+# export_snapshot() pulls Performance joined with athlete, season, event, meet and relay
+# membership from Neon once per season and writes one Arrow IPC file per season:
+#
+#   snapshot/
+#       manifest.json
+#       2025_Indoor/performances.arrow
+#       2025_Indoor/relay_members.arrow
+#
+# The loaders memory-map those files, so repeated analysis runs read straight from the page
+# cache with no network round trip and no Decimal/date conversion.
+# Missing ids are stored as -1 and missing wind as NaN so every numeric column converts to
+# NumPy without a copy.
+
+SNAPSHOT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "snapshot")
+
+PERFORMANCE_SCHEMA = pa.schema([
+    ("PerformanceID", pa.int64()),
+    ("MeetID", pa.int64()),
+    ("MeetName", pa.string()),
+    ("MeetDate", pa.date32()),
+    ("EventID", pa.int32()),
+    ("EventName", pa.string()),
+    ("EventType", pa.string()),
+    ("MeasureUnit", pa.string()),
+    ("IsRelay", pa.bool_()),
+    ("AthleteSeasonID", pa.int64()),  # -1 for relays
+    ("AthleteID", pa.int64()),  # -1 for relays
+    ("AthleteFirstName", pa.string()),
+    ("AthleteLastName", pa.string()),
+    ("Gender", pa.string()),
+    ("SchoolID", pa.string()),
+    ("ClassYear", pa.string()),  # '' for relays
+    ("RelayTeamID", pa.int64()),  # -1 for individual performances
+    ("ResultValue", pa.float64()),
+    ("WindGauge", pa.float64()),  # NaN when no wind reading
+    ("SeasonType", pa.string()),
+    ("SeasonYear", pa.int32()),
+])
+
+RELAY_MEMBER_SCHEMA = pa.schema([
+    ("RelayTeamID", pa.int64()),
+    ("AthleteSeasonID", pa.int64()),
+    ("AthleteID", pa.int64()),
+    ("LegNum", pa.int8()),
+    ("SchoolID", pa.string()),
+    ("Gender", pa.string()),
+    ("SeasonType", pa.string()),
+    ("SeasonYear", pa.int32()),
+])
+
+
+def season_dir(season_year : int, season_type : str, snapshot_dir : str = SNAPSHOT_DIR) -> str:
+    return os.path.join(snapshot_dir, str(season_year) + "_" + season_type)
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def _to_table(rows : list, schema : pa.Schema) -> pa.Table:
+    columns = list(zip(*rows)) if rows else [[] for _ in schema]
+    arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+def _write_table(table : pa.Table, path : str):
+    with pa.OSFile(path, "wb") as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+
+
+def export_season(cursor, season_year : int, season_type : str, snapshot_dir : str = SNAPSHOT_DIR) -> dict:
+    """Export one season to its snapshot directory. Returns the season's manifest entry."""
+    cursor.execute("""
+        SELECT
+            P.PerformanceID,
+            P.MeetID,
+            M.MeetName,
+            M.StartDate,
+            E.EventID,
+            E.EventName,
+            E.EventType,
+            E.MeasureUnit,
+            E.IsRelay,
+            COALESCE(P.AthleteSeasonID, -1),
+            COALESCE(A.AthleteID, -1),
+            COALESCE(A.AthleteFirstName, ''),
+            COALESCE(A.AthleteLastName, ''),
+            COALESCE(A.Gender, RG.Gender, ''),
+            COALESCE(AtS.SchoolID, RT.SchoolID),
+            COALESCE(AtS.ClassYear, ''),
+            COALESCE(P.RelayTeamID, -1),
+            P.ResultValue::FLOAT8,
+            COALESCE(P.WindGauge::FLOAT8, 'NaN'::FLOAT8),
+            P.SeasonType,
+            P.SeasonYear
+        FROM Performance AS P
+        JOIN TrackEvent AS E ON P.EventID = E.EventID
+        JOIN TrackMeet AS M ON P.MeetID = M.MeetID
+        LEFT JOIN AthleteSeason AS AtS ON P.AthleteSeasonID = AtS.AthleteSeasonID
+        LEFT JOIN Athlete AS A ON AtS.AthleteID = A.AthleteID
+        LEFT JOIN RelayTeam AS RT ON P.RelayTeamID = RT.RelayTeamID
+        LEFT JOIN LATERAL (
+            SELECT Ath.Gender
+            FROM RelayTeamMembers AS RTM
+            JOIN AthleteSeason AS AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
+            JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
+            WHERE RTM.RelayTeamID = P.RelayTeamID
+            LIMIT 1
+        ) AS RG ON P.RelayTeamID IS NOT NULL
+        WHERE P.SeasonYear = %s
+            AND P.SeasonType = %s
+        ORDER BY P.PerformanceID
+    """, (season_year, season_type))
+    performances = _to_table(cursor.fetchall(), PERFORMANCE_SCHEMA)
+
+    cursor.execute("""
+        SELECT
+            RTM.RelayTeamID,
+            RTM.AthleteSeasonID,
+            AthS.AthleteID,
+            RTM.LegNum,
+            RT.SchoolID,
+            Ath.Gender,
+            P.SeasonType,
+            P.SeasonYear
+        FROM Performance AS P
+        JOIN RelayTeam AS RT ON P.RelayTeamID = RT.RelayTeamID
+        JOIN RelayTeamMembers AS RTM ON RT.RelayTeamID = RTM.RelayTeamID
+        JOIN AthleteSeason AS AthS ON RTM.AthleteSeasonID = AthS.AthleteSeasonID
+        JOIN Athlete AS Ath ON AthS.AthleteID = Ath.AthleteID
+        WHERE P.SeasonYear = %s
+            AND P.SeasonType = %s
+        ORDER BY RTM.RelayTeamID, RTM.LegNum
+    """, (season_year, season_type))
+    relay_members = _to_table(cursor.fetchall(), RELAY_MEMBER_SCHEMA)
+
+    directory = season_dir(season_year, season_type, snapshot_dir)
+    os.makedirs(directory, exist_ok=True)
+    _write_table(performances, os.path.join(directory, "performances.arrow"))
+    _write_table(relay_members, os.path.join(directory, "relay_members.arrow"))
+
+    max_id = max(performances.column("PerformanceID").to_pylist(), default=0)
+    print(f"SNAPSHOT: Exported {season_year} {season_type} ({performances.num_rows} performances, {relay_members.num_rows} relay legs)")
+    return {
+        "season_year": season_year,
+        "season_type": season_type,
+        "performances": performances.num_rows,
+        "relay_members": relay_members.num_rows,
+        "max_performance_id": max_id
+    }
+
+
+def export_snapshot(snapshot_dir : str = SNAPSHOT_DIR, seasons : list = None):
+    """Export every season (or just the given [(year, type)] seasons) and rewrite the manifest"""
+    load_dotenv()
+    database_url = os.environ.get("DATABASE_URL")
+
+    if not database_url:
+        raise Exception("DATABASE_URL environment variable not set!")
+
+    connection = psycopg2.connect(database_url)
+    cursor = connection.cursor()
+
+    if seasons is None:
+        cursor.execute("SELECT DISTINCT SeasonYear, SeasonType FROM Performance ORDER BY SeasonYear, SeasonType")
+        seasons = cursor.fetchall()
+
+    manifest = load_manifest(snapshot_dir)
+    for season_year, season_type in seasons:
+        entry = export_season(cursor, season_year, season_type, snapshot_dir)
+        manifest["seasons"][str(season_year) + "_" + season_type] = entry
+
+    manifest["exported_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    with open(os.path.join(snapshot_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    cursor.close()
+    connection.close()
+
+
+# ============================================================
+# LOAD
+# ============================================================
+
+def load_manifest(snapshot_dir : str = SNAPSHOT_DIR) -> dict:
+    path = os.path.join(snapshot_dir, "manifest.json")
+    if not os.path.exists(path):
+        return {"seasons": {}}
+    with open(path) as f:
+        return json.load(f)
+
+
+def available_seasons(snapshot_dir : str = SNAPSHOT_DIR) -> list:
+    """[(season_year, season_type)] present in the snapshot, oldest first"""
+    entries = load_manifest(snapshot_dir)["seasons"].values()
+    return sorted((entry["season_year"], entry["season_type"]) for entry in entries)
+
+
+def _read_mapped(path : str) -> pa.Table:
+    # Record batches reference the mapped file directly, nothing is copied into Python memory
+    return ipc.open_file(pa.memory_map(path, "r")).read_all()
+
+
+def load_season(season_year : int, season_type : str, snapshot_dir : str = SNAPSHOT_DIR) -> pa.Table:
+    """Memory-map one season's performances as an Arrow table"""
+    return _read_mapped(os.path.join(season_dir(season_year, season_type, snapshot_dir), "performances.arrow"))
+
+
+def load_relay_members(season_year : int, season_type : str, snapshot_dir : str = SNAPSHOT_DIR) -> pa.Table:
+    """Memory-map one season's relay legs as an Arrow table"""
+    return _read_mapped(os.path.join(season_dir(season_year, season_type, snapshot_dir), "relay_members.arrow"))
+
+
+def load_performances(seasons : list = None, snapshot_dir : str = SNAPSHOT_DIR) -> pa.Table:
+    """Memory-map several seasons (default: all of them) as one Arrow table"""
+    if seasons is None:
+        seasons = available_seasons(snapshot_dir)
+    tables = [load_season(season_year, season_type, snapshot_dir) for season_year, season_type in seasons]
+    if not tables:
+        return PERFORMANCE_SCHEMA.empty_table()
+    return pa.concat_tables(tables)
+
+
+def to_numpy(table : pa.Table, columns : list = None) -> dict:
+    """
+    Convert Arrow columns to NumPy arrays: numbers stay zero-copy where the column is a single chunk,
+    dates become datetime64[D] and strings become object arrays.
+    """
+    arrays = {}
+    for name in columns or table.column_names:
+        column = table.column(name)
+        if pa.types.is_date32(column.type):
+            arrays[name] = column.to_numpy().astype("datetime64[D]")
+        elif pa.types.is_string(column.type):
+            arrays[name] = column.to_numpy(zero_copy_only=False)
+        elif column.num_chunks == 1:
+            arrays[name] = column.chunk(0).to_numpy(zero_copy_only=not pa.types.is_boolean(column.type))
+        else:
+            arrays[name] = column.to_numpy()
+    return arrays
+
+
+if __name__ == "__main__":
+    # python snapshot.py              -> export every season
+    # python snapshot.py 2026 Indoor  -> re-export one season
+    if len(sys.argv) == 3:
+        export_snapshot(seasons=[(int(sys.argv[1]), sys.argv[2])])
+    else:
+        export_snapshot()
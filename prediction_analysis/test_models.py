@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Test script for models.py and backtest.score_model
+Runs the registered models over a small synthetic season and scores predictions against a made-up
+championship. No database or network needed.
+"""
+
+import numpy as np
+import models
+import backtest
+import scrape_path  # noqa: F401
+import testing
+from records import PerformanceRow
+
+
+def meet_rows(event_id : int, event_name : str, event_type : str, school_id : str, athlete_id : int, marks : list) -> list:
+    """One PerformanceRow per (day, mark)"""
+    return [PerformanceRow(event_id, event_name, event_type, school_id, athlete_id, "Test", f"Athlete{athlete_id}", day, mark)
+            for day, mark in marks]
+
+
+def toy_dataset() -> models.SeasonDataset:
+    """Sprinters getting faster, a thrower getting longer, one single-meet athlete and a relay"""
+    rows = (meet_rows(46, "60 Meters", "sprints", "Ursinus", 1, [(20000, 7.30), (20007, 7.21), (20021, 7.12)]) +
+            meet_rows(46, "60 Meters", "sprints", "Haverford", 2, [(20003, 7.40), (20010, 7.38), (20014, 7.31), (20028, 7.30)]) +
+            meet_rows(46, "60 Meters", "sprints", "Haverford", 3, [(20014, 7.50)]) +
+            meet_rows(30, "Shot Put", "throws", "Ursinus", 4, [(20000, 13.1), (20014, 13.6), (20021, 13.5)]) +
+            meet_rows(73, "4 x 400 Relay", "sprints", "Ursinus", -1, [(20007, 210.5), (20021, 207.9)]))
+    return models.SeasonDataset.from_meet_marks("M", rows)
+
+
+def test_run_models():
+    """Test that the linear model matches a per-entrant np.polyfit and the others keep to event direction."""
+    print("\n=== Testing Models ===")
+    check = testing.Checks()
+
+    dataset = toy_dataset()
+    results = models.run_models(dataset)
+    check(set(results) >= {"season_best", "season_average", "linear", "time_weighted"}, f"every model ran: {sorted(results)}")
+
+    expected = []
+    for i in range(len(dataset)):
+        marks, days = dataset.entrant_marks(i)
+        if len(marks) == 1:
+            expected.append(marks[0])
+        else:
+            slope, intercept = np.polyfit(days, marks, 1)
+            expected.append(slope * (days[-1] + models.DAYS_AHEAD) + intercept)
+    check(np.allclose(results["linear"], expected), "linear matches np.polyfit, DAYS_AHEAD after the last meet")
+
+    best = {dataset.entrant_key(i): results["season_best"][i] for i in range(len(dataset))}
+    check(best[(46, "Ursinus", 1)] == 7.12 and best[(30, "Ursinus", 4)] == 13.6, "season best is the fastest time and longest throw")
+
+    try:
+        models.run_models(dataset, ["no_such_model"])
+        check(False, "unknown model rejected")
+    except Exception:
+        check(True, "unknown model rejected")
+    return check.passed
+
+
+def test_score_model():
+    """Test the backtest metrics for a perfect and a reversed prediction of a four-athlete final."""
+    print("\n=== Testing Backtest Scoring ===")
+    check = testing.Checks()
+
+    rows = (meet_rows(46, "60 Meters", "sprints", "Ursinus", 1, [(20000, 7.00)]) +
+            meet_rows(46, "60 Meters", "sprints", "Ursinus", 2, [(20000, 7.10)]) +
+            meet_rows(46, "60 Meters", "sprints", "Haverford", 3, [(20000, 7.20)]) +
+            meet_rows(46, "60 Meters", "sprints", "Haverford", 4, [(20000, 7.30)]))
+    dataset = models.SeasonDataset.from_meet_marks("M", rows)
+    actual = {dataset.entrant_key(i): float(dataset.marks[i]) for i in range(len(dataset))}
+
+    perfect = backtest.score_model(dataset, actual, dataset.marks.copy())
+    check((perfect["mark_mape"], perfect["place_spearman"], perfect["podium_hit_rate"], perfect["team_points_mae"],
+           perfect["winner_correct"]) == (0.0, 1.0, 1.0, 0.0, True), f"perfect prediction scores perfectly: {perfect}")
+
+    reversed_marks = dataset.marks[::-1].copy()
+    reversed_scores = backtest.score_model(dataset, actual, reversed_marks)
+    mape = np.mean(np.abs(reversed_marks - dataset.marks) / dataset.marks)
+    check(abs(reversed_scores["mark_mape"] - mape) < 1e-12, f"mark error ({reversed_scores['mark_mape']:.4f})")
+    # Predicted: Haverford 10 + 8 = 18, Ursinus 6 + 5 = 11; it was the other way round
+    scores = tuple(round(reversed_scores[name], 9) for name in ("place_spearman", "team_points_mae", "team_spearman"))
+    check(scores == (-1.0, 7.0, -1.0) and not reversed_scores["winner_correct"], f"reversed placings and team totals {scores}")
+    check(abs(reversed_scores["podium_hit_rate"] - 2 / 3) < 1e-12, "two of the three medallists predicted on the podium")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Models Test Suite")
+    print("=" * 50)
+
+    test_run_models()
+    test_score_model()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Test script for optimizer.py
+Solves a small predicted meet with the greedy search and (when PuLP is installed) the integer program,
+and falls back to greedy when the integer program fails.
+No database or network needed.
+"""
+
+import io
+import contextlib
+import optimizer
+import scrape_path  # noqa: F401
+import testing
+
+
+# Home has six sprinters predicted in five events and a 4x400; Away has three entrants per event
+EVENTS = {10: "60 Meters", 11: "200 Meters", 12: "400 Meters", 13: "60 Hurdles", 14: "500 Meters"}
+RELAY = 40
+
+
+def toy_rows() -> list:
+    rows = []
+    for offset, (event_id, event_name) in enumerate(EVENTS.items()):
+        for athlete_id in range(1, 7):
+            rows.append((event_id, event_name, "sprints", "M", "Home", athlete_id, "Home", f"Runner{athlete_id}",
+                         10.0 + offset + athlete_id * 0.1))
+        for athlete_id in range(101, 104):
+            rows.append((event_id, event_name, "sprints", "M", "Away", athlete_id, "Away", f"Runner{athlete_id}",
+                         10.0 + offset + (athlete_id - 100) * 0.25))
+    rows.append((RELAY, "4 x 400 Relay", "sprints", "M", "Home", -1, "", "", 200.0))
+    rows.append((RELAY, "4 x 400 Relay", "sprints", "M", "Away", -1, "", "", 201.0))
+    return rows
+
+
+def limit_problems(lineup : optimizer.Lineup) -> list:
+    """Entry rules a lineup breaks"""
+    problems = []
+    for event_id, athletes in lineup.individual.items():
+        if len(athletes) > optimizer.MAX_ENTRIES_PER_EVENT:
+            problems.append(f"{len(athletes)} entries in event {event_id}")
+    for event_id, legs in lineup.relays.items():
+        if len(set(legs)) != optimizer.RELAY_LEGS:
+            problems.append(f"relay {event_id} has legs {legs}")
+    for athlete_id in range(1, 7):
+        individual, total = lineup.events_of(athlete_id)
+        if individual > optimizer.MAX_INDIVIDUAL_EVENTS or total > optimizer.MAX_EVENTS:
+            problems.append(f"athlete {athlete_id} in {individual} individual and {total} total events")
+    return problems
+
+
+def test_optimizer():
+    """Test that both solvers keep to the entry limits and score the same on a small meet."""
+    print("\n=== Testing Optimizer ===")
+    check = testing.Checks()
+
+    problem = optimizer.Problem(toy_rows(), "Home")
+    check(sorted(problem.relay_legs(RELAY)) == [1, 2, 3, 4, 5, 6], "sprinters can run the sprint relay")
+    check(problem.rivals_ahead(10, 10.3) == 1 and problem.rivals_ahead(10, 10.25) == 1, "ties go to the rival")
+
+    greedy = optimizer.solve_greedy(problem)
+    greedy_points = optimizer.lineup_points(problem, greedy)
+    check(limit_problems(greedy) == [], f"greedy lineup keeps to the entry limits {limit_problems(greedy)}")
+    check(RELAY in greedy.relays, "greedy enters the relay")
+
+    if optimizer.pulp is None:
+        print("  - PuLP is not installed, skipping the integer program")
+        return check.passed
+
+    ilp = optimizer.solve_ilp(problem)
+    ilp_points = optimizer.lineup_points(problem, ilp)
+    check(limit_problems(ilp) == [], f"ILP lineup keeps to the entry limits {limit_problems(ilp)}")
+    check(greedy_points == ilp_points, f"greedy and ILP agree: {greedy_points} and {ilp_points} points")
+
+    # A solve that doesn't finish optimal falls back to the greedy lineup
+    def failing_solve(problem):
+        raise Exception(f"Lineup solve for {problem.school_id} failed: Not Solved")
+    original_solve = optimizer.solve_ilp
+    optimizer._init_worker(toy_rows())
+    optimizer.solve_ilp = failing_solve
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = optimizer.optimize_school("Home", "ilp")
+    finally:
+        optimizer.solve_ilp = original_solve
+        optimizer._init_worker(None)
+    check((result["solver"], result["points"]) == ("greedy", greedy_points),
+          f"failed ILP solve falls back to greedy ({result['solver']}, {result['points']} points)")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Optimizer Test Suite")
+    print("=" * 50)
+
+    test_optimizer()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
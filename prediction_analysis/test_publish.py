@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Test script for publish.py
+Publishes a small snapshot season twice into a throwaway directory. No database or network needed.
+"""
+
+import io
+import os
+import tempfile
+import contextlib
+import models
+import scoring
+import snapshot
+import publish
+import scrape_path  # noqa: F401
+import testing
+from records import PerformanceRow
+
+
+def season_rows(gender : str, faster : float = 0.0) -> list:
+    """Two meets of 60m marks for three schools"""
+    rows = []
+    for school, school_id in enumerate(("Dickinson", "Johns_Hopkins", "Ursinus")):
+        athlete_id = 9000 + school
+        for meet, day in enumerate((20064, 20099)):
+            rows.append(PerformanceRow(46, "60 Meters", "sprints", school_id, athlete_id, "Test", "Sprinter",
+                                       day, round(7.0 + school * 0.1 - meet * 0.02 - faster, 2), 99001 + meet))
+    return rows
+
+
+def test_publish():
+    """Test that artifacts are written once, unchanged seasons skip the models, and changed marks re-render."""
+    print("\n=== Testing Publish ===")
+    check = testing.Checks()
+
+    original_load = models.load_dataset_from_snapshot
+    original_seasons = snapshot.available_seasons
+    original_run = models.run_models
+    faster = {"M": 0.0, "F": 0.0}
+    runs = []
+
+    def fake_load(season_year, season_type, gender, **kwargs):
+        return models.SeasonDataset.from_meet_marks(gender, season_rows(gender, faster[gender]))
+
+    def counted_run(dataset, names=None):
+        runs.append((dataset.gender, tuple(names or models.MODELS)))
+        return original_run(dataset, names)
+
+    out = tempfile.mkdtemp()
+    try:
+        models.load_dataset_from_snapshot = fake_load
+        snapshot.available_seasons = lambda: [(2025, "Indoor")]
+        models.run_models = counted_run
+        names = ["season_best", "season_average"]
+        with contextlib.redirect_stdout(io.StringIO()):
+            first = publish.publish([("Indoor", 2025)], names, use_snapshot=True, publish_dir=out)
+            first_runs = list(runs)
+            runs.clear()
+            second = publish.publish([("Indoor", 2025)], names, use_snapshot=True, publish_dir=out)
+            second_runs = list(runs)
+            faster["F"] = 0.05
+            runs.clear()
+            third = publish.publish([("Indoor", 2025)], names, use_snapshot=True, publish_dir=out)
+            third_runs = list(runs)
+        manifest = publish.load_manifest(out)
+    finally:
+        models.load_dataset_from_snapshot = original_load
+        snapshot.available_seasons = original_seasons
+        models.run_models = original_run
+
+    check(first == (4, 0) and len(first_runs) == 2, f"first publish renders every artifact {first}")
+    check(second == (0, 4) and second_runs == [], f"unchanged fingerprints skipped without running a model {second}")
+    check(third == (2, 2) and third_runs == [("F", tuple(names))], f"only the changed gender re-rendered {third}")
+    paths = sorted(entry["path"] for entry in manifest["artifacts"].values())
+    stored = sorted(os.path.relpath(os.path.join(root, name), out) for root, _, files in os.walk(out)
+                    for name in files if name != "manifest.json")
+    check(paths == stored, "replaced artifact files removed, manifest matches the files")
+
+    # Editing models.py or scoring.py (e.g. DAYS_AHEAD or the placing points) changes every fingerprint
+    dataset = models.SeasonDataset.from_meet_marks("M", season_rows("M"))
+    unchanged = publish.fingerprint(dataset, "season_best", ["Ursinus"])
+    original_getsource = publish.inspect.getsource
+    changed = {}
+    try:
+        for module in (models, scoring):
+            publish.inspect.getsource = lambda source: original_getsource(source) + ("\n# edited" if source is module else "")
+            changed[module.__name__] = publish.fingerprint(dataset, "season_best", ["Ursinus"])
+    finally:
+        publish.inspect.getsource = original_getsource
+    check(unchanged not in changed.values() and len(set(changed.values())) == 2,
+          "fingerprint covers the models.py and scoring.py source")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Publish Test Suite")
+    print("=" * 50)
+
+    test_publish()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Test script for simulate.py
+Simulates a small championship built in memory and builds entrants from a season dataset.
+No database or network needed.
+"""
+
+import simulate
+import scoring
+import models
+import scrape_path  # noqa: F401
+import testing
+from records import PerformanceRow
+
+
+SCHOOLS = ("Dickinson", "Haverford", "Johns_Hopkins", "Swarthmore", "Ursinus")
+
+
+def toy_entrants() -> list:
+    """Two athletes per school in a sprint and a throw, and a relay each; Johns_Hopkins is far ahead in everything"""
+    entrants = []
+    for school, school_id in enumerate(SCHOOLS):
+        dominant = school_id == "Johns_Hopkins"
+        for athlete in range(2):
+            athlete_id = 1000 * (school + 1) + athlete
+            sprinter = simulate.Entrant(46, "60 Meters", "sprints", school_id, athlete_id, "Test Sprinter")
+            sprinter.marks = [6.5, 6.52, 6.49] if dominant else [7.1 + 0.02 * athlete, 7.15, 7.05]
+            thrower = simulate.Entrant(30, "Shot Put", "throws", school_id, athlete_id, "Test Thrower")
+            thrower.marks = [18.0, 18.2] if dominant else [13.0 + 0.3 * athlete]
+            entrants += [sprinter, thrower]
+        relay = simulate.Entrant(73, "4 x 400 Relay", "sprints", school_id, -1, school_id)
+        relay.marks = [195.0] if dominant else [205.0 + school, 206.0]
+        entrants.append(relay)
+    return entrants
+
+
+def test_simulate():
+    """Test that expected points add up to the points awarded, win chances to 1, and a dominant school wins."""
+    print("\n=== Testing Simulate ===")
+    check = testing.Checks()
+
+    entrants = toy_entrants()
+    results = simulate.simulate_meet(entrants, n_sims=5000, seed=3)
+
+    # 10 entrants in each individual event fill every scoring place; 5 relays fill the top 5
+    awarded = 2 * sum(scoring.PLACE_POINTS) + sum(scoring.PLACE_POINTS[:len(SCHOOLS)])
+    expected = sum(stats["expected_points"] for stats in results.values())
+    check(abs(expected - awarded) < 1e-6, f"expected points sum to the points awarded ({expected:.2f} of {awarded})")
+
+    win = sum(stats["win_probability"] for stats in results.values())
+    check(abs(win - 1.0) < 1e-9, f"win probabilities sum to 1 ({win:.6f})")
+
+    leader = results["Johns_Hopkins"]
+    check(leader["win_probability"] > 0.99, f"dominant school wins ({leader['win_probability']:.3f})")
+    check(leader["p05"] == leader["median"] == leader["p95"] == 10 + 8 + 10 + 8 + 10,
+          f"dominant school takes 1-2 in both events and the relay every time ({leader['median']:.0f})")
+    check(all(stats["p05"] <= stats["median"] <= stats["p95"] for stats in results.values()), "percentiles in order")
+
+    mean, spread = simulate.fit_distribution([7.0])
+    check(abs(spread - simulate.PRIOR_CV * mean) < 1e-12, "a single mark gets the prior spread")
+
+    dataset = models.SeasonDataset.from_meet_marks("M", [
+        PerformanceRow(46, "60 Meters", "sprints", "Ursinus", 7, "Test", "Sprinter", 20000, 7.2),
+        PerformanceRow(46, "60 Meters", "sprints", "Ursinus", 7, "Test", "Sprinter", 20007, 7.1),
+        PerformanceRow(73, "4 x 400 Relay", "sprints", "Ursinus", -1, "Ursinus", " ", 20007, 205.0),
+    ])
+    loaded = [(e.event_id, e.school_id, e.athlete_id, e.name, e.marks) for e in simulate.entrants_from_dataset(dataset)]
+    check(loaded == [(46, "Ursinus", 7, "Test Sprinter", [7.2, 7.1]), (73, "Ursinus", -1, "Ursinus", [205.0])],
+          f"entrants built from the models' season dataset: {loaded}")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Simulate Test Suite")
+    print("=" * 50)
+
+    test_simulate()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
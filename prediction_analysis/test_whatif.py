@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Test script for whatif.py
+Chains edits on a small predicted meet and compares the incremental totals with a full re-score.
+No database or network needed.
+"""
+
+import random
+import whatif
+import scrape_path  # noqa: F401
+import testing
+
+
+def predicted_rows(seed : int = 7) -> list:
+    """Prediction rows (models.prediction_rows shape) for five schools over a track and a field event"""
+    rng = random.Random(seed)
+    rows = []
+    for school, school_id in enumerate(("Dickinson", "Haverford", "Johns_Hopkins", "Swarthmore", "Ursinus")):
+        for athlete_id in range(1000 * (school + 1), 1000 * (school + 1) + 4):
+            rows.append((46, "60 Meters", "sprints", "M", school_id, athlete_id, "Test", "Sprinter", round(rng.uniform(6.9, 7.4), 2)))
+            rows.append((30, "Shot Put", "throws", "M", school_id, athlete_id, "Test", "Thrower", round(rng.uniform(12.0, 16.0), 2)))
+    return rows
+
+
+def test_whatif():
+    """Test that chained scratches, moves and overrides match a meet re-scored from the edited rows."""
+    print("\n=== Testing What-If ===")
+    check = testing.Checks()
+
+    rows = predicted_rows()
+    meet = whatif.WhatIf.from_rows(rows)
+    before = meet.standings()
+    check(sum(points for _, points in before) == 2 * sum((10, 8, 6, 5, 4, 3, 2, 1)), "every scoring place awarded once")
+
+    # Edit the predictions directly as well: {(event_id, school_id, athlete_id): mark}
+    marks = {(event_id, school_id, athlete_id): mark for event_id, _, _, _, school_id, athlete_id, _, _, mark in rows}
+    rng = random.Random(11)
+    start = meet.checkpoint()
+    deltas = {}
+    for _ in range(40):
+        event_id, school_id, athlete_id = rng.choice(sorted(marks))
+        kind = rng.choice(("scratch", "override", "move"))
+        if kind == "scratch":
+            changes = meet.scratch(event_id, school_id, athlete_id)
+            del marks[(event_id, school_id, athlete_id)]
+        elif kind == "override":
+            mark = round(marks[(event_id, school_id, athlete_id)] * rng.uniform(0.97, 1.03), 2)
+            changes = meet.override(event_id, school_id, athlete_id, mark)
+            marks[(event_id, school_id, athlete_id)] = mark
+        else:
+            to_event = 30 if event_id == 46 else 46
+            mark = 7.0 if to_event == 46 else 14.0
+            changes = meet.move(event_id, to_event, school_id, athlete_id, mark)
+            del marks[(event_id, school_id, athlete_id)]
+            marks[(to_event, school_id, athlete_id)] = mark
+        for changed_school, change in changes.items():
+            deltas[changed_school] = deltas.get(changed_school, 0) + change
+
+    edited_rows = [(event_id, "60 Meters" if event_id == 46 else "Shot Put", "sprints" if event_id == 46 else "throws", "M",
+                    school_id, athlete_id, "Test", "Athlete", mark) for (event_id, school_id, athlete_id), mark in marks.items()]
+    rescored = whatif.WhatIf.from_rows(edited_rows)
+    check(meet.standings() == rescored.standings(), "chained edits match a full re-score")
+    check([row[:3] for row in meet.placings(46)] == [row[:3] for row in rescored.placings(46)], "event order matches a full re-score")
+    check(all(meet.totals.get(school_id, 0) - points == deltas.get(school_id, 0) for school_id, points in before),
+          "edit deltas add up to the change in totals")
+
+    meet.rollback(start)
+    check(meet.standings() == before, "rollback restores the predicted standings")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("What-If Test Suite")
+    print("=" * 50)
+
+    test_whatif()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,237 @@
+import sys
+import bisect
+import argparse
+import scoring
+import models
+
+# What-if scoring of a predicted championship
+#
+# Holds every event's predicted order and the 10-8-6-5-4-3-2-1 team totals in memory. An edit
+# (scratch an entrant, move an athlete to another event, override a mark) re-places only the event(s)
+# it touches and applies the difference in that event's points to the team totals, so an edit costs
+# one sorted insert/remove over an event's entry list instead of a re-run of the scoring path.
+# Every edit returns the team deltas and can be undone; rollback() unwinds a whole chained scenario.
+#
+#   meet = WhatIf.from_dataset(dataset, models.run_models(dataset, ["linear"])["linear"])
+#   meet.scratch(46, "Johns_Hopkins", 8001)      -> {"Johns_Hopkins": -6, "Swarthmore": 1, ...}
+#   meet.override(46, "Swarthmore", 9001, 6.95)
+#   meet.undo()
+
+
+class Event:
+    """One event's predicted entries in finishing order and the points each school scores in it"""
+    __slots__ = ("event_id", "event_name", "higher", "marks", "order", "points")
+
+    def __init__(self, event_id : int, event_name : str, higher : bool):
+        self.event_id = event_id
+        self.event_name = event_name
+        self.higher = higher
+        self.marks = {}    # entrant (school_id, athlete_id) -> predicted mark
+        self.order = []    # sorted (sort key, entrant), best first
+        self.points = {}   # school_id -> points scored in this event
+
+    def _sort_key(self, entrant : tuple, mark : float) -> tuple:
+        return (-mark if self.higher else mark, entrant)
+
+    def set_mark(self, entrant : tuple, mark):
+        """Add, move or (mark None) remove an entrant"""
+        old = self.marks.get(entrant)
+        if old is not None:
+            del self.order[bisect.bisect_left(self.order, self._sort_key(entrant, old))]
+            del self.marks[entrant]
+        if mark is not None:
+            bisect.insort(self.order, self._sort_key(entrant, mark))
+            self.marks[entrant] = mark
+
+    def score(self) -> dict:
+        points = {}
+        for place, (_, (school_id, _)) in enumerate(self.order[:scoring.SCORING_PLACES], start=1):
+            points[school_id] = points.get(school_id, 0) + scoring.points_for_place(place)
+        return points
+
+
+class WhatIf:
+
+    def __init__(self):
+        self.events = {}
+        self.totals = {}
+        self.history = []  # one list of (event_id, entrant, old mark, new mark) per edit
+
+    @classmethod
+    def from_rows(cls, rows) -> "WhatIf":
+        """
+        Build from prediction rows in the LinearRegressionPredictions shape (models.prediction_rows):
+        (EventID, EventName, EventType, Gender, SchoolID, AthleteID, AthleteFirstName, AthleteLastName, predictedresult)
+        """
+        meet = cls()
+        for event_id, event_name, event_type, _, school_id, athlete_id, _, _, mark in rows:
+            event = meet.events.get(event_id)
+            if event is None:
+                event = meet.events[event_id] = Event(event_id, event_name, scoring.higher_is_better(event_type))
+            event.set_mark((school_id, int(athlete_id)), float(mark))
+            meet.totals.setdefault(school_id, 0)
+
+        for event in meet.events.values():
+            event.points = event.score()
+            for school_id, points in event.points.items():
+                meet.totals[school_id] += points
+        return meet
+
+    @classmethod
+    def from_dataset(cls, dataset : models.SeasonDataset, predictions) -> "WhatIf":
+        return cls.from_rows(models.prediction_rows(dataset, predictions))
+
+    # ============================================================
+    # EDITS
+    # ============================================================
+
+    def _apply(self, changes : list) -> dict:
+        """Set marks and re-score the touched events. Returns {school_id: change in points}."""
+        deltas = {}
+        touched = {}
+        for event_id, entrant, _, mark in changes:
+            event = self.events[event_id]
+            event.set_mark(entrant, mark)
+            touched[event_id] = event
+
+        for event in touched.values():
+            points = event.score()
+            for school_id in set(points) | set(event.points):
+                change = points.get(school_id, 0) - event.points.get(school_id, 0)
+                if change:
+                    deltas[school_id] = deltas.get(school_id, 0) + change
+            event.points = points
+
+        for school_id, change in deltas.items():
+            self.totals[school_id] = self.totals.get(school_id, 0) + change
+        return {school_id: change for school_id, change in deltas.items() if change}
+
+    def _edit(self, changes : list) -> dict:
+        self.history.append(changes)
+        return self._apply(changes)
+
+    def _event(self, event_id : int) -> Event:
+        if event_id not in self.events:
+            raise Exception(f"Event {event_id} is not in the meet")
+        return self.events[event_id]
+
+    def set_mark(self, event_id : int, school_id : str, athlete_id : int, mark) -> dict:
+        """Enter (or with mark None, remove) an entrant with a predicted mark"""
+        entrant = (school_id, int(athlete_id))
+        old = self._event(event_id).marks.get(entrant)
+        self.totals.setdefault(school_id, 0)
+        return self._edit([(event_id, entrant, old, None if mark is None else float(mark))])
+
+    def override(self, event_id : int, school_id : str, athlete_id : int, mark : float) -> dict:
+        """Replace an entrant's predicted mark"""
+        if (school_id, int(athlete_id)) not in self._event(event_id).marks:
+            raise Exception(f"{school_id} {athlete_id} is not entered in event {event_id}")
+        return self.set_mark(event_id, school_id, athlete_id, mark)
+
+    def scratch(self, event_id : int, school_id : str, athlete_id : int) -> dict:
+        """Remove an entrant from an event"""
+        if (school_id, int(athlete_id)) not in self._event(event_id).marks:
+            raise Exception(f"{school_id} {athlete_id} is not entered in event {event_id}")
+        return self.set_mark(event_id, school_id, athlete_id, None)
+
+    def move(self, from_event : int, to_event : int, school_id : str, athlete_id : int, mark : float = None) -> dict:
+        """
+        Move an athlete between events as one edit. mark is their predicted mark in the new event,
+        by default the prediction they already have there.
+        """
+        entrant = (school_id, int(athlete_id))
+        old = self._event(from_event).marks.get(entrant)
+        if old is None:
+            raise Exception(f"{school_id} {athlete_id} is not entered in event {from_event}")
+        existing = self._event(to_event).marks.get(entrant)
+        if mark is None:
+            if existing is None:
+                raise Exception(f"No predicted mark for {school_id} {athlete_id} in event {to_event}, pass one")
+            mark = existing
+        return self._edit([(from_event, entrant, old, None), (to_event, entrant, existing, float(mark))])
+
+    def undo(self) -> dict:
+        """Revert the last edit. Returns its team deltas."""
+        if not self.history:
+            raise Exception("Nothing to undo")
+        changes = self.history.pop()
+        return self._apply([(event_id, entrant, mark, old) for event_id, entrant, old, mark in reversed(changes)])
+
+    def checkpoint(self) -> int:
+        return len(self.history)
+
+    def rollback(self, checkpoint : int = 0) -> dict:
+        """Undo every edit after a checkpoint(). Returns the combined team deltas."""
+        deltas = {}
+        while len(self.history) > checkpoint:
+            for school_id, change in self.undo().items():
+                deltas[school_id] = deltas.get(school_id, 0) + change
+        return {school_id: change for school_id, change in deltas.items() if change}
+
+    # ============================================================
+    # READS
+    # ============================================================
+
+    def standings(self) -> list:
+        """[(school_id, points)] best first"""
+        return sorted(self.totals.items(), key=lambda item: (-item[1], item[0]))
+
+    def placings(self, event_id : int) -> list:
+        """[(place, school_id, athlete_id, mark, points)] for one event"""
+        event = self._event(event_id)
+        return [(place, school_id, athlete_id, event.marks[(school_id, athlete_id)], scoring.points_for_place(place))
+                for place, (_, (school_id, athlete_id)) in enumerate(event.order, start=1)]
+
+
+def print_standings(meet : WhatIf, deltas : dict = None):
+    deltas = deltas or {}
+    for school_id, points in meet.standings():
+        change = deltas.get(school_id, 0)
+        print(f"  {school_id:<20} {points:>4}" + (f" ({change:+d})" if change else ""))
+
+
+def parse_entrant(value : str) -> tuple:
+    """EVENT:SCHOOL:ATHLETE[:MARK]"""
+    parts = value.split(":")
+    if len(parts) not in (3, 4):
+        raise argparse.ArgumentTypeError("expected EVENT:SCHOOL:ATHLETE or EVENT:SCHOOL:ATHLETE:MARK")
+    return (int(parts[0]), parts[1], int(parts[2])) + ((float(parts[3]),) if len(parts) == 4 else ())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predicted championship standings with scratches and mark overrides")
+    parser.add_argument("gender", choices=["M", "F"])
+    parser.add_argument("season_type", choices=["Indoor", "Outdoor"])
+    parser.add_argument("season_year", type=int)
+    parser.add_argument("--model", default="linear", help="Registered model to predict with (default: linear)")
+    parser.add_argument("--snapshot", default=None, help="Read this snapshot directory instead of the database")
+    parser.add_argument("--scratch", action="append", default=[], type=parse_entrant, metavar="EVENT:SCHOOL:ATHLETE")
+    parser.add_argument("--override", action="append", default=[], type=parse_entrant, metavar="EVENT:SCHOOL:ATHLETE:MARK")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        dataset = models.load_dataset_from_snapshot(args.season_year, args.season_type, args.gender, snapshot_dir=args.snapshot)
+    else:
+        connection = models.connect()
+        dataset = models.load_dataset_from_database(connection.cursor(), args.gender, args.season_type, args.season_year)
+        connection.close()
+
+    meet = WhatIf.from_dataset(dataset, models.run_models(dataset, [args.model])[args.model])
+    print(f"Predicted standings ({args.model})")
+    print_standings(meet)
+
+    deltas = {}
+    edits = [(meet.scratch, scratch) for scratch in args.scratch] + [(meet.override, override) for override in args.override]
+    for edit, entrant in edits:
+        if len(entrant) != (4 if edit == meet.override else 3):
+            parser.error("--scratch takes EVENT:SCHOOL:ATHLETE, --override EVENT:SCHOOL:ATHLETE:MARK")
+        for school_id, change in edit(*entrant).items():
+            deltas[school_id] = deltas.get(school_id, 0) + change
+
+    if edits:
+        print("\nWith edits")
+        print_standings(meet, deltas)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
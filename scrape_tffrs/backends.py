@@ -0,0 +1,695 @@
+# Backends.py
+# Storage backends behind repository.py
+#
+# PostgresBackend writes to Neon (DATABASE_URL="postgresql://...").
+# SQLiteBackend is an embedded local database with the same schema and constraints
+# (DATABASE_URL="sqlite:///tfrrs.db"), for network-free ingest during development, tests and
+# offline rebuilds. copy_to_postgres() moves a local database into Postgres in bulk afterwards.
+
+import os
+import re
+import sqlite3
+import contextlib
+import psycopg2
+from psycopg2 import sql
+from psycopg2.extras import execute_values
+import leaderboard
+import progression
+import ratings
+import percentiles
+import change_feed
+
+SQL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "db_generating")
+
+
+def performance_partition_name(season_type: str, season_year: int) -> str:
+    """Name of the leaf partition holding a season, e.g. performance_2025_indoor"""
+    if season_type not in ("Indoor", "Outdoor"):
+        raise Exception(f"Unknown season type '{season_type}'")
+    return f"performance_{int(season_year)}_{season_type.lower()}"
+
+
+class Backend:
+    """
+    Statements shared by every backend. Queries are written with %s placeholders;
+    subclasses connect and override the few statements whose dialects differ.
+    """
+
+    name = None
+
+    # Dialect pieces for the feature upserts; {} is a DATE expression, turned into days since 1970-01-01
+    greatest = "GREATEST"
+    least = "LEAST"
+    day_number = "({} - DATE '1970-01-01')"
+    # ...and for the read queries (queries.py)
+    ilike = "ILIKE"
+    year_of = "EXTRACT(YEAR FROM {})"
+    distinct_list = "STRING_AGG(DISTINCT {}, ', ')"
+
+    def __init__(self):
+        self._connection = None
+        self._depth = 0    # open transaction() blocks
+
+    def connect(self):
+        raise NotImplementedError
+
+    @property
+    def connection(self):
+        if self._connection is None or self.is_closed():
+            self._connection = self.connect()
+        return self._connection
+
+    def is_closed(self) -> bool:
+        return False
+
+    def close(self):
+        if self._connection is not None and not self.is_closed():
+            self._connection.close()
+        self._connection = None
+        self._depth = 0
+
+    def adapt(self, query: str) -> str:
+        return query
+
+    def execute(self, query: str, params: tuple = ()):
+        """Run a statement and return its (open) cursor"""
+        cur = self.connection.cursor()
+        cur.execute(self.adapt(query), params)
+        return cur
+
+    def fetchone(self, query: str, params: tuple = ()):
+        cur = self.execute(query, params)
+        row = cur.fetchone()
+        cur.close()
+        return row
+
+    def fetchall(self, query: str, params: tuple = ()) -> list:
+        cur = self.execute(query, params)
+        rows = cur.fetchall()
+        cur.close()
+        return rows
+
+    def run(self, query: str, params: tuple = ()) -> int:
+        """Run a statement, returns how many rows it inserted or updated"""
+        cur = self.execute(query, params)
+        count = cur.rowcount
+        cur.close()
+        return count
+
+    def run_many(self, query: str, rows: list):
+        """Run one statement for each params tuple in rows"""
+        if rows:
+            cur = self.connection.cursor()
+            cur.executemany(self.adapt(query), rows)
+            cur.close()
+
+    def stream(self, query: str, params: tuple = (), batch_size: int = 10000):
+        """Yield a query's rows batch_size at a time instead of loading the whole result"""
+        cur = self.execute(query, params)
+        try:
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
+    # Statement that opens a transaction; the connection is otherwise in autocommit mode
+    begin = "BEGIN"
+
+    @contextlib.contextmanager
+    def transaction(self, lock_key: str = None):
+        """
+        Run the enclosed statements as one transaction. Writers passing the same lock_key are serialized,
+        so a read-then-rewrite inside the block can't interleave with another worker's. Inside another
+        transaction it is a savepoint: a failure undoes only the inner block, and the lock is held until
+        the outer transaction ends.
+        """
+        depth = self._depth
+        savepoint = f"transaction_{depth}"
+        self.run(self.begin if depth == 0 else f"SAVEPOINT {savepoint}")
+        self._depth += 1
+        try:
+            if lock_key is not None:
+                self.lock(lock_key)
+            yield
+        except BaseException:
+            self._depth = depth
+            if depth == 0:
+                self.run("ROLLBACK")
+            else:
+                self.run(f"ROLLBACK TO SAVEPOINT {savepoint}")
+                self.run(f"RELEASE SAVEPOINT {savepoint}")
+            self.rolled_back()
+            raise
+        self._depth = depth
+        self.run("COMMIT" if depth == 0 else f"RELEASE SAVEPOINT {savepoint}")
+
+    def rolled_back(self):
+        """Forget anything cached about rows a rolled back transaction wrote"""
+
+    def lock(self, lock_key: str):
+        """Block until no other transaction holds lock_key; released at COMMIT or ROLLBACK"""
+        raise NotImplementedError
+
+    # ============================================================
+    # STATEMENTS
+    # ============================================================
+
+    def insert_event(self, event_id: int, event_name: str, event_type: str, measure_unit: str, is_relay: bool) -> bool:
+        """True if the event is new"""
+        return self.run("""
+            INSERT INTO TrackEvent (EventID, EventName, EventType, MeasureUnit, IsRelay)
+            VALUES (%s, %s, %s, %s, %s)
+            ON CONFLICT (EventID) DO NOTHING
+        """, (event_id, event_name, event_type, measure_unit, is_relay)) > 0
+
+    def insert_athlete(self, athlete_id: int, first_name: str, last_name: str, gender: str) -> bool:
+        """True if the athlete is new"""
+        return self.run("""
+            INSERT INTO Athlete (AthleteID, AthleteFirstName, AthleteLastName, Gender)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (AthleteID) DO NOTHING
+        """, (athlete_id, first_name, last_name, gender)) > 0
+
+    def insert_school(self, school_id: str, school_name: str) -> bool:
+        """Placeholder School row: only the ID and name are known until someone fills in the rest. True if it is new"""
+        return self.run("""
+            INSERT INTO School (SchoolID, SchoolName)
+            VALUES (%s, %s)
+            ON CONFLICT (SchoolID) DO NOTHING
+        """, (school_id, school_name)) > 0
+
+    def upsert_meet(self, meet_id: int, meet_name: str, meet_date) -> bool:
+        """Insert meet, or widen its date range if it exists. True if the meet is new or its range changed"""
+        return self.run("""
+            INSERT INTO TrackMeet (MeetID, MeetName, StartDate, EndDate)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (MeetID) DO UPDATE SET
+                StartDate = LEAST(TrackMeet.StartDate, EXCLUDED.StartDate),
+                EndDate = GREATEST(TrackMeet.EndDate, EXCLUDED.EndDate)
+            WHERE EXCLUDED.StartDate < TrackMeet.StartDate OR EXCLUDED.EndDate > TrackMeet.EndDate
+        """, (meet_id, meet_name, meet_date, meet_date)) > 0
+
+    def get_athlete_season(self, athlete_id: int, season_type: str, season_year: int):
+        """Returns (AthleteSeasonID, ClassYear) or None"""
+        return self.fetchone("""
+            SELECT AthleteSeasonID, ClassYear FROM AthleteSeason
+            WHERE AthleteID = %s AND SeasonType = %s AND SeasonYear = %s
+        """, (athlete_id, season_type, season_year))
+
+    def update_class_year(self, athlete_season_id: int, class_year: str):
+        self.run("""
+            UPDATE AthleteSeason SET ClassYear = %s
+            WHERE AthleteSeasonID = %s
+        """, (class_year, athlete_season_id))
+
+    def create_athlete_season(self, athlete_id: int, school_id: str, season_type: str, season_year: int, class_year: str) -> int:
+        return self.fetchone("""
+            INSERT INTO AthleteSeason (AthleteID, SchoolID, SeasonType, SeasonYear, ClassYear)
+            VALUES (%s, %s, %s, %s, %s)
+            RETURNING AthleteSeasonID
+        """, (athlete_id, school_id, season_type, season_year, class_year))[0]
+
+    def insert_performance(self, meet_id: int, event_id: int, athlete_season_id, relay_team_id,
+                           result_value: float, wind_value, season_type: str, season_year: int):
+        self.run("""
+            INSERT INTO Performance (MeetID, EventID, AthleteSeasonID, RelayTeamID, ResultValue, WindGauge, SeasonType, SeasonYear)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """, (meet_id, event_id, athlete_season_id, relay_team_id, result_value, wind_value, season_type, season_year))
+
+    # Re-ingesting a page (a retried task, a list scraped after its meet results pages) must not store a
+    # mark twice, so the repository looks each one up first. Two identical marks by the same entrant in
+    # one meet and event (prelims and final to the hundredth) are kept as one.
+
+    def performance_exists(self, meet_id: int, event_id: int, athlete_season_id: int, result_value: float,
+                           season_type: str, season_year: int) -> bool:
+        return self.fetchone("""
+            SELECT 1 FROM Performance
+            WHERE SeasonType = %s AND SeasonYear = %s AND MeetID = %s AND EventID = %s AND AthleteSeasonID = %s
+                AND ABS(ResultValue - %s) < 0.005
+            LIMIT 1
+        """, (season_type, season_year, meet_id, event_id, athlete_season_id, result_value)) is not None
+
+    def relay_performance_exists(self, school_id: str, event_id: int, meet_id: int, result_value: float,
+                                 season_type: str, season_year: int) -> bool:
+        return self.fetchone("""
+            SELECT 1 FROM Performance AS P
+            JOIN RelayTeam AS RT ON RT.RelayTeamID = P.RelayTeamID
+            WHERE P.SeasonType = %s AND P.SeasonYear = %s AND P.MeetID = %s AND P.EventID = %s AND RT.SchoolID = %s
+                AND ABS(P.ResultValue - %s) < 0.005
+            LIMIT 1
+        """, (season_type, season_year, meet_id, event_id, school_id, result_value)) is not None
+
+    def create_relay_team(self, school_id: str, event_id: int, meet_id: int) -> int:
+        return self.fetchone("""
+            INSERT INTO RelayTeam (SchoolID, EventID, MeetID)
+            VALUES (%s, %s, %s)
+            RETURNING RelayTeamID
+        """, (school_id, event_id, meet_id))[0]
+
+    def insert_relay_member(self, relay_team_id: int, athlete_season_id: int, leg_num: int):
+        self.run("""
+            INSERT INTO RelayTeamMembers (RelayTeamID, AthleteSeasonID, LegNum)
+            VALUES (%s, %s, %s)
+            ON CONFLICT DO NOTHING
+        """, (relay_team_id, athlete_season_id, leg_num))
+
+    # ============================================================
+    # FEATURES (feature_tables.sql)
+    # ============================================================
+
+    def _upsert_features(self, table: str, key_columns: tuple, key_values: tuple, meet_id: int, result_value: float):
+        """Fold one mark into a feature row, dating it by its meet's start date"""
+        keys = ", ".join(key_columns)
+        self.run(f"""
+            INSERT INTO {table} ({keys}, MinMark, MaxMark, MarkCount, MarkSum, MarkSumSq,
+                                 DaySum, DaySumSq, DayMarkSum, FirstDate, LastDate, LastMark)
+            SELECT {", ".join(["%s"] * len(key_columns))}, %s, %s, 1, %s, %s,
+                   M.Day, M.Day * M.Day, M.Day * %s, M.StartDate, M.StartDate, %s
+            FROM (SELECT StartDate, {self.day_number.format("StartDate")} AS Day FROM TrackMeet WHERE MeetID = %s) AS M
+            WHERE TRUE
+            ON CONFLICT ({keys}) DO UPDATE SET
+                MinMark = {self.least}({table}.MinMark, EXCLUDED.MinMark),
+                MaxMark = {self.greatest}({table}.MaxMark, EXCLUDED.MaxMark),
+                MarkCount = {table}.MarkCount + 1,
+                MarkSum = {table}.MarkSum + EXCLUDED.MarkSum,
+                MarkSumSq = {table}.MarkSumSq + EXCLUDED.MarkSumSq,
+                DaySum = {table}.DaySum + EXCLUDED.DaySum,
+                DaySumSq = {table}.DaySumSq + EXCLUDED.DaySumSq,
+                DayMarkSum = {table}.DayMarkSum + EXCLUDED.DayMarkSum,
+                FirstDate = {self.least}({table}.FirstDate, EXCLUDED.FirstDate),
+                LastDate = {self.greatest}({table}.LastDate, EXCLUDED.LastDate),
+                LastMark = CASE WHEN EXCLUDED.LastDate >= {table}.LastDate THEN EXCLUDED.LastMark ELSE {table}.LastMark END
+        """, key_values + (result_value, result_value, result_value, result_value * result_value, result_value, result_value, meet_id))
+
+    def upsert_athlete_features(self, athlete_season_id: int, event_id: int, meet_id: int, result_value: float):
+        self._upsert_features("AthleteEventFeatures", ("AthleteSeasonID", "EventID"),
+                              (athlete_season_id, event_id), meet_id, result_value)
+
+    def upsert_relay_features(self, school_id: str, gender: str, event_id: int, season_type: str, season_year: int,
+                              meet_id: int, result_value: float):
+        self._upsert_features("RelayEventFeatures", ("SchoolID", "Gender", "EventID", "SeasonType", "SeasonYear"),
+                              (school_id, gender, event_id, season_type, season_year), meet_id, result_value)
+
+    def rebuild_features(self):
+        """Recompute both feature tables from Performance (after bulk loads, or to repair drift)"""
+        day = self.day_number.format("M.StartDate")
+        moments = f"""
+            MIN(P.ResultValue), MAX(P.ResultValue), COUNT(*), SUM(P.ResultValue), SUM(P.ResultValue * P.ResultValue),
+            SUM({day}), SUM({day} * {day}), SUM({day} * P.ResultValue), MIN(M.StartDate), MAX(M.StartDate)
+        """
+        columns = """MinMark, MaxMark, MarkCount, MarkSum, MarkSumSq, DaySum, DaySumSq, DayMarkSum, FirstDate, LastDate, LastMark"""
+
+        self.run("DELETE FROM AthleteEventFeatures")
+        self.run(f"""
+            INSERT INTO AthleteEventFeatures (AthleteSeasonID, EventID, {columns})
+            SELECT P.AthleteSeasonID, P.EventID, {moments},
+                (SELECT P2.ResultValue FROM Performance AS P2 JOIN TrackMeet AS M2 ON M2.MeetID = P2.MeetID
+                 WHERE P2.AthleteSeasonID = P.AthleteSeasonID AND P2.EventID = P.EventID
+                 ORDER BY M2.StartDate DESC, P2.PerformanceID DESC LIMIT 1)
+            FROM Performance AS P
+            JOIN TrackMeet AS M ON M.MeetID = P.MeetID
+            WHERE P.AthleteSeasonID IS NOT NULL
+            GROUP BY P.AthleteSeasonID, P.EventID
+        """)
+
+        # A relay's gender is that of its members; relays with no known members can't be placed and are skipped
+        self.run("DELETE FROM RelayEventFeatures")
+        self.run(f"""
+            INSERT INTO RelayEventFeatures (SchoolID, Gender, EventID, SeasonType, SeasonYear, {columns})
+            SELECT P.SchoolID, P.Gender, P.EventID, P.SeasonType, P.SeasonYear, {moments},
+                (SELECT P2.ResultValue FROM Performance AS P2
+                 JOIN RelayTeam AS RT2 ON RT2.RelayTeamID = P2.RelayTeamID
+                 JOIN TrackMeet AS M2 ON M2.MeetID = P2.MeetID
+                 WHERE RT2.SchoolID = P.SchoolID AND P2.EventID = P.EventID
+                     AND P2.SeasonType = P.SeasonType AND P2.SeasonYear = P.SeasonYear
+                     AND (SELECT A2.Gender FROM RelayTeamMembers AS RTM2
+                          JOIN AthleteSeason AS AtS2 ON AtS2.AthleteSeasonID = RTM2.AthleteSeasonID
+                          JOIN Athlete AS A2 ON A2.AthleteID = AtS2.AthleteID
+                          WHERE RTM2.RelayTeamID = P2.RelayTeamID LIMIT 1) = P.Gender
+                 ORDER BY M2.StartDate DESC, P2.PerformanceID DESC LIMIT 1)
+            FROM (
+                SELECT Perf.*, RT.SchoolID,
+                    (SELECT A.Gender FROM RelayTeamMembers AS RTM
+                     JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = RTM.AthleteSeasonID
+                     JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID
+                     WHERE RTM.RelayTeamID = Perf.RelayTeamID LIMIT 1) AS Gender
+                FROM Performance AS Perf
+                JOIN RelayTeam AS RT ON RT.RelayTeamID = Perf.RelayTeamID
+            ) AS P
+            JOIN TrackMeet AS M ON M.MeetID = P.MeetID
+            WHERE P.Gender IS NOT NULL
+            GROUP BY P.SchoolID, P.Gender, P.EventID, P.SeasonType, P.SeasonYear
+        """)
+
+
+# ============================================================
+# POSTGRES
+# ============================================================
+
+class PostgresBackend(Backend):
+
+    name = "postgres"
+
+    def __init__(self, database_url: str):
+        super().__init__()
+        self.database_url = database_url
+        self._known_partitions = set()
+
+    def connect(self):
+        connection = psycopg2.connect(self.database_url)
+        connection.autocommit = True
+        return connection
+
+    def is_closed(self) -> bool:
+        return bool(self._connection.closed)
+
+    def close(self):
+        super().close()
+        self._known_partitions.clear()
+
+    def rolled_back(self):
+        # The partitions may have been created by the rolled back transaction
+        self._known_partitions.clear()
+
+    # Performance is partitioned by season (see table_generation.sql):
+    #   Performance -> Performance_<year> -> Performance_<year>_<Indoor|Outdoor>
+    # Inserts go straight to the leaf partition so Postgres doesn't have to route every row.
+
+    def ensure_performance_partition(self, season_type: str, season_year: int) -> str:
+        """Create the year and season partitions if they don't exist yet. Returns the leaf partition name."""
+        partition = performance_partition_name(season_type, season_year)
+        if partition in self._known_partitions:
+            return partition
+
+        cur = self.connection.cursor()
+
+        year_partition = f"performance_{int(season_year)}"
+        cur.execute(sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} PARTITION OF Performance
+            FOR VALUES FROM (%s) TO (%s) PARTITION BY LIST (SeasonType)
+        """).format(sql.Identifier(year_partition)), (int(season_year), int(season_year) + 1))
+
+        cur.execute(sql.SQL("""
+            CREATE TABLE IF NOT EXISTS {} PARTITION OF {} FOR VALUES IN (%s)
+        """).format(sql.Identifier(partition), sql.Identifier(year_partition)), (season_type,))
+
+        cur.close()
+        self._known_partitions.add(partition)
+        return partition
+
+    def insert_performance(self, meet_id: int, event_id: int, athlete_season_id, relay_team_id,
+                           result_value: float, wind_value, season_type: str, season_year: int):
+        partition = self.ensure_performance_partition(season_type, season_year)
+        cur = self.connection.cursor()
+        cur.execute(sql.SQL("""
+            INSERT INTO {} (MeetID, EventID, AthleteSeasonID, RelayTeamID, ResultValue, WindGauge, SeasonType, SeasonYear)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+        """).format(sql.Identifier(partition)),
+            (meet_id, event_id, athlete_season_id, relay_team_id, result_value, wind_value, season_type, season_year))
+        cur.close()
+
+    def lock(self, lock_key: str):
+        self.run("SELECT pg_advisory_xact_lock(hashtext(%s))", (lock_key,))
+
+    def reserve_ids(self, table: str, column: str, count: int) -> list:
+        """Draw count ids from a SERIAL column's sequence"""
+        if count == 0:
+            return []
+        rows = self.fetchall("""
+            SELECT nextval(pg_get_serial_sequence(%s, %s)) FROM generate_series(1, %s)
+        """, (table, column, count))
+        return [row[0] for row in rows]
+
+    def bulk_insert(self, query: str, rows: list):
+        if rows:
+            cur = self.connection.cursor()
+            execute_values(cur, query, rows, page_size=1000)
+            cur.close()
+
+    def stream(self, query: str, params: tuple = (), batch_size: int = 10000):
+        # A named (server-side) cursor keeps the result in Postgres; WITH HOLD lets it outlive autocommit
+        cur = self.connection.cursor(name=f"stream_{id(query)}", withhold=True)
+        cur.itersize = batch_size
+        try:
+            cur.execute(query, params)
+            yield from cur
+        finally:
+            cur.close()
+
+
+# ============================================================
+# SQLITE
+# ============================================================
+
+class SQLiteBackend(Backend):
+    """Embedded local database. The schema and the School/Location/Conference seed data are applied on connect."""
+
+    name = "sqlite"
+
+    # SQLite has no LEAST/GREATEST; multi-argument MIN/MAX are the scalar equivalents
+    greatest = "MAX"
+    least = "MIN"
+    day_number = "CAST(julianday({}) - 2440587.5 AS INTEGER)"
+    # LIKE is already case-insensitive for ASCII; GROUP_CONCAT(DISTINCT ...) can't take a separator
+    ilike = "LIKE"
+    year_of = "CAST(strftime('%Y', {}) AS INTEGER)"
+    distinct_list = "REPLACE(GROUP_CONCAT(DISTINCT {}), ',', ', ')"
+    # Takes the database's write lock up front, which already serializes every writer
+    begin = "BEGIN IMMEDIATE"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+
+    def connect(self):
+        # Autocommit mode; WAL + synchronous=NORMAL avoids an fsync per statement
+        connection = sqlite3.connect(self.path, isolation_level=None)
+        connection.execute("PRAGMA foreign_keys = ON")
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.execute("PRAGMA synchronous = NORMAL")
+        self.apply_schema(connection)
+        return connection
+
+    def apply_schema(self, connection):
+        if not connection.execute("SELECT 1 FROM sqlite_master WHERE name = 'Performance'").fetchone():
+            with open(os.path.join(SQL_DIR, "table_generation_sqlite.sql")) as f:
+                connection.executescript(f.read())
+            with open(os.path.join(SQL_DIR, "add_manual_info.sql")) as f:
+                connection.executescript(f.read())
+        elif connection.execute("SELECT \"notnull\" FROM pragma_table_info('School') WHERE name = 'LocationID'").fetchone()[0]:
+            self.rebuild_school_table(connection)
+        # Idempotent, so databases created before the feature tables existed pick them up
+        with open(os.path.join(SQL_DIR, "feature_tables.sql")) as f:
+            connection.executescript(f.read())
+
+    def rebuild_school_table(self, connection):
+        """
+        Databases created before placeholder schools (school_placeholders.sql) have NOT NULL School columns.
+        SQLite can't drop NOT NULL in place, so copy School into a table made from the current schema.
+        """
+        with open(os.path.join(SQL_DIR, "table_generation_sqlite.sql")) as f:
+            create = re.search(r"CREATE TABLE IF NOT EXISTS School \(.*?\);", f.read(), re.DOTALL).group(0)
+        connection.execute("PRAGMA foreign_keys = OFF")
+        try:
+            connection.executescript(f"""
+                BEGIN;
+                {create.replace("School (", "School_Rebuilt (", 1)}
+                INSERT INTO School_Rebuilt SELECT * FROM School;
+                DROP TABLE School;
+                ALTER TABLE School_Rebuilt RENAME TO School;
+                COMMIT;
+            """)
+        finally:
+            connection.execute("PRAGMA foreign_keys = ON")
+
+    def adapt(self, query: str) -> str:
+        return query.replace("%s", "?")
+
+    def lock(self, lock_key: str):
+        pass
+
+    def upsert_meet(self, meet_id: int, meet_name: str, meet_date) -> bool:
+        # Dates are ISO strings, which compare in date order
+        return self.run("""
+            INSERT INTO TrackMeet (MeetID, MeetName, StartDate, EndDate)
+            VALUES (%s, %s, %s, %s)
+            ON CONFLICT (MeetID) DO UPDATE SET
+                StartDate = MIN(TrackMeet.StartDate, EXCLUDED.StartDate),
+                EndDate = MAX(TrackMeet.EndDate, EXCLUDED.EndDate)
+            WHERE EXCLUDED.StartDate < TrackMeet.StartDate OR EXCLUDED.EndDate > TrackMeet.EndDate
+        """, (meet_id, meet_name, meet_date.isoformat(), meet_date.isoformat())) > 0
+
+
+def backend_from_url(database_url: str) -> Backend:
+    """sqlite:///path/to/file.db selects the local backend, anything else is a Postgres URL"""
+    if database_url.startswith("sqlite:///"):
+        return SQLiteBackend(database_url[len("sqlite:///"):])
+    return PostgresBackend(database_url)
+
+
+# ============================================================
+# BULK TRANSFER
+# ============================================================
+
+def _mark_key(meet_id: int, event_id: int, entrant, result_value: float) -> tuple:
+    """A mark's identity, as performance_exists / relay_performance_exists match it: entrant is an AthleteSeasonID or a relay's SchoolID"""
+    return (int(meet_id), int(event_id), entrant, round(float(result_value), 2))
+
+
+def copy_to_postgres(source: Backend, target: PostgresBackend):
+    """
+    Copy every ingested row from a (local) backend into Postgres in bulk, as one transaction.
+    Natural keys (athletes, meets, events, athlete seasons) are merged with what Postgres already has;
+    RelayTeam and Performance rows get fresh ids from the Postgres sequences. Marks Postgres already has
+    are skipped like a re-ingested page's, so copying a file twice, or one overlapping Postgres, adds
+    nothing twice. The copied marks' keys go to the change feed as one run.
+    """
+    with target.transaction():
+        target.bulk_insert("""
+            INSERT INTO TrackEvent (EventID, EventName, EventType, MeasureUnit, IsRelay) VALUES %s
+            ON CONFLICT (EventID) DO NOTHING
+        """, [(e, n, t, u, bool(r)) for e, n, t, u, r in source.fetchall(
+            "SELECT EventID, EventName, EventType, MeasureUnit, IsRelay FROM TrackEvent")])
+
+        target.bulk_insert("""
+            INSERT INTO Athlete (AthleteID, AthleteFirstName, AthleteLastName, Gender) VALUES %s
+            ON CONFLICT (AthleteID) DO NOTHING
+        """, source.fetchall("SELECT AthleteID, AthleteFirstName, AthleteLastName, Gender FROM Athlete"))
+
+        target.bulk_insert("""
+            INSERT INTO TrackMeet (MeetID, MeetName, StartDate, EndDate) VALUES %s
+            ON CONFLICT (MeetID) DO UPDATE SET
+                StartDate = LEAST(TrackMeet.StartDate, EXCLUDED.StartDate),
+                EndDate = GREATEST(TrackMeet.EndDate, EXCLUDED.EndDate)
+        """, source.fetchall("SELECT MeetID, MeetName, StartDate, EndDate FROM TrackMeet"))
+
+        # Athlete seasons are keyed by (athlete, season); a real class year replaces a default 'FR'
+        seasons = source.fetchall("""
+            SELECT AthleteSeasonID, AthleteID, SchoolID, SeasonType, SeasonYear, ClassYear FROM AthleteSeason
+        """)
+        target.bulk_insert("""
+            INSERT INTO AthleteSeason (AthleteID, SchoolID, SeasonType, SeasonYear, ClassYear) VALUES %s
+            ON CONFLICT (AthleteID, SeasonType, SeasonYear) DO UPDATE SET
+                ClassYear = CASE WHEN AthleteSeason.ClassYear = 'FR' THEN EXCLUDED.ClassYear ELSE AthleteSeason.ClassYear END
+        """, [row[1:] for row in seasons])
+        target_season_ids = {
+            (athlete_id, season_type, season_year): athlete_season_id
+            for athlete_season_id, athlete_id, season_type, season_year in target.fetchall("""
+                SELECT AthleteSeasonID, AthleteID, SeasonType, SeasonYear FROM AthleteSeason
+                WHERE AthleteID = ANY(%s)
+            """, (list({row[1] for row in seasons}),))
+        }
+        season_map = {row[0]: target_season_ids[(row[1], row[3], row[4])] for row in seasons}
+        season_athletes = {row[0]: (row[1], row[2]) for row in seasons}
+
+        # Marks Postgres already has at the copied meets
+        performances = source.fetchall("""
+            SELECT P.MeetID, P.EventID, P.AthleteSeasonID, P.RelayTeamID, R.SchoolID, P.ResultValue, P.WindGauge,
+                   P.SeasonType, P.SeasonYear
+            FROM Performance AS P
+            LEFT JOIN RelayTeam AS R ON R.RelayTeamID = P.RelayTeamID
+        """)
+        stored = {
+            _mark_key(meet, event, season if school is None else school, result)
+            for meet, event, season, school, result in target.fetchall("""
+                SELECT P.MeetID, P.EventID, P.AthleteSeasonID, R.SchoolID, P.ResultValue
+                FROM Performance AS P
+                LEFT JOIN RelayTeam AS R ON R.RelayTeamID = P.RelayTeamID
+                WHERE P.MeetID = ANY(%s)
+            """, (list({row[0] for row in performances}),))
+        }
+        new_performances = []
+        for row in performances:
+            meet, event, season, relay, school, result = row[:6]
+            key = _mark_key(meet, event, school if relay is not None else season_map[season], result)
+            if key not in stored:
+                stored.add(key)
+                new_performances.append(row)
+
+        # Relay teams only for the relay marks being copied
+        copied_relays = {row[3] for row in new_performances if row[3] is not None}
+        relay_teams = [row for row in source.fetchall("SELECT RelayTeamID, SchoolID, EventID, MeetID FROM RelayTeam")
+                       if row[0] in copied_relays]
+        new_relay_ids = target.reserve_ids("relayteam", "relayteamid", len(relay_teams))
+        relay_map = {row[0]: new_id for row, new_id in zip(relay_teams, new_relay_ids)}
+        target.bulk_insert("""
+            INSERT INTO RelayTeam (RelayTeamID, SchoolID, EventID, MeetID) VALUES %s
+        """, [(relay_map[row[0]],) + tuple(row[1:]) for row in relay_teams])
+
+        members = [(team, season, leg) for team, season, leg in source.fetchall(
+            "SELECT RelayTeamID, AthleteSeasonID, LegNum FROM RelayTeamMembers") if team in relay_map]
+        target.bulk_insert("""
+            INSERT INTO RelayTeamMembers (RelayTeamID, AthleteSeasonID, LegNum) VALUES %s
+            ON CONFLICT DO NOTHING
+        """, [(relay_map[team], season_map[season], leg) for team, season, leg in members])
+
+        for season_type, season_year in {(row[7], row[8]) for row in new_performances}:
+            target.ensure_performance_partition(season_type, season_year)
+        target.bulk_insert("""
+            INSERT INTO Performance (MeetID, EventID, AthleteSeasonID, RelayTeamID, ResultValue, WindGauge, SeasonType, SeasonYear) VALUES %s
+        """, [
+            (meet, event, season_map.get(season), relay_map.get(relay), result, wind, season_type, season_year)
+            for meet, event, season, relay, _, result, wind, season_type, season_year in new_performances
+        ])
+
+        # Feature rows, leaderboards, ratings and percentiles are derived from every performance, so recompute them rather than merge
+        target.rebuild_features()
+        leaderboard.Leaderboards(target).rebuild()
+        progression.rebuild(target)
+        ratings.rebuild(target)
+        percentiles.build(target)
+
+        # The same keys the repository records for an ingested mark
+        for meet, event, season, relay, school, _, _, season_type, season_year in new_performances:
+            if relay is None:
+                athlete_id, school = season_athletes[season]
+                change_feed.record("athlete", athlete_id)
+            change_feed.record("meet", meet)
+            change_feed.record("event", event)
+            change_feed.record("school", school)
+            change_feed.record("season", change_feed.season_key(season_type, season_year))
+        for _, season, _ in members:
+            change_feed.record("athlete", season_athletes[season][0])
+        change_feed.flush(target, f"copy_to_postgres {len(new_performances)} performances")
+
+    print(f"BACKENDS: Copied {len(new_performances)} performances ({len(performances) - len(new_performances)} already in Postgres), "
+          f"{len(seasons)} athlete seasons, {len(relay_teams)} relay teams to Postgres")
+
+
+if __name__ == "__main__":
+    # python backends.py tfrrs.db             -> copy a local SQLite ingest into the Postgres DATABASE_URL
+    # python backends.py --rebuild-features   -> recompute the feature tables, leaderboards, progressions, ratings and percentiles of DATABASE_URL
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    if len(sys.argv) != 2:
+        print("Usage: python backends.py <local sqlite file> | --rebuild-features")
+        sys.exit(1)
+
+    database_url = os.environ.get("DATABASE_URL")
+
+    if sys.argv[1] == "--rebuild-features":
+        if not database_url:
+            raise Exception("DATABASE_URL environment variable not set!")
+        backend = backend_from_url(database_url)
+        backend.rebuild_features()
+        leaderboard.Leaderboards(backend).rebuild()
+        progression.rebuild(backend)
+        ratings.rebuild(backend)
+        percentiles.build(backend)
+        print("BACKENDS: Rebuilt feature tables, leaderboards, progressions, ratings and percentiles")
+        backend.close()
+        sys.exit(0)
+
+    if not database_url or database_url.startswith("sqlite:///"):
+        raise Exception("DATABASE_URL must point at the Postgres database to copy into!")
+
+    source = SQLiteBackend(sys.argv[1])
+    target = PostgresBackend(database_url)
+    copy_to_postgres(source, target)
+    source.close()
+    target.close()
@@ -0,0 +1,111 @@
+# Change_feed.py
+# Append-only feed of what each ingest run wrote, kept in IngestRun / IngestChange (feature_tables.sql)
+#
+# The repository's insert functions record every athlete, meet, event, season and school they touch
+# in memory. At the end of a run (one scraped page, one meet results fetch, one quarantine replay)
+# flush() writes the distinct keys once, under a new RunID, so an ingest costs one batch insert instead
+# of a write per mark. A run that raises still flushes the keys of what it wrote before failing, under a
+# source ending in "(failed)": ingesting it again skips those rows as duplicates and wouldn't record them.
+# Only if that flush fails too are they discard()ed, so they aren't credited to the next run.
+# Consumers (the web app's caches, publish.py, percentile or rating refreshes) keep the last RunID they
+# processed and ask for the keys of later runs, invalidating or recomputing just those.
+#
+# Keys are strings: athlete, meet and event ids, seasons as "2025-Indoor" and school slugs.
+#
+# Usage:
+#   python change_feed.py runs [--limit 20]
+#   python change_feed.py since 41
+
+import argparse
+import datetime
+
+KINDS = ("athlete", "meet", "event", "season", "school")
+
+_pending = set()
+
+
+def season_key(season_type : str, season_year : int) -> str:
+    return f"{int(season_year)}-{season_type}"
+
+
+def record(kind : str, key):
+    """Note that the current run wrote something keyed by key"""
+    if kind not in KINDS:
+        raise Exception(f"Unknown change kind '{kind}', expected one of {', '.join(KINDS)}")
+    _pending.add((kind, str(key)))
+
+
+def pending() -> set:
+    return set(_pending)
+
+
+def discard():
+    _pending.clear()
+
+
+def flush(backend, source : str) -> int:
+    """Write the changes recorded since the last flush as one run. Returns its RunID, None if nothing changed."""
+    if not _pending:
+        return None
+    changes = sorted(_pending)
+    finished = datetime.datetime.now().isoformat(sep=" ", timespec="seconds")
+
+    # One transaction, so a consumer never sees a run without its keys. The lock serializes concurrent
+    # ingests (work_queue.py workers): each picks the next RunID and runs become visible in RunID order.
+    with backend.transaction("change_feed"):
+        run_id = backend.fetchone("SELECT COALESCE(MAX(RunID), 0) + 1 FROM IngestRun")[0]
+        backend.run("""
+            INSERT INTO IngestRun (RunID, Source, FinishedAt, Changes) VALUES (%s, %s, %s, %s)
+        """, (run_id, source[:200], finished, len(changes)))
+        backend.run_many("""
+            INSERT INTO IngestChange (RunID, Kind, ChangeKey) VALUES (%s, %s, %s)
+        """, [(run_id, kind, key) for kind, key in changes])
+    _pending.clear()
+
+    print(f"CHANGE FEED: Run {run_id} ({source}) touched {len(changes)} keys")
+    return run_id
+
+
+def changes_since(backend, run_id : int = 0) -> tuple:
+    """({kind: sorted keys} written by the runs after run_id, last RunID seen) — pass that RunID next time"""
+    last = backend.fetchone("SELECT COALESCE(MAX(RunID), 0) FROM IngestRun")[0]
+    changes = {kind: set() for kind in KINDS}
+    for kind, key in backend.stream("""
+        SELECT Kind, ChangeKey FROM IngestChange WHERE RunID > %s AND RunID <= %s
+    """, (int(run_id), last)):
+        changes[kind].add(key)
+    return {kind: sorted(keys) for kind, keys in changes.items()}, max(last, int(run_id))
+
+
+def runs(backend, limit : int = 20) -> list:
+    """[(RunID, Source, FinishedAt, Changes)], most recent first"""
+    return backend.fetchall("""
+        SELECT RunID, Source, FinishedAt, Changes FROM IngestRun ORDER BY RunID DESC LIMIT %s
+    """, (int(limit),))
+
+
+def main(argv=None):
+    import repository as repo
+
+    parser = argparse.ArgumentParser(description="Keys written by ingest runs, for downstream cache invalidation")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    runs_parser = subparsers.add_parser("runs", help="Most recent ingest runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    since_parser = subparsers.add_parser("since", help="Keys written by the runs after a RunID")
+    since_parser.add_argument("run_id", type=int)
+    args = parser.parse_args(argv)
+
+    backend = repo.get_backend()
+    if args.command == "runs":
+        for run_id, source, finished, count in runs(backend, args.limit):
+            print(f"{run_id:>6}  {finished}  {count:>6} keys  {source}")
+    else:
+        changes, last = changes_since(backend, args.run_id)
+        for kind in KINDS:
+            print(f"{kind}: {' '.join(changes[kind]) if changes[kind] else '-'}")
+        print(f"CHANGE FEED: Up to run {last}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
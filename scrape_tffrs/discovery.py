@@ -0,0 +1,280 @@
+# Discovery.py
+# Catalog of TFRRS teams and season handles
+#
+# The scrapers need, for each page, the school's TFRRS slug, its state, which gender teams exist and
+# the (list_hnd, season_hnd) pair of the season. Instead of typing these in by hand, this module crawls
+# TFRRS league / division pages for team links and a team's all_performances page for the season
+# dropdown, and keeps the result in catalog.json. A refresh only adds what isn't in the catalog yet.
+#
+# The catalog starts from the Centennial Conference teams and seasons we already knew about, so the
+# scrapers work without a crawl.
+#
+# Ingest writes rows that reference School(SchoolID), so a refresh adds a placeholder School row (ID and a
+# name made from the slug) for every team that has none; add_manual_info.sql has the full rows of the seed
+# schools. iterate_teams(known=...) still skips teams without a row, e.g. from a catalog saved before
+# placeholders existed, until the next refresh. Slugs longer than a SchoolID can hold are left out of the catalog.
+#
+# Usage:
+#   python discovery.py                          refresh seasons (and teams of any saved leagues)
+#   python discovery.py --league <league url>    also crawl a league / division page for teams
+
+import os
+import re
+import sys
+import json
+import datetime
+import http_client
+import repository as repo
+
+CATALOG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "catalog.json")
+
+# Team pages look like https://www.tfrrs.org/teams/tf/PA_college_m_Ursinus.html
+TEAM_LINK = re.compile(r"/teams/(?:tf/)?([A-Z]{2})_college_([mf])_([A-Za-z0-9_]+)\.html")
+
+# School.SchoolID is VARCHAR(20)
+SCHOOL_ID_LENGTH = 20
+
+# Season dropdown entries carry both handles in their link, and "2025 Outdoor" style text
+SEASON_OPTION = re.compile(
+    r"list_hnd=(\d+)(?:&amp;|&)season_hnd=(\d+)[^>]*>\s*(?:<[^>]+>\s*)*(\d{4})\s+(Indoor|Outdoor)",
+    re.IGNORECASE,
+)
+
+# ========================================
+# Seed catalog
+# ========================================
+
+SEED_SCHOOLS = {
+    "Johns_Hopkins" : "MD",
+    "McDaniel" : "MD",
+    "Ursinus" : "PA",
+    "Dickinson_College" : "PA",
+    "Franklin__Marshall" : "PA",
+    "Gettysburg" : "PA",
+    "Haverford" : "PA",
+    "Muhlenberg" : "PA",
+    "Bryn_Mawr" : "PA",
+    "Swarthmore" : "PA"
+}
+
+# Bryn Mawr is a women's college
+SEED_WOMEN_ONLY = {"Bryn_Mawr"}
+
+SEED_SEASONS = {
+    (2010, "Indoor") : (601, 132),
+    (2010, "Outdoor") : (600, 131),
+    (2011, "Indoor") : (611, 138),
+    (2011, "Outdoor") : (695, 158),
+    (2012, "Indoor") : (773, 167),
+    (2012, "Outdoor") : (863, 191),
+    (2013, "Indoor") : (948, 202),
+    (2013, "Outdoor") : (1047, 221),
+    (2014, "Indoor") : (1148, 236),
+    (2014, "Outdoor") : (1251, 256),
+    (2015, "Indoor") : (1429, 276),
+    (2015, "Outdoor") : (1552, 303),
+    (2016, "Indoor") : (1587, 309),
+    (2016, "Outdoor") : (1683, 336),
+    (2017, "Indoor") : (1793, 346),
+    (2017, "Outdoor") : (1915, 377),
+    (2018, "Indoor") : (2120, 388),
+    (2018, "Outdoor") : (2278, 414),
+    (2019, "Indoor") : (2330, 429),
+    (2019, "Outdoor") : (2573, 453),
+    (2020, "Indoor") : (2776, 474),
+    (2020, "Outdoor") : (2906, 496), # Empty Because COVID
+    (2021, "Indoor") : (3167, 519), # Empty Because COVID
+    (2021, "Outdoor") : (3200, 530),
+    (2022, "Indoor") : (3501, 548),
+    (2022, "Outdoor") : (3730, 568),
+    (2023, "Indoor") : (3909, 584),
+    (2023, "Outdoor") : (4153, 608),
+    (2024, "Indoor") : (4466, 627),
+    (2024, "Outdoor") : (4541, 645),
+    (2025, "Indoor") : (4874, 661),
+    (2025, "Outdoor") : (5027, 681),
+    (2026, "Indoor") : (5354, 697)
+}
+
+
+def season_key(year : int, season : str) -> str:
+    return str(year) + " " + season
+
+
+def seed_catalog() -> dict:
+    teams = {}
+    for school, state in SEED_SCHOOLS.items():
+        genders = ["f"] if school in SEED_WOMEN_ONLY else ["m", "f"]
+        teams[school] = {"state": state, "genders": genders}
+
+    seasons = {season_key(year, season): list(handles) for (year, season), handles in SEED_SEASONS.items()}
+
+    return {"teams": teams, "seasons": seasons, "leagues": [], "updated_at": None}
+
+# ========================================
+# Catalog file
+# ========================================
+
+def load_catalog(path : str = CATALOG_PATH) -> dict:
+    """The saved catalog, or the seed catalog if nothing has been discovered yet. Never crawls."""
+    if not os.path.exists(path):
+        return seed_catalog()
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_catalog(catalog : dict, path : str = CATALOG_PATH):
+    # Write then rename so a crash never leaves a half-written catalog
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(catalog, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def get_schools(catalog : dict) -> dict:
+    """School -> state, like the old SCHOOLS dicts"""
+    return {school: team["state"] for school, team in catalog["teams"].items()}
+
+
+def get_seasons(catalog : dict, first_year : int = None, last_year : int = None) -> dict:
+    """(year, season) -> (list_hnd, season_hnd), in chronological order like the old SEASONS dicts"""
+    seasons = {}
+    for key, handles in catalog["seasons"].items():
+        year, season = key.split(" ")
+        year = int(year)
+        if first_year is not None and year < first_year:
+            continue
+        if last_year is not None and year > last_year:
+            continue
+        seasons[(year, season)] = tuple(handles)
+
+    # Indoor comes before Outdoor within a year
+    return dict(sorted(seasons.items(), key=lambda item: (item[0][0], item[0][1] != "Indoor")))
+
+
+def get_season(catalog : dict, year : int, season : str) -> tuple:
+    handles = catalog["seasons"].get(season_key(year, season))
+    if handles is None:
+        raise Exception("Season " + season_key(year, season) + " is not in the catalog, run discovery.py")
+    return tuple(handles)
+
+
+def iterate_teams(catalog : dict, schools : list = None, known : set = None):
+    """
+    Yield (school, state, gender) for every gender team, optionally limited to some schools and to the
+    known SchoolIDs (repository.school_ids()) that ingest can write rows for
+    """
+    for school, team in catalog["teams"].items():
+        if schools is not None and school not in schools:
+            continue
+        if known is not None and school not in known:
+            continue
+        for gender in team["genders"]:
+            yield school, team["state"], gender
+
+# ========================================
+# Crawling
+# ========================================
+
+def get_url_html_content(url : str) -> str:
+    return http_client.get_url_html_content(url)
+
+
+def parse_team_links(html_content : str) -> list:
+    """(school, state, gender) for every TFRRS track team linked from a page"""
+    found = []
+    for state, gender, school in TEAM_LINK.findall(html_content):
+        if (school, state, gender) not in found:
+            found.append((school, state, gender))
+    return found
+
+
+def parse_season_options(html_content : str) -> dict:
+    """(year, season) -> (list_hnd, season_hnd) for every season offered by an all_performances page"""
+    seasons = {}
+    for list_hnd, season_hnd, year, season in SEASON_OPTION.findall(html_content):
+        seasons[(int(year), season.capitalize())] = (int(list_hnd), int(season_hnd))
+    return seasons
+
+
+def add_teams(catalog : dict, teams : list) -> int:
+    """Merge discovered teams into the catalog, returns how many gender teams were new"""
+    added = 0
+    for school, state, gender in teams:
+        if len(school) > SCHOOL_ID_LENGTH:
+            print("DISCOVERY: Skipping team " + school + ", its slug is longer than a SchoolID")
+            continue
+        team = catalog["teams"].setdefault(school, {"state": state, "genders": []})
+        if gender not in team["genders"]:
+            team["genders"].append(gender)
+            team["genders"].sort(reverse=True)
+            added += 1
+    return added
+
+
+def school_name(school : str) -> str:
+    """Placeholder SchoolName from a slug, Franklin__Marshall -> Franklin Marshall"""
+    return " ".join(part for part in school.split("_") if part)
+
+
+def add_school_rows(catalog : dict) -> int:
+    """Insert a placeholder School row for every catalog team without one, returns how many were added"""
+    known = repo.school_ids()
+    missing = [school for school in catalog["teams"] if school not in known]
+    for school in missing:
+        repo.insert_school(school, school_name(school))
+    return len(missing)
+
+
+def add_seasons(catalog : dict, seasons : dict) -> int:
+    """Merge discovered seasons into the catalog, known handles are kept. Returns how many were new"""
+    added = 0
+    for (year, season), handles in seasons.items():
+        key = season_key(year, season)
+        if key not in catalog["seasons"]:
+            catalog["seasons"][key] = list(handles)
+            added += 1
+    return added
+
+
+def season_index_url(catalog : dict) -> str:
+    # Any team's all_performances page lists every season in its dropdown
+    school, state, gender = next(iterate_teams(catalog))
+    return "https://www.tfrrs.org/all_performances/" + state + "_college_" + gender + "_" + school + ".html"
+
+
+def refresh_catalog(catalog : dict = None, leagues : list = (), path : str = CATALOG_PATH) -> dict:
+    """Crawl the season dropdown and league pages once, add anything new (with School rows for new teams) and save the catalog"""
+    if catalog is None:
+        catalog = load_catalog(path)
+
+    for league in leagues:
+        if league not in catalog["leagues"]:
+            catalog["leagues"].append(league)
+
+    for league in catalog["leagues"]:
+        teams = parse_team_links(get_url_html_content(league))
+        print("DISCOVERY: " + str(add_teams(catalog, teams)) + " new teams from " + league)
+    print("DISCOVERY: " + str(add_school_rows(catalog)) + " placeholder School rows added")
+
+    seasons = parse_season_options(get_url_html_content(season_index_url(catalog)))
+    print("DISCOVERY: " + str(add_seasons(catalog, seasons)) + " new seasons")
+
+    catalog["updated_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+    save_catalog(catalog, path)
+    return catalog
+
+
+if __name__ == "__main__":
+    leagues = []
+    args = sys.argv[1:]
+    while args:
+        if args[0] == "--league" and len(args) > 1:
+            leagues.append(args[1])
+            args = args[2:]
+        else:
+            print("Usage: python discovery.py [--league <league url>]...")
+            sys.exit(1)
+
+    catalog = refresh_catalog(leagues=leagues)
+    print("DISCOVERY: catalog has " + str(len(catalog["teams"])) + " schools and " + str(len(catalog["seasons"])) + " seasons")
@@ -0,0 +1,182 @@
+# Http_client.py
+# Page fetching shared by every scraper
+#
+# One requests.Session per process, so pages reuse keep-alive connections (no TCP + TLS handshake
+# per page) and are transferred compressed. Requests are paced by an adaptive throttle:
+#   - each fast response shortens the delay between requests a little (additive speed-up)
+#   - a slow response, a 429 or a 503 doubles it (multiplicative back-off)
+#   - Retry-After is honored on every retried status, 500 / 502 / 504 included
+# so throughput rises until TFRRS pushes back and stays just below that.
+# Failed requests are retried with full-jitter exponential backoff; a page that still fails raises
+# requests.exceptions.HTTPError instead of handing an error page to the parser.
+
+import time
+import random
+import threading
+import email.utils
+import requests
+from requests.adapters import HTTPAdapter
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
+
+# Statuses that mean "slow down / try again later" rather than "this page is wrong"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+PUSHBACK_STATUSES = {429, 503}
+
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 1.0
+BACKOFF_CAP = 60.0
+TIMEOUT = 30
+
+
+class AdaptiveThrottle:
+    """Delay between requests, adjusted from observed latency and server pushback (AIMD)"""
+
+    def __init__(self, initial_delay : float = 0.5, min_delay : float = 0.05, max_delay : float = 30.0,
+                 step : float = 0.05, slow_factor : float = 2.0):
+        self.delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.step = step
+        self.slow_factor = slow_factor
+
+        self.baseline_latency = None
+        self.average_latency = None
+        self.next_request_at = 0.0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        """Block until the next request is allowed, and reserve that slot"""
+        with self.lock:
+            now = time.monotonic()
+            start = max(now, self.next_request_at)
+            self.next_request_at = start + self.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def on_success(self, latency : float):
+        with self.lock:
+            if self.average_latency is None:
+                self.average_latency = latency
+            else:
+                self.average_latency = 0.8 * self.average_latency + 0.2 * latency
+            if self.baseline_latency is None or self.average_latency < self.baseline_latency:
+                self.baseline_latency = self.average_latency
+
+            if self.average_latency > self.slow_factor * self.baseline_latency:
+                # The server is getting slower: we are past what it comfortably serves
+                self.delay = min(self.max_delay, self.delay * 2)
+            else:
+                self.delay = max(self.min_delay, self.delay - self.step)
+
+    def on_pushback(self, retry_after : float = None):
+        with self.lock:
+            self.delay = min(self.max_delay, max(self.delay * 2, self.min_delay))
+        self.defer(retry_after)
+
+    def defer(self, retry_after : float = None):
+        """Hold every request until retry_after seconds from now, without changing the pace"""
+        if retry_after is None:
+            return
+        with self.lock:
+            self.next_request_at = max(self.next_request_at, time.monotonic() + retry_after)
+
+
+def parse_retry_after(value : str):
+    """Seconds to wait from a Retry-After header (either seconds or an HTTP date), or None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt : int) -> float:
+    """Full jitter: uniform between 0 and the capped exponential delay for this attempt"""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * (2 ** attempt)))
+
+
+class FetchClient:
+
+    def __init__(self, throttle : AdaptiveThrottle = None, max_attempts : int = MAX_ATTEMPTS, timeout : float = TIMEOUT):
+        self.throttle = throttle or AdaptiveThrottle()
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent" : USER_AGENT,
+            "Accept-Encoding" : "gzip, deflate",
+            "Connection" : "keep-alive",
+        })
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def close(self):
+        self.session.close()
+
+    def get(self, url : str, stream : bool = False) -> requests.Response:
+        """GET a page with throttling and retries. Raises on a bad status once retries are used up"""
+        for attempt in range(1, self.max_attempts + 1):
+            self.throttle.wait()
+            started = time.monotonic()
+            try:
+                response = self.session.get(url, timeout=self.timeout, stream=stream)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                print("HTTP: " + url + " failed on attempt " + str(attempt) + ": " + str(e))
+                if attempt == self.max_attempts:
+                    raise
+                self.throttle.on_pushback()
+                time.sleep(backoff_delay(attempt))
+                continue
+
+            if response.status_code < 400:
+                self.throttle.on_success(time.monotonic() - started)
+                return response
+
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_attempts:
+                response.close()
+                response.raise_for_status()
+
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            print("HTTP: " + url + " returned " + str(response.status_code) + " on attempt " + str(attempt))
+            response.close()
+
+            if response.status_code in PUSHBACK_STATUSES:
+                self.throttle.on_pushback(retry_after)
+            else:
+                # A server error isn't pushback, but its Retry-After still says when to come back
+                self.throttle.defer(retry_after)
+            if retry_after is None:
+                time.sleep(backoff_delay(attempt))
+
+    def get_text(self, url : str) -> str:
+        with self.get(url) as response:
+            return response.text
+
+    def iter_text(self, url : str, chunk_size : int = 64 * 1024):
+        """Yield a page as decoded text chunks, for stream_parse.iter_records"""
+        with self.get(url, stream=True) as response:
+            response.encoding = response.encoding or "utf-8"
+            yield from response.iter_content(chunk_size=chunk_size, decode_unicode=True)
+
+
+_client = None
+
+
+def get_client() -> FetchClient:
+    """The process-wide client, so every scraper shares one session and one throttle"""
+    global _client
+    if _client is None:
+        _client = FetchClient()
+    return _client
+
+
+def get_url_html_content(url : str) -> str:
+    return get_client().get_text(url)
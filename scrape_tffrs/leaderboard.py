@@ -0,0 +1,178 @@
+# Leaderboard.py
+# Conference top-K per (event, season, gender), kept in EventLeaderboard (feature_tables.sql)
+#
+# Each board holds the best mark of at most K entrants (an athlete, or a school's relay team) in a
+# heap with the worst kept entrant on top, so a new mark is compared against one value and, if it
+# gets in, costs O(log K). repository.py feeds every performance it writes through record(); boards
+# are loaded from the table on first use and written back only when a mark gets in.
+# rebuild() recomputes every board from one streaming scan of Performance.
+
+import heapq
+
+# Entrants kept per board; routes show the top 5, the rest absorbs late improvements
+LEADERBOARD_SIZE = 10
+
+HIGHER_IS_BETTER = ("throws", "jumps", "combined")
+
+# Every performance with its board key. A relay's gender is that of its members; relays with no
+# known members can't be placed and are left out.
+PERFORMANCE_SCAN = """
+    SELECT P.EventID, E.EventType, P.SeasonType, P.SeasonYear, A.Gender, AtS.SchoolID, A.AthleteID,
+        P.ResultValue, P.MeetID
+    FROM Performance AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID
+    JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID
+    UNION ALL
+    SELECT P.EventID, E.EventType, P.SeasonType, P.SeasonYear, P.Gender, P.SchoolID, -1,
+        P.ResultValue, P.MeetID
+    FROM (
+        SELECT Perf.*, RT.SchoolID,
+            (SELECT A.Gender FROM RelayTeamMembers AS RTM
+             JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = RTM.AthleteSeasonID
+             JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID
+             WHERE RTM.RelayTeamID = Perf.RelayTeamID LIMIT 1) AS Gender
+        FROM Performance AS Perf
+        JOIN RelayTeam AS RT ON RT.RelayTeamID = Perf.RelayTeamID
+    ) AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    WHERE P.Gender IS NOT NULL
+"""
+
+
+class TopK:
+    """Best mark of the top size entrants. Entrants are (school_id, athlete_id), athlete_id -1 for relays."""
+
+    def __init__(self, higher : bool, size : int = LEADERBOARD_SIZE):
+        self.higher = higher
+        self.size = size
+        self.members = {}  # entrant -> (mark, meet_id)
+        # (sort key, entrant) with the worst entrant at heap[0]; an entrant that improved leaves a
+        # stale entry behind, skipped when it surfaces and dropped when the heap is compacted
+        self.heap = []
+
+    def _key(self, mark : float) -> float:
+        return mark if self.higher else -mark
+
+    def _is_current(self, entry : tuple) -> bool:
+        key, entrant = entry
+        member = self.members.get(entrant)
+        return member is not None and self._key(member[0]) == key
+
+    def _push(self, entrant : tuple, mark : float, meet_id : int):
+        self.members[entrant] = (mark, meet_id)
+        heapq.heappush(self.heap, (self._key(mark), entrant))
+        if len(self.heap) > 2 * self.size:
+            self.heap = [(self._key(mark), entrant) for entrant, (mark, _) in self.members.items()]
+            heapq.heapify(self.heap)
+
+    def offer(self, entrant : tuple, mark : float, meet_id : int) -> bool:
+        """Count a mark. Returns True if the board changed."""
+        current = self.members.get(entrant)
+        if current is not None:
+            if self._key(mark) <= self._key(current[0]):
+                return False
+            self._push(entrant, mark, meet_id)
+            return True
+
+        if len(self.members) < self.size:
+            self._push(entrant, mark, meet_id)
+            return True
+
+        while not self._is_current(self.heap[0]):
+            heapq.heappop(self.heap)
+        worst_key, worst = self.heap[0]
+        # Ties keep whoever got there first
+        if self._key(mark) <= worst_key:
+            return False
+        heapq.heappop(self.heap)
+        del self.members[worst]
+        self._push(entrant, mark, meet_id)
+        return True
+
+    def ranked(self) -> list:
+        """[(place, school_id, athlete_id, mark, meet_id)] best first"""
+        order = sorted(self.members.items(), key=lambda item: (-self._key(item[1][0]), item[0]))
+        return [(place, school_id, athlete_id, mark, meet_id)
+                for place, ((school_id, athlete_id), (mark, meet_id)) in enumerate(order, start=1)]
+
+
+class Leaderboards:
+    """Every board of one backend, keyed (event_id, season_type, season_year, gender)"""
+
+    def __init__(self, backend, size : int = LEADERBOARD_SIZE):
+        self.backend = backend
+        self.size = size
+        self.boards = {}
+        self._higher = {}
+
+    def higher_is_better(self, event_id : int) -> bool:
+        if event_id not in self._higher:
+            row = self.backend.fetchone("SELECT EventType FROM TrackEvent WHERE EventID = %s", (event_id,))
+            self._higher[event_id] = row is not None and row[0] in HIGHER_IS_BETTER
+        return self._higher[event_id]
+
+    def board(self, key : tuple) -> TopK:
+        """A board, loaded from EventLeaderboard the first time it's used"""
+        if key not in self.boards:
+            board = TopK(self.higher_is_better(key[0]), self.size)
+            for school_id, athlete_id, mark, meet_id in self.backend.fetchall("""
+                SELECT SchoolID, AthleteID, BestMark, MeetID FROM EventLeaderboard
+                WHERE EventID = %s AND SeasonType = %s AND SeasonYear = %s AND Gender = %s
+                ORDER BY Place
+            """, key):
+                board.offer((school_id, -1 if athlete_id is None else athlete_id), mark, meet_id)
+            self.boards[key] = board
+        return self.boards[key]
+
+    def record(self, event_id : int, season_type : str, season_year : int, gender : str,
+               school_id : str, athlete_id : int, mark : float, meet_id : int) -> bool:
+        """Count one performance (athlete_id -1 for a relay) and save its board if it changed"""
+        key = (int(event_id), season_type, int(season_year), gender.upper())
+        entrant = (school_id, int(athlete_id))
+        if not self.board(key).offer(entrant, float(mark), int(meet_id)):
+            return False
+        # Other ingest workers may have raised the stored board since it was loaded (a board only ever
+        # gets better, so a mark rejected above is rejected there too); re-read and rewrite it while
+        # holding the board's lock, so two workers can't both delete it and insert their own places
+        with self.backend.transaction(f"leaderboard:{key}"):
+            del self.boards[key]
+            if not self.board(key).offer(entrant, float(mark), int(meet_id)):
+                return False
+            self.save([key])
+        return True
+
+    def top(self, event_id : int, season_type : str, season_year : int, gender : str, count : int = None) -> list:
+        """[(place, school_id, athlete_id, mark, meet_id)] of a board, best first"""
+        ranked = self.board((int(event_id), season_type, int(season_year), gender.upper())).ranked()
+        return ranked if count is None else ranked[:count]
+
+    def save(self, keys : list):
+        """Replace the stored rows of boards. Run it inside a transaction (see record)."""
+        rows = []
+        for key in keys:
+            self.backend.run("""
+                DELETE FROM EventLeaderboard WHERE EventID = %s AND SeasonType = %s AND SeasonYear = %s AND Gender = %s
+            """, key)
+            rows += [key + (place, school_id, None if athlete_id == -1 else athlete_id, mark, meet_id)
+                     for place, school_id, athlete_id, mark, meet_id in self.boards[key].ranked()]
+        self.backend.run_many("""
+            INSERT INTO EventLeaderboard (EventID, SeasonType, SeasonYear, Gender, Place, SchoolID, AthleteID, BestMark, MeetID)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, rows)
+
+    def rebuild(self):
+        """Recompute every board from one pass over Performance and replace EventLeaderboard"""
+        self.boards = {}
+        for event_id, event_type, season_type, season_year, gender, school_id, athlete_id, mark, meet_id in self.backend.stream(PERFORMANCE_SCAN):
+            key = (int(event_id), season_type, int(season_year), gender)
+            board = self.boards.get(key)
+            if board is None:
+                self._higher[key[0]] = event_type in HIGHER_IS_BETTER
+                board = self.boards[key] = TopK(self._higher[key[0]], self.size)
+            board.offer((school_id, int(athlete_id)), float(mark), int(meet_id))
+
+        with self.backend.transaction():
+            self.backend.run("DELETE FROM EventLeaderboard")
+            self.save(list(self.boards))
+        print(f"LEADERBOARD: Rebuilt {len(self.boards)} leaderboards")
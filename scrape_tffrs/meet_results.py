@@ -0,0 +1,343 @@
+# Meet_results.py
+# Ingest mode reading whole meet results pages instead of per-school performance lists
+#
+# A school's all_performances list only holds that school's athletes, so a meet the whole conference
+# attended is read once per school and gender, and everyone else in the field is missing. This mode
+# fetches each meet's TFRRS results page (https://www.tfrrs.org/results/<MeetID>) once, for the meets
+# already in TrackMeet, and parses every event on it:
+#   - every entrant, from any school, goes to MeetEntry, so placing predictions see the full field
+#   - marks of School athletes the school lists don't have yet go through the repository like any
+#     other scraped mark. The repository skips a mark already stored (same meet, event, athlete or
+#     relay school and result) whichever mode stored it, so the two modes can run in either order
+#     without double counting
+# A meet is recorded in FetchedMeet once ingested and isn't fetched again. Downloaded pages are kept
+# in PAGE_DIR: --reparse ingests the fetched meets again from those saved pages after a parser fix,
+# with no network; --refetch downloads them again.
+#
+# Usage:
+#   python meet_results.py fetch [--meet 86242]... [--limit 50] [--refetch | --reparse] [--profile sampling]
+#   python meet_results.py status
+
+import os
+import re
+import datetime
+import argparse
+from collections import Counter
+from bs4 import BeautifulSoup
+import repository as repo
+import discovery
+import http_client
+import error_log
+import profiling
+from records import IndividualRecord, RelayLeg, RelayRecord, MeetEntryRecord
+
+PAGE_DIR = "pages"
+
+# "Men's 60 Meters Prelims", "Women 4x400 Relay", "Men's Long Jump Final"
+EVENT_TITLE = re.compile(
+    r"^(Men|Women)(?:'s)?\s+(.+?)(?:\s+(Prelims|Preliminaries|Finals?|Heat\s+\d+|Section\s+\d+|Flight\s+\d+))?$",
+    re.IGNORECASE,
+)
+
+ATHLETE_LINK = re.compile(r"/athletes/(\d+)/([A-Za-z0-9_]+)/")
+
+PLACE_COLUMNS = ("PL", "PLACE")
+NAME_COLUMNS = ("NAME", "ATHLETE")
+YEAR_COLUMNS = ("YEAR", "YR", "CLASS")
+RESULT_COLUMNS = ("TIME", "MARK", "POINTS", "SCORE")
+
+
+def meet_url(meet_id : int) -> str:
+    return "https://www.tfrrs.org/results/" + str(meet_id)
+
+
+def normalize_event(name : str) -> str:
+    """Event name as compared between list pages and meet pages: "4 x 400 Relay" and "4x400 Relay" match"""
+    return re.sub(r"[^a-z0-9]", "", name.lower())[:20]
+
+
+def split_name(full_name : str) -> tuple:
+    """(first, last) from "Ye, Spencer" or "Spencer Ye\""""
+    full_name = " ".join(full_name.split())
+    if "," in full_name:
+        last, first = full_name.split(",", 1)
+        return first.strip(), last.strip()
+    first, _, last = full_name.rpartition(" ")
+    return first, last
+
+# ========================================
+# Parsing
+# ========================================
+
+def column(headers : list, names : tuple):
+    for i, header in enumerate(headers):
+        if header in names:
+            return i
+    return None
+
+
+def parse_row(cells : list, row, headers : list, event_name : str, gender : str, section : str, is_relay : bool) -> MeetEntryRecord:
+    def text(names):
+        i = column(headers, names)
+        return " ".join(cells[i].text.split()) if i is not None and i < len(cells) else ""
+
+    place = text(PLACE_COLUMNS)
+    team_cell = cells[column(headers, ("TEAM",))]
+    team_link = discovery.TEAM_LINK.search(team_cell.find("a").get("href", "")) if team_cell.find("a") else None
+    school_id = team_link.group(3) if team_link else ""
+    if team_link:
+        gender = team_link.group(2).upper()
+
+    athlete_id, first_name, last_name, legs = "", "", "", ()
+    if is_relay:
+        legs = []
+        for link in row.find_all("a", href=ATHLETE_LINK):
+            leg_first, leg_last = split_name(link.text)
+            legs.append(RelayLeg(ATHLETE_LINK.search(link.get("href")).group(1), leg_first, leg_last))
+        legs = tuple(legs)
+    else:
+        name_cell = cells[column(headers, NAME_COLUMNS)]
+        link = name_cell.find("a", href=ATHLETE_LINK)
+        if link is None:
+            raise Exception("Entrant without an athlete link: " + name_cell.text.strip())
+        athlete_match = ATHLETE_LINK.search(link.get("href"))
+        athlete_id = athlete_match.group(1)
+        school_id = school_id or athlete_match.group(2)
+        first_name, last_name = split_name(link.text)
+
+    return MeetEntryRecord(event_name, gender, section, int(place) if place.isdigit() else None, athlete_id, first_name,
+                           last_name, text(YEAR_COLUMNS), text(("TEAM",)), school_id, text(RESULT_COLUMNS), text(("WIND",)), legs)
+
+
+def parse_meet_page(file_content : str) -> list:
+    """Every entrant of every event table on a meet results page. Rows that fail to parse are logged and skipped."""
+    soup = BeautifulSoup(file_content, "html.parser")
+
+    entries = []
+    for table in soup.find_all("table"):
+        title = table.find_previous("h3")
+        match = EVENT_TITLE.match(" ".join(title.text.split())) if title else None
+        if match is None or table.find("thead") is None:
+            continue
+        gender = "M" if match.group(1).lower() == "men" else "F"
+        event_name = match.group(2)
+        section = (match.group(3) or "Final").capitalize()
+        if section.startswith("Prelim"):
+            section = "Prelims"
+        elif section.startswith("Final"):
+            section = "Final"
+
+        headers = [" ".join(th.text.split()).upper() for th in table.find("thead").find_all("th")]
+        if column(headers, ("TEAM",)) is None or column(headers, RESULT_COLUMNS) is None:
+            continue
+        is_relay = event_name.endswith("Relay") or column(headers, NAME_COLUMNS) is None
+
+        for row in (table.find("tbody") or table).find_all("tr"):
+            cells = row.find_all("td")
+            if len(cells) < len(headers):
+                continue
+            try:
+                entries.append(parse_row(cells, row, headers, event_name, gender, section, is_relay))
+            except Exception as e:
+                error_log.log_failed(str(e) + "\n" + str(row) + "\n\n")
+
+    return entries
+
+# ========================================
+# Ingest
+# ========================================
+
+def event_ids(backend) -> dict:
+    """normalize_event(name) -> (EventID, IsRelay) for every event seen on the school lists"""
+    return {normalize_event(name): (event_id, bool(is_relay))
+            for event_id, name, is_relay in backend.fetchall("SELECT EventID, EventName, IsRelay FROM TrackEvent")}
+
+
+def meet_season(backend, meet_id : int, start_date) -> tuple:
+    """(SeasonType, SeasonYear) the school lists filed the meet under, else guessed from its date"""
+    row = backend.fetchone("""
+        SELECT SeasonType, SeasonYear FROM Performance WHERE MeetID = %s
+        GROUP BY SeasonType, SeasonYear ORDER BY COUNT(*) DESC LIMIT 1
+    """, (meet_id,))
+    if row:
+        return row[0], int(row[1])
+    date = datetime.date.fromisoformat(str(start_date)[:10])
+    # Indoor seasons run December to March and are named after the year they end in
+    if date.month == 12:
+        return "Indoor", date.year + 1
+    return ("Indoor" if date.month <= 3 else "Outdoor"), date.year
+
+
+def ingested_marks(backend, meet_id : int) -> set:
+    """Keys of the marks already stored for a meet: (event, athlete id, result) and (event, relay school, result)"""
+    keys = set()
+    for event_id, athlete_id, relay_school, result_value in backend.fetchall("""
+        SELECT P.EventID, AtS.AthleteID, R.SchoolID, P.ResultValue
+        FROM Performance AS P
+        LEFT JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID
+        LEFT JOIN RelayTeam AS R ON R.RelayTeamID = P.RelayTeamID
+        WHERE P.MeetID = %s
+    """, (meet_id,)):
+        keys.add((event_id, athlete_id if athlete_id is not None else relay_school, round(float(result_value), 2)))
+    return keys
+
+
+def ingest_meet(meet_id : int, file_content : str) -> tuple:
+    """Store a meet page's full field and add the School athletes' marks the school lists missed. Returns (entries, added)."""
+    backend = repo.get_backend()
+    meet = backend.fetchone("SELECT MeetName, StartDate FROM TrackMeet WHERE MeetID = %s", (int(meet_id),))
+    if meet is None:
+        raise Exception("Meet " + str(meet_id) + " is not in TrackMeet")
+    meet_name, start_date = meet[0], str(meet[1])[:10]
+    season_type, season_year = meet_season(backend, int(meet_id), start_date)
+    events = event_ids(backend)
+    schools = {row[0] for row in backend.fetchall("SELECT SchoolID FROM School")}
+    seen = ingested_marks(backend, int(meet_id))
+
+    rows = []
+    added = 0
+    skipped = Counter()
+    for entry in parse_meet_page(file_content):
+        event = events.get(normalize_event(entry.event_name))
+        if event is None:
+            skipped["unknown event " + entry.event_name] += 1
+            continue
+        event_id, is_relay = event
+        result_value = repo.convert_result_to_decimal(entry.result)
+        if is_relay:
+            entry_key = (entry.school_id or entry.team_name) + "|" + entry.result
+            entrant = entry.team_name
+        else:
+            entry_key = entry.athlete_id
+            entrant = entry.first_name + " " + entry.last_name
+        rows.append((int(meet_id), event_id, entry.gender, entry.section[:20], entry_key[:120],
+                     int(entry.athlete_id) if entry.athlete_id else None, entrant[:200], entry.team_name[:100],
+                     entry.school_id[:100] or None, entry.place, result_value, repo.convert_wind_to_decimal(entry.wind)))
+
+        if entry.school_id not in schools or result_value is None:
+            continue
+        key = (event_id, entry.school_id if is_relay else int(entry.athlete_id), round(result_value, 2))
+        if key in seen:
+            skipped["already ingested"] += 1
+            continue
+        seen.add(key)
+        try:
+            if is_relay:
+                repo.insert_relay_record(RelayRecord(event_id, entry.legs, str(meet_id), meet_name, start_date, entry.result, entry.wind),
+                                         season_type, season_year, entry.gender, entry.school_id)
+            else:
+                repo.insert_individual_record(IndividualRecord(event_id, entry.athlete_id, entry.first_name, entry.last_name,
+                                                               entry.class_year, str(meet_id), meet_name, start_date, entry.result, entry.wind),
+                                              season_type, season_year, entry.gender, entry.school_id)
+            added += 1
+        except Exception as e:
+            error_log.log_failed(str(e) + "\n" + str(entry) + "\n\n")
+
+    backend.run_many("""
+        INSERT INTO MeetEntry (MeetID, EventID, Gender, Section, EntryKey, AthleteID, EntrantName, TeamName, TeamSlug,
+                               Place, ResultValue, WindGauge)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (MeetID, EventID, Gender, Section, EntryKey) DO UPDATE SET
+            Place = EXCLUDED.Place, ResultValue = EXCLUDED.ResultValue, WindGauge = EXCLUDED.WindGauge
+    """, rows)
+    backend.run("""
+        INSERT INTO FetchedMeet (MeetID, FetchedOn, Entries, Added) VALUES (%s, %s, %s, %s)
+        ON CONFLICT (MeetID) DO UPDATE SET FetchedOn = EXCLUDED.FetchedOn, Entries = EXCLUDED.Entries, Added = EXCLUDED.Added
+    """, (int(meet_id), datetime.date.today().isoformat(), len(rows), added))
+
+    print(f"MEET RESULTS: Meet {meet_id} '{meet_name}': {len(rows)} entries, {added} marks added"
+          + "".join(f", {count} {reason}" for reason, count in sorted(skipped.items())))
+    return len(rows), added
+
+
+def pending_meets(backend, refetch : bool = False, reparse : bool = False) -> list:
+    """MeetIDs of TrackMeet, oldest first: the ones not fetched yet, every one if refetch, only the fetched ones if reparse"""
+    if reparse:
+        condition = "WHERE MeetID IN (SELECT MeetID FROM FetchedMeet)"
+    else:
+        condition = "" if refetch else "WHERE MeetID NOT IN (SELECT MeetID FROM FetchedMeet)"
+    return [row[0] for row in backend.fetchall(f"SELECT MeetID FROM TrackMeet {condition} ORDER BY StartDate, MeetID")]
+
+
+def load_page(meet_id : int, refetch : bool = False, reparse : bool = False) -> str:
+    """A meet's results page, from PAGE_DIR if it was downloaded before. With reparse it is never downloaded."""
+    path = os.path.join(PAGE_DIR, "meet_" + str(meet_id) + ".html")
+    if reparse and not os.path.exists(path):
+        raise Exception("Meet " + str(meet_id) + " has no saved page in " + PAGE_DIR)
+    if os.path.exists(path) and not refetch:
+        with open(path, "r") as f:
+            return f.read()
+    html_content = http_client.get_url_html_content(meet_url(meet_id))
+    os.makedirs(PAGE_DIR, exist_ok=True)
+    with open(path, "w") as f:
+        f.write(html_content)
+    return html_content
+
+
+@profiling.profiled("meet_results.fetch_meets")
+def fetch_meets(meet_ids : list = None, limit : int = None, refetch : bool = False, reparse : bool = False) -> int:
+    """
+    Fetch and ingest the results page of each meet not fetched yet (or of meet_ids). reparse ingests
+    the fetched meets again from their saved pages. profile= see profiling.py
+    """
+    if refetch and reparse:
+        raise Exception("Pass refetch or reparse, not both")
+    if meet_ids is None:
+        meet_ids = pending_meets(repo.get_backend(), refetch, reparse)
+    if limit is not None:
+        meet_ids = meet_ids[:limit]
+
+    count = 0
+    try:
+        for meet_id in meet_ids:
+            try:
+                ingest_meet(meet_id, load_page(meet_id, refetch, reparse))
+            except Exception as e:
+                # http_client already retried with backoff
+                print("ERROR: Failed to ingest meet " + str(meet_id))
+                print(e)
+                continue
+            count += 1
+    except BaseException:
+        repo.fail_changes(f"meet_results {count} meets")
+        raise
+    print(f"MEET RESULTS: Ingested {count} of {len(meet_ids)} meets")
+    repo.flush_changes(f"meet_results {count} meets")
+    return count
+
+
+def status(backend) -> dict:
+    meets, fetched, added = backend.fetchone("""
+        SELECT (SELECT COUNT(*) FROM TrackMeet), COUNT(*), COALESCE(SUM(Added), 0) FROM FetchedMeet
+    """)
+    entries, outside = backend.fetchone("""
+        SELECT COUNT(*), COALESCE(SUM(CASE WHEN TeamSlug IS NULL OR TeamSlug NOT IN (SELECT SchoolID FROM School) THEN 1 ELSE 0 END), 0)
+        FROM MeetEntry
+    """)
+    return {"meets": meets, "fetched": fetched, "added": added, "entries": entries, "outside": outside}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ingest whole meet results pages for the meets in TrackMeet")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    fetch_parser = subparsers.add_parser("fetch", help="Fetch and ingest meets whose results page wasn't ingested yet")
+    fetch_parser.add_argument("--meet", type=int, action="append", help="Only these MeetIDs (repeatable)")
+    fetch_parser.add_argument("--limit", type=int)
+    again = fetch_parser.add_mutually_exclusive_group()
+    again.add_argument("--refetch", action="store_true", help="Download and ingest again even if already fetched")
+    again.add_argument("--reparse", action="store_true", help="Ingest the fetched meets again from their saved pages, without downloading")
+    fetch_parser.add_argument("--profile", choices=profiling.MODES, default=os.environ.get("PROFILE"), help="Profile the run (see profiling.py)")
+    subparsers.add_parser("status", help="Meets fetched and entries stored")
+    args = parser.parse_args(argv)
+
+    if args.command == "fetch":
+        fetch_meets(args.meet, args.limit, args.refetch, args.reparse, profile=args.profile)
+    else:
+        counts = status(repo.get_backend())
+        print(f"MEET RESULTS: {counts['fetched']} of {counts['meets']} meets fetched, {counts['entries']} entries "
+              f"({counts['outside']} from outside School), {counts['added']} marks added to Performance")
+    repo.close_connection()
+
+
+if __name__ == "__main__":
+    main()
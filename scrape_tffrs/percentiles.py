@@ -0,0 +1,218 @@
+# Percentiles.py
+# Mark -> percentile lookups from precomputed quantile arrays, kept in MarkPercentiles (feature_tables.sql)
+#
+# For every event, gender and season type the athletes' season-best marks (one per athlete and season,
+# so frequent racers don't count twice) are summarized as an ascending array of at most
+# QUANTILE_POINTS quantiles, for each season, each WINDOW_YEARS-season window and every season
+# together. A lookup is a binary search in one array plus a linear interpolation, so "this 400m ranks
+# in the top 8%" or comparing a 400m to a shot put costs microseconds instead of a sort of the history.
+#
+# The ingest path marks the event seasons it writes to in PercentileDirty; refresh() rebuilds only the
+# arrays of those events, genders and season types. build() recomputes everything in one streaming pass.
+#
+# Usage:
+#   python percentiles.py build
+#   python percentiles.py refresh
+#   python percentiles.py lookup 46 M Indoor 7.01 [--years 2022-2025]
+
+import bisect
+import argparse
+import itertools
+from array import array
+from leaderboard import HIGHER_IS_BETTER
+
+# Values kept per array: exact below this many marks, quantiles at 1% steps above
+QUANTILE_POINTS = 101
+
+# Length of the trailing season windows (a college career)
+WINDOW_YEARS = 4
+
+# (FirstYear, LastYear) of the arrays covering every season
+ALL_YEARS = (0, 0)
+
+# Each athlete's season best per event season, grouped by event, gender and season type. {} takes a
+# condition limiting the scan to one group.
+SEASON_BESTS = """
+    SELECT P.EventID, A.Gender, P.SeasonType, E.EventType, P.SeasonYear, MIN(P.ResultValue), MAX(P.ResultValue)
+    FROM Performance AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID
+    JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID
+    WHERE E.IsRelay = FALSE {}
+    GROUP BY P.EventID, A.Gender, P.SeasonType, E.EventType, P.SeasonYear, A.AthleteID
+    ORDER BY P.EventID, A.Gender, P.SeasonType
+"""
+
+
+def quantiles(marks : list, points : int = QUANTILE_POINTS) -> array:
+    """Ascending array summarizing marks: the marks themselves if there are few, else evenly spaced quantiles"""
+    marks = sorted(marks)
+    n = len(marks)
+    if n <= points:
+        return array("d", marks)
+    result = array("d")
+    for k in range(points):
+        position = k * (n - 1) / (points - 1)
+        low = int(position)
+        high = min(low + 1, n - 1)
+        result.append(marks[low] + (marks[high] - marks[low]) * (position - low))
+    return result
+
+
+def percentile(values : array, higher : bool, mark : float) -> float:
+    """Percent of the summarized marks that mark beats (100 = better than all of them)"""
+    n = len(values)
+    i = bisect.bisect_left(values, mark)
+    if n == 1:
+        below = 0.5 if mark == values[0] else float(i)
+    elif i == 0:
+        below = 0.0
+    elif i == n:
+        below = 1.0
+    else:
+        below = (i - 1 + (mark - values[i - 1]) / (values[i] - values[i - 1])) / (n - 1)
+    return 100.0 * (below if higher else 1.0 - below)
+
+
+def year_ranges(years) -> list:
+    """(FirstYear, LastYear) of every array built from marks in these season years: each season, the
+    WINDOW_YEARS seasons ending in each season, and every season"""
+    ranges = {ALL_YEARS}
+    for year in years:
+        ranges.add((year, year))
+        ranges.add((year - WINDOW_YEARS + 1, year))
+    return sorted(ranges)
+
+
+def group_arrays(event_type : str, marks_by_year : dict) -> list:
+    """[(first_year, last_year, higher, mark count, quantile array)] for one event, gender and season type"""
+    higher = event_type in HIGHER_IS_BETTER
+    arrays = []
+    for first, last in year_ranges(marks_by_year):
+        if (first, last) == ALL_YEARS:
+            marks = [mark for year_marks in marks_by_year.values() for mark in year_marks]
+        else:
+            marks = [mark for year in range(first, last + 1) for mark in marks_by_year.get(year, ())]
+        arrays.append((first, last, higher, len(marks), quantiles(marks)))
+    return arrays
+
+
+def _write(backend, rows : list):
+    backend.run_many("""
+        INSERT INTO MarkPercentiles (EventID, Gender, SeasonType, FirstYear, LastYear, HigherIsBetter, MarkCount, Quantiles)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, [key + (first, last, higher, count, values.tobytes()) for key, (first, last, higher, count, values) in rows])
+
+
+def _scan(backend, condition : str = "", params : tuple = ()):
+    """Yield ((event_id, gender, season_type), event_type, {season_year: [season bests]}) per group"""
+    for key, rows in itertools.groupby(backend.stream(SEASON_BESTS.format(condition), params), key=lambda r: r[:3]):
+        marks_by_year = {}
+        event_type = None
+        for _, _, _, event_type, season_year, low, high in rows:
+            marks_by_year.setdefault(int(season_year), []).append(float(high if event_type in HIGHER_IS_BETTER else low))
+        yield (int(key[0]), key[1], key[2]), event_type, marks_by_year
+
+
+def build(backend) -> int:
+    """Recompute every array from one pass over Performance"""
+    backend.run("DELETE FROM PercentileDirty")
+    backend.run("DELETE FROM MarkPercentiles")
+    rows = []
+    for key, event_type, marks_by_year in _scan(backend):
+        rows += [(key, array_row) for array_row in group_arrays(event_type, marks_by_year)]
+    _write(backend, rows)
+    print(f"PERCENTILES: Built {len(rows)} percentile arrays")
+    return len(rows)
+
+
+def mark_dirty(backend, event_id : int, gender : str, season_type : str, season_year : int):
+    """Called by the ingest path for every individual mark it writes"""
+    backend.run("""
+        INSERT INTO PercentileDirty (EventID, Gender, SeasonType, SeasonYear) VALUES (%s, %s, %s, %s)
+        ON CONFLICT DO NOTHING
+    """, (int(event_id), gender.upper(), season_type, int(season_year)))
+
+
+def refresh(backend) -> int:
+    """Rebuild the arrays of every event, gender and season type with marks ingested since the last refresh"""
+    dirty = backend.fetchall("SELECT EventID, Gender, SeasonType, SeasonYear FROM PercentileDirty")
+    groups = sorted({(event_id, gender, season_type) for event_id, gender, season_type, _ in dirty})
+    rows = []
+    for group in groups:
+        backend.run("DELETE FROM MarkPercentiles WHERE EventID = %s AND Gender = %s AND SeasonType = %s", group)
+        for key, event_type, marks_by_year in _scan(backend, "AND P.EventID = %s AND A.Gender = %s AND P.SeasonType = %s", group):
+            rows += [(key, array_row) for array_row in group_arrays(event_type, marks_by_year)]
+    _write(backend, rows)
+    # Only the rows read above: marks ingested meanwhile stay dirty for the next refresh
+    backend.run_many("""
+        DELETE FROM PercentileDirty WHERE EventID = %s AND Gender = %s AND SeasonType = %s AND SeasonYear = %s
+    """, dirty)
+    print(f"PERCENTILES: Refreshed {len(rows)} percentile arrays for {len(groups)} events")
+    return len(groups)
+
+
+class Percentiles:
+    """Every percentile array of a backend in memory, for repeated lookups"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.arrays = None
+
+    def load(self):
+        self.arrays = {}
+        for event_id, gender, season_type, first, last, higher, count, data in self.backend.fetchall("""
+            SELECT EventID, Gender, SeasonType, FirstYear, LastYear, HigherIsBetter, MarkCount, Quantiles FROM MarkPercentiles
+        """):
+            values = array("d")
+            values.frombytes(bytes(data))
+            self.arrays[(event_id, gender, season_type, first, last)] = (bool(higher), count, values)
+
+    def lookup(self, event_id : int, gender : str, season_type : str, mark : float, years : tuple = None) -> float:
+        """
+        Percent of athletes' season bests that mark beats, over every season or the years (first, last)
+        of a stored range: one season (2025, 2025) or a WINDOW_YEARS window ending in a season.
+        Returns None when there are no marks for the range.
+        """
+        if self.arrays is None:
+            self.load()
+        first, last = years or ALL_YEARS
+        entry = self.arrays.get((int(event_id), gender.upper(), season_type, int(first), int(last)))
+        if entry is None:
+            return None
+        higher, _, values = entry
+        return percentile(values, higher, float(mark))
+
+
+def main(argv=None):
+    import repository as repo
+
+    parser = argparse.ArgumentParser(description="Mark percentile arrays per event, gender, season type and year range")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="Recompute every array")
+    subparsers.add_parser("refresh", help="Rebuild the arrays of events with newly ingested marks")
+    lookup_parser = subparsers.add_parser("lookup", help="Percentile of a mark")
+    lookup_parser.add_argument("event_id", type=int)
+    lookup_parser.add_argument("gender", choices=["M", "F"])
+    lookup_parser.add_argument("season_type", choices=["Indoor", "Outdoor"])
+    lookup_parser.add_argument("mark", type=float)
+    lookup_parser.add_argument("--years", default=None, help="FIRST-LAST, e.g. 2025-2025 or 2022-2025 (default: every season)")
+    args = parser.parse_args(argv)
+
+    backend = repo.get_backend()
+    if args.command == "build":
+        build(backend)
+    elif args.command == "refresh":
+        refresh(backend)
+    else:
+        years = tuple(int(year) for year in args.years.split("-")) if args.years else None
+        result = Percentiles(backend).lookup(args.event_id, args.gender, args.season_type, args.mark, years)
+        if result is None:
+            print("PERCENTILES: No marks for that event, gender, season type and years")
+        else:
+            print(f"PERCENTILES: {args.mark} beats {result:.1f}% of season bests (top {100 - result:.1f}%)")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+# Profiling.py
+# Built-in profiling for the scrape, ingest and prediction entry points
+#
+# An entry point decorated with @profiled takes an extra profile= keyword:
+#   "deterministic"  cProfile of every call (exact counts, slows the run down)
+#   "sampling"       the profiled thread's stack every SAMPLE_INTERVAL seconds (cheap, statistical)
+#
+# Each profiled run writes two files to PROFILE_DIR (default ./profiles), both tagged with the entry
+# point and the arguments it was called with:
+#   <entry>_<params>_<time>.txt     hot functions, sorted by own time and by cumulative time
+#   <entry>_<params>_<time>.folded  collapsed stacks ("outer;inner;leaf count") for flamegraph.pl,
+#                                   speedscope or inferno; the root frame carries the run's arguments
+# Stacks always come from the sampler, so the .folded file is available in both modes.
+#
+#   python download_page.py --profile sampling
+#   scrape.scrape_file(html, "Indoor", 2025, "m", "Johns_Hopkins", profile="deterministic")
+#
+# Profiles don't nest: an entry point called inside a profiled run (scrape_file inside
+# download_page.main) is recorded as part of the outer profile.
+
+import io
+import os
+import re
+import sys
+import time
+import inspect
+import cProfile
+import pstats
+import functools
+import threading
+from collections import Counter
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+
+MODES = ("deterministic", "sampling")
+
+# Seconds between stack samples
+SAMPLE_INTERVAL = 0.005
+
+# Functions listed in each section of the report
+REPORT_LINES = 40
+
+_active = False
+
+
+def describe(value) -> str:
+    """Short printable form of an argument; page contents and other long values become their length"""
+    if isinstance(value, (str, bytes)) and len(value) > 40:
+        return f"<{len(value)} chars>"
+    if isinstance(value, (list, tuple, dict, set)):
+        return f"<{len(value)} items>"
+    return str(value)
+
+
+def frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ",")
+
+
+class StackSampler:
+    """Counts the stacks of one thread, sampled from a background thread"""
+
+    def __init__(self, thread_id : int, interval : float = SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiling-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        this_file = os.path.abspath(__file__)
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                if os.path.abspath(frame.f_code.co_filename) != this_file:
+                    stack.append(frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def report(self, limit : int = REPORT_LINES) -> str:
+        """Functions by samples on top of the stack (own) and anywhere in it (cumulative)"""
+        total = sum(self.stacks.values())
+        own = Counter()
+        cumulative = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for label in set(stack):
+                cumulative[label] += count
+
+        lines = [f"{total} samples, {self.interval * 1000:g} ms apart"]
+        for title, counts in (("own samples", own), ("cumulative samples", cumulative)):
+            lines.append(f"\nSorted by {title}\n{'samples':>9} {'%':>6}  function")
+            for label, count in counts.most_common(limit):
+                lines.append(f"{count:>9} {100.0 * count / max(total, 1):>6.1f}  {label}")
+        return "\n".join(lines) + "\n"
+
+
+class Profiler:
+    """Context manager profiling the calling thread and writing the report and stack files on exit"""
+
+    def __init__(self, name : str, params : dict = None, mode : str = "deterministic", out_dir : str = None,
+                 interval : float = SAMPLE_INTERVAL):
+        if mode not in MODES:
+            raise Exception(f"Unknown profiling mode '{mode}', expected one of {', '.join(MODES)}")
+        self.name = name
+        self.params = {key: describe(value) for key, value in (params or {}).items()}
+        self.mode = mode
+        self.out_dir = out_dir or PROFILE_DIR
+        self.interval = interval
+        self.paths = None
+
+    def tag(self) -> str:
+        return " ".join([self.name] + [f"{key}={value}" for key, value in self.params.items()])
+
+    def __enter__(self):
+        self.sampler = StackSampler(threading.get_ident(), self.interval)
+        self.profile = cProfile.Profile() if self.mode == "deterministic" else None
+        self.started = time.perf_counter()
+        self.sampler.start()
+        if self.profile is not None:
+            self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profile is not None:
+            self.profile.disable()
+        self.sampler.stop()
+        self.elapsed = time.perf_counter() - self.started
+        self.paths = self.write()
+        print(f"PROFILING: {self.tag()} took {self.elapsed:.2f}s, wrote {self.paths[0]} and {self.paths[1]}")
+        return False
+
+    def write(self) -> tuple:
+        os.makedirs(self.out_dir, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9.=-]+", "_", "_".join([self.name] + [f"{k}={v}" for k, v in self.params.items()]))[:150]
+        stem = os.path.join(self.out_dir, slug.strip("_") + "_" + time.strftime("%Y%m%d-%H%M%S"))
+
+        header = f"# {self.tag()}\n# mode={self.mode} wall={self.elapsed:.3f}s\n\n"
+        if self.profile is not None:
+            out = io.StringIO()
+            stats = pstats.Stats(self.profile, stream=out)
+            out.write("Sorted by own time\n")
+            stats.sort_stats("tottime").print_stats(REPORT_LINES)
+            out.write("Sorted by cumulative time\n")
+            stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+            body = out.getvalue()
+        else:
+            body = self.sampler.report()
+        with open(stem + ".txt", "w") as f:
+            f.write(header + body)
+
+        root = f"[{self.tag()}]".replace(";", ",").replace(" ", "_")
+        with open(stem + ".folded", "w") as f:
+            for stack, count in sorted(self.sampler.stacks.items()):
+                f.write(";".join((root,) + stack) + f" {count}\n")
+        return stem + ".txt", stem + ".folded"
+
+
+def profiled(name : str):
+    """
+    Give an entry point a profile= keyword ("deterministic", "sampling" or None). The run is tagged
+    with the arguments the entry point was called with.
+    """
+    def decorate(function):
+        signature = inspect.signature(function)
+
+        @functools.wraps(function)
+        def run(*args, profile : str = None, **kwargs):
+            global _active
+            if profile is None or _active:
+                return function(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            _active = True
+            try:
+                with Profiler(name, bound.arguments, profile):
+                    return function(*args, **kwargs)
+            finally:
+                _active = False
+        return run
+    return decorate
@@ -0,0 +1,129 @@
+# Progression.py
+# Personal best (PB) and season best (SB) progressions, kept in BestProgression (feature_tables.sql)
+#
+# A progression is the list of marks that improved on everything before them, with the date, the
+# mark and the improvement. rebuild() computes every athlete's progressions in one pass over their
+# performances sorted by athlete, event and date, keeping the running best. record() is the ingest
+# path: the existing progression rows are exactly the marks a new mark has to beat, so adding one
+# re-runs the same pass over a handful of rows.
+
+import itertools
+from leaderboard import HIGHER_IS_BETTER
+
+# Individual marks with the date of their meet, grouped for the progression pass
+PERFORMANCE_SCAN = """
+    SELECT AtS.AthleteID, P.EventID, P.SeasonType, E.EventType, P.SeasonYear, M.StartDate, P.ResultValue, P.MeetID
+    FROM Performance AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    JOIN TrackMeet AS M ON M.MeetID = P.MeetID
+    JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID
+    ORDER BY AtS.AthleteID, P.EventID, P.SeasonType, M.StartDate
+"""
+
+_higher = {}
+
+
+def improvements(marks, higher : bool) -> list:
+    """
+    The marks that improved on every earlier one, best of each day only.
+    marks are (date, season_year, mark, meet_id) in any order;
+    returns [(date, season_year, mark, improvement, meet_id)], improvement None for the first.
+    """
+    progression = []
+    best = None
+    # By date, and within a day best first, so one pass with a running best finds every record
+    for date, season_year, mark, meet_id in sorted(marks, key=lambda m: (m[0], -m[2] if higher else m[2])):
+        if best is None:
+            progression.append((date, season_year, mark, None, meet_id))
+        elif (mark > best) if higher else (mark < best):
+            progression.append((date, season_year, mark, round(abs(mark - best), 2), meet_id))
+        else:
+            continue
+        best = mark
+    return progression
+
+
+def progressions(marks, higher : bool) -> dict:
+    """{("PB", None): PB progression, ("SB", season_year): SB progression} for one athlete, event and season type"""
+    marks = list(marks)
+    result = {("PB", None): improvements(marks, higher)}
+    for season_year in {m[1] for m in marks}:
+        result[("SB", season_year)] = improvements([m for m in marks if m[1] == season_year], higher)
+    return result
+
+
+def _rows(athlete_id : int, event_id : int, season_type : str, kind : str, progression : list) -> list:
+    return [(athlete_id, event_id, season_type, kind, season_year, date, mark, improvement, meet_id)
+            for date, season_year, mark, improvement, meet_id in progression]
+
+
+def _insert(backend, rows : list):
+    backend.run_many("""
+        INSERT INTO BestProgression (AthleteID, EventID, SeasonType, Kind, SeasonYear, MarkDate, Mark, Improvement, MeetID)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, rows)
+
+
+def higher_is_better(backend, event_id : int) -> bool:
+    if event_id not in _higher:
+        row = backend.fetchone("SELECT EventType FROM TrackEvent WHERE EventID = %s", (event_id,))
+        _higher[event_id] = row is not None and row[0] in HIGHER_IS_BETTER
+    return _higher[event_id]
+
+
+def record(backend, athlete_id : int, event_id : int, season_type : str, season_year : int, meet_id : int, mark : float) -> bool:
+    """Fold one new individual mark into the athlete's PB and SB progressions. Returns True if either changed."""
+    athlete_id, event_id, season_year, meet_id = int(athlete_id), int(event_id), int(season_year), int(meet_id)
+    higher = higher_is_better(backend, event_id)
+    row = backend.fetchone("SELECT StartDate FROM TrackMeet WHERE MeetID = %s", (meet_id,))
+    if row is None:
+        return False
+    new_mark = (row[0], season_year, float(mark), meet_id)
+
+    # Read and rewrite under the athlete event's lock: two workers folding marks into the same progression
+    # would otherwise both delete it and insert their own rows
+    with backend.transaction(f"progression:{athlete_id}:{event_id}:{season_type}"):
+        existing = {("PB", None): [], ("SB", season_year): []}
+        for kind, year, date, old_mark, meet in backend.fetchall("""
+            SELECT Kind, SeasonYear, MarkDate, Mark, MeetID FROM BestProgression
+            WHERE AthleteID = %s AND EventID = %s AND SeasonType = %s AND (Kind = 'PB' OR SeasonYear = %s)
+        """, (athlete_id, event_id, season_type, season_year)):
+            existing[(kind, None if kind == "PB" else year)].append((date, year, old_mark, meet))
+
+        changed = False
+        for (kind, year), marks in existing.items():
+            before = improvements(marks, higher)
+            after = improvements(marks + [new_mark], higher)
+            if after == before:
+                continue
+            if kind == "PB":
+                backend.run("""
+                    DELETE FROM BestProgression WHERE AthleteID = %s AND EventID = %s AND SeasonType = %s AND Kind = 'PB'
+                """, (athlete_id, event_id, season_type))
+            else:
+                backend.run("""
+                    DELETE FROM BestProgression
+                    WHERE AthleteID = %s AND EventID = %s AND SeasonType = %s AND Kind = 'SB' AND SeasonYear = %s
+                """, (athlete_id, event_id, season_type, year))
+            _insert(backend, _rows(athlete_id, event_id, season_type, kind, after))
+            changed = True
+        return changed
+
+
+def rebuild(backend, batch_size : int = 10000):
+    """Recompute BestProgression for every athlete from one sorted streaming scan of Performance"""
+    backend.run("DELETE FROM BestProgression")
+
+    rows = []
+    groups = 0
+    scan = backend.stream(PERFORMANCE_SCAN)
+    for (athlete_id, event_id, season_type, event_type), marks in itertools.groupby(scan, key=lambda r: r[:4]):
+        marks = [(date, season_year, float(mark), meet_id) for _, _, _, _, season_year, date, mark, meet_id in marks]
+        for (kind, _), progression in progressions(marks, event_type in HIGHER_IS_BETTER).items():
+            rows += _rows(athlete_id, event_id, season_type, kind, progression)
+        groups += 1
+        if len(rows) >= batch_size:
+            _insert(backend, rows)
+            rows = []
+    _insert(backend, rows)
+    print(f"PROGRESSION: Rebuilt progressions for {groups} athlete events")
@@ -0,0 +1,227 @@
+# Quarantine.py
+# Dead-letter store for performance rows the parser could not handle
+#
+# scrape.parse_event and stream_parse quarantine a failing row's HTML together with its page
+# context (season, gender, school, event) and the parser version that failed on it. Once the parser
+# is fixed (and PARSER_VERSION bumped), replay re-parses just those rows and writes them to the
+# repository, with no network access and without re-parsing the pages they came from.
+#
+# The store is a SQLite file (QUARANTINE_PATH, default quarantine.db), in rollback journal mode like
+# work_queue.db so workers on several hosts can share it over a network filesystem. error_log.txt still
+# gets a human-readable copy of every failure.
+#
+# Usage:
+#   python quarantine.py status
+#   python quarantine.py list [--limit 20]
+#   python quarantine.py replay [--all] [--dry-run]
+
+import os
+import re
+import time
+import hashlib
+import sqlite3
+import argparse
+from collections import namedtuple
+from bs4 import BeautifulSoup
+import scrape
+import repository as repo
+
+QUARANTINE_PATH = os.environ.get(
+    "QUARANTINE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "quarantine.db"),
+)
+
+QuarantinedRow = namedtuple("QuarantinedRow", ["row_id", "season_year", "season_type", "gender", "school_id",
+                                               "event_id", "is_relay", "row_html", "parser_version", "error", "attempts"])
+
+ROW_COLUMNS = "RowID, SeasonYear, SeasonType, Gender, SchoolID, EventID, IsRelay, RowHTML, ParserVersion, Error, Attempts"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS QuarantinedRow (
+    RowID           INTEGER PRIMARY KEY,
+    SeasonYear      INT NOT NULL,
+    SeasonType      VARCHAR(10) NOT NULL,
+    Gender          VARCHAR(1) NOT NULL,
+    SchoolID        VARCHAR(100) NOT NULL,
+    EventID         INT NOT NULL,
+    IsRelay         BOOLEAN NOT NULL,
+    RowHash         VARCHAR(64) NOT NULL,
+    RowHTML         TEXT NOT NULL,
+    ParserVersion   INT NOT NULL,
+    Error           TEXT NOT NULL,
+    Status          VARCHAR(11) NOT NULL DEFAULT 'quarantined' CHECK (Status IN ('quarantined', 'replayed')),
+    Attempts        INT NOT NULL DEFAULT 1,
+    CreatedAt       REAL NOT NULL,
+    UpdatedAt       REAL NOT NULL,
+    UNIQUE (SeasonYear, SeasonType, Gender, SchoolID, EventID, RowHash)
+);
+
+CREATE INDEX IF NOT EXISTS QuarantinedRow_Status ON QuarantinedRow (Status, ParserVersion);
+"""
+
+
+def normalize(row_html : str) -> str:
+    """Row HTML without layout whitespace, so the soup and stream parsers' copies of a row match"""
+    return re.sub(r"\s*(<|>)\s*", r"\1", " ".join(row_html.split()))
+
+
+class Quarantine:
+
+    def __init__(self, path : str = QUARANTINE_PATH):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, row_html : str, error : str, event_id : int, is_relay : bool, season_type : str, season_year : int,
+            gender : str, school_id : str, parser_version : int):
+        """Quarantine a row; a row that fails again (e.g. the page was re-scraped) is updated, not duplicated"""
+        now = time.time()
+        row_hash = hashlib.sha256(normalize(row_html).encode("utf-8", "surrogatepass")).hexdigest()
+        self.connection.execute("""
+            INSERT INTO QuarantinedRow (SeasonYear, SeasonType, Gender, SchoolID, EventID, IsRelay, RowHash, RowHTML,
+                                        ParserVersion, Error, CreatedAt, UpdatedAt)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (SeasonYear, SeasonType, Gender, SchoolID, EventID, RowHash) DO UPDATE SET
+                ParserVersion = EXCLUDED.ParserVersion,
+                Error = EXCLUDED.Error,
+                Status = 'quarantined',
+                Attempts = QuarantinedRow.Attempts + 1,
+                UpdatedAt = EXCLUDED.UpdatedAt
+        """, (int(season_year), season_type, gender.upper(), school_id, int(event_id), bool(is_relay), row_hash, row_html,
+              int(parser_version), error, now, now))
+
+    def quarantined(self, before_version : int = None, limit : int = None) -> list:
+        """Rows still quarantined, optionally only those that failed on a parser older than before_version"""
+        query = "SELECT " + ROW_COLUMNS + " FROM QuarantinedRow WHERE Status = 'quarantined'"
+        params = []
+        if before_version is not None:
+            query += " AND ParserVersion < ?"
+            params.append(before_version)
+        query += " ORDER BY RowID"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        return [QuarantinedRow(*row) for row in self.connection.execute(query, params)]
+
+    def mark_replayed(self, row_ids : list):
+        now = time.time()
+        self.connection.executemany("""
+            UPDATE QuarantinedRow SET Status = 'replayed', UpdatedAt = ? WHERE RowID = ?
+        """, [(now, row_id) for row_id in row_ids])
+
+    def mark_failed(self, failures : list, parser_version : int):
+        """failures: [(row_id, error)] that failed again with parser_version"""
+        now = time.time()
+        self.connection.executemany("""
+            UPDATE QuarantinedRow SET ParserVersion = ?, Error = ?, Attempts = Attempts + 1, UpdatedAt = ? WHERE RowID = ?
+        """, [(parser_version, error, now, row_id) for row_id, error in failures])
+
+    def status_counts(self) -> dict:
+        counts = {"quarantined": 0, "replayed": 0}
+        for status, count in self.connection.execute("SELECT Status, COUNT(*) FROM QuarantinedRow GROUP BY Status"):
+            counts[status] = count
+        return counts
+
+
+_quarantine = None
+
+def get_quarantine() -> Quarantine:
+    global _quarantine
+    if _quarantine is None:
+        _quarantine = Quarantine()
+    return _quarantine
+
+
+def quarantine_row(row_html : str, error : Exception, event_id : int, is_relay : bool, season_type : str, season_year : int,
+                   gender : str, school_id : str, parser_version : int):
+    """Called by the parsers for a row that raised"""
+    get_quarantine().add(row_html, type(error).__name__ + ": " + str(error), event_id, is_relay,
+                         season_type, season_year, gender, school_id, parser_version)
+
+
+# ============================================================
+# REPLAY
+# ============================================================
+
+def parse_row(row : QuarantinedRow):
+    """Re-parse one quarantined row with the current parser"""
+    performance = BeautifulSoup(row.row_html, "html.parser").find("div")
+    if performance is None:
+        raise Exception("Quarantined HTML has no row element")
+    parse = scrape.parse_relay_performance if row.is_relay else scrape.parse_individual_performance
+    return parse(row.event_id, row.season_type, row.season_year, row.gender.lower(), row.school_id, performance)
+
+
+def replay(quarantine : Quarantine, all_rows : bool = False, ingest : bool = True, batch_size : int = 500) -> tuple:
+    """
+    Re-parse quarantined rows (by default only those that failed on an older parser version) and write
+    the ones that now parse to the repository. Returns (replayed, still failing).
+    """
+    rows = quarantine.quarantined(None if all_rows else scrape.PARSER_VERSION)
+    replayed = 0
+    failing = 0
+    try:
+        for start in range(0, len(rows), batch_size):
+            done = []
+            failures = []
+            for row in rows[start:start + batch_size]:
+                try:
+                    record = parse_row(row)
+                    if ingest:
+                        scrape.ingest_record(record, row.season_type, row.season_year, row.gender.lower(), row.school_id)
+                    done.append(row.row_id)
+                except Exception as e:
+                    failures.append((row.row_id, type(e).__name__ + ": " + str(e)))
+
+            if ingest:
+                quarantine.mark_replayed(done)
+                quarantine.mark_failed(failures, scrape.PARSER_VERSION)
+            replayed += len(done)
+            failing += len(failures)
+    except BaseException:
+        repo.fail_changes(f"quarantine replay {replayed} rows")
+        raise
+    if ingest:
+        repo.flush_changes(f"quarantine replay {replayed} rows")
+    return replayed, failing
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Inspect and replay quarantined performance rows")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Count quarantined and replayed rows")
+
+    list_parser = subparsers.add_parser("list", help="Show quarantined rows and their errors")
+    list_parser.add_argument("--limit", type=int, default=20)
+
+    replay_parser = subparsers.add_parser("replay", help="Re-parse quarantined rows and write them to the repository")
+    replay_parser.add_argument("--all", action="store_true", help="Also retry rows that failed on the current parser version")
+    replay_parser.add_argument("--dry-run", action="store_true", help="Only report which rows would now parse")
+
+    args = parser.parse_args(argv)
+    quarantine = Quarantine()
+
+    if args.command == "status":
+        counts = quarantine.status_counts()
+        print(f"QUARANTINE: {counts['quarantined']} quarantined, {counts['replayed']} replayed (parser version {scrape.PARSER_VERSION})")
+
+    elif args.command == "list":
+        for row in quarantine.quarantined(limit=args.limit):
+            print(f"{row.row_id}: {row.season_year} {row.season_type} {row.gender} {row.school_id} event {row.event_id} "
+                  f"(parser v{row.parser_version}, {row.attempts} attempts): {row.error}")
+
+    elif args.command == "replay":
+        replayed, failing = replay(quarantine, all_rows=args.all, ingest=not args.dry_run)
+        verb = "would replay" if args.dry_run else "replayed"
+        print(f"QUARANTINE: {verb} {replayed} rows, {failing} still failing")
+
+    quarantine.close()
+
+
+if __name__ == "__main__":
+    main()
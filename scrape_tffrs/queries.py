@@ -0,0 +1,410 @@
+# Queries.py
+# Read side of repository.py: the analytical queries of db_generating/queries.sql as functions
+#
+# Each function takes the values the SQL file hard-codes (athlete, school, season, event, meet) as
+# parameters and returns the rows as a list of tuples, in the column order of the SQL file. Results
+# are kept in an LRU cache keyed by query and parameters. repository.py bumps its ingest generation on
+# every write; the first read after a bump drops the whole cache, so repeated reads between ingests
+# never reach the database and a read after an ingest never sees stale rows.
+#
+# The generation lives in this process, so a reader in another process than the ingest should call
+# clear_cache() when it knows the database changed.
+#
+#   import queries
+#   queries.personal_best("Spencer", "Ye", "400")
+#   queries.roster("Johns_Hopkins", 2025, "Indoor")
+
+from collections import OrderedDict
+import repository as repo
+
+# Results kept before the least recently used is dropped
+CACHE_SIZE = 256
+
+# Meet name pattern of the conference championships
+CONFERENCE_MEET = "%centennial%conference%"
+
+
+class ResultCache:
+    """LRU of query results, valid for one backend and ingest generation"""
+
+    def __init__(self, size : int = CACHE_SIZE):
+        self.size = size
+        self.results = OrderedDict()
+        self.backend = None
+        self.generation = None
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        self.results.clear()
+
+    def validate(self, backend, generation : int):
+        if backend is not self.backend or generation != self.generation:
+            self.clear()
+            self.backend = backend
+            self.generation = generation
+
+    def get(self, key : tuple):
+        rows = self.results.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.results.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def put(self, key : tuple, rows : tuple):
+        self.results[key] = rows
+        self.results.move_to_end(key)
+        while len(self.results) > self.size:
+            self.results.popitem(last=False)
+
+
+_cache = ResultCache()
+
+
+def clear_cache():
+    _cache.clear()
+
+
+def cache_info() -> dict:
+    return {"hits": _cache.hits, "misses": _cache.misses, "size": len(_cache.results), "generation": _cache.generation}
+
+
+def _read(name : str, query : str, params : tuple) -> list:
+    """Run a query through the cache. {ilike}, {year_of} and {distinct_list} take the backend's dialect."""
+    backend = repo.get_backend()
+    _cache.validate(backend, repo.ingest_generation())
+    key = (name,) + params
+    rows = _cache.get(key)
+    if rows is None:
+        sql = query.format(ilike=backend.ilike, year_of=backend.year_of.format("tm.StartDate"),
+                           distinct_list=backend.distinct_list.format("e.EventName"))
+        rows = tuple(tuple(row) for row in backend.fetchall(sql, params))
+        _cache.put(key, rows)
+    return list(rows)
+
+
+def _contains(text : str) -> str:
+    """LIKE pattern matching text anywhere, as the SQL file matches event and meet names"""
+    return "%" + text + "%"
+
+
+# ============================================================
+# ATHLETES
+# ============================================================
+
+def personal_best(first_name : str, last_name : str, event_name : str) -> list:
+    """QUERY 1: (first name, last name, event, PB) for each individual event matching event_name"""
+    return _read("personal_best", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, e.EventName, MIN(p.ResultValue) AS PersonalBest
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE a.AthleteLastName = %s AND a.AthleteFirstName = %s AND e.EventName LIKE %s AND e.IsRelay = FALSE
+        GROUP BY a.AthleteFirstName, a.AthleteLastName, e.EventName
+    """, (last_name, first_name, _contains(event_name)))
+
+
+def season_bests(first_name : str, last_name : str, event_name : str) -> list:
+    """QUERY 3: (season year, season type, event, SB), latest season first"""
+    return _read("season_bests", """
+        SELECT ats.SeasonYear, ats.SeasonType, e.EventName, MIN(p.ResultValue) AS SeasonBest
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE a.AthleteLastName = %s AND a.AthleteFirstName = %s AND e.EventName LIKE %s AND e.IsRelay = FALSE
+        GROUP BY ats.SeasonYear, ats.SeasonType, e.EventName
+        ORDER BY ats.SeasonYear DESC, ats.SeasonType
+    """, (last_name, first_name, _contains(event_name)))
+
+
+def athlete_results(first_name : str, last_name : str, season_year : int) -> list:
+    """QUERY 4: (meet, date, event, result, wind) for every mark in a year"""
+    return _read("athlete_results", """
+        SELECT tm.MeetName, tm.StartDate, e.EventName, p.ResultValue, p.WindGauge
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+        WHERE a.AthleteLastName = %s AND a.AthleteFirstName = %s AND p.SeasonYear = %s
+        ORDER BY tm.StartDate, e.EventName
+    """, (last_name, first_name, int(season_year)))
+
+
+def pb_progression(first_name : str, last_name : str, event_name : str) -> list:
+    """QUERY 13: (season year, season type, class year, SB) per season, oldest first"""
+    return _read("pb_progression", """
+        SELECT ats.SeasonYear, ats.SeasonType, ats.ClassYear, MIN(p.ResultValue) AS SeasonBest
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE a.AthleteLastName = %s AND a.AthleteFirstName = %s AND e.EventName LIKE %s AND e.IsRelay = FALSE
+        GROUP BY ats.SeasonYear, ats.SeasonType, ats.ClassYear
+        ORDER BY ats.SeasonYear, ats.SeasonType
+    """, (last_name, first_name, _contains(event_name)))
+
+
+def head_to_head(last_name_a : str, last_name_b : str, event_name : str) -> list:
+    """QUERY 16: (athlete, meet, date, result) for two athletes in one event, by date"""
+    return _read("head_to_head", """
+        SELECT a.AthleteFirstName || ' ' || a.AthleteLastName AS Athlete, tm.MeetName, tm.StartDate, p.ResultValue
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+        WHERE (a.AthleteLastName = %s OR a.AthleteLastName = %s) AND e.EventName LIKE %s AND e.IsRelay = FALSE
+        ORDER BY tm.StartDate, p.ResultValue
+    """, (last_name_a, last_name_b, _contains(event_name)))
+
+
+def most_relay_appearances(limit : int = 10) -> list:
+    """QUERY 9: (first name, last name, school, relay count)"""
+    return _read("most_relay_appearances", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, COUNT(DISTINCT rtm.RelayTeamID) AS RelayCount
+        FROM RelayTeamMembers rtm
+        JOIN AthleteSeason ats ON rtm.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName
+        ORDER BY RelayCount DESC
+        LIMIT %s
+    """, (int(limit),))
+
+
+def most_performances(season_year : int, season_type : str, limit : int = 20) -> list:
+    """QUERY 18: (first name, last name, school, performance count) for a season"""
+    return _read("most_performances", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, COUNT(*) AS PerformanceCount
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        WHERE p.SeasonYear = %s AND p.SeasonType = %s
+        GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName
+        ORDER BY PerformanceCount DESC
+        LIMIT %s
+    """, (int(season_year), season_type, int(limit)))
+
+
+def multi_event_athletes(season_year : int, min_events : int = 3) -> list:
+    """QUERY 19: (first name, last name, school, event count, events) for athletes in min_events or more events"""
+    return _read("multi_event_athletes", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, COUNT(DISTINCT e.EventID) AS EventCount,
+            {distinct_list} AS Events
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE p.SeasonYear = %s AND e.IsRelay = FALSE
+        GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName
+        HAVING COUNT(DISTINCT e.EventID) >= %s
+        ORDER BY EventCount DESC
+    """, (int(season_year), int(min_events)))
+
+
+# ============================================================
+# SCHOOLS
+# ============================================================
+
+def school_athletes(school_id : str, season_year : int, season_type : str) -> list:
+    """QUERY 2: (first name, last name, class year) of a school's athletes in a season"""
+    return _read("school_athletes", """
+        SELECT DISTINCT a.AthleteFirstName, a.AthleteLastName, ats.ClassYear
+        FROM Athlete a
+        JOIN AthleteSeason ats ON a.AthleteID = ats.AthleteID
+        WHERE ats.SchoolID = %s AND ats.SeasonYear = %s AND ats.SeasonType = %s
+        ORDER BY a.AthleteLastName, a.AthleteFirstName
+    """, (school_id, int(season_year), season_type))
+
+
+def roster(school_id : str, season_year : int, season_type : str) -> list:
+    """QUERY 11: (first name, last name, class year, gender) of a school's roster in a season"""
+    return _read("roster", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, ats.ClassYear, a.Gender
+        FROM Athlete a
+        JOIN AthleteSeason ats ON a.AthleteID = ats.AthleteID
+        WHERE ats.SchoolID = %s AND ats.SeasonYear = %s AND ats.SeasonType = %s
+        ORDER BY a.AthleteLastName, a.AthleteFirstName
+    """, (school_id, int(season_year), season_type))
+
+
+def seniors_by_school(season_year : int) -> list:
+    """QUERY 10: (school, senior count) in a year"""
+    return _read("seniors_by_school", """
+        SELECT s.SchoolName, COUNT(DISTINCT a.AthleteID) AS SeniorCount
+        FROM AthleteSeason ats
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        WHERE ats.ClassYear = 'SR' AND ats.SeasonYear = %s
+        GROUP BY s.SchoolID, s.SchoolName
+        ORDER BY SeniorCount DESC
+    """, (int(season_year),))
+
+
+def school_records(school_id : str) -> list:
+    """QUERY 14: (event, first name, last name, best) for a school's timed individual events"""
+    return _read("school_records", """
+        SELECT e.EventName, a.AthleteFirstName, a.AthleteLastName, MIN(p.ResultValue) AS SchoolRecord
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE ats.SchoolID = %s AND e.IsRelay = FALSE AND e.MeasureUnit = 'seconds'
+        GROUP BY e.EventID, e.EventName, a.AthleteID, a.AthleteFirstName, a.AthleteLastName
+        ORDER BY e.EventName
+    """, (school_id,))
+
+
+def meets_attended(school_id : str, season_year : int) -> list:
+    """QUERY 15: (meet, start date, end date, performance count) for a school's meets in a year"""
+    return _read("meets_attended", """
+        SELECT DISTINCT tm.MeetName, tm.StartDate, tm.EndDate, COUNT(DISTINCT p.PerformanceID) AS PerformanceCount
+        FROM TrackMeet tm
+        JOIN Performance p ON tm.MeetID = p.MeetID
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        WHERE ats.SchoolID = %s AND p.SeasonYear = %s
+        GROUP BY tm.MeetID, tm.MeetName, tm.StartDate, tm.EndDate
+        ORDER BY tm.StartDate
+    """, (school_id, int(season_year)))
+
+
+def average_by_event_type(season_year : int) -> list:
+    """QUERY 20: (school, event type, performance count, average result) for a year"""
+    return _read("average_by_event_type", """
+        SELECT s.SchoolName, e.EventType, COUNT(*) AS PerformanceCount, ROUND(AVG(p.ResultValue), 2) AS AvgResult
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        WHERE p.SeasonYear = %s
+        GROUP BY s.SchoolID, s.SchoolName, e.EventType
+        ORDER BY s.SchoolName, e.EventType
+    """, (int(season_year),))
+
+
+# ============================================================
+# MEETS AND EVENTS
+# ============================================================
+
+def championship_results(event_name : str, year : int, limit : int = 10) -> list:
+    """QUERY 5: (first name, last name, school, result) of an event at the conference championships"""
+    return _read("championship_results", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, p.ResultValue
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+        WHERE e.EventName LIKE %s AND e.IsRelay = FALSE
+          AND tm.MeetName {ilike} %s AND {year_of} = %s
+        ORDER BY p.ResultValue ASC
+        LIMIT %s
+    """, (_contains(event_name), CONFERENCE_MEET, int(year), int(limit)))
+
+
+def championship_team_scores(year : int, season_type : str = "Outdoor") -> list:
+    """QUERY 6: (school, points) at a conference championship, 10-8-6-5-4-3-2-1 scoring"""
+    return _read("championship_team_scores", """
+        WITH RankedPerformances AS (
+            SELECT p.PerformanceID, e.EventID, e.EventName, COALESCE(ats.SchoolID, rt.SchoolID) AS SchoolID, p.ResultValue,
+                CASE
+                    WHEN e.MeasureUnit = 'seconds' THEN ROW_NUMBER() OVER (PARTITION BY e.EventID ORDER BY p.ResultValue ASC)
+                    ELSE ROW_NUMBER() OVER (PARTITION BY e.EventID ORDER BY p.ResultValue DESC)
+                END AS Place
+            FROM Performance p
+            JOIN TrackEvent e ON p.EventID = e.EventID
+            JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+            LEFT JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+            LEFT JOIN RelayTeam rt ON p.RelayTeamID = rt.RelayTeamID
+            WHERE tm.MeetName {ilike} %s AND {year_of} = %s
+        )
+        SELECT s.SchoolName,
+            SUM(CASE Place WHEN 1 THEN 10 WHEN 2 THEN 8 WHEN 3 THEN 6 WHEN 4 THEN 5
+                           WHEN 5 THEN 4 WHEN 6 THEN 3 WHEN 7 THEN 2 WHEN 8 THEN 1 ELSE 0 END) AS TotalPoints
+        FROM RankedPerformances rp
+        JOIN School s ON rp.SchoolID = s.SchoolID
+        WHERE rp.Place <= 8
+        GROUP BY s.SchoolName
+        ORDER BY TotalPoints DESC
+    """, (CONFERENCE_MEET + season_type.lower() + "%", int(year)))
+
+
+def top_performers(season_year : int, season_type : str, places : int = 5) -> list:
+    """QUERY 7: (event, first name, last name, school, best, rank) for the top timed marks of a season"""
+    return _read("top_performers", """
+        WITH RankedAthletes AS (
+            SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, e.EventName, MIN(p.ResultValue) AS BestMark,
+                ROW_NUMBER() OVER (PARTITION BY e.EventID ORDER BY MIN(p.ResultValue) ASC) AS ConferenceRank
+            FROM Performance p
+            JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+            JOIN Athlete a ON ats.AthleteID = a.AthleteID
+            JOIN School s ON ats.SchoolID = s.SchoolID
+            JOIN TrackEvent e ON p.EventID = e.EventID
+            WHERE p.SeasonYear = %s AND p.SeasonType = %s AND e.IsRelay = FALSE AND e.MeasureUnit = 'seconds'
+            GROUP BY a.AthleteID, a.AthleteFirstName, a.AthleteLastName, s.SchoolName, e.EventID, e.EventName
+        )
+        SELECT EventName, AthleteFirstName, AthleteLastName, SchoolName, BestMark, ConferenceRank
+        FROM RankedAthletes
+        WHERE ConferenceRank <= %s
+        ORDER BY EventName, ConferenceRank
+    """, (int(season_year), season_type, int(places)))
+
+
+def individual_and_relay_athletes(meet_name : str) -> list:
+    """QUERY 8: (first name, last name, school) of athletes with both an individual mark and a relay leg at a meet"""
+    pattern = _contains(meet_name)
+    return _read("individual_and_relay_athletes", """
+        SELECT DISTINCT a.AthleteFirstName, a.AthleteLastName, s.SchoolName
+        FROM Athlete a
+        JOIN AthleteSeason ats ON a.AthleteID = ats.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        WHERE EXISTS (
+                SELECT 1 FROM Performance p
+                JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+                WHERE p.AthleteSeasonID = ats.AthleteSeasonID AND tm.MeetName {ilike} %s
+            )
+            AND EXISTS (
+                SELECT 1 FROM RelayTeamMembers rtm
+                JOIN RelayTeam rt ON rtm.RelayTeamID = rt.RelayTeamID
+                JOIN TrackMeet tm ON rt.MeetID = tm.MeetID
+                WHERE rtm.AthleteSeasonID = ats.AthleteSeasonID AND tm.MeetName {ilike} %s
+            )
+    """, (pattern, pattern))
+
+
+def meet_event_results(event_name : str, meet_name : str) -> list:
+    """QUERY 12: (first name, last name, school, result, wind) for one event at one meet"""
+    return _read("meet_event_results", """
+        SELECT a.AthleteFirstName, a.AthleteLastName, s.SchoolName, p.ResultValue, p.WindGauge
+        FROM Performance p
+        JOIN AthleteSeason ats ON p.AthleteSeasonID = ats.AthleteSeasonID
+        JOIN Athlete a ON ats.AthleteID = a.AthleteID
+        JOIN School s ON ats.SchoolID = s.SchoolID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+        WHERE e.EventName LIKE %s AND tm.MeetName {ilike} %s
+        ORDER BY p.ResultValue ASC
+    """, (_contains(event_name), _contains(meet_name)))
+
+
+def best_relay_teams(event_name : str = "4 x 400", limit : int = 10) -> list:
+    """QUERY 17: (school, event, meet, result) of the fastest relays"""
+    return _read("best_relay_teams", """
+        SELECT s.SchoolName, e.EventName, tm.MeetName, p.ResultValue
+        FROM Performance p
+        JOIN RelayTeam rt ON p.RelayTeamID = rt.RelayTeamID
+        JOIN School s ON rt.SchoolID = s.SchoolID
+        JOIN TrackEvent e ON p.EventID = e.EventID
+        JOIN TrackMeet tm ON p.MeetID = tm.MeetID
+        WHERE e.EventName LIKE %s
+        ORDER BY p.ResultValue ASC
+        LIMIT %s
+    """, (_contains(event_name), int(limit)))
@@ -0,0 +1,255 @@
+# Ratings.py
+# Head-to-head strength ratings per athlete and event group, kept in AthleteRating (feature_tables.sql)
+#
+# Every meet is one Glicko rating period. In each event an entrant scores the share of the field they
+# beat (ties count half) against the rest of the field as one composite opponent, whose rating and
+# deviation are the field's mean rating and RMS deviation without the entrant. Both come from the
+# field's totals, so an event costs a sort of its entrants instead of a comparison of every pair.
+# An athlete's results in every event of a group (60m and 200m are both sprints) at a meet are
+# combined into one update, and deviation grows back between meets so returning athletes move faster.
+#
+# Meets are applied in date order. update() applies only meets newer than every rated meet; if an
+# ingest added marks to a meet that's already rated or older than one, the ratings are rebuilt from
+# one streaming pass over Performance, which is what rebuild() does.
+#
+# Usage:
+#   python ratings.py update
+#   python ratings.py rebuild
+#   python ratings.py top sprints M [--count 20]
+
+import math
+import datetime
+import argparse
+import itertools
+from leaderboard import HIGHER_IS_BETTER
+
+INITIAL_RATING = 1500.0
+INITIAL_DEVIATION = 350.0
+MIN_DEVIATION = 30.0
+
+# Deviation added per sqrt(day) without a meet: 50 grows back to 350 in about three years
+DEVIATION_GROWTH = 6.5
+
+Q = math.log(10) / 400
+
+# Best individual mark of each athlete in each event of each meet, meets in date order. {} takes an
+# extra condition for update().
+MEET_SCAN = """
+    SELECT M.StartDate, P.MeetID, P.EventID, E.EventType, A.Gender, A.AthleteID, MIN(P.ResultValue), MAX(P.ResultValue)
+    FROM Performance AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    JOIN TrackMeet AS M ON M.MeetID = P.MeetID
+    JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID
+    JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID
+    WHERE E.IsRelay = FALSE {}
+    GROUP BY M.StartDate, P.MeetID, P.EventID, E.EventType, A.Gender, A.AthleteID
+    ORDER BY M.StartDate, P.MeetID
+"""
+
+MEET_COUNTS = """
+    SELECT P.MeetID, M.StartDate, COUNT(*)
+    FROM Performance AS P
+    JOIN TrackEvent AS E ON E.EventID = P.EventID
+    JOIN TrackMeet AS M ON M.MeetID = P.MeetID
+    WHERE E.IsRelay = FALSE AND P.AthleteSeasonID IS NOT NULL
+    GROUP BY P.MeetID, M.StartDate
+"""
+
+
+def day_of(value) -> int:
+    """Day number of a DATE as returned by either backend (date object or ISO string)"""
+    if isinstance(value, datetime.date):
+        return value.toordinal()
+    return datetime.date.fromisoformat(str(value)[:10]).toordinal()
+
+
+def g(deviation : float) -> float:
+    return 1 / math.sqrt(1 + 3 * (Q * deviation) ** 2 / math.pi ** 2)
+
+
+def field_scores(marks : list, higher : bool) -> list:
+    """Share of the rest of the field each mark beat, ties counting half, in the order given"""
+    n = len(marks)
+    order = sorted(range(n), key=lambda i: -marks[i] if higher else marks[i])
+    scores = [0.0] * n
+    start = 0
+    while start < n:
+        end = start
+        while end + 1 < n and marks[order[end + 1]] == marks[order[start]]:
+            end += 1
+        tied = end - start + 1
+        score = (n - end - 1 + 0.5 * (tied - 1)) / (n - 1)
+        for k in range(start, end + 1):
+            scores[order[k]] = score
+        start = end + 1
+    return scores
+
+
+class Ratings:
+    """Rating state of every athlete, keyed (athlete_id, event_group)"""
+
+    def __init__(self):
+        self.players = {}  # key -> [rating, deviation, meet count, last day]
+        self.changed = set()
+
+    def current(self, key : tuple, day : int) -> tuple:
+        """(rating, deviation) going into a meet on day, deviation grown for the time since the last one"""
+        player = self.players.get(key)
+        if player is None:
+            return INITIAL_RATING, INITIAL_DEVIATION
+        rating, deviation, _, last_day = player
+        return rating, min(math.sqrt(deviation ** 2 + DEVIATION_GROWTH ** 2 * max(day - last_day, 0)), INITIAL_DEVIATION)
+
+    def rate_meet(self, day : int, results : list):
+        """
+        Apply one meet. results are (event_id, event_group, gender, athlete_id, mark), best mark per
+        athlete and event.
+        """
+        before = {}
+        totals = {}  # key -> [sum of g * (score - expected), sum of g^2 * E * (1 - E)]
+        fields = itertools.groupby(sorted(results, key=lambda r: (r[0], r[2])), key=lambda r: (r[0], r[2]))
+        for _, field in fields:
+            field = list(field)
+            n = len(field)
+            if n < 2:
+                continue
+            group = field[0][1]
+            keys = [(athlete_id, group) for _, _, _, athlete_id, _ in field]
+            for key in keys:
+                if key not in before:
+                    before[key] = self.current(key, day)
+            rating_sum = sum(before[key][0] for key in keys)
+            variance_sum = sum(before[key][1] ** 2 for key in keys)
+            scores = field_scores([mark for _, _, _, _, mark in field], group in HIGHER_IS_BETTER)
+
+            for key, score in zip(keys, scores):
+                rating, deviation = before[key]
+                opponent_rating = (rating_sum - rating) / (n - 1)
+                opponent_g = g(math.sqrt(max(variance_sum - deviation ** 2, 0) / (n - 1)))
+                expected = 1 / (1 + 10 ** (-opponent_g * (rating - opponent_rating) / 400))
+                total = totals.setdefault(key, [0.0, 0.0])
+                total[0] += opponent_g * (score - expected)
+                total[1] += opponent_g ** 2 * expected * (1 - expected)
+
+        for key, (gain, information) in totals.items():
+            rating, deviation = before[key]
+            variance = 1 / (1 / deviation ** 2 + Q ** 2 * information)
+            meets = self.players[key][2] if key in self.players else 0
+            self.players[key] = [rating + Q * variance * gain, max(math.sqrt(variance), MIN_DEVIATION), meets + 1, day]
+            self.changed.add(key)
+
+    # ============================================================
+    # STORAGE
+    # ============================================================
+
+    @classmethod
+    def load(cls, backend) -> "Ratings":
+        ratings = cls()
+        for athlete_id, group, rating, deviation, meets, last_date in backend.fetchall("""
+            SELECT AthleteID, EventGroup, Rating, Deviation, MeetCount, LastDate FROM AthleteRating
+        """):
+            ratings.players[(athlete_id, group)] = [rating, deviation, meets, day_of(last_date)]
+        return ratings
+
+    def save(self, backend):
+        """Write the ratings changed since load"""
+        backend.run_many("""
+            INSERT INTO AthleteRating (AthleteID, EventGroup, Rating, Deviation, MeetCount, LastDate)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (AthleteID, EventGroup) DO UPDATE SET
+                Rating = EXCLUDED.Rating, Deviation = EXCLUDED.Deviation,
+                MeetCount = EXCLUDED.MeetCount, LastDate = EXCLUDED.LastDate
+        """, [(athlete_id, group, rating, deviation, meets, datetime.date.fromordinal(last_day).isoformat())
+              for (athlete_id, group), (rating, deviation, meets, last_day) in ((key, self.players[key]) for key in sorted(self.changed))])
+        self.changed = set()
+
+
+def _apply(backend, ratings : Ratings, scan, counts : dict) -> int:
+    """Rate every meet of a scan and record them in RatedMeet. Returns the meets applied."""
+    rated = []
+    for (start_date, meet_id), rows in itertools.groupby(scan, key=lambda r: (r[0], r[1])):
+        results = [(event_id, group, gender, athlete_id, float(high if group in HIGHER_IS_BETTER else low))
+                   for _, _, event_id, group, gender, athlete_id, low, high in rows]
+        ratings.rate_meet(day_of(start_date), results)
+        rated.append((meet_id, start_date, counts.get(meet_id, 0)))
+
+    ratings.save(backend)
+    backend.run_many("""
+        INSERT INTO RatedMeet (MeetID, StartDate, Performances) VALUES (%s, %s, %s)
+        ON CONFLICT (MeetID) DO UPDATE SET Performances = EXCLUDED.Performances
+    """, rated)
+    return len(rated)
+
+
+def rebuild(backend) -> int:
+    """Recompute every rating from one pass over Performance in meet order"""
+    backend.run("DELETE FROM AthleteRating")
+    backend.run("DELETE FROM RatedMeet")
+    counts = {meet_id: count for meet_id, _, count in backend.fetchall(MEET_COUNTS)}
+    meets = _apply(backend, Ratings(), backend.stream(MEET_SCAN.format("")), counts)
+    print(f"RATINGS: Rebuilt ratings from {meets} meets")
+    return meets
+
+
+def update(backend) -> int:
+    """Apply meets ingested since the last update, or rebuild if an already-rated period changed"""
+    rated = {meet_id: (day_of(start_date), count)
+             for meet_id, start_date, count in backend.fetchall("SELECT MeetID, StartDate, Performances FROM RatedMeet")}
+    current = backend.fetchall(MEET_COUNTS)
+    changed = [(day_of(start_date), meet_id) for meet_id, start_date, count in current
+               if rated.get(meet_id) != (day_of(start_date), count)]
+    if not changed:
+        print("RATINGS: No new meets")
+        return 0
+
+    newest = max(((day, meet_id) for meet_id, (day, _) in rated.items()), default=None)
+    if newest is not None and min(changed) <= newest:
+        print("RATINGS: Marks were added to an already rated period, rebuilding")
+        return rebuild(backend)
+
+    start_date = datetime.date.fromordinal(newest[0]).isoformat() if newest else "0001-01-01"
+    scan = backend.stream(MEET_SCAN.format("AND (M.StartDate > %s OR (M.StartDate = %s AND P.MeetID > %s))"),
+                          (start_date, start_date, newest[1] if newest else -1))
+    meets = _apply(backend, Ratings.load(backend), scan, {meet_id: count for meet_id, _, count in current})
+    print(f"RATINGS: Applied {meets} new meets")
+    return meets
+
+
+def top(backend, group : str, gender : str, count : int = 20) -> list:
+    """[(athlete_id, first name, last name, rating, deviation)] by conservative strength (rating - 2 deviations)"""
+    return backend.fetchall("""
+        SELECT R.AthleteID, A.AthleteFirstName, A.AthleteLastName, R.Rating, R.Deviation
+        FROM AthleteRating AS R
+        JOIN Athlete AS A ON A.AthleteID = R.AthleteID
+        WHERE R.EventGroup = %s AND A.Gender = %s
+        ORDER BY R.Rating - 2 * R.Deviation DESC
+        LIMIT %s
+    """, (group, gender.upper(), count))
+
+
+def main(argv=None):
+    import repository as repo
+
+    parser = argparse.ArgumentParser(description="Athlete strength ratings per event group")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("update", help="Apply meets ingested since the last update")
+    subparsers.add_parser("rebuild", help="Recompute every rating")
+    top_parser = subparsers.add_parser("top", help="Strongest athletes of an event group")
+    top_parser.add_argument("group", choices=["sprints", "distance", "jumps", "throws", "combined"])
+    top_parser.add_argument("gender", choices=["M", "F"])
+    top_parser.add_argument("--count", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    backend = repo.get_backend()
+    if args.command == "update":
+        update(backend)
+    elif args.command == "rebuild":
+        rebuild(backend)
+    else:
+        for place, (athlete_id, first_name, last_name, rating, deviation) in enumerate(top(backend, args.group, args.gender, args.count), start=1):
+            print(f"{place:>3}. {first_name} {last_name} ({athlete_id}): {rating:.0f} ± {2 * deviation:.0f}")
+    backend.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+# Record_cache.py
+# Cache of parsed page records, so replaying a page (into a new schema, a local backend or a
+# corrected repository) skips BeautifulSoup entirely.
+#
+# Records are keyed by the page's content hash and the parser version, and stored as
+# zlib-compressed pickles: record_cache/<sha256>_v<version>.bin
+
+import os
+import zlib
+import pickle
+import hashlib
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "record_cache")
+
+
+def cache_key(file_content : str, parser_version : int) -> str:
+    digest = hashlib.sha256(file_content.encode("utf-8", "surrogatepass")).hexdigest()
+    return digest + "_v" + str(parser_version)
+
+
+def cache_path(key : str) -> str:
+    return os.path.join(CACHE_DIR, key + ".bin")
+
+
+def load(key : str):
+    """Cached records for a key, or None if the page hasn't been parsed with this parser version"""
+    path = cache_path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            return pickle.loads(zlib.decompress(f.read()))
+    except (OSError, zlib.error, pickle.UnpicklingError, EOFError, AttributeError):
+        # Corrupt or written by an incompatible record type: treat as a miss and re-parse
+        return None
+
+
+def store(key : str, records : list):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    data = zlib.compress(pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # Write then rename so a crash never leaves a half-written cache entry
+    temp_path = cache_path(key) + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    os.replace(temp_path, cache_path(key))
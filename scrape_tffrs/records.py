@@ -0,0 +1,180 @@
+# Records.py
+# Record types shared by the scraper, the repository and the prediction jobs
+#
+# Single records are slotted dataclasses: named fields, no per-instance __dict__.
+# PerformanceBatch holds many performances column by column in typed arrays (array module), with
+# repeated strings (event names, schools, athlete names) stored once and referenced by index, so a
+# whole season in memory costs a few dozen bytes per performance instead of a tuple of objects each.
+
+import datetime
+from array import array
+from dataclasses import dataclass
+
+EPOCH = datetime.date(1970, 1, 1)
+
+# ============================================================
+# PARSED PAGE RECORDS
+# ============================================================
+# Page context (season, gender, school) is passed alongside, not stored per record
+
+@dataclass(slots=True)
+class EventRecord:
+    event_id: int
+    name: str
+    is_relay: bool
+
+
+@dataclass(slots=True)
+class IndividualRecord:
+    event_id: int
+    athlete_id: str
+    first_name: str
+    last_name: str
+    class_year: str
+    meet_id: str
+    meet_name: str
+    meet_date: str
+    result: str
+    wind: str
+
+
+@dataclass(slots=True)
+class RelayLeg:
+    athlete_id: str
+    first_name: str
+    last_name: str
+
+
+@dataclass(slots=True)
+class RelayRecord:
+    event_id: int
+    legs: tuple
+    meet_id: str
+    meet_name: str
+    meet_date: str
+    result: str
+    wind: str
+
+
+@dataclass(slots=True)
+class MeetEntryRecord:
+    """One entrant of one event on a meet results page (meet_results.py), from any school"""
+    event_name: str
+    gender: str
+    section: str
+    place: int  # None when unplaced (DNF, DQ...)
+    athlete_id: str  # "" for relays
+    first_name: str
+    last_name: str
+    class_year: str
+    team_name: str
+    school_id: str  # the team's TFRRS slug, "" if the page doesn't link the team
+    result: str
+    wind: str
+    legs: tuple = ()
+
+# ============================================================
+# PERFORMANCES FOR ANALYSIS
+# ============================================================
+
+@dataclass(slots=True)
+class PerformanceRow:
+    """One mark, already converted: result as a float and the meet date as days since 1970-01-01"""
+    event_id: int
+    event_name: str
+    event_type: str
+    school_id: str
+    athlete_id: int  # -1 for relays
+    first_name: str
+    last_name: str
+    day: int
+    mark: float
+    meet_id: int = -1
+
+    @property
+    def date(self) -> datetime.date:
+        return EPOCH + datetime.timedelta(days=self.day)
+
+    @property
+    def entrant(self) -> tuple:
+        """(event_id, school_id, athlete_id): an athlete, or a school's relay team"""
+        return (self.event_id, self.school_id, self.athlete_id)
+
+
+def day_number(value) -> int:
+    """Days since 1970-01-01 for a date (or an int that already is one)"""
+    if isinstance(value, datetime.date):
+        return (value - EPOCH).days
+    return int(value)
+
+
+class PerformanceBatch:
+    """Column store of PerformanceRows. Iterating or indexing builds rows on demand."""
+
+    NUMERIC = {"event_id": "l", "athlete_id": "q", "day": "l", "mark": "d", "meet_id": "q"}
+    STRINGS = ("event_name", "event_type", "school_id", "first_name", "last_name")
+
+    def __init__(self):
+        self.columns = {name: array(typecode) for name, typecode in self.NUMERIC.items()}
+        # Strings are dictionary encoded: codes per row, each distinct value stored once
+        self.codes = {name: array("l") for name in self.STRINGS}
+        self.values = {name: [] for name in self.STRINGS}
+        self._lookup = {name: {} for name in self.STRINGS}
+
+    def __len__(self) -> int:
+        return len(self.columns["mark"])
+
+    def _encode(self, name : str, value : str) -> int:
+        lookup = self._lookup[name]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self.values[name])
+            self.values[name].append(value)
+        return code
+
+    def append(self, row : PerformanceRow):
+        for name in self.NUMERIC:
+            self.columns[name].append(getattr(row, name))
+        for name in self.STRINGS:
+            self.codes[name].append(self._encode(name, getattr(row, name)))
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    @classmethod
+    def from_rows(cls, rows) -> "PerformanceBatch":
+        """
+        Build from PerformanceRows, or from query tuples in PerformanceRow field order
+        (dates and Decimals are converted once here)
+        """
+        batch = cls()
+        for row in rows:
+            if not isinstance(row, PerformanceRow):
+                row = PerformanceRow(int(row[0]), row[1], row[2], row[3], int(row[4]), row[5], row[6],
+                                     day_number(row[7]), float(row[8]), int(row[9]) if len(row) > 9 else -1)
+            batch.append(row)
+        return batch
+
+    def __getitem__(self, i : int) -> PerformanceRow:
+        values = {name: self.columns[name][i] for name in self.NUMERIC}
+        for name in self.STRINGS:
+            values[name] = self.values[name][self.codes[name][i]]
+        return PerformanceRow(**values)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, name : str):
+        """A numeric column's typed array, or a string column decoded to a list"""
+        if name in self.columns:
+            return self.columns[name]
+        return [self.values[name][code] for code in self.codes[name]]
+
+    def select(self, keep) -> "PerformanceBatch":
+        """New batch with the rows for which keep(row) is true"""
+        batch = PerformanceBatch()
+        batch.extend(row for row in self if keep(row))
+        return batch
+
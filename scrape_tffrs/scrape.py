@@ -1,13 +1,25 @@
+import os
+import argparse
 from bs4 import BeautifulSoup
 import re
 import repository as repo
 import error_log
+import record_cache
+import quarantine
+import profiling
+from records import EventRecord, IndividualRecord, RelayLeg, RelayRecord
+
+# Bump whenever parsing changes what records a page produces, so cached records are re-parsed
+PARSER_VERSION = 2
+
+# Parsed records are EventRecord, IndividualRecord and RelayRecord (records.py). Page context
+# (season, gender, school) is passed alongside, not stored per record.
 
 
 def reduce_all_whitespace(string : str):
     return " ".join(string.split())
 
-def scrape_individual_performance(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, performance : BeautifulSoup):
+def parse_individual_performance(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, performance : BeautifulSoup) -> IndividualRecord:
     print("------------------Scraping Performance------------------")
 
     print("Event ID: " + str(eventId))
@@ -74,14 +86,10 @@ def scrape_individual_performance(eventId : int, season_type : str, season_year
         wind_info = wind_info.text.strip()
     print("Wind Info: " + wind_info)
 
-    repo.insert_athlete(athlete_id, athlete_first_name, athlete_last_name, gender)
-    repo.insert_meet(meet_id, meet_name, reduce_all_whitespace(meet_date))
-    repo.insert_athlete_performance(
-        meet_id, athlete_id, eventId, school_id, result, wind_info,
-        season_type, season_year, athlete_year
-    )
+    return IndividualRecord(eventId, athlete_id, athlete_first_name, athlete_last_name, athlete_year,
+                            meet_id, meet_name, reduce_all_whitespace(meet_date), result, wind_info)
 
-def scrape_relay_performance(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, performance : BeautifulSoup):
+def parse_relay_performance(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, performance : BeautifulSoup) -> RelayRecord:
     print("------------------Scraping Relay Performance------------------")
 
     print("Event ID: " + str(eventId))
@@ -105,17 +113,16 @@ def scrape_relay_performance(eventId : int, season_type : str, season_year : int
     else:
         for athlete_link in athletes_link_info:
             athlete_id = athlete_link.get("href").strip().split("/")[4]
-            athletes.append(athlete_id)
             assert athlete_link.get("href").strip().split("/")[5] == school_id
 
             athlete_last_name = athlete_link.text.strip()
             athlete_full_name = athlete_link.get("href").strip().split("/")[6]
             athlete_first_name = (athlete_full_name[:len(athlete_full_name) - len(athlete_last_name) - 6]).replace("_", " ")
 
-            repo.insert_athlete(athlete_id, athlete_first_name, athlete_last_name, gender)
+            athletes.append(RelayLeg(athlete_id, athlete_first_name, athlete_last_name))
 
     athletes = tuple(athletes)
-    print("Athletes: " + str(athletes))
+    print("Athletes: " + str(tuple(athlete.athlete_id for athlete in athletes)))
 
     # Get Meet Info
     meet_link_info = performance.find("div", {"data-label" : "Meet"}).find("a").get("href").strip()
@@ -138,15 +145,11 @@ def scrape_relay_performance(eventId : int, season_type : str, season_year : int
         wind_info = wind_info.text.strip()
     print("Wind Info: " + wind_info)
 
-    repo.insert_meet(meet_id, meet_name, reduce_all_whitespace(meet_date))
-    repo.insert_relay_team_performance(
-        meet_id, athletes, eventId, school_id, result_info, wind_info,
-        season_type, season_year
-    )
-    
+    return RelayRecord(eventId, athletes, meet_id, meet_name, reduce_all_whitespace(meet_date), result_info, wind_info)
 
 
-def scrape_event(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, soup : BeautifulSoup):
+
+def parse_event(eventId : int, season_type : str, season_year : int, gender : str, school_id : str, soup : BeautifulSoup) -> list:
     result = soup.find("div", {"class" : "standard_event_hnd_" + str(eventId)})
 
     # Get Name Using H3
@@ -157,7 +160,7 @@ def scrape_event(eventId : int, season_type : str, season_year : int, gender : s
     is_relay = name.endswith("Relay")
     print("Is Relay: " + str(is_relay))
 
-    repo.insert_event(eventId, name, is_relay)
+    records = [EventRecord(eventId, name, is_relay)]
 
     # Get Performances Using performance-list-row
     performances = result.find_all("div", {"class" : "performance-list-row"})
@@ -168,24 +171,74 @@ def scrape_event(eventId : int, season_type : str, season_year : int, gender : s
     for performance in performances:
         try:
             if is_relay:
-                scrape_relay_performance(eventId, season_type, season_year, gender, school_id, performance)
+                records.append(parse_relay_performance(eventId, season_type, season_year, gender, school_id, performance))
             else:
-                scrape_individual_performance(eventId, season_type, season_year, gender, school_id, performance)
+                records.append(parse_individual_performance(eventId, season_type, season_year, gender, school_id, performance))
         except Exception as e:
             error_log.log_failed(str(e) + "\n" + str(performance) + "\n\n")
+            quarantine.quarantine_row(str(performance), e, eventId, is_relay, season_type, season_year, gender, school_id, PARSER_VERSION)
+
+    return records
 
-def scrape_file(file_content : str, season_type : str, season_year : int, gender : str, school_id : str):
+def parse_file(file_content : str, season_type : str, season_year : int, gender : str, school_id : str) -> list:
+    """Parse a page into records (see the top of this file). Rows that fail to parse are logged and skipped."""
 
     soup = BeautifulSoup(file_content, "html.parser")
     events = soup.find_all("a", {"id" : re.compile("event")})
 
+    records = []
     for event in events:
         eventId = int(event.get("name").replace("event", ""))
         print("Event: " + str(eventId))
 
-        scrape_event(eventId, season_type, season_year, gender, school_id, soup)
+        records.extend(parse_event(eventId, season_type, season_year, gender, school_id, soup))
+
+    return records
+
+def ingest_record(record, season_type : str, season_year : int, gender : str, school_id : str):
+    """Write one parsed record to the repository"""
+    if isinstance(record, EventRecord):
+        repo.insert_event(record.event_id, record.name, record.is_relay)
+    elif isinstance(record, IndividualRecord):
+        repo.insert_individual_record(record, season_type, season_year, gender, school_id)
+    elif isinstance(record, RelayRecord):
+        repo.insert_relay_record(record, season_type, season_year, gender, school_id)
+
+@profiling.profiled("scrape.scrape_file")
+def scrape_file(file_content : str, season_type : str, season_year : int, gender : str, school_id : str, should_stop=None):
+    """
+    Parse a page (or load its cached records) and write everything on it to the repository. profile= see profiling.py
+    should_stop() is checked before each record; ingesting the page again later stores only the records not written yet.
+    """
+
+    if school_id not in repo.school_ids():
+        raise Exception(f"School '{school_id}' is not in the School table, add it before ingesting its pages")
+
+    key = record_cache.cache_key(file_content, PARSER_VERSION)
+    records = record_cache.load(key)
+    if records is None:
+        records = parse_file(file_content, season_type, season_year, gender, school_id)
+        record_cache.store(key, records)
+    else:
+        print("Loaded " + str(len(records)) + " cached records")
+
+    try:
+        for record in records:
+            if should_stop is not None and should_stop():
+                raise Exception("Ingest stopped before the end of the page")
+            try:
+                ingest_record(record, season_type, season_year, gender, school_id)
+            except Exception as e:
+                error_log.log_failed(str(e) + "\n" + str(record) + "\n\n")
+    except BaseException:
+        repo.fail_changes(f"scrape {season_year} {season_type} {gender} {school_id}")
+        raise
+    repo.flush_changes(f"scrape {season_year} {season_type} {gender} {school_id}")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scrape one saved page into the repository")
+    parser.add_argument("--profile", choices=profiling.MODES, default=os.environ.get("PROFILE"), help="Profile the run (see profiling.py)")
+    args = parser.parse_args()
     with open("pages/2010_Indoor_MD_college_m_Johns_Hopkins.html", "r") as f:
-        scrape_file(f.read(), "Indoor", 2010, "m", "Johns_Hopkins")
\ No newline at end of file
+        scrape_file(f.read(), "Indoor", 2010, "m", "Johns_Hopkins", profile=args.profile)
\ No newline at end of file
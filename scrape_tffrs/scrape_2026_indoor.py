@@ -2,82 +2,56 @@
 Script to scrape just the 2026 Indoor season data
 """
 import requests
-import time
 import scrape as scraper
+import repository as repo
+import discovery
+import http_client
 
-SCHOOLS = {
-    "Johns_Hopkins" : "MD",
-    "McDaniel" : "MD",
-    "Ursinus" : "PA",
-    "Dickinson_College" : "PA",
-    "Franklin__Marshall" : "PA",
-    "Gettysburg" : "PA",
-    "Haverford" : "PA",
-    "Muhlenberg" : "PA",
-    "Bryn_Mawr" : "PA",
-    "Swarthmore" : "PA"
-}
+CATALOG = discovery.load_catalog()
 
 # 2026 Indoor season IDs
-LIST_HND = 5354
-SEASON_HND = 697
 YEAR = 2026
 SEASON = "Indoor"
+LIST_HND, SEASON_HND = discovery.get_season(CATALOG, YEAR, SEASON)
 
 def get_url_html_content(url: str) -> str:
-    response = requests.get(url, headers={
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36"
-    })
-    return response.text
+    # Shared keep-alive session with adaptive throttling and retries (http_client.py)
+    return http_client.get_url_html_content(url)
 
 def get_full_url(school: str, state: str, gender: str) -> str:
     return f"https://www.tfrrs.org/all_performances/{state}_college_{gender}_{school}.html?list_hnd={LIST_HND}&season_hnd={SEASON_HND}"
 
 def main():
     count = 0
-    total = len(SCHOOLS) * 2 - 1  # -1 for Bryn Mawr (women only)
+    teams = list(discovery.iterate_teams(CATALOG, known=repo.school_ids()))
+    total = len(teams)
     
     print(f"Starting scrape of {YEAR} {SEASON} season...")
     print(f"Total pages to scrape: {total}")
     print("-" * 50)
     
-    for school, state in SCHOOLS.items():
-        for gender in ["m", "f"]:
-            # Skip Bryn Mawr men's (women's college)
-            if school == "Bryn_Mawr" and gender == "m":
-                continue
+    for school, state, gender in teams:
+        url = get_full_url(school, state, gender)
+        gender_name = "Men" if gender == "m" else "Women"
+        
+        print(f"\nScraping {school} {gender_name}...")
+        
+        try:
+            html_content = get_url_html_content(url)
             
-            url = get_full_url(school, state, gender)
-            gender_name = "Men" if gender == "m" else "Women"
+            # Save the HTML (optional)
+            outpath = f"pages/{YEAR}_{SEASON}_{state}_college_{gender}_{school}.html"
+            with open(outpath, 'w') as f:
+                f.write(html_content)
             
-            print(f"\nScraping {school} {gender_name}...")
+            # Parse and insert into database
+            scraper.scrape_file(html_content, SEASON, YEAR, gender, school)
             
-            # Exponential backoff for retries
-            for attempt in range(1, 4):
-                try:
-                    html_content = get_url_html_content(url)
-                    
-                    # Save the HTML (optional)
-                    outpath = f"pages/{YEAR}_{SEASON}_{state}_college_{gender}_{school}.html"
-                    with open(outpath, 'w') as f:
-                        f.write(html_content)
-                    
-                    # Parse and insert into database
-                    scraper.scrape_file(html_content, SEASON, YEAR, gender, school)
-                    
-                    count += 1
-                    print(f"  ✓ Done ({count}/{total})")
-                    break
-                    
-                except requests.exceptions.RequestException as e:
-                    print(f"  ✗ Attempt {attempt} failed: {e}")
-                    if attempt == 3:
-                        print(f"  ERROR: Failed after 3 attempts")
-                    else:
-                        time.sleep(0.75 * (2 ** attempt))
-            
-            # Rate limiting
-            time.sleep(0.5)
+            count += 1
+            print(f"  ✓ Done ({count}/{total})")
+        except requests.exceptions.RequestException as e:
+            # http_client already retried with backoff
+            print(f"  ✗ Failed: {e}")
     
     print("\n" + "=" * 50)
     print(f"Scraping complete! {count}/{total} pages scraped.")
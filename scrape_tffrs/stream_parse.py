@@ -0,0 +1,235 @@
+# Stream_parse.py
+# Streaming page parser with bounded memory
+#
+# scrape.parse_file builds the whole BeautifulSoup tree for a page. This parser reads the HTML
+# incrementally (html.parser.HTMLParser fed chunk by chunk) and yields the same records as
+# scrape.parse_file, event by event, as soon as each performance row closes.
+# Only the row being read is kept as a tree, so memory stays flat regardless of page size.
+
+import re
+from html.parser import HTMLParser
+import scrape
+import repository as repo
+import error_log
+import quarantine
+from records import EventRecord
+
+# Tags that never have a closing tag, so they must not be pushed on the open-element stack
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+EVENT_CLASS = re.compile(r"^standard_event_hnd_(\d+)$")
+ROW_CLASS = "performance-list-row"
+
+CHUNK_SIZE = 64 * 1024
+
+
+class RowNode:
+    """
+    Minimal element tree for one performance row. Implements the parts of the BeautifulSoup
+    API used by scrape.parse_*_performance (find, find_all, get, text) so both parsers share
+    the same field extraction.
+    """
+
+    __slots__ = ("tag", "attrs", "children", "start_tag")
+
+    def __init__(self, tag : str, attrs : list, start_tag : str):
+        self.tag = tag
+        self.attrs = dict(attrs)
+        self.children = []
+        self.start_tag = start_tag
+
+    def get(self, name : str, default=None):
+        return self.attrs.get(name, default)
+
+    def _matches(self, tag : str, attrs : dict) -> bool:
+        if tag is not None and self.tag != tag:
+            return False
+        for name, value in (attrs or {}).items():
+            actual = self.attrs.get(name)
+            if actual is None:
+                return False
+            # Like BeautifulSoup, "class" matches any one of the element's classes
+            if name == "class":
+                if value not in actual.split() and value != actual:
+                    return False
+            elif actual != value:
+                return False
+        return True
+
+    def _descendants(self):
+        for child in self.children:
+            if isinstance(child, RowNode):
+                yield child
+                yield from child._descendants()
+
+    def find(self, tag : str = None, attrs : dict = None):
+        for node in self._descendants():
+            if node._matches(tag, attrs):
+                return node
+        return None
+
+    def find_all(self, tag : str = None, attrs : dict = None) -> list:
+        return [node for node in self._descendants() if node._matches(tag, attrs)]
+
+    @property
+    def text(self) -> str:
+        return "".join(child if isinstance(child, str) else child.text for child in self.children)
+
+    def __str__(self):
+        # Approximate source HTML, used for error logs
+        inner = "".join(str(child) for child in self.children)
+        return self.start_tag + inner + ("" if self.tag in VOID_TAGS else "</" + self.tag + ">")
+
+
+class PerformanceStreamParser(HTMLParser):
+    """Push parser: feed() HTML chunks, then take the records it produced with drain()"""
+
+    def __init__(self, season_type : str, season_year : int, gender : str, school_id : str):
+        super().__init__(convert_charrefs=True)
+        self.season_type = season_type
+        self.season_year = season_year
+        self.gender = gender
+        self.school_id = school_id
+
+        self.pending = []
+
+        # Depth counts open <div>s so we know when the event / row divs close
+        self.div_depth = 0
+        self.event_id = None
+        self.event_depth = None
+        self.event_is_relay = False
+
+        self.heading = None
+
+        # Open elements of the row being read; empty outside a row
+        self.row_stack = []
+
+    def drain(self) -> list:
+        records = self.pending
+        self.pending = []
+        return records
+
+    def handle_starttag(self, tag, attrs):
+        start_tag = self.get_starttag_text()
+
+        if self.row_stack:
+            node = RowNode(tag, attrs, start_tag)
+            self.row_stack[-1].children.append(node)
+            if tag not in VOID_TAGS:
+                self.row_stack.append(node)
+            if tag == "div":
+                self.div_depth += 1
+            return
+
+        if tag == "div":
+            self.div_depth += 1
+            classes = (dict(attrs).get("class") or "").split()
+
+            if self.event_id is None:
+                for cls in classes:
+                    match = EVENT_CLASS.match(cls)
+                    if match:
+                        self.event_id = int(match.group(1))
+                        self.event_depth = self.div_depth
+                        break
+
+            elif ROW_CLASS in classes:
+                self.row_stack = [RowNode(tag, attrs, start_tag)]
+
+        elif tag == "h3" and self.event_id is not None and self.heading is None:
+            self.heading = []
+
+    def handle_endtag(self, tag):
+        if self.row_stack:
+            # Pop back to the matching open element (tolerates unclosed inline tags)
+            for i in range(len(self.row_stack) - 1, -1, -1):
+                if self.row_stack[i].tag == tag:
+                    break
+            else:
+                return
+
+            if i == 0:
+                self.finish_row(self.row_stack[0])
+                self.row_stack = []
+            else:
+                del self.row_stack[i:]
+
+            if tag == "div":
+                self.div_depth -= 1
+            return
+
+        if tag == "h3" and isinstance(self.heading, list):
+            name = "".join(self.heading).strip()
+            self.heading = name
+            print("Name of Event: " + name)
+
+            # Check if event is relay with is-relay attribute
+            self.event_is_relay = name.endswith("Relay")
+            print("Is Relay: " + str(self.event_is_relay))
+            self.pending.append(EventRecord(self.event_id, name, self.event_is_relay))
+
+        elif tag == "div":
+            if self.event_id is not None and self.div_depth == self.event_depth:
+                self.event_id = None
+                self.event_depth = None
+                self.heading = None
+            self.div_depth -= 1
+
+    def handle_data(self, data):
+        if self.row_stack:
+            self.row_stack[-1].children.append(data)
+        elif isinstance(self.heading, list):
+            self.heading.append(data)
+
+    def finish_row(self, row : RowNode):
+        try:
+            if self.event_is_relay:
+                record = scrape.parse_relay_performance(self.event_id, self.season_type, self.season_year, self.gender, self.school_id, row)
+            else:
+                record = scrape.parse_individual_performance(self.event_id, self.season_type, self.season_year, self.gender, self.school_id, row)
+            self.pending.append(record)
+        except Exception as e:
+            error_log.log_failed(str(e) + "\n" + str(row) + "\n\n")
+            quarantine.quarantine_row(str(row), e, self.event_id, self.event_is_relay, self.season_type, self.season_year,
+                                      self.gender, self.school_id, scrape.PARSER_VERSION)
+
+
+def iter_records(chunks, season_type : str, season_year : int, gender : str, school_id : str):
+    """Yield parsed records from an iterable of HTML text chunks, as soon as each row is complete"""
+    parser = PerformanceStreamParser(season_type, season_year, gender, school_id)
+    for chunk in chunks:
+        parser.feed(chunk)
+        yield from parser.drain()
+    parser.close()
+    yield from parser.drain()
+
+
+def iter_file_chunks(path : str, chunk_size : int = CHUNK_SIZE):
+    """Read a saved page in fixed-size text chunks"""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+
+
+def scrape_stream(chunks, season_type : str, season_year : int, gender : str, school_id : str):
+    """Streaming counterpart of scrape.scrape_file: each record is written as soon as it is parsed"""
+    if school_id not in repo.school_ids():
+        raise Exception(f"School '{school_id}' is not in the School table, add it before ingesting its pages")
+
+    try:
+        for record in iter_records(chunks, season_type, season_year, gender, school_id):
+            try:
+                scrape.ingest_record(record, season_type, season_year, gender, school_id)
+            except Exception as e:
+                error_log.log_failed(str(e) + "\n" + str(record) + "\n\n")
+    except BaseException:
+        repo.fail_changes(f"stream {season_year} {season_type} {gender} {school_id}")
+        raise
+    repo.flush_changes(f"stream {season_year} {season_type} {gender} {school_id}")
+
+
+if __name__ == "__main__":
+    scrape_stream(iter_file_chunks("pages/2010_Indoor_MD_college_m_Johns_Hopkins.html"), "Indoor", 2010, "m", "Johns_Hopkins")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Test script for discovery.py
+Parses team links from a league page and season handles from a team page's season dropdown, and adds
+placeholder School rows for discovered teams. Uses an in-memory SQLite backend; no network needed.
+"""
+
+import io
+import contextlib
+import discovery
+import repository as repo
+import testing
+
+LEAGUE_PAGE = """<html><body><div class="container">
+<table class="tablesaw"><tbody>
+  <tr><td><a href="https://www.tfrrs.org/teams/tf/MD_college_m_Johns_Hopkins.html">Johns Hopkins (Men)</a></td>
+      <td><a href="https://www.tfrrs.org/teams/tf/MD_college_f_Johns_Hopkins.html">Johns Hopkins (Women)</a></td></tr>
+  <tr><td><a href="https://www.tfrrs.org/teams/MD_college_m_Salisbury.html">Salisbury (Men)</a></td>
+      <td><a href="https://www.tfrrs.org/teams/xc/MD_college_m_Salisbury.html">Salisbury XC</a></td></tr>
+  <tr><td><a href="https://www.tfrrs.org/teams/tf/PA_college_f_Franklin__Marshall.html">F&amp;M (Women)</a></td>
+      <td><a href="https://www.tfrrs.org/teams/tf/MD_college_m_Johns_Hopkins.html">Johns Hopkins (Men) again</a></td></tr>
+</tbody></table>
+</div></body></html>"""
+
+SEASON_PAGE = """<html><body>
+<select class="form-control" id="list_hnd_dropdown">
+  <option value="https://www.tfrrs.org/all_performances/MD_college_m_Johns_Hopkins.html?list_hnd=5354&amp;season_hnd=697">2026 Indoor</option>
+  <option value="https://www.tfrrs.org/all_performances/MD_college_m_Johns_Hopkins.html?list_hnd=5027&season_hnd=681" selected>
+      2025 Outdoor
+  </option>
+  <option value="https://www.tfrrs.org/all_performances/MD_college_m_Johns_Hopkins.html?list_hnd=4874&amp;season_hnd=661"><span>2025 INDOOR</span></option>
+  <option value="https://www.tfrrs.org/all_performances/MD_college_m_Johns_Hopkins.html?list_hnd=4800&amp;season_hnd=650">2025 Cross Country</option>
+</select>
+</body></html>"""
+
+
+def test_discovery():
+    """Test the league and season page parsers and placeholder School rows for new teams."""
+    print("\n=== Testing Discovery ===")
+    check = testing.Checks()
+
+    teams = discovery.parse_team_links(LEAGUE_PAGE)
+    check(teams == [("Johns_Hopkins", "MD", "m"), ("Johns_Hopkins", "MD", "f"), ("Salisbury", "MD", "m"),
+                    ("Franklin__Marshall", "PA", "f")], f"track team links, each once, no XC teams: {teams}")
+
+    seasons = discovery.parse_season_options(SEASON_PAGE)
+    check(seasons == {(2026, "Indoor"): (5354, 697), (2025, "Outdoor"): (5027, 681), (2025, "Indoor"): (4874, 661)},
+          f"season handles from the dropdown, cross country left out: {seasons}")
+
+    catalog = discovery.seed_catalog()
+    added = discovery.add_teams(catalog, teams)
+    check(added == 1 and catalog["teams"]["Salisbury"] == {"state": "MD", "genders": ["m"]}, "only Salisbury is new")
+
+    with testing.local_backend() as backend:
+        with contextlib.redirect_stdout(io.StringIO()):
+            inserted = discovery.add_school_rows(catalog)
+            again = discovery.add_school_rows(catalog)
+        row = backend.fetchone("SELECT SchoolName, LocationID, EnrollmentSize FROM School WHERE SchoolID = 'Salisbury'")
+        known = {school for school, _, _ in discovery.iterate_teams(catalog, known=repo.school_ids())}
+
+    check((inserted, again) == (1, 0), f"placeholder row added once ({inserted}, then {again})")
+    check(row == ("Salisbury", None, None), f"placeholder has only the ID and name: {row}")
+    check("Salisbury" in known, "new team can be ingested")
+    check(discovery.school_name("Franklin__Marshall") == "Franklin Marshall", "placeholder name from the slug")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Discovery Test Suite")
+    print("=" * 50)
+
+    test_discovery()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
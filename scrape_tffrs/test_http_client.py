@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Test script for http_client.py
+Runs a throwaway local HTTP server that pushes back with 429 / 503, so no network is needed.
+"""
+
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+import http_client
+import testing
+
+# Responses the server hands out in order, then 200s
+SCRIPT = []
+SEEN = []
+
+
+class Handler(BaseHTTPRequestHandler):
+
+    def do_GET(self):
+        SEEN.append(self.path)
+        status, headers = SCRIPT.pop(0) if SCRIPT else (200, {})
+        body = ("page " + self.path).encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_client():
+    """Test retries on pushback, Retry-After, raising on bad pages and delay adaptation."""
+    print("\n=== Testing HTTP Client ===")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    http_client.BACKOFF_BASE = 0.01
+    throttle = http_client.AdaptiveThrottle(initial_delay=0.2, min_delay=0.01, step=0.05)
+    client = http_client.FetchClient(throttle=throttle, max_attempts=3)
+    check = testing.Checks()
+
+    check(client.get_text(base + "/a") == "page /a", "plain page is fetched")
+    check(throttle.delay < 0.2, f"fast responses shorten the delay (now {throttle.delay:.2f}s)")
+
+    before = throttle.delay
+    SCRIPT.extend([(429, {"Retry-After": "0"}), (503, {})])
+    check(client.get_text(base + "/b") == "page /b", "429 and 503 are retried")
+    check(SEEN[-3:] == ["/b", "/b", "/b"], "pushback responses were not handed to the caller")
+    check(throttle.delay > before, f"pushback lengthens the delay (now {throttle.delay:.2f}s)")
+
+    SCRIPT.extend([(502, {"Retry-After": "1"})])
+    started = time.monotonic()
+    check(client.get_text(base + "/c") == "page /c", "502 is retried")
+    check(time.monotonic() - started >= 1.0, "Retry-After on a 502 is waited out")
+
+    SCRIPT.extend([(404, {})])
+    try:
+        client.get_text(base + "/missing")
+        check(False, "404 raises")
+    except requests.exceptions.HTTPError:
+        check(True, "404 raises")
+
+    SCRIPT.extend([(503, {})] * 3)
+    try:
+        client.get_text(base + "/down")
+        check(False, "503 raises once retries are used up")
+    except requests.exceptions.HTTPError:
+        check(True, "503 raises once retries are used up")
+
+    check(http_client.parse_retry_after("7") == 7.0, "Retry-After in seconds")
+    check(http_client.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0, "Retry-After as a past HTTP date")
+
+    client.close()
+    server.shutdown()
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("HTTP Client Test Suite")
+    print("=" * 50)
+
+    test_http_client()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Test script for meet_results.py
+Ingests a meet results page on top of a school-list ingest of the same meet: the whole field is stored,
+marks the school lists already had aren't added twice, and each meet is fetched once.
+Uses an in-memory SQLite backend and a throwaway page directory; no network needed.
+"""
+
+import io
+import os
+import tempfile
+import contextlib
+import meet_results
+import http_client
+import repository as repo
+import testing
+from records import IndividualRecord, RelayLeg, RelayRecord
+
+JHU_M = "https://www.tfrrs.org/teams/tf/MD_college_m_Johns_Hopkins.html"
+SALISBURY_M = "https://www.tfrrs.org/teams/tf/MD_college_m_Salisbury.html"
+
+SAMPLE_PAGE = f"""<html><body><div class="container">
+<div class="custom-table-title"><h3 class="font-weight-500">Men's 60 Meters</h3></div>
+<table class="tablesaw table-striped"><thead><tr><th>PL</th><th>NAME</th><th>YEAR</th><th>TEAM</th><th>TIME</th></tr></thead>
+<tbody>
+  <tr><td>1</td><td><a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye, Spencer</a></td><td>SR-4</td>
+      <td><a href="{JHU_M}">Johns Hopkins</a></td><td>6.98</td></tr>
+  <tr><td>2</td><td><a href="https://www.tfrrs.org/athletes/9100/Salisbury/Sam_Runner.html">Runner, Sam</a></td><td>JR-3</td>
+      <td><a href="{SALISBURY_M}">Salisbury</a></td><td>7.05</td></tr>
+  <tr><td>3</td><td><a href="https://www.tfrrs.org/athletes/8003/Johns_Hopkins/Alex_Colletti.html">Colletti, Alex</a></td><td>SR-4</td>
+      <td><a href="{JHU_M}">Johns Hopkins</a></td><td>7.10</td></tr>
+</tbody></table>
+<div class="custom-table-title"><h3 class="font-weight-500">Men's 60 Meters Prelims</h3></div>
+<table class="tablesaw table-striped"><thead><tr><th>PL</th><th>NAME</th><th>YEAR</th><th>TEAM</th><th>TIME</th></tr></thead>
+<tbody>
+  <tr><td>1</td><td><a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye, Spencer</a></td><td>SR-4</td>
+      <td><a href="{JHU_M}">Johns Hopkins</a></td><td>7.02</td></tr>
+</tbody></table>
+<div class="custom-table-title"><h3 class="font-weight-500">Men's 4x400 Relay</h3></div>
+<table class="tablesaw table-striped"><thead><tr><th>PL</th><th>TEAM</th><th>TIME</th></tr></thead>
+<tbody>
+  <tr><td>1</td><td><a href="{SALISBURY_M}">Salisbury</a></td><td>3:20.00</td></tr>
+  <tr><td>2</td><td><a href="{JHU_M}">Johns Hopkins</a>
+      <a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye, Spencer</a></td><td>3:22.10</td></tr>
+</tbody></table>
+<div class="custom-table-title"><h3 class="font-weight-500">Women's Long Jump Final</h3></div>
+<table class="tablesaw table-striped"><thead><tr><th>PL</th><th>NAME</th><th>YEAR</th><th>TEAM</th><th>MARK</th><th>WIND</th></tr></thead>
+<tbody>
+  <tr><td>1</td><td><a href="https://www.tfrrs.org/athletes/8002/Johns_Hopkins/Mirra_Klimov.html">Klimov, Mirra</a></td><td>SO-2</td>
+      <td><a href="https://www.tfrrs.org/teams/tf/MD_college_f_Johns_Hopkins.html">Johns Hopkins</a></td><td>5.51m</td><td>+1.2</td></tr>
+</tbody></table>
+<div class="custom-table-title"><h3 class="font-weight-500">Men's Weight Throw</h3></div>
+<table class="tablesaw table-striped"><thead><tr><th>PL</th><th>NAME</th><th>YEAR</th><th>TEAM</th><th>MARK</th></tr></thead>
+<tbody>
+  <tr><td>1</td><td><a href="https://www.tfrrs.org/athletes/9101/Salisbury/Tom_Thrower.html">Thrower, Tom</a></td><td>SR-4</td>
+      <td><a href="{SALISBURY_M}">Salisbury</a></td><td>18.20m</td></tr>
+</tbody></table>
+</div></body></html>"""
+
+
+def ingest_school_list():
+    """What the all_performances list of Johns Hopkins men already contributed for the meet"""
+    repo.insert_event(46, "60 Meters", False)
+    repo.insert_event(73, "4 x 400 Relay", True)
+    repo.insert_event(66, "Long Jump", False)
+    repo.insert_individual_record(IndividualRecord(46, "8001", "Spencer", "Ye", "SR-4", "86242", "Centennial Conference Indoor",
+                                                   "Feb 22, 2025", "6.98", ""), "Indoor", 2025, "m", "Johns_Hopkins")
+    legs = tuple(RelayLeg(athlete_id, "Relay", "Leg") for athlete_id in ("8001", "8003", "8004", "8005"))
+    repo.insert_relay_record(RelayRecord(73, legs, "86242", "Centennial Conference Indoor", "Feb 22, 2025", "3:22.10", ""),
+                             "Indoor", 2025, "m", "Johns_Hopkins")
+
+
+def test_meet_results():
+    """Test the meet page parser, deduplication against the school lists and fetching each meet once."""
+    print("\n=== Testing Meet Results Ingest ===")
+
+    original_page_dir = meet_results.PAGE_DIR
+    original_get = http_client.get_url_html_content
+    check = testing.Checks()
+
+    fetched = []
+    def fake_get(url):
+        fetched.append(url)
+        return SAMPLE_PAGE
+
+    try:
+        with testing.local_backend():
+            entries = meet_results.parse_meet_page(SAMPLE_PAGE)
+            check(len(entries) == 8, f"every row of every event table parsed ({len(entries)} entries)")
+            check([(e.event_name, e.section, e.place, e.last_name) for e in entries[:4]] ==
+                  [("60 Meters", "Final", 1, "Ye"), ("60 Meters", "Final", 2, "Runner"), ("60 Meters", "Final", 3, "Colletti"),
+                   ("60 Meters", "Prelims", 1, "Ye")], "event, section, place and name from each table")
+            check((entries[4].school_id, entries[5].legs[0].athlete_id) == ("Salisbury", "8001"), "relay teams and their legs")
+            check((entries[6].gender, entries[6].wind, entries[6].result) == ("F", "+1.2", "5.51m"), "gender and wind")
+
+            meet_results.PAGE_DIR = tempfile.mkdtemp()
+            http_client.get_url_html_content = fake_get
+            backend = repo.get_backend()
+            with contextlib.redirect_stdout(io.StringIO()):
+                ingest_school_list()
+                first = meet_results.fetch_meets()
+                second = meet_results.fetch_meets()
+
+            check((first, second, len(fetched)) == (1, 0, 1), f"meet fetched once ({len(fetched)} downloads)")
+            check(fetched == [meet_results.meet_url(86242)], "page requested by the stored MeetID")
+            stored = backend.fetchall("""
+                SELECT P.EventID, AtS.AthleteID, P.ResultValue FROM Performance AS P
+                JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID ORDER BY P.EventID, P.ResultValue
+            """)
+            check(stored == [(46, 8001, 6.98), (46, 8001, 7.02), (46, 8003, 7.1), (66, 8002, 5.51)],
+                  "missing School marks added, ingested ones not duplicated")
+            relays = backend.fetchone("SELECT COUNT(*) FROM Performance WHERE RelayTeamID IS NOT NULL")[0]
+            check(relays == 1, f"School relay already ingested isn't added again ({relays} relay performances)")
+            field = backend.fetchall("SELECT Place, EntrantName, TeamSlug FROM MeetEntry WHERE EventID = 46 AND Section = 'Final' ORDER BY Place")
+            check(field == [(1, "Spencer Ye", "Johns_Hopkins"), (2, "Sam Runner", "Salisbury"), (3, "Alex Colletti", "Johns_Hopkins")],
+                  "full field, outside schools included, stored with places")
+            season = backend.fetchone("SELECT SeasonType, SeasonYear FROM AthleteSeason WHERE AthleteID = 8002")
+            check(season == ("Indoor", 2025), "added marks filed under the meet's season")
+
+            counts = meet_results.status(backend)
+            check(counts == {"meets": 1, "fetched": 1, "added": 3, "entries": 7, "outside": 2}, f"status counts {counts}")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                again = meet_results.ingest_meet(86242, meet_results.load_page(86242))
+            check(again == (7, 0) and len(fetched) == 1, "re-ingesting the saved page adds nothing and downloads nothing")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                reparsed = meet_results.fetch_meets(reparse=True)
+                os.remove(os.path.join(meet_results.PAGE_DIR, "meet_86242.html"))
+                missing = meet_results.fetch_meets(reparse=True)
+            check((reparsed, missing, len(fetched)) == (1, 0, 1), "reparse reads only saved pages, never downloads")
+    finally:
+        http_client.get_url_html_content = original_get
+        meet_results.PAGE_DIR = original_page_dir
+
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Meet Results Test Suite")
+    print("=" * 50)
+
+    test_meet_results()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
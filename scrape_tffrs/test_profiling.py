@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Test script for profiling.py
+Profiles a small CPU-bound entry point in both modes into a throwaway directory and checks the
+report and flamegraph stack files. No database or network needed.
+"""
+
+import io
+import os
+import glob
+import tempfile
+import contextlib
+import profiling
+import testing
+
+
+def busy(n : int) -> int:
+    total = 0
+    for i in range(n):
+        total += sum(j * j for j in range(200))
+    return total
+
+
+@profiling.profiled("test.outer")
+def outer(n : int, label : str = "run") -> int:
+    return inner(n, profile="deterministic")
+
+
+@profiling.profiled("test.inner")
+def inner(n : int) -> int:
+    return busy(n)
+
+
+def test_profiling():
+    """Test that a profiled run writes a tagged hot-function report and a collapsed-stack file."""
+    print("\n=== Testing Profiling ===")
+
+    original_dir = profiling.PROFILE_DIR
+    profiling.PROFILE_DIR = tempfile.mkdtemp()
+    check = testing.Checks()
+
+    try:
+        for mode in profiling.MODES:
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = outer(3000, "x" * 100, profile=mode)
+            check(result == busy(3000), f"{mode}: profiled call returns its result")
+
+            reports = glob.glob(os.path.join(profiling.PROFILE_DIR, "test.outer_n=3000*.txt"))
+            folded = glob.glob(os.path.join(profiling.PROFILE_DIR, "test.outer_n=3000*.folded"))
+            check(len(reports) == 1 and len(folded) == 1, f"{mode}: one report and one stack file, named after the run")
+            if not reports or not folded:
+                continue
+            with open(reports[0]) as f:
+                report = f.read()
+            with open(folded[0]) as f:
+                stacks = [line.rsplit(" ", 1) for line in f.read().splitlines()]
+            check(report.startswith("# test.outer n=3000 label=<100 chars>\n# mode=" + mode), f"{mode}: report tagged with the arguments")
+            check("busy" in report and "Sorted by" in report, f"{mode}: report lists the hot function")
+            check(stacks and all(frames.startswith("[test.outer_n=3000_label=<100_chars>];") and count.isdigit()
+                                 for frames, count in stacks), f"{mode}: {len(stacks)} collapsed stacks under a tagged root frame")
+            check(any("busy (test_profiling.py" in frames for frames, _ in stacks), f"{mode}: stacks reach the hot function")
+            check(not glob.glob(os.path.join(profiling.PROFILE_DIR, "test.inner*")), f"{mode}: nested entry point adds no profile")
+            for path in reports + folded:
+                os.remove(path)
+
+        try:
+            outer(1, profile="tracing")
+            check(False, "unknown mode rejected")
+        except Exception:
+            check(True, "unknown mode rejected")
+    finally:
+        profiling.PROFILE_DIR = original_dir
+
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Profiling Test Suite")
+    print("=" * 50)
+
+    test_profiling()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Test script for quarantine.py
+Checks that a row the parser rejects is quarantined with its page context, and that replay re-parses
+just that row once the parser is fixed. Uses a throwaway quarantine file and an in-memory SQLite backend.
+"""
+
+import io
+import os
+import tempfile
+import contextlib
+import scrape
+import stream_parse
+import quarantine
+import repository as repo
+import testing
+
+# The second row's athlete name has no "Last, First" comma, which the parser rejects
+SAMPLE_PAGE = """<html><body><div class="container">
+<a id="event46" name="event46"></a>
+<div class="row standard_event_hnd_46">
+  <div class="custom-table-title"><h3>60 Meters</h3></div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Athlete"><a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye, Spencer</a></div>
+    <div class="col" data-label="Year">JR-3</div>
+    <div class="col" data-label="Time"><a href="https://www.tfrrs.org/results/86241/5551/Navy_Invite/">7.01</a></div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/86241/Navy_Invite">Navy Invite</a></div>
+    <div class="col" data-label="Meet Date">Dec 7, 2024</div>
+  </div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Athlete"><a href="https://www.tfrrs.org/athletes/8002/Johns_Hopkins/Mirra_Klimov.html">Mirra Klimov</a></div>
+    <div class="col" data-label="Year">SO-2</div>
+    <div class="col" data-label="Time"><a href="https://www.tfrrs.org/results/86241/5551/Navy_Invite/">7.45</a></div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/86241/Navy_Invite">Navy Invite</a></div>
+    <div class="col" data-label="Meet Date">Dec 7, 2024</div>
+  </div>
+</div>
+</div></body></html>"""
+
+
+def test_quarantine_and_replay():
+    """Test that failing rows are quarantined once and replayed after a parser fix."""
+    print("\n=== Testing Quarantine and Replay ===")
+
+    original_store = quarantine._quarantine
+    original_parse = scrape.parse_individual_performance
+    original_version = scrape.PARSER_VERSION
+    store = quarantine._quarantine = quarantine.Quarantine(os.path.join(tempfile.mkdtemp(), "quarantine.db"))
+    check = testing.Checks()
+
+    def fixed_parse(eventId, season_type, season_year, gender, school_id, performance):
+        link = performance.find("div", {"data-label" : "Athlete"}).find("a")
+        if "," not in link.string:
+            first, last = link.string.split(" ", 1)
+            link.string = last + ", " + first
+        return original_parse(eventId, season_type, season_year, gender, school_id, performance)
+
+    try:
+        with testing.local_backend():
+            with contextlib.redirect_stdout(io.StringIO()):
+                records = scrape.parse_file(SAMPLE_PAGE, "Indoor", 2025, "m", "Johns_Hopkins")
+                list(stream_parse.iter_records([SAMPLE_PAGE], "Indoor", 2025, "m", "Johns_Hopkins"))
+            rows = store.quarantined()
+            check(len(records) == 2, f"good row still parsed ({len(records) - 1} performance)")
+            check(len(rows) == 1, f"failing row quarantined once across both parsers ({len(rows)} rows)")
+            row = rows[0]
+            check((row.season_year, row.season_type, row.gender, row.school_id, row.event_id, row.is_relay) ==
+                  (2025, "Indoor", "M", "Johns_Hopkins", 46, 0), "page context stored with the row")
+            check(row.parser_version == original_version and row.attempts == 2, "parser version and attempts recorded")
+            check("Mirra Klimov" in row.row_html and "IndexError" in row.error, "row HTML and error stored")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = quarantine.replay(store)
+            check(result == (0, 0), "rows that failed on the current parser are skipped by default")
+
+            scrape.parse_individual_performance = fixed_parse
+            scrape.PARSER_VERSION = original_version + 1
+            with contextlib.redirect_stdout(io.StringIO()):
+                dry_run = quarantine.replay(store, ingest=False)
+                repo.insert_event(46, "60 Meters", False)
+                result = quarantine.replay(store)
+            check(dry_run == (1, 0) and result == (1, 0), f"row replays after the fix (dry run {dry_run}, replay {result})")
+            check(store.status_counts() == {"quarantined": 0, "replayed": 1}, "replayed row marked")
+            stored = repo.get_backend().fetchone("SELECT A.AthleteFirstName, A.AthleteLastName, P.ResultValue FROM Performance AS P "
+                                                 "JOIN AthleteSeason AS AtS ON AtS.AthleteSeasonID = P.AthleteSeasonID "
+                                                 "JOIN Athlete AS A ON A.AthleteID = AtS.AthleteID")
+            check(stored == ("Mirra", "Klimov", 7.45), f"replayed performance written to the repository: {stored}")
+    finally:
+        scrape.parse_individual_performance = original_parse
+        scrape.PARSER_VERSION = original_version
+        store.close()
+        quarantine._quarantine = original_store
+
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Quarantine Test Suite")
+    print("=" * 50)
+
+    test_quarantine_and_replay()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Test script for queries.py
+Runs every read query against an in-memory SQLite backend and checks the result cache: repeated
+reads don't reach the database, a write invalidates them, and the LRU drops the oldest result.
+"""
+
+import io
+import contextlib
+import repository as repo
+import testing
+import queries
+from records import IndividualRecord, RelayLeg, RelayRecord
+
+
+def insert_sample():
+    repo.insert_event(46, "60 Meters", False)
+    repo.insert_event(73, "4 x 400 Relay", True)
+    for athlete_id, first, last, mark, meet_id, meet_name, date in (
+        ("8001", "Spencer", "Ye", "7.01", "86241", "Navy Invite", "Dec 7, 2024"),
+        ("8001", "Spencer", "Ye", "6.98", "86242", "Centennial Conference Indoor", "Feb 22, 2025"),
+        ("8003", "Alex", "Colletti", "7.10", "86242", "Centennial Conference Indoor", "Feb 22, 2025"),
+    ):
+        repo.insert_individual_record(IndividualRecord(46, athlete_id, first, last, "SR-4", meet_id, meet_name, date, mark, ""),
+                                      "Indoor", 2025, "m", "Johns_Hopkins")
+    legs = tuple(RelayLeg(athlete_id, "Relay", "Leg") for athlete_id in ("8001", "8003", "8004", "8005"))
+    repo.insert_relay_record(RelayRecord(73, legs, "86242", "Centennial Conference Indoor", "Feb 22, 2025", "3:22.10", ""),
+                             "Indoor", 2025, "m", "Johns_Hopkins")
+
+
+def test_queries():
+    """Test that every query runs and that results are cached until the next ingest."""
+    print("\n=== Testing Read Queries ===")
+
+    check = testing.Checks()
+
+    try:
+        with testing.local_backend():
+            with contextlib.redirect_stdout(io.StringIO()):
+                insert_sample()
+
+            calls = [
+                (queries.personal_best, ("Spencer", "Ye", "60")),
+                (queries.school_athletes, ("Johns_Hopkins", 2025, "Indoor")),
+                (queries.season_bests, ("Spencer", "Ye", "60")),
+                (queries.athlete_results, ("Spencer", "Ye", 2025)),
+                (queries.championship_results, ("60", 2025)),
+                (queries.championship_team_scores, (2025, "Indoor")),
+                (queries.top_performers, (2025, "Indoor")),
+                (queries.individual_and_relay_athletes, ("Centennial",)),
+                (queries.most_relay_appearances, ()),
+                (queries.seniors_by_school, (2025,)),
+                (queries.roster, ("Johns_Hopkins", 2025, "Indoor")),
+                (queries.meet_event_results, ("60 Meters", "centennial")),
+                (queries.pb_progression, ("Alex", "Colletti", "60")),
+                (queries.school_records, ("Johns_Hopkins",)),
+                (queries.meets_attended, ("Johns_Hopkins", 2025)),
+                (queries.head_to_head, ("Ye", "Colletti", "60")),
+                (queries.best_relay_teams, ()),
+                (queries.most_performances, (2025, "Indoor")),
+                (queries.multi_event_athletes, (2025, 1)),
+                (queries.average_by_event_type, (2025,)),
+            ]
+            results = {}
+            for function, args in calls:
+                try:
+                    results[function.__name__] = function(*args)
+                except Exception as e:
+                    check(False, f"{function.__name__} failed: {e}")
+            check(len(results) == 20, f"all {len(results)} queries run on SQLite")
+
+            check(results.get("personal_best") == [("Spencer", "Ye", "60 Meters", 6.98)], "personal best")
+            check(results.get("championship_results") == [("Spencer", "Ye", "Johns Hopkins University", 6.98),
+                                                           ("Alex", "Colletti", "Johns Hopkins University", 7.1)],
+                  "championship results matched case-insensitively by year")
+            check(results.get("championship_team_scores") == [("Johns Hopkins University", 28)], "championship team scoring")
+            check(results.get("head_to_head") == [("Spencer Ye", "Navy Invite", "2024-12-07", 7.01),
+                                                  ("Spencer Ye", "Centennial Conference Indoor", "2025-02-22", 6.98),
+                                                  ("Alex Colletti", "Centennial Conference Indoor", "2025-02-22", 7.1)],
+                  "head to head")
+            check(results.get("multi_event_athletes") == [("Spencer", "Ye", "Johns Hopkins University", 1, "60 Meters"),
+                                                          ("Alex", "Colletti", "Johns Hopkins University", 1, "60 Meters")],
+                  "multi-event athletes list their events")
+
+            backend = repo.get_backend()
+            fetches = []
+            fetchall = backend.fetchall
+            backend.fetchall = lambda query, params=(): fetches.append(query) or fetchall(query, params)
+
+            for function, args in calls:
+                function(*args)
+            check(not fetches, f"repeated reads served from the cache ({len(fetches)} database reads)")
+
+            with contextlib.redirect_stdout(io.StringIO()):
+                repo.insert_individual_record(IndividualRecord(46, "8003", "Alex", "Colletti", "SR-4", "86243", "Last Chance",
+                                                               "Mar 1, 2025", "6.90", ""), "Indoor", 2025, "m", "Johns_Hopkins")
+            fetches.clear()
+            check(queries.personal_best("Alex", "Colletti", "60") == [("Alex", "Colletti", "60 Meters", 6.9)],
+                  "a write invalidates cached results")
+            check(len(fetches) == 1, "only the re-read query reached the database")
+            del backend.fetchall
+
+            cache = queries.ResultCache(size=2)
+            cache.put(("a",), ())
+            cache.put(("b",), ())
+            cache.get(("a",))
+            cache.put(("c",), ())
+            check(list(cache.results) == [("a",), ("c",)], "LRU drops the least recently used result")
+    finally:
+        queries.clear_cache()
+    return check.passed
+
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Read Query Test Suite")
+    print("=" * 50)
+
+    test_queries()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
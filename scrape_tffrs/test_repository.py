@@ -10,7 +10,19 @@ Before running:
 2. Make sure the tables exist (run table_generation.sql and add_manual_info.sql first)
 """
 
+import io
+import random
+import contextlib
 import repository as repo
+import leaderboard
+import progression
+import ratings
+import percentiles
+import change_feed
+import stream_parse
+import testing
+from records import IndividualRecord, RelayLeg, RelayRecord, PerformanceBatch, PerformanceRow
+
 
 def test_result_conversion():
     """Test the result conversion function."""
@@ -62,6 +74,505 @@ def test_event_type_inference():
     return all_passed
 
 
+def test_partition_naming():
+    """Test season partition names used for routing Performance inserts."""
+    print("\n=== Testing Partition Naming ===")
+    
+    test_cases = [
+        ("Indoor", 2025, "performance_2025_indoor"),
+        ("Outdoor", 2010, "performance_2010_outdoor"),
+        ("Outdoor", "2024", "performance_2024_outdoor"),
+    ]
+    
+    all_passed = True
+    for season_type, season_year, expected in test_cases:
+        result = repo.performance_partition_name(season_type, season_year)
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} ({season_type}, {season_year}) -> {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_local_backend():
+    """Test the insert functions against an in-memory SQLite backend (no network needed)."""
+    print("\n=== Testing Local SQLite Backend ===")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_athlete(99999, "Test", "Athlete", "m")
+        repo.insert_meet(99999, "Test Meet 2024", "Dec 7, 2024")
+        repo.insert_meet(99999, "Test Meet 2024", "Jan 11, 2025")
+        repo.insert_athlete_performance(99999, 99999, 46, "Johns_Hopkins", "7.12", "", "Indoor", 2025, "JR")
+        
+        # Ingesting the same page again (a retried or taken-over task) stores nothing twice
+        repo.insert_event(73, "4 x 400 Relay", True)
+        for _ in range(2):
+            repo.insert_athlete_performance(99999, 99999, 46, "Johns_Hopkins", "7.12", "", "Indoor", 2025, "JR")
+            repo.insert_relay_team_performance(99999, (99999,), 73, "Johns_Hopkins", "3:30.00", "", "Indoor", 2025, "m")
+        
+        # A failure between the mark and its derived rows stores neither, so the retry writes both
+        original_record = progression.record
+        def failing_record(*args):
+            raise Exception("progression write failed")
+        progression.record = failing_record
+        try:
+            repo.insert_athlete_performance(99999, 99999, 46, "Johns_Hopkins", "7.05", "", "Indoor", 2025, "JR")
+        except Exception:
+            pass
+        finally:
+            progression.record = original_record
+        backend = repo.get_backend()
+        half_written = backend.fetchone("SELECT COUNT(*) FROM Performance WHERE ResultValue = 7.05")[0]
+        repo.insert_athlete_performance(99999, 99999, 46, "Johns_Hopkins", "7.05", "", "Indoor", 2025, "JR")
+        
+        checks = [
+            ("failed record left no mark", half_written, 0),
+            ("retried record stored with its derived rows",
+             backend.fetchone("SELECT MarkCount, MinMark FROM AthleteEventFeatures") + backend.fetchone("SELECT COUNT(*) FROM BestProgression WHERE Mark = 7.05"),
+             (2, 7.05, 2)),
+            ("meet date range widened", backend.fetchone("SELECT StartDate, EndDate FROM TrackMeet"), ("2024-12-07", "2025-01-11")),
+            ("performance stored with season", backend.fetchone("SELECT ResultValue, SeasonType, SeasonYear FROM Performance WHERE EventID = 46"), (7.12, "Indoor", 2025)),
+            ("class year stored", backend.fetchone("SELECT ClassYear FROM AthleteSeason"), ("JR",)),
+            ("re-ingested marks not stored twice", backend.fetchone("SELECT COUNT(*) FROM Performance")[0], 3),
+            ("re-ingested relay gets no second team", backend.fetchone("SELECT COUNT(*) FROM RelayTeam")[0], 1),
+        ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_feature_store():
+    """Test that incrementally maintained features match a rebuild from Performance."""
+    print("\n=== Testing Feature Store ===")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_event(73, "4 x 400 Relay", True)
+        repo.insert_athlete(99999, "Test", "Athlete", "m")
+        for athlete_id in (99991, 99992, 99993, 99994):
+            repo.insert_athlete(athlete_id, "Relay", "Leg", "m")
+        repo.insert_meet(99001, "Test Meet 1", "Dec 7, 2024")
+        repo.insert_meet(99002, "Test Meet 2", "Jan 11, 2025")
+        repo.insert_meet(99003, "Test Meet 3", "Feb 1, 2025")
+        repo.insert_athlete_performance(99002, 99999, 46, "Johns_Hopkins", "7.05", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99001, 99999, 46, "Johns_Hopkins", "7.12", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99003, 99999, 46, "Johns_Hopkins", "7.01", "", "Indoor", 2025, "JR")
+        repo.insert_relay_team_performance(99001, (99991, 99992, 99993, 99994), 73, "Johns_Hopkins", "3:25.40", "", "Indoor", 2025, "m")
+        repo.insert_relay_team_performance(99003, (99991, 99992, 99993, 99994), 73, "Johns_Hopkins", "3:22.10", "", "Indoor", 2025, "m")
+        # No members: neither path can tell the relay's gender, so neither keeps features for it
+        repo.insert_relay_team_performance(99002, (), 73, "Ursinus", "3:30.00", "", "Indoor", 2025, "m")
+        
+        backend = repo.get_backend()
+        view = backend.fetchone("""
+            SELECT BestMark, WorstMark, MarkCount, ROUND(MeanMark, 4), LastDate, LastMark, TrendPerDay < 0
+            FROM AthleteEventFeatureView
+        """)
+        relay = backend.fetchone("SELECT BestMark, MarkCount, LastMark FROM RelayEventFeatureView")
+        incremental = backend.fetchall("SELECT * FROM AthleteEventFeatures") + backend.fetchall("SELECT * FROM RelayEventFeatures")
+        backend.rebuild_features()
+        rebuilt = backend.fetchall("SELECT * FROM AthleteEventFeatures") + backend.fetchall("SELECT * FROM RelayEventFeatures")
+        
+        checks = [
+            ("athlete features", view, (7.01, 7.12, 3, 7.06, "2025-02-01", 7.01, 1)),
+            ("relay features", relay, (202.1, 2, 202.1)),
+            ("incremental matches rebuild", [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in incremental],
+                [tuple(round(v, 6) if isinstance(v, float) else v for v in row) for row in rebuilt]),
+        ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_record_types():
+    """Test record inserts and the array-backed performance batch."""
+    print("\n=== Testing Record Types ===")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_event(73, "4 x 400 Relay", True)
+        repo.insert_individual_record(IndividualRecord(46, "99999", "Test", "Athlete", "SO", "99001", "Test Meet 1",
+                                                       "Dec 7, 2024", "7.12", ""), "Indoor", 2025, "m", "Johns_Hopkins")
+        legs = tuple(RelayLeg(str(athlete_id), "Relay", "Leg") for athlete_id in (99991, 99992, 99993, 99994))
+        repo.insert_relay_record(RelayRecord(73, legs, "99001", "Test Meet 1", "Dec 7, 2024", "3:25.40", ""),
+                                 "Indoor", 2025, "m", "Johns_Hopkins")
+        
+        backend = repo.get_backend()
+        performances = backend.fetchall("SELECT EventID, ResultValue FROM Performance ORDER BY EventID")
+        members = backend.fetchone("SELECT COUNT(*) FROM RelayTeamMembers")
+    
+    rows = [PerformanceRow(46, "60 Meters", "sprints", "Johns_Hopkins", 99999, "Test", "Athlete", 20064, 7.12, 99001),
+            PerformanceRow(46, "60 Meters", "sprints", "Johns_Hopkins", 99999, "Test", "Athlete", 20099, 7.05, 99002)]
+    batch = PerformanceBatch.from_rows(rows)
+    
+    checks = [
+        ("individual and relay inserted", performances, [(46, 7.12), (73, 205.4)]),
+        ("relay legs inserted", members, (4,)),
+        ("batch round trip", list(batch), rows),
+        ("batch strings stored once", batch.values["event_name"], ["60 Meters"]),
+        ("batch select", [row.mark for row in batch.select(lambda row: row.meet_id == 99002)], [7.05]),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_leaderboard():
+    """Test the top-K heap against a full sort, and ingest updates against a rebuild."""
+    print("\n=== Testing Leaderboard ===")
+    
+    rng = random.Random(7)
+    marks = [(("Johns_Hopkins", rng.randrange(30)), round(rng.uniform(7.0, 8.0), 2), meet) for meet in range(300)]
+    board = leaderboard.TopK(higher=False, size=5)
+    for entrant, mark, meet in marks:
+        board.offer(entrant, mark, meet)
+    best = {}
+    for entrant, mark, meet in marks:
+        if entrant not in best or mark < best[entrant]:
+            best[entrant] = mark
+    expected_top = sorted(best.values())[:5]
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_event(73, "4 x 400 Relay", True)
+        repo.insert_event(30, "Shot Put", False)
+        for athlete_id in (99991, 99992, 99993, 99994):
+            repo.insert_athlete(athlete_id, "Test", "Athlete", "m")
+        repo.insert_meet(99001, "Test Meet 1", "Dec 7, 2024")
+        repo.insert_meet(99002, "Test Meet 2", "Jan 11, 2025")
+        repo.insert_athlete_performance(99001, 99991, 46, "Johns_Hopkins", "7.12", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99002, 99991, 46, "Johns_Hopkins", "7.01", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99001, 99992, 46, "Johns_Hopkins", "7.05", "", "Indoor", 2025, "SO")
+        repo.insert_athlete_performance(99001, 99993, 30, "Johns_Hopkins", "13.10m", "", "Indoor", 2025, "SR")
+        repo.insert_athlete_performance(99002, 99994, 30, "Johns_Hopkins", "14.20m", "", "Indoor", 2025, "SR")
+        repo.insert_relay_team_performance(99001, (99991, 99992, 99993, 99994), 73, "Johns_Hopkins", "3:25.40", "", "Indoor", 2025, "m")
+        
+        backend = repo.get_backend()
+        sprints = [(place, athlete_id, mark) for place, _, athlete_id, mark, _ in repo.get_leaderboards().top(46, "Indoor", 2025, "M")]
+        throws = [athlete_id for _, _, athlete_id, _, _ in repo.get_leaderboards().top(30, "Indoor", 2025, "M")]
+        incremental = backend.fetchall("SELECT * FROM EventLeaderboard ORDER BY EventID, Place")
+        leaderboard.Leaderboards(backend).rebuild()
+        rebuilt = backend.fetchall("SELECT * FROM EventLeaderboard ORDER BY EventID, Place")
+        
+        # A rewrite that fails halfway leaves the stored board as it was
+        try:
+            with backend.transaction("leaderboard:test"):
+                backend.run("DELETE FROM EventLeaderboard WHERE EventID = 46")
+                raise Exception("writer failed")
+        except Exception:
+            pass
+        after_failure = backend.fetchall("SELECT * FROM EventLeaderboard ORDER BY EventID, Place")
+    
+    checks = [
+        ("top-K matches full sort", [mark for _, _, _, mark, _ in board.ranked()], expected_top),
+        ("athlete best counted once", sprints, [(1, 99991, 7.01), (2, 99992, 7.05)]),
+        ("higher is better for throws", throws, [99994, 99993]),
+        ("relay stored without athlete", [row[6] for row in incremental if row[0] == 73], [None]),
+        ("incremental matches rebuild", incremental, rebuilt),
+        ("failed rewrite rolled back", after_failure, rebuilt),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_progression():
+    """Test PB/SB progressions kept on ingest (marks arriving out of order) against a rebuild."""
+    print("\n=== Testing Progression ===")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_athlete(99999, "Test", "Athlete", "m")
+        for meet_id, date in ((99001, "Dec 7, 2023"), (99002, "Feb 1, 2024"), (99003, "Dec 6, 2024"), (99004, "Jan 11, 2025")):
+            repo.insert_meet(meet_id, "Test Meet", date)
+        # The 2025 season is scraped before 2024
+        repo.insert_athlete_performance(99004, 99999, 46, "Johns_Hopkins", "7.02", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99003, 99999, 46, "Johns_Hopkins", "7.10", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99001, 99999, 46, "Johns_Hopkins", "7.20", "", "Indoor", 2024, "SO")
+        repo.insert_athlete_performance(99002, 99999, 46, "Johns_Hopkins", "7.05", "", "Indoor", 2024, "SO")
+        
+        backend = repo.get_backend()
+        query = "SELECT * FROM BestProgression ORDER BY Kind, SeasonYear, MarkDate"
+        pb = backend.fetchall("SELECT MarkDate, Mark, Improvement FROM BestProgression WHERE Kind = 'PB' ORDER BY MarkDate")
+        sb_2025 = backend.fetchall("SELECT Mark, Improvement FROM BestProgression WHERE Kind = 'SB' AND SeasonYear = 2025 ORDER BY MarkDate")
+        incremental = backend.fetchall(query)
+        progression.rebuild(backend)
+        rebuilt = backend.fetchall(query)
+    
+    checks = [
+        ("PB progression", pb, [("2023-12-07", 7.2, None), ("2024-02-01", 7.05, 0.15), ("2025-01-11", 7.02, 0.03)]),
+        ("SB progression", sb_2025, [(7.1, None), (7.02, 0.08)]),
+        ("incremental matches rebuild", incremental, rebuilt),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_ratings():
+    """Test head-to-head ratings: order of strength, incremental updates and a rebuild after a late mark."""
+    print("\n=== Testing Ratings ===")
+    
+    
+    def add_meet(meet_id, date, marks):
+        repo.insert_meet(meet_id, "Test Meet", date)
+        for athlete_id, mark in marks:
+            repo.insert_athlete_performance(meet_id, athlete_id, 46, "Johns_Hopkins", mark, "", "Indoor", 2025, "JR")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        for athlete_id in (99991, 99992, 99993):
+            repo.insert_athlete(athlete_id, "Test", "Athlete", "m")
+        backend = repo.get_backend()
+        query = "SELECT AthleteID, EventGroup, ROUND(Rating, 6), ROUND(Deviation, 6), MeetCount, LastDate FROM AthleteRating ORDER BY AthleteID"
+        
+        add_meet(99001, "Dec 7, 2024", [(99991, "7.00"), (99992, "7.10"), (99993, "7.20")])
+        add_meet(99002, "Jan 11, 2025", [(99991, "6.98"), (99992, "7.12"), (99993, "7.15")])
+        first_update = ratings.update(backend)
+        add_meet(99003, "Feb 1, 2025", [(99991, "6.95"), (99992, "7.05"), (99993, "7.30")])
+        second_update = ratings.update(backend)
+        no_update = ratings.update(backend)
+        incremental = backend.fetchall(query)
+        ratings.rebuild(backend)
+        rebuilt = backend.fetchall(query)
+        
+        # A late mark in an already rated meet forces a rebuild
+        repo.insert_athlete(99994, "Test", "Athlete", "m")
+        add_meet(99002, "Jan 11, 2025", [(99994, "7.50")])
+        late_update = ratings.update(backend)
+        top = [row[0] for row in ratings.top(backend, "sprints", "M")]
+    
+    checks = [
+        ("meets applied incrementally", (first_update, second_update, no_update), (2, 1, 0)),
+        ("incremental matches rebuild", incremental, rebuilt),
+        ("winner rated highest, deviation shrinking", [(row[0], row[4], row[2] > 1500, row[3] < 350) for row in incremental],
+         [(99991, 3, True, True), (99992, 3, False, True), (99993, 3, False, True)]),
+        ("late mark rebuilds every meet", late_update, 3),
+        ("strongest first", top, [99991, 99992, 99993, 99994]),
+        ("tied marks share the score", ratings.field_scores([7.0, 7.1, 7.1, 7.3], False), [1.0, 0.5, 0.5, 0.0]),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+def test_percentiles():
+    """Test mark percentiles: lookups in both directions, year ranges and refreshing only changed events."""
+    print("\n=== Testing Percentiles ===")
+    
+    with testing.local_backend():
+        repo.insert_event(46, "60 Meters", False)
+        repo.insert_event(30, "Shot Put", False)
+        repo.insert_meet(99001, "Test Meet", "Feb 1, 2025")
+        repo.insert_meet(99002, "Test Meet", "Feb 3, 2024")
+        with contextlib.redirect_stdout(io.StringIO()):
+            for k in range(200):
+                athlete_id = 99000 + k
+                repo.insert_athlete(athlete_id, "Test", "Athlete", "m")
+                repo.insert_athlete_performance(99001, athlete_id, 46, "Johns_Hopkins", f"{7 + k / 100:.2f}", "", "Indoor", 2025, "JR")
+                # A slower second race doesn't count: one season best per athlete
+                repo.insert_athlete_performance(99001, athlete_id, 46, "Johns_Hopkins", f"{8 + k / 100:.2f}", "", "Indoor", 2025, "JR")
+                repo.insert_athlete_performance(99001, athlete_id, 30, "Johns_Hopkins", f"{10 + k / 20:.2f}", "", "Indoor", 2025, "JR")
+        repo.insert_athlete_performance(99002, 99000, 46, "Johns_Hopkins", "7.50", "", "Indoor", 2024, "SO")
+        backend = repo.get_backend()
+        
+        percentiles.build(backend)
+        table = percentiles.Percentiles(backend)
+        table.load()
+        array_lengths = {len(values) for _, _, values in table.arrays.values()}
+        lookups = [
+            round(table.lookup(46, "M", "Indoor", 6.90, (2025, 2025))),
+            round(table.lookup(46, "M", "Indoor", 8.99, (2025, 2025))),
+            round(table.lookup(46, "M", "Indoor", 8.00, (2025, 2025))),
+            round(table.lookup(30, "M", "Indoor", 15.0, (2025, 2025))),
+            round(table.lookup(30, "M", "Indoor", 25.0)),
+        ]
+        ranges = sorted((first, last, count) for (event_id, _, _, first, last), (_, count, _) in table.arrays.items() if event_id == 46)
+        missing = table.lookup(46, "F", "Indoor", 7.0)
+        
+        # New marks only rebuild their own event, and match a full build
+        repo.insert_athlete(99999, "Test", "Athlete", "m")
+        repo.insert_athlete_performance(99001, 99999, 30, "Johns_Hopkins", "30.00", "", "Indoor", 2025, "SR")
+        dirty = backend.fetchall("SELECT EventID, Gender, SeasonType, SeasonYear FROM PercentileDirty")
+        refreshed = percentiles.refresh(backend)
+        query = "SELECT EventID, FirstYear, LastYear, MarkCount, Quantiles FROM MarkPercentiles ORDER BY EventID, FirstYear, LastYear"
+        incremental = [tuple(row[:4]) + (bytes(row[4]),) for row in backend.fetchall(query)]
+        percentiles.build(backend)
+        rebuilt = [tuple(row[:4]) + (bytes(row[4]),) for row in backend.fetchall(query)]
+        table.load()
+        record = round(table.lookup(30, "M", "Indoor", 30.0))
+    
+    checks = [
+        ("arrays compacted to the quantile points", array_lengths <= set(range(1, percentiles.QUANTILE_POINTS + 1)), True),
+        ("faster than everyone, slowest, median 60m; shot put both ways", lookups, [100, 0, 50, 50, 100]),
+        ("season, window and all-time ranges", ranges,
+         [(0, 0, 201), (2021, 2024, 1), (2022, 2025, 201), (2024, 2024, 1), (2025, 2025, 200)]),
+        ("no marks for the range", missing, None),
+        ("ingest marks its event season dirty", dirty, [(30, "M", "Indoor", 2025)]),
+        ("refresh rebuilds only that event", refreshed, 1),
+        ("refresh matches a full build", incremental == rebuilt, True),
+        ("new best beats every season best", record, 100),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
+FAILING_PAGE_ROW = """<div class="row standard_event_hnd_49">
+  <div class="custom-table-title"><h3>200 Meters</h3></div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Athlete"><a href="https://www.tfrrs.org/athletes/99005/Haverford/Test_Athlete.html">Athlete, Test</a></div>
+    <div class="col" data-label="Year">SO-2</div>
+    <div class="col" data-label="Time"><a href="https://www.tfrrs.org/results/99010/5551/Test_Meet/">22.50</a></div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/99010/Test_Meet">Test Meet</a></div>
+    <div class="col" data-label="Meet Date">Jan 10, 2026</div>
+  </div>
+</div>"""
+
+
+def test_change_feed():
+    """Test the ingest change feed: one run per flush with the distinct keys written, read back after a RunID."""
+    print("\n=== Testing Change Feed ===")
+    
+    change_feed.discard()
+    
+    with testing.local_backend():
+        with contextlib.redirect_stdout(io.StringIO()):
+            repo.insert_event(46, "60 Meters", False)
+            repo.insert_individual_record(IndividualRecord(46, "99001", "Test", "Athlete", "JR-3", "99001", "Test Meet",
+                                                           "Feb 1, 2025", "7.01", ""), "Indoor", 2025, "m", "Johns_Hopkins")
+            repo.insert_individual_record(IndividualRecord(46, "99001", "Test", "Athlete", "JR-3", "99001", "Test Meet",
+                                                           "Feb 1, 2025", "7.05", ""), "Indoor", 2025, "m", "Johns_Hopkins")
+            first = repo.flush_changes("test page 1")
+            empty = repo.flush_changes("test page 2")
+            repo.insert_event(73, "4 x 400 Relay", True)
+            repo.insert_relay_record(RelayRecord(73, (RelayLeg("99002", "Relay", "Leg"), RelayLeg("99003", "Relay", "Leg")),
+                                                 "99002", "Other Meet", "Feb 3, 2024", "3:25.00", ""), "Indoor", 2024, "m", "Ursinus")
+            second = repo.flush_changes("test page 3")
+        backend = repo.get_backend()
+        
+        first_rows = backend.fetchall("SELECT Kind, ChangeKey FROM IngestChange WHERE RunID = %s ORDER BY Kind, ChangeKey", (first,))
+        everything, last = change_feed.changes_since(backend)
+        later, _ = change_feed.changes_since(backend, first)
+        nothing = change_feed.changes_since(backend, last)
+        history = [(run_id, source, count) for run_id, source, _, count in change_feed.runs(backend)]
+        
+        # A flush that fails leaves no run without its keys; a run that raises before writing leaves none pending
+        def failing_run_many(query, rows):
+            raise Exception("IngestChange write failed")
+        change_feed.record("meet", 99009)
+        backend.run_many = failing_run_many
+        with contextlib.suppress(Exception):
+            repo.flush_changes("test page 4")
+        del backend.run_many
+        half_written = backend.fetchone("SELECT COUNT(*) FROM IngestRun WHERE Source = 'test page 4'")[0]
+        def failing_page():
+            yield "<div>"
+            raise Exception("connection reset")
+        with contextlib.suppress(Exception), contextlib.redirect_stdout(io.StringIO()):
+            stream_parse.scrape_stream(failing_page(), "Indoor", 2025, "m", "Johns_Hopkins")
+        left_over = change_feed.pending()
+        with contextlib.redirect_stdout(io.StringIO()):
+            repo.insert_athlete(99004, "Test", "Athlete", "m")
+            stream_parse.scrape_stream(iter(["<div></div>"]), "Indoor", 2025, "m", "Johns_Hopkins")
+        streamed_run, streamed = change_feed.runs(backend, 1)[0][:2]
+        
+        # A page that fails after writing a mark flushes its keys as a failed run; the retry skips the
+        # stored mark as a duplicate, but its event, school and season are already in the feed
+        def page_then_reset():
+            yield FAILING_PAGE_ROW
+            raise Exception("connection reset")
+        with contextlib.suppress(Exception), contextlib.redirect_stdout(io.StringIO()):
+            stream_parse.scrape_stream(page_then_reset(), "Indoor", 2026, "m", "Haverford")
+        failed_run = change_feed.runs(backend, 1)[0]
+        with contextlib.redirect_stdout(io.StringIO()):
+            stream_parse.scrape_stream(iter([FAILING_PAGE_ROW]), "Indoor", 2026, "m", "Haverford")
+        retried, _ = change_feed.changes_since(backend, streamed_run)
+        retried = (retried["event"], retried["school"], retried["season"])
+        stored = backend.fetchone("SELECT COUNT(*) FROM Performance WHERE SeasonYear = 2026")[0]
+        
+        # Writes that change nothing record nothing; widening a meet's dates does
+        with contextlib.redirect_stdout(io.StringIO()):
+            repo.insert_event(46, "60 Meters", False)
+            repo.insert_athlete(99001, "Test", "Athlete", "m")
+            repo.insert_meet(99001, "Test Meet", "Feb 1, 2025")
+            unchanged = change_feed.pending()
+            repo.insert_meet(99001, "Test Meet", "Jan 31, 2025")
+            widened = change_feed.pending()
+        change_feed.discard()
+    
+    checks = [
+        ("each key written once per run", first_rows,
+         [("athlete", "99001"), ("event", "46"), ("meet", "99001"), ("school", "Johns_Hopkins"), ("season", "2025-Indoor")]),
+        ("runs numbered in order, nothing written makes no run", (first, empty, second), (1, None, 2)),
+        ("changes since the start", (everything["athlete"], everything["season"], last),
+         (["99001", "99002", "99003"], ["2024-Indoor", "2025-Indoor"], 2)),
+        ("changes since a run leave out its keys", (later["meet"], later["school"], later["event"]), (["99002"], ["Ursinus"], ["73"])),
+        ("no changes after the last run", nothing, ({kind: [] for kind in change_feed.KINDS}, 2)),
+        ("run history, most recent first", history, [(2, "test page 3", 6), (1, "test page 1", 5)]),
+        ("failed flush wrote no run", half_written, 0),
+        ("failed run that wrote nothing leaves no keys", left_over, set()),
+        ("streamed page flushed as its own run", streamed, "stream 2025 Indoor m Johns_Hopkins"),
+        ("failed run flushed its keys", failed_run[1], "stream 2026 Indoor m Haverford (failed)"),
+        ("retry stored nothing twice, the failed mark's keys are in the feed", (stored, retried),
+         (1, (["49"], ["Haverford"], ["2026-Indoor"]))),
+        ("existing event, athlete and meet record no keys", unchanged, set()),
+        ("an earlier meet date records the meet", widened, {("meet", "99001")}),
+    ]
+    
+    all_passed = True
+    for name, result, expected in checks:
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} {name}: {result} (expected {expected})")
+    
+    return all_passed
+
+
 def test_database_connection():
     """Test that we can connect to the database."""
     print("\n=== Testing Database Connection ===")
@@ -131,6 +642,15 @@ if __name__ == "__main__":
     # Run tests that don't need DB
     test_result_conversion()
     test_event_type_inference()
+    test_partition_naming()
+    test_local_backend()
+    test_feature_store()
+    test_record_types()
+    test_leaderboard()
+    test_progression()
+    test_ratings()
+    test_percentiles()
+    test_change_feed()
     
     # Run DB tests
     if test_database_connection():
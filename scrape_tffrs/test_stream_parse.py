@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Test script for stream_parse.py
+Checks that the streaming parser produces exactly the same records as scrape.parse_file,
+however the page is split into chunks, and that pages of unknown schools are refused.
+No network needed; writes go to an in-memory SQLite database.
+"""
+
+import io
+import contextlib
+import scrape
+import stream_parse
+import testing
+
+SAMPLE_PAGE = """<html><body><div class="container">
+<a id="event46" name="event46"></a>
+<div class="row standard_event_hnd_46">
+  <div class="custom-table-title"><h3>60 Meters</h3></div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Athlete"><a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye, Spencer</a></div>
+    <div class="col" data-label="Year">JR-3</div>
+    <div class="col" data-label="Time"><a href="https://www.tfrrs.org/results/86241/5551/Navy_Invite/">7.01</a></div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/86241/Navy_Invite">Navy Invite</a></div>
+    <div class="col" data-label="Meet Date">
+        Dec 7, 2024
+    </div>
+  </div>
+</div>
+<a id="event66" name="event66"></a>
+<div class="row standard_event_hnd_66">
+  <div class="custom-table-title"><h3>Long Jump</h3></div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Athlete"><a href="https://www.tfrrs.org/athletes/8002/Johns_Hopkins/Mirra_Klimov.html">Klimov, Mirra</a></div>
+    <div class="col" data-label="Year">SO-2</div>
+    <div class="col" data-label="Mark"><a href="https://www.tfrrs.org/results/86242/5552/Black_&amp;_Blue/">5.51m</a><br></div>
+    <div class="col" data-label="Wind">+1.2</div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/86242/Black_Blue">Black &amp; Blue</a></div>
+    <div class="col" data-label="Meet Date">Jan 11, 2025</div>
+  </div>
+</div>
+<a id="event73" name="event73"></a>
+<div class="row standard_event_hnd_73">
+  <div class="custom-table-title"><h3>4 x 400 Relay</h3></div>
+  <div class="performance-list-row">
+    <div class="col" data-label="Time"><a href="https://www.tfrrs.org/results/86243/5553/Final/">3:22.10</a></div>
+    <div class="col" data-label="Athletes">
+      <a href="https://www.tfrrs.org/athletes/8001/Johns_Hopkins/Spencer_Ye.html">Ye</a>
+      <a href="https://www.tfrrs.org/athletes/8003/Johns_Hopkins/Alex_Colletti.html">Colletti</a>
+      <a href="https://www.tfrrs.org/athletes/8004/Johns_Hopkins/Sam_Lee.html">Lee</a>
+      <a href="https://www.tfrrs.org/athletes/8005/Johns_Hopkins/Jo_Park.html">Park</a>
+    </div>
+    <div class="col" data-label="Meet"><a href="https://www.tfrrs.org/results/86243/Final">Final</a></div>
+    <div class="col" data-label="Meet Date">Feb 1, 2025</div>
+  </div>
+</div>
+</div></body></html>"""
+
+
+def test_stream_matches_soup():
+    """Test the streaming parser against the BeautifulSoup parser for several chunk sizes."""
+    print("\n=== Testing Streaming Parser ===")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        expected = scrape.parse_file(SAMPLE_PAGE, "Indoor", 2025, "m", "Johns_Hopkins")
+
+    all_passed = len(expected) == 6
+    print(f"  {'✓' if all_passed else '✗'} BeautifulSoup parser found {len(expected)} records (expected 6)")
+
+    for chunk_size in (1, 13, 256, len(SAMPLE_PAGE)):
+        chunks = [SAMPLE_PAGE[i:i + chunk_size] for i in range(0, len(SAMPLE_PAGE), chunk_size)]
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = list(stream_parse.iter_records(chunks, "Indoor", 2025, "m", "Johns_Hopkins"))
+        status = "✓" if result == expected else "✗"
+        if result != expected:
+            all_passed = False
+        print(f"  {status} chunk size {chunk_size}: {len(result)} records")
+
+    return all_passed
+
+
+def test_unknown_school():
+    """Test that a page of a school missing from the School table is refused before any of it is read."""
+    print("\n=== Testing Unknown School ===")
+    check = testing.Checks()
+
+    read = []
+    def chunks():
+        read.append(True)
+        yield SAMPLE_PAGE
+
+    with testing.local_backend() as backend:
+        try:
+            stream_parse.scrape_stream(chunks(), "Indoor", 2025, "m", "Not_A_School")
+            error = None
+        except Exception as e:
+            error = str(e)
+        performances = backend.fetchone("SELECT COUNT(*) FROM Performance")[0]
+
+    check(error is not None and "Not_A_School" in error, f"unknown school refused: {error}")
+    check(read == [] and performances == 0, "nothing read or written")
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Stream Parser Test Suite")
+    print("=" * 50)
+
+    test_stream_matches_soup()
+    test_unknown_school()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Test script for work_queue.py
+Checks claiming, leases, retries and dead tasks on a throwaway queue file. No database or network needed.
+"""
+
+import os
+import time
+import tempfile
+import work_queue
+import discovery
+import testing
+
+
+def test_work_queue():
+    """Test that tasks are claimed once, retried, and marked dead after MAX_ATTEMPTS."""
+    print("\n=== Testing Work Queue ===")
+
+    path = os.path.join(tempfile.mkdtemp(), "queue.db")
+    queue = work_queue.WorkQueue(path)
+    other = work_queue.WorkQueue(path)
+    check = testing.Checks()
+
+    tasks = [
+        (2025, "Indoor", "Ursinus", "PA", "m", 4874, 661),
+        (2025, "Indoor", "Ursinus", "PA", "f", 4874, 661),
+    ]
+    check(queue.connection.execute("PRAGMA journal_mode").fetchone()[0] == "delete", "rollback journal, usable over a network filesystem")
+    check(queue.enqueue(tasks) == 2, "enqueue adds new tasks")
+    check(queue.enqueue(tasks) == 0, "enqueue skips known tasks")
+
+    first = queue.claim("worker-a")
+    second = other.claim("worker-b")
+    check(first is not None and second is not None and first.task_id != second.task_id, "two workers claim different tasks")
+    check(queue.claim("worker-a") is None, "nothing left to claim while both are leased")
+
+    check(not other.complete(first.task_id, "worker-b"), "a worker can't complete another worker's task")
+    check(queue.complete(first.task_id, "worker-a"), "lease owner completes its task")
+
+    # Retry immediately instead of waiting for the backoff delay
+    work_queue.RETRY_DELAY = 0
+    check(other.fail(second.task_id, "worker-b", "HTTP 503") == "pending", "failed task goes back to pending")
+
+    retried = queue.claim("worker-a", lease_seconds=-1)
+    check(retried is not None and retried.task_id == second.task_id and retried.attempts == 2, "failed task is claimed again")
+    stolen = other.claim("worker-b")
+    check(stolen is not None and stolen.task_id == second.task_id, "expired lease is claimed by another worker")
+    check(other.fail(stolen.task_id, "worker-b", "HTTP 503") == "dead", "task is dead after MAX_ATTEMPTS")
+
+    check(queue.status_counts() == {"pending": 0, "leased": 0, "done": 1, "dead": 1}, "status counts")
+    check(queue.retry_dead() == 1 and queue.outstanding() == 1, "retry-dead re-queues dead tasks")
+
+    # Only schools with a School row are queued; slugs that can't be a SchoolID never reach the catalog
+    catalog = discovery.seed_catalog()
+    added = discovery.add_teams(catalog, [("Stevens_Institute_of_Technology", "NJ", "m"), ("Stevens", "NJ", "m")])
+    check(added == 1 and "Stevens_Institute_of_Technology" not in catalog["teams"], "over-long team slugs skipped")
+    known = {school for school, _, _ in discovery.iterate_teams(catalog, known={"Ursinus", "Bryn_Mawr"})}
+    check(known == {"Ursinus", "Bryn_Mawr"}, "teams limited to known SchoolIDs")
+    check({task[2] for task in work_queue.catalog_tasks(2025, 2025, known={"Ursinus"})} == {"Ursinus"}, "tasks only for known schools")
+
+    # A heartbeat keeps a short lease alive while the task runs, and notices once another worker holds it
+    path = os.path.join(tempfile.mkdtemp(), "heartbeat.db")
+    queue.close()
+    other.close()
+    queue = work_queue.WorkQueue(path)
+    other = work_queue.WorkQueue(path)
+    queue.enqueue(tasks[:1])
+    held = queue.claim("worker-a", lease_seconds=0.3)
+    with work_queue.LeaseHeartbeat(path, held.task_id, "worker-a", 0.3) as heartbeat:
+        time.sleep(0.6)
+        check(other.claim("worker-b") is None and not heartbeat.lost.is_set(), "heartbeat extends the lease of a long task")
+    time.sleep(0.4)
+    taken = other.claim("worker-b")
+    with work_queue.LeaseHeartbeat(path, held.task_id, "worker-a", 0.3) as heartbeat:
+        time.sleep(0.3)
+        check(taken is not None and heartbeat.lost.is_set(), "heartbeat reports a lease lost to another worker")
+    check(not queue.complete(held.task_id, "worker-a"), "the stopped worker can't complete the task")
+
+    queue.close()
+    other.close()
+    return check.passed
+
+
+if __name__ == "__main__":
+    print("=" * 50)
+    print("Work Queue Test Suite")
+    print("=" * 50)
+
+    test_work_queue()
+
+    print("\n" + "=" * 50)
+    print("Tests complete!")
@@ -0,0 +1,36 @@
+# Testing.py
+# Helpers shared by the test_*.py scripts (scrape_tffrs and prediction_analysis)
+#
+#   check = testing.Checks()
+#   check(result == expected, "what is being checked")      ->   ✓ what is being checked
+#   with testing.local_backend():
+#       ...                                                  repository writes go to an in-memory SQLite database
+#   return check.passed
+
+import contextlib
+import repository as repo
+import backends
+
+
+class Checks:
+    """Prints one ✓/✗ line per check; passed stays True until a check fails"""
+
+    def __init__(self):
+        self.passed = True
+
+    def __call__(self, condition, message : str) -> bool:
+        if not condition:
+            self.passed = False
+        print(f"  {'✓' if condition else '✗'} {message}")
+        return bool(condition)
+
+
+@contextlib.contextmanager
+def local_backend():
+    """Send the repository to a fresh in-memory SQLite database for the block, then put its backend back"""
+    original_backend = repo._backend
+    repo.use_backend(backends.SQLiteBackend(":memory:"))
+    try:
+        yield repo.get_backend()
+    finally:
+        repo.use_backend(original_backend)
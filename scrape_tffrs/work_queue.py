@@ -0,0 +1,342 @@
+# Work_queue.py
+# Shared work queue for spreading a crawl over several worker processes or hosts
+#
+# A coordinator enqueues one task per (season, school, gender) page. Workers claim tasks with a
+# time-limited lease, download and scrape the page, and report back. A task whose worker dies is
+# claimed again once its lease expires; failed tasks are retried with a growing delay and marked
+# dead after MAX_ATTEMPTS so they can be inspected and re-queued centrally. While a page is ingested a
+# heartbeat thread keeps extending the lease; if the lease is lost anyway the worker stops writing. The
+# repository skips marks it already has, so a retried or taken-over page only adds what is missing.
+#
+# The queue is a SQLite file (WORK_QUEUE_PATH, default work_queue.db). Claims take a write lock
+# (BEGIN IMMEDIATE), so any number of processes can share it; hosts can share it over a network
+# filesystem that supports file locks. It uses the rollback journal rather than WAL, which needs
+# shared memory between the processes and so doesn't work over a network filesystem.
+#
+# Usage:
+#   python work_queue.py enqueue [--first-year 2010] [--last-year 2026] [--school Ursinus]...
+#   python work_queue.py worker [--worker-id host-1]
+#   python work_queue.py status
+#   python work_queue.py retry-dead
+
+import os
+import time
+import socket
+import threading
+import sqlite3
+import argparse
+from collections import namedtuple
+import discovery
+
+QUEUE_PATH = os.environ.get(
+    "WORK_QUEUE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "work_queue.db"),
+)
+
+LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3
+RETRY_DELAY = 30
+MAX_RETRY_DELAY = 600
+POLL_INTERVAL = 5
+
+Task = namedtuple("Task", ["task_id", "season_year", "season_type", "school", "state", "gender", "list_hnd", "season_hnd", "attempts"])
+
+TASK_COLUMNS = "TaskID, SeasonYear, SeasonType, School, State, Gender, ListHnd, SeasonHnd, Attempts"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS Task (
+    TaskID          INTEGER PRIMARY KEY,
+    SeasonYear      INT NOT NULL,
+    SeasonType      VARCHAR(10) NOT NULL,
+    School          VARCHAR(100) NOT NULL,
+    State           VARCHAR(2) NOT NULL,
+    Gender          VARCHAR(1) NOT NULL,
+    ListHnd         INT NOT NULL,
+    SeasonHnd       INT NOT NULL,
+    Status          VARCHAR(10) NOT NULL DEFAULT 'pending' CHECK (Status IN ('pending', 'leased', 'done', 'dead')),
+    Attempts        INT NOT NULL DEFAULT 0,
+    LeaseOwner      VARCHAR(100),
+    LeaseExpires    REAL,
+    AvailableAt     REAL NOT NULL DEFAULT 0,
+    LastError       TEXT,
+    UpdatedAt       REAL,
+    UNIQUE (SeasonYear, SeasonType, School, Gender)
+);
+
+CREATE INDEX IF NOT EXISTS Task_Status ON Task (Status, AvailableAt);
+"""
+
+
+class WorkQueue:
+
+    def __init__(self, path : str = QUEUE_PATH):
+        self.path = path
+        # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+        self.connection = sqlite3.connect(path, timeout=60, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode = DELETE")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def transaction(self):
+        """Take the write lock up front, so two workers can never claim the same task"""
+        self.connection.execute("BEGIN IMMEDIATE")
+
+    # ========================================
+    # Coordinator
+    # ========================================
+
+    def enqueue(self, tasks : list) -> int:
+        """Add (year, season, school, state, gender, list_hnd, season_hnd) tasks; known pages are skipped"""
+        self.transaction()
+        try:
+            before = self.connection.total_changes
+            self.connection.executemany("""
+                INSERT OR IGNORE INTO Task (SeasonYear, SeasonType, School, State, Gender, ListHnd, SeasonHnd, UpdatedAt)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, [tuple(task) + (time.time(),) for task in tasks])
+            added = self.connection.total_changes - before
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return added
+
+    def retry_dead(self) -> int:
+        """Give every dead task a fresh set of attempts"""
+        cur = self.connection.execute("""
+            UPDATE Task SET Status = 'pending', Attempts = 0, AvailableAt = 0, LeaseOwner = NULL, LeaseExpires = NULL, UpdatedAt = ?
+            WHERE Status = 'dead'
+        """, (time.time(),))
+        return cur.rowcount
+
+    def status_counts(self) -> dict:
+        counts = {"pending": 0, "leased": 0, "done": 0, "dead": 0}
+        for status, count in self.connection.execute("SELECT Status, COUNT(*) FROM Task GROUP BY Status"):
+            counts[status] = count
+        return counts
+
+    def dead_tasks(self) -> list:
+        return self.connection.execute("""
+            SELECT SeasonYear, SeasonType, School, Gender, Attempts, LastError FROM Task WHERE Status = 'dead'
+            ORDER BY SeasonYear, SeasonType, School, Gender
+        """).fetchall()
+
+    def outstanding(self) -> int:
+        """Tasks that are not finished yet (waiting, leased, or waiting for a retry)"""
+        return self.connection.execute("SELECT COUNT(*) FROM Task WHERE Status IN ('pending', 'leased')").fetchone()[0]
+
+    # ========================================
+    # Worker
+    # ========================================
+
+    def claim(self, worker_id : str, lease_seconds : float = LEASE_SECONDS):
+        """Lease the next available task to a worker, or None if nothing is ready"""
+        now = time.time()
+        self.transaction()
+        try:
+            # A worker that dies while holding the last attempt's lease leaves the task dead
+            self.connection.execute("""
+                UPDATE Task SET Status = 'dead', LastError = COALESCE(LastError, 'lease expired'), UpdatedAt = ?
+                WHERE Status = 'leased' AND LeaseExpires < ? AND Attempts >= ?
+            """, (now, now, MAX_ATTEMPTS))
+
+            row = self.connection.execute(f"""
+                SELECT {TASK_COLUMNS} FROM Task
+                WHERE (Status = 'pending' AND AvailableAt <= ?) OR (Status = 'leased' AND LeaseExpires < ?)
+                ORDER BY SeasonYear, SeasonType, TaskID
+                LIMIT 1
+            """, (now, now)).fetchone()
+
+            if row is None:
+                self.connection.execute("COMMIT")
+                return None
+
+            self.connection.execute("""
+                UPDATE Task SET Status = 'leased', Attempts = Attempts + 1, LeaseOwner = ?, LeaseExpires = ?, UpdatedAt = ?
+                WHERE TaskID = ?
+            """, (worker_id, now + lease_seconds, now, row[0]))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+
+        task = Task(*row)
+        return task._replace(attempts=task.attempts + 1)
+
+    def extend_lease(self, task_id : int, worker_id : str, lease_seconds : float = LEASE_SECONDS) -> bool:
+        """Heartbeat for long tasks. False if the lease was lost to another worker"""
+        cur = self.connection.execute("""
+            UPDATE Task SET LeaseExpires = ?, UpdatedAt = ?
+            WHERE TaskID = ? AND Status = 'leased' AND LeaseOwner = ?
+        """, (time.time() + lease_seconds, time.time(), task_id, worker_id))
+        return cur.rowcount == 1
+
+    def complete(self, task_id : int, worker_id : str) -> bool:
+        """Mark a leased task done. False if the lease was lost to another worker"""
+        cur = self.connection.execute("""
+            UPDATE Task SET Status = 'done', LeaseOwner = NULL, LeaseExpires = NULL, LastError = NULL, UpdatedAt = ?
+            WHERE TaskID = ? AND Status = 'leased' AND LeaseOwner = ?
+        """, (time.time(), task_id, worker_id))
+        return cur.rowcount == 1
+
+    def fail(self, task_id : int, worker_id : str, error : str) -> str:
+        """Report a failed attempt; the task is retried after a delay or marked dead. Returns the new status"""
+        self.transaction()
+        try:
+            row = self.connection.execute(
+                "SELECT Attempts FROM Task WHERE TaskID = ? AND Status = 'leased' AND LeaseOwner = ?",
+                (task_id, worker_id),
+            ).fetchone()
+            if row is None:
+                self.connection.execute("COMMIT")
+                return None
+
+            attempts = row[0]
+            now = time.time()
+            status = "dead" if attempts >= MAX_ATTEMPTS else "pending"
+            delay = min(RETRY_DELAY * (2 ** (attempts - 1)), MAX_RETRY_DELAY)
+            self.connection.execute("""
+                UPDATE Task SET Status = ?, LeaseOwner = NULL, LeaseExpires = NULL, AvailableAt = ?, LastError = ?, UpdatedAt = ?
+                WHERE TaskID = ?
+            """, (status, now + delay, error, now, task_id))
+            self.connection.execute("COMMIT")
+        except Exception:
+            self.connection.execute("ROLLBACK")
+            raise
+        return status
+
+
+class LeaseHeartbeat:
+    """
+    Extends a task's lease every lease_seconds / 3 from a background thread while the task runs.
+    lost is set, and the heartbeat stops, once another worker has taken the task over.
+    """
+
+    def __init__(self, path : str, task_id : int, worker_id : str, lease_seconds : float = LEASE_SECONDS):
+        self.path = path
+        self.task_id = task_id
+        self.worker_id = worker_id
+        self.lease_seconds = lease_seconds
+        self.lost = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, daemon=True)
+
+    def _beat(self):
+        # A SQLite connection belongs to the thread that opened it
+        queue = WorkQueue(self.path)
+        try:
+            while not self._stop.wait(max(self.lease_seconds / 3, 0)):
+                if not queue.extend_lease(self.task_id, self.worker_id, self.lease_seconds):
+                    self.lost.set()
+                    break
+        finally:
+            queue.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def catalog_tasks(first_year : int = None, last_year : int = None, schools : list = None, known : set = None) -> list:
+    """One task per season and gender team in the discovery catalog, of the known SchoolIDs if given"""
+    catalog = discovery.load_catalog()
+    tasks = []
+    for (year, season), (lst_hnd, season_hnd) in discovery.get_seasons(catalog, first_year, last_year).items():
+        for school, state, gender in discovery.iterate_teams(catalog, schools, known):
+            tasks.append((year, season, school, state, gender, lst_hnd, season_hnd))
+    return tasks
+
+
+def process_task(task : Task, should_stop=None):
+    """Download, save and scrape one page, stopping between records once should_stop() is true"""
+    # Imported here so the status and retry-dead commands don't need the database configured
+    import download_page
+    import scrape as scraper
+
+    url = download_page.get_full_url(task.school, task.state, task.gender, task.list_hnd, task.season_hnd)
+    html_content = download_page.get_url_html_content(url)
+
+    outpath = "pages/" + str(task.season_year) + "_" + task.season_type + "_" + url.split("/")[-1].split("?")[0]
+    with open(outpath, 'w') as f:
+        f.write(html_content)
+
+    scraper.scrape_file(html_content, task.season_type, task.season_year, task.gender, task.school, should_stop=should_stop)
+
+
+def run_worker(queue : WorkQueue, worker_id : str, lease_seconds : float = LEASE_SECONDS):
+    """Claim and process tasks until the queue has nothing left to do"""
+    count = 0
+    while True:
+        task = queue.claim(worker_id, lease_seconds)
+        if task is None:
+            if queue.outstanding() == 0:
+                break
+            # Everything left is leased by someone else or waiting for a retry
+            time.sleep(POLL_INTERVAL)
+            continue
+
+        label = f"{task.season_year} {task.season_type} {task.school} {task.gender}"
+        try:
+            # The heartbeat keeps the lease while the page is written; a lost lease stops the ingest
+            with LeaseHeartbeat(queue.path, task.task_id, worker_id, lease_seconds) as heartbeat:
+                process_task(task, heartbeat.lost.is_set)
+            if queue.complete(task.task_id, worker_id):
+                count += 1
+                print(f"WORK QUEUE: {worker_id} completed {label} ({count} pages)")
+            else:
+                print(f"WORK QUEUE: {worker_id} lost the lease on {label}")
+        except Exception as e:
+            status = queue.fail(task.task_id, worker_id, str(e))
+            print(f"WORK QUEUE: {worker_id} failed {label} on attempt {task.attempts}, now {status}: {e}")
+
+        # Rate limiting: small delay between pages to avoid getting blocked
+        time.sleep(0.5)
+
+    print(f"WORK QUEUE: {worker_id} finished, {count} pages completed")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared crawl work queue")
+    parser.add_argument("--queue", default=QUEUE_PATH, help="SQLite queue file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue = commands.add_parser("enqueue", help="Queue pages from the discovery catalog")
+    enqueue.add_argument("--first-year", type=int)
+    enqueue.add_argument("--last-year", type=int)
+    enqueue.add_argument("--school", action="append", help="Limit to a school (repeatable)")
+
+    worker = commands.add_parser("worker", help="Claim and scrape pages until the queue is empty")
+    worker.add_argument("--worker-id", default=f"{socket.gethostname()}-{os.getpid()}")
+    worker.add_argument("--lease", type=float, default=LEASE_SECONDS, help="Lease length in seconds")
+
+    commands.add_parser("status", help="Show task counts and dead tasks")
+    commands.add_parser("retry-dead", help="Re-queue dead tasks")
+
+    args = parser.parse_args()
+    queue = WorkQueue(args.queue)
+
+    if args.command == "enqueue":
+        # Pages of schools without a School row could only fail, so they aren't queued
+        import repository as repo
+        tasks = catalog_tasks(args.first_year, args.last_year, args.school, repo.school_ids())
+        print(f"WORK QUEUE: Queued {queue.enqueue(tasks)} new tasks ({len(tasks)} requested)")
+    elif args.command == "worker":
+        run_worker(queue, args.worker_id, args.lease)
+    elif args.command == "status":
+        print(queue.status_counts())
+        for year, season, school, gender, attempts, error in queue.dead_tasks():
+            print(f"  dead: {year} {season} {school} {gender} after {attempts} attempts: {error}")
+    elif args.command == "retry-dead":
+        print(f"WORK QUEUE: Re-queued {queue.retry_dead()} dead tasks")
+
+    queue.close()
+
+
+if __name__ == "__main__":
+    main()